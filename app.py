@@ -1,19 +1,33 @@
 import streamlit as st
 import datetime
+import time
 
 # 스타일 및 유틸리티 모듈 임포트
+# 화면별 컴포넌트와 Gemini SDK는 처음 필요할 때 임포트합니다. (콜드 스타트 단축)
 from styles.styles import load_styles
-from utils.session import initialize_session_state, initialize_gemini_api
-from utils.saju import analyze_saju, generate_saju_insight
-from components.onboarding import show_onboarding
-from components.chat import show_chat_tab
-from components.roadmap import show_roadmap_tab
+from utils.session import (MAIN_TABS, initialize_session_state, initialize_gemini_api, record_session_event,
+                           reset_session)
+from utils.onboarding_job import get_saju_analysis_job
+from utils.delta_meter import finish_delta_meter, start_delta_meter
+from utils.rerun_profiler import finish_rerun_profile, start_rerun_profile
+from utils.llm import is_degraded
+from utils.session_memory import get_session_memory_monitor
+from utils.tracing import finish_rerun_span, start_rerun_span, traced
 
 # Requirements.txt:
 # streamlit==1.32.0
 # google-generativeai==0.3.1
 # python-dotenv==1.0.0
 
+# 요청된 경우 이번 실행의 프로파일링 시작 (느린 실행만 저장)
+rerun_profile = start_rerun_profile()
+
+# 추적이 켜져 있으면 이번 실행 전체를 최상위 구간으로 기록
+rerun_span = start_rerun_span()
+
+# 이번 실행에서 브라우저로 보내는 전송량 측정 시작 (main()에서 화면별로 기록)
+delta_meter = start_delta_meter()
+
 # Page configuration
 st.set_page_config(
     page_title="사주기반 멘토",
@@ -28,12 +42,23 @@ load_styles()
 # 세션 상태 초기화
 initialize_session_state()
 
-# Gemini API 초기화
-gemini_model = initialize_gemini_api()
+# Gemini API 키 등록 (SDK 로드는 첫 호출 시점으로 지연)
+initialize_gemini_api()
+
+# 세션별 메모리 측정 타이머 시작 (프로세스당 한 번)
+get_session_memory_monitor()
+
+# 백그라운드 사주 분석 진행 상황을 화면에 반영하는 간격 (초)
+ANALYSIS_POLL_SECONDS = 0.3
 
 
+@traced('render.main_screen')
 def show_main_screen():
     """메인 화면을 표시합니다."""
+    from components.chat import show_chat_tab
+    from components.history import show_history_transfer
+    from components.roadmap import show_roadmap_tab
+    
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
     
     # 상단 헤더
@@ -45,49 +70,100 @@ def show_main_screen():
     
     with col3:
         if st.button("처음으로", key="reset_button"):
-            # 세션 스테이트 초기화
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            # 세션 자원 정리 및 세션 스테이트 초기화
+            reset_session()
             st.rerun()
     
     # 사주 분석 결과 expander
     with st.expander("📜 내 사주 자세히 보기"):
         st.markdown("### 📊 사주 분석 결과")
-        st.markdown(st.session_state['user_info'].get('saju_analysis', '분석 결과가 없습니다.'))
+        analysis_box = st.empty()
+        analysis_status = st.empty()
+        if 'saju_analysis' in st.session_state['user_info'] or get_saju_analysis_job() is None:
+            analysis_box.markdown(st.session_state['user_info'].get('saju_analysis', '분석 결과가 없습니다.'))
     
-    # 세션 상태에 탭 인덱스가 없으면 초기화
-    if 'active_tab' not in st.session_state:
-        st.session_state['active_tab'] = 0
+    # 전체 기록 내보내기 / 가져오기
+    show_history_transfer()
     
-    # 탭 구성 - 활성화된 탭 번호 지정
-    tabs = st.tabs(["🔮 고민 상담실", "🗺️ 나의 7일 계획"])
+    # 탭 선택은 서버 쪽 위젯 상태로 관리하고, 선택된 탭의 내용만 그림
+    # (보이지 않는 탭의 느린 작업이 현재 탭의 응답을 늦추지 않도록)
+    active_tab = st.radio("메뉴", MAIN_TABS, key='active_tab', horizontal=True, label_visibility="collapsed")
     
-    # 채팅 탭
-    with tabs[0]:
+    if active_tab == MAIN_TABS[0]:
         show_chat_tab()
-    
-    # 로드맵 탭
-    with tabs[1]:
+    else:
         show_roadmap_tab()
-        
-    # 자동 탭 선택 (JavaScript 사용)
-    if st.session_state['active_tab'] > 0:
-        js = f"""
-        <script>
-            window.parent.document.querySelectorAll('.stTabs button[role="tab"]')[{st.session_state['active_tab']}].click();
-        </script>
-        """
-        st.components.v1.html(js, height=0, width=0)
     
     st.markdown('</div>', unsafe_allow_html=True)
+    
+    # 화면을 모두 그린 뒤, 백그라운드 사주 분석이 진행 중이면 도착한 내용을 이어서 표시
+    _follow_saju_analysis(analysis_box, analysis_status)
+
+
+def _follow_saju_analysis(analysis_box, status_box):
+    """
+    백그라운드 사주 분석 작업의 진행 내용을 분석 결과 영역에 스트리밍 표시하고,
+    끝나면 결과를 세션 상태에 반영합니다.
+    
+    화면 갱신은 Streamlit의 중단 지점이므로, 사용자가 다른 동작을 하면 이 대기는 곧바로 중단됩니다.
+    분석 텍스트가 바뀌지 않는 동안(로드맵 생성 중 등)에도 진행 안내를 매번 갱신하여 중단 지점을 유지합니다.
+    
+    Args:
+        analysis_box: 분석 결과를 표시할 st.empty() 영역
+        status_box: 진행 안내를 표시할 st.empty() 영역
+    """
+    job = get_saju_analysis_job()
+    if job is None:
+        return
+    
+    shown = None
+    while not job.finished:
+        text = job.text
+        if text != shown:
+            analysis_box.markdown(text + " ▌" if text else "전체 사주를 분석하고 있어요...")
+            shown = text
+        # 긴 분석 본문 대신 짧은 안내만 매번 다시 그림
+        status_box.caption("성장 로드맵을 준비하고 있어요..." if job.analysis_done else "분석 내용을 받고 있어요...")
+        time.sleep(ANALYSIS_POLL_SECONDS)
+    status_box.empty()
+    
+    from utils.saju import extract_core_traits
+    
+    user_info = st.session_state['user_info']
+    if job.error:
+        # 오류 문구나 중간에 끊긴(취소된) 분석은 저장하지 않음
+        st.toast(job.error)
+    elif job.text and not job.cancelled:
+        user_info['saju_analysis'] = job.text
+        if 'core_traits' not in user_info:
+            traits = extract_core_traits(job.text)
+            if traits:
+                user_info['core_traits'] = traits
+        record_session_event('user_info.update', saju_analysis=job.text,
+                             core_traits=user_info.get('core_traits', ''))
+    if job.roadmap and not is_degraded(job.roadmap):
+        st.session_state['roadmap'] = job.roadmap
+        record_session_event('roadmap.set', text=job.roadmap)
+    del st.session_state['saju_analysis_job']
+    
+    # 로드맵 탭 등 분석 결과를 쓰는 화면을 새로 그림
+    st.rerun()
 
 
 def main():
     """애플리케이션의 메인 실행 함수"""
-    if not st.session_state.get('onboarding_complete', False):
-        show_onboarding()
-    else:
-        show_main_screen()
+    screen = 'onboarding'
+    try:
+        if not st.session_state.get('onboarding_complete', False):
+            from components.onboarding import show_onboarding
+            show_onboarding()
+        else:
+            screen = 'chat' if st.session_state.get('active_tab') == MAIN_TABS[0] else 'roadmap'
+            show_main_screen()
+    finally:
+        finish_delta_meter(delta_meter, screen)
+        finish_rerun_profile(rerun_profile, screen)
+        finish_rerun_span(rerun_span, screen)
 
 
 if __name__ == "__main__":
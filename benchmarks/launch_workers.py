@@ -0,0 +1,131 @@
+"""
+다중 워커 실행기 (벤치마크용)
+
+Streamlit 워커 N개를 서로 다른 포트로 띄우고, 그 앞에 로컬 TCP 리버스 프록시를 둡니다.
+모든 워커는 같은 CACHE_BACKEND_URL을 사용하므로 LLM 응답 캐시와 호출 횟수 제한 카운터가 공유됩니다.
+
+프록시는 TCP 연결 단위로 워커를 고릅니다. 기본은 클라이언트 IP 해시로 워커를 고정하는 방식입니다.
+st.file_uploader 업로드처럼 웹소켓 세션과 별도 HTTP 요청이 같은 워커의 세션 상태를 써야 하는 기능이 있으므로,
+--round-robin (연결마다 다른 워커) 은 웹소켓만 쓰는 부하 측정에만 사용합니다.
+
+캐시 URL의 sqlite:/// 뒤 경로는 저장소 루트 기준 상대 경로입니다. (절대 경로는 sqlite:////절대/경로)
+
+사용법:
+    python benchmarks/launch_workers.py --workers 4 --port 8500 --cache sqlite:///.cache/shared.db
+    python benchmarks/launch_workers.py --workers 4 --cache redis://127.0.0.1:6379/0
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def start_workers(count: int, base_port: int, cache_url: str) -> List[subprocess.Popen]:
+    """
+    Streamlit 워커 프로세스를 시작합니다.
+
+    Args:
+        count: 워커 수
+        base_port: 첫 워커 포트 (이후 1씩 증가)
+        cache_url: 모든 워커가 공유할 캐시 백엔드 URL
+
+    Returns:
+        List[subprocess.Popen]: 워커 프로세스 목록
+    """
+    env = dict(os.environ, CACHE_BACKEND_URL=cache_url)
+    workers = []
+    for index in range(count):
+        workers.append(subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", str(ROOT / "app.py"),
+             "--server.port", str(base_port + index),
+             "--server.headless", "true",
+             "--server.enableCORS", "false",
+             "--server.enableXsrfProtection", "false"],
+            cwd=ROOT, env=env
+        ))
+    return workers
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        try:
+            writer.close()
+        except Exception:
+            pass
+
+async def run_proxy(listen_port: int, upstreams: List[Tuple[str, int]], sticky: bool = True) -> None:
+    """
+    연결 단위 TCP 리버스 프록시를 실행합니다.
+
+    Args:
+        listen_port: 프록시가 받을 포트
+        upstreams: (호스트, 포트) 워커 주소 목록
+        sticky: True(기본값)면 클라이언트 IP 해시로, False면 라운드 로빈으로 워커 선택
+    """
+    rotation = itertools.cycle(range(len(upstreams)))
+
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        if sticky:
+            peer_host = client_writer.get_extra_info("peername")[0]
+            index = zlib.crc32(peer_host.encode()) % len(upstreams)
+        else:
+            index = next(rotation)
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(*upstreams[index])
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            _pipe(client_reader, upstream_writer),
+            _pipe(upstream_reader, client_writer),
+        )
+
+    server = await asyncio.start_server(handle, "127.0.0.1", listen_port)
+    print(f"프록시 http://127.0.0.1:{listen_port} → " + ", ".join(f"{h}:{p}" for h, p in upstreams))
+    async with server:
+        await server.serve_forever()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Streamlit 다중 워커 + 로컬 리버스 프록시")
+    parser.add_argument("--workers", type=int, default=2, help="워커 수")
+    parser.add_argument("--port", type=int, default=8500, help="프록시 포트")
+    parser.add_argument("--worker-base-port", type=int, default=8601, help="첫 워커 포트")
+    parser.add_argument("--cache", default="sqlite:///.cache/shared.db",
+                        help="공유 캐시 백엔드 URL (memory://, sqlite:///저장소 기준 상대 경로, redis://호스트:포트/DB)")
+    parser.add_argument("--round-robin", action="store_true",
+                        help="연결마다 워커를 돌아가며 선택 (파일 업로드가 실패할 수 있으므로 웹소켓 부하 측정용)")
+    args = parser.parse_args()
+
+    workers = start_workers(args.workers, args.worker_base_port, args.cache)
+    upstreams = [("127.0.0.1", args.worker_base_port + i) for i in range(args.workers)]
+
+    def shutdown(*_):
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait(timeout=10)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    try:
+        asyncio.run(run_proxy(args.port, upstreams, sticky=not args.round_robin))
+    except KeyboardInterrupt:
+        shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+재실행 전송량 벤치마크
+
+메인 화면(고민 상담실 탭, 7일 계획 탭)을 여러 번 다시 실행하며
+실행 한 번에 브라우저로 보내는 바이트 수와 화면 요소 수를 측정합니다. (utils.delta_meter 참고)
+LLM은 호출하지 않도록 분석 결과와 7일 계획을 미리 채운 세션으로 실행합니다.
+
+사용법:
+    python benchmarks/rerun_payload_benchmark.py [--runs 5]
+"""
+import argparse
+import datetime
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from utils import metrics  # noqa: E402
+from utils.calendar import TaskStore  # noqa: E402
+from utils.session import MAIN_TABS  # noqa: E402
+
+SAMPLE_PLAN = [
+    {'title': f'{i}일차 실천 활동', 'description': '하루 10분 동안 오늘의 감정을 기록하고 돌아봅니다. ' * 3}
+    for i in range(1, 8)
+]
+
+def run_screen(tab: str, runs: int) -> None:
+    """
+    지정한 탭을 선택한 메인 화면을 runs번 다시 실행합니다.
+
+    Args:
+        tab: MAIN_TABS 중 하나
+        runs: 재실행 횟수
+    """
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=60)
+    at.secrets['gemini_api_key'] = 'benchmark'
+    at.run()
+    at.session_state['user_info'] = {
+        'name': '홍길동', 'birthdate': datetime.date(1990, 1, 1), 'birth_hour': '모름',
+        'saju_analysis': '분석 결과입니다. ' * 50, 'core_traits': '따뜻한 리더',
+    }
+    at.session_state['roadmap'] = '성장 인사이트입니다. ' * 40
+    task_store = TaskStore()
+    today = datetime.date.today()
+    at.session_state['plan_task_ids'] = [
+        task_store.add((today + datetime.timedelta(days=i)).isoformat(), dict(item))
+        for i, item in enumerate(SAMPLE_PLAN)
+    ]
+    at.session_state['task_store'] = task_store
+    at.session_state['current_concern'] = '커리어 방향을 어떻게 정할 수 있을까요?'
+    at.session_state['onboarding_complete'] = True
+    at.session_state['active_tab'] = tab
+    for _ in range(runs):
+        at.run()
+        assert not at.exception, at.exception
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="재실행 전송량 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="화면별 재실행 횟수")
+    args = parser.parse_args()
+
+    metrics.reset_metrics()
+    for tab in MAIN_TABS:
+        run_screen(tab, args.runs)
+
+    observations = metrics.get_metrics()['observations']
+    print(f"{'화면':<12}{'평균 바이트':>12}{'최대 바이트':>12}{'평균 요소 수':>12}")
+    for screen in ('onboarding', 'chat', 'roadmap'):
+        sent = observations.get(f"rerun.delta_bytes.{screen}")
+        elements = observations.get(f"rerun.elements.{screen}")
+        if not sent:
+            continue
+        print(f"{screen:<12}{sent['sum'] / sent['count']:>12.0f}{sent['max']:>12.0f}"
+              f"{elements['sum'] / elements['count']:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+앱 시작 시간 벤치마크
+
+1. `python -X importtime` 으로 진입점이 끌어오는 모듈별 누적 임포트 시간을 측정합니다.
+2. 새 프로세스에서 app.py 첫 화면(온보딩)을 렌더링하기까지의 콜드 스타트 시간을 측정합니다.
+
+사용법:
+    python benchmarks/startup_benchmark.py [--runs 5] [--top 15]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 첫 화면 렌더링 경로에서 임포트되는 모듈
+STARTUP_MODULES = ["styles.styles", "utils.session", "components.onboarding"]
+
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=60)
+at.secrets['gemini_api_key'] = 'benchmark'
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+def measure_import_times(modules: List[str]) -> List[Tuple[int, str]]:
+    """
+    -X importtime 출력을 파싱하여 모듈별 누적 임포트 시간(us)을 반환합니다.
+
+    Args:
+        modules: 임포트할 모듈 목록
+
+    Returns:
+        List[Tuple[int, str]]: (누적 시간 us, 모듈 이름) 목록, 큰 순서
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((int(cumulative_us), name.strip()))
+    return sorted(timings, reverse=True)
+
+def measure_cold_start(runs: int) -> List[float]:
+    """
+    새 프로세스에서 첫 화면 렌더링까지 걸린 시간(초)을 측정합니다.
+
+    Args:
+        runs: 반복 횟수
+
+    Returns:
+        List[float]: 회차별 소요 시간 (초)
+    """
+    script = COLD_START_SCRIPT.format(app=str(ROOT / "app.py"))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="사주기반 멘토 시작 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="콜드 스타트 측정 반복 횟수")
+    parser.add_argument("--top", type=int, default=15, help="출력할 임포트 상위 항목 수")
+    args = parser.parse_args()
+
+    print("## 임포트 시간 (-X importtime, 누적 기준)")
+    timings = measure_import_times(STARTUP_MODULES)
+    for cumulative_us, name in timings[:args.top]:
+        print(f"{cumulative_us / 1000:9.1f} ms  {name}")
+    loaded = {name for _, name in timings}
+    print(f"\ngoogle.generativeai 로드 여부: {'예' if 'google.generativeai' in loaded else '아니오'}")
+
+    print(f"\n## 콜드 스타트 (첫 화면 렌더링, {args.runs}회)")
+    samples = measure_cold_start(args.runs)
+    print(f"중앙값 {statistics.median(samples):.3f}s / 최소 {min(samples):.3f}s / 최대 {max(samples):.3f}s")
+
+if __name__ == "__main__":
+    main()
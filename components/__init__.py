@@ -6,3 +6,4 @@
 # - from components.onboarding import show_onboarding
 # - from components.chat_ui import render_chat_ui
 # - from components.calendar_ui import render_calendar
+# - from components.history import show_history_transfer
@@ -0,0 +1,100 @@
+"""
+월간 캘린더 컴포넌트
+
+한 달치 6주 x 7일 그리드를 하나의 HTML 블록으로 그리고,
+날짜별 태스크 수와 완료 비율을 함께 표시합니다.
+
+Export 형태:
+- from components.calendar_ui import render_calendar
+- 또는 import components.calendar_ui as calendar_ui 후 calendar_ui.render_calendar() 형태로 사용
+"""
+import datetime
+import streamlit as st
+from typing import Dict, Tuple
+from utils.tracing import traced
+from utils.calendar import (
+    get_month_calendar, get_prev_month, get_next_month, get_month_task_summary
+)
+
+WEEKDAY_LABELS = ['월', '화', '수', '목', '금', '토', '일']
+
+def _density_class(task_count: int) -> str:
+    """태스크 수에 따른 밀도 CSS 클래스를 반환합니다."""
+    if task_count >= 4:
+        return "density-3"
+    if task_count >= 2:
+        return "density-2"
+    return "density-1"
+
+def build_calendar_html(year: int, month: int, summary: Dict[str, Tuple[int, int]],
+                        today: datetime.date) -> str:
+    """
+    월간 캘린더 HTML을 생성합니다.
+
+    Args:
+        year: 연도
+        month: 월
+        summary: 날짜 → (태스크 수, 완료 수)
+        today: 오늘 날짜 (강조 표시용)
+
+    Returns:
+        str: 캘린더 그리드 HTML
+    """
+    rows = ['<div class="calendar-week">']
+    rows.extend(f'<div class="calendar-day-header">{label}</div>' for label in WEEKDAY_LABELS)
+    rows.append('</div>')
+
+    for week in get_month_calendar(year, month):
+        rows.append('<div class="calendar-week">')
+        for day in week:
+            if day == 0:
+                rows.append('<div class="calendar-day empty"></div>')
+                continue
+
+            date_str = f"{year:04d}-{month:02d}-{day:02d}"
+            classes = ["calendar-day"]
+            if (year, month, day) == (today.year, today.month, today.day):
+                classes.append("today")
+
+            detail = ""
+            if date_str in summary:
+                total, completed = summary[date_str]
+                classes.append("has-tasks")
+                classes.append(_density_class(total))
+                if completed == total:
+                    classes.append("all-done")
+                detail = f'<span class="calendar-day-count">{completed}/{total}</span>'
+
+            rows.append(f'<div class="{" ".join(classes)}"><span>{day}</span>{detail}</div>')
+        rows.append('</div>')
+
+    return f'<div class="calendar-container"><div class="calendar-grid">{"".join(rows)}</div></div>'
+
+@traced('render.calendar')
+def render_calendar():
+    """월간 캘린더 UI를 표시합니다."""
+    if 'current_date' not in st.session_state:
+        st.session_state['current_date'] = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    current = st.session_state['current_date']
+
+    # 월 이동 헤더
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if st.button("◀", key="calendar_prev_month"):
+            st.session_state['current_date'] = get_prev_month(current)
+            st.rerun()
+    with col2:
+        st.markdown(f"<div class='calendar-header'><h4>{current.year}년 {current.month}월</h4></div>",
+                    unsafe_allow_html=True)
+    with col3:
+        if st.button("▶", key="calendar_next_month"):
+            st.session_state['current_date'] = get_next_month(current)
+            st.rerun()
+
+    # 해당 월 구간만 날짜 인덱스에서 조회
+    summary = get_month_task_summary(current.year, current.month)
+    st.markdown(
+        build_calendar_html(current.year, current.month, summary, datetime.date.today()),
+        unsafe_allow_html=True
+    )
@@ -6,16 +6,35 @@ Export 형태:
 - 또는 import components.chat as chat 후 chat.show_chat_tab() 형태로 사용
 """
 import datetime
+from typing import Optional
+
 import streamlit as st
 from utils.saju import generate_saju_insight
+from utils.llm import is_degraded
+from utils.speculative import conversation_fingerprint, get_speculative_summarizer
+from utils.inflight import (GenerationCancelled, current_session_id, get_inflight_registry,
+                            idempotency_key)
+from utils.records import MessageStore
+from utils.search_index import SNIPPET_CHARS
+from utils.rerun_profiler import mark_rerun_action
+from utils.session import get_search_index, record_session_event
+from utils.tracing import traced
+
+# 선계산 요약이 진행 중일 때 새로 요청하지 않고 기다릴 최대 시간 (초)
+SPECULATIVE_WAIT_SECONDS = 10.0
 
+# 지난 대화·고민 검색 결과 수
+SEARCH_RESULT_LIMIT = 10
+
+@traced('render.chat_tab')
 def show_chat_tab():
     """채팅 탭 UI를 표시합니다."""
     st.markdown("### 💬 고민 상담실")
     
     # 세션 상태 초기화
     if 'chat_messages' not in st.session_state:
-        st.session_state['chat_messages'] = []
+        st.session_state['chat_messages'] = MessageStore()
+    messages: MessageStore = st.session_state['chat_messages']
         
     if 'has_initial_greeting' not in st.session_state:
         st.session_state['has_initial_greeting'] = False
@@ -23,12 +42,12 @@ def show_chat_tab():
     # 초기 인사 메시지 추가 (첫 방문 시에만)
     if not st.session_state['has_initial_greeting'] and st.session_state['user_info'].get('core_traits'):
         greeting_message = f"안녕하세요 {st.session_state['user_info']['name']}님! 좋은 하루 보내셨나요?"
-        st.session_state['chat_messages'].append({
-            'role': 'assistant',  # st.chat_message에서는 'ai' 대신 'assistant' 사용
-            'content': greeting_message
-        })
+        messages.append('assistant', greeting_message)
         st.session_state['has_initial_greeting'] = True
     
+    # 지난 대화·고민 검색
+    _show_history_search()
+    
     # 채팅 메시지 표시 영역
     chat_container = st.container()
     
@@ -36,71 +55,27 @@ def show_chat_tab():
     with chat_container:
         # 마지막 AI 메시지를 찾기 위한 변수
         last_ai_msg_idx = -1
-        for idx, msg in enumerate(st.session_state['chat_messages']):
-            if msg['role'] == 'assistant':
+        for idx, msg in enumerate(messages):
+            if msg.role == 'assistant':
                 last_ai_msg_idx = idx
         
-        # 메시지 표시
-        for idx, msg in enumerate(st.session_state['chat_messages']):
-            role = msg['role']
+        # 메시지 표시 (보관소로 옮겨진 오래된 메시지는 표시하지 않음)
+        for idx, msg in enumerate(messages):
+            role = msg.role
             # st.chat_message 컴포넌트는 'ai' 대신 'assistant' 사용
             with st.chat_message(role if role != 'ai' else 'assistant'):
-                st.write(msg['content'])
+                st.write(msg.content)
                 
                 # 마지막 AI 메시지에만 7일 계획 생성 버튼 표시
                 if role == 'assistant' and idx == last_ai_msg_idx and idx > 0:
                     # 이전 메시지가 사용자 메시지인지 확인
-                    if st.session_state['chat_messages'][idx-1]['role'] == 'user':
-                        if st.button("📅 대화를 요약해서 7일 계획으로 생성", key=f"add_roadmap_{idx}"):
-                            from utils.saju import generate_weekly_plan, summarize_conversation
-                            
-                            with st.spinner("대화 내용을 분석하고 7일 계획을 생성하고 있습니다..."):
-                                # 전체 대화 내용을 분석하여 핵심 고민 추출
-                                extracted_concern = summarize_conversation(st.session_state['chat_messages'])
-                                st.info(f"{extracted_concern}")
-                                
-                                # 추출된 핵심 고민을 기반으로 7일 계획 생성
-                                weekly_plan = generate_weekly_plan(st.session_state['user_info'], extracted_concern)
-                                
-                                # 새 계획으로 설정
-                                st.session_state['weekly_plan'] = weekly_plan
-                                st.session_state['current_concern'] = extracted_concern
-                                
-                                # 태스크 추가
-                                current_date = datetime.datetime.now().date()
-                                for i, plan in enumerate(weekly_plan):
-                                    task_date = current_date + datetime.timedelta(days=i)
-                                    task_id = f"{task_date.strftime('%Y-%m-%d')}_plan_{i}"
-                                    
-                                    # 태스크 추가 (from utils.calendar import add_task_to_date)
-                                    from utils.calendar import add_task_to_date
-                                    add_task_to_date(task_date.strftime('%Y-%m-%d'), {
-                                        'id': task_id,
-                                        'title': plan['title'],
-                                        'description': plan['description'],
-                                        'completed': False,
-                                        'created_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                                    })
-                                
-                                # 이전 고민 기록에도 추가 (필요한 경우)
-                                if 'previous_concerns' not in st.session_state:
-                                    st.session_state['previous_concerns'] = []
-                                
-                                # 이미 있는 고민인지 확인
-                                existing = False
-                                for concern in st.session_state['previous_concerns']:
-                                    if concern['concern'] == extracted_concern:
-                                        existing = True
-                                        break
-                                        
-                                if not existing:
-                                    st.session_state['previous_concerns'].append({
-                                        'concern': extracted_concern,
-                                        'created_at': datetime.datetime.now().strftime('%Y-%m-%d')
-                                    })
-                            
-                            msg['add_to_roadmap'] = True
-                            st.success("✓ 7일 계획이 생성되었습니다! '나의 7일 계획' 탭에서 확인해보세요.")
+                    if messages[idx-1].role == 'user':
+                        # 키는 대화 전체에서의 위치로 만들어 보관 후에도 바뀌지 않도록 함
+                        button_key = f"add_roadmap_{messages.archived_count + idx}"
+                        if st.button("📅 대화를 요약해서 7일 계획으로 생성", key=button_key):
+                            mark_rerun_action('plan_button')
+                            if _create_weekly_plan():
+                                st.success("✓ 7일 계획이 생성되었습니다! '나의 7일 계획' 탭에서 확인해보세요.")
     
     # 빠른 질문 칩 버튼들
     st.markdown('<div class="quick-chips">', unsafe_allow_html=True)
@@ -113,103 +88,200 @@ def show_chat_tab():
         "스트레스 관리": "제 사주를 고려할 때 스트레스를 줄이는 방법은 무엇인가요?"
     }
     
-    with col1:
-        if st.button("💼 커리어 고민", key="career_chip"):
-            st.session_state['chat_messages'].append({
-                'role': 'user',
-                'content': quick_questions["커리어 고민"]
-            })
-            
-            with st.spinner("답변 생성 중..."):
-                response = generate_saju_insight(st.session_state['user_info'], quick_questions["커리어 고민"])
-                st.session_state['chat_messages'].append({
-                    'role': 'assistant',  # 'ai'에서 'assistant'로 변경
-                    'content': response,
-                    'add_to_roadmap': False
-                })
-            
-            # 페이지 리렌더링
-            st.rerun()
-    
-    with col2:
-        if st.button("👥 인간관계", key="relationship_chip"):
-            st.session_state['chat_messages'].append({
-                'role': 'user',
-                'content': quick_questions["인간관계"]
-            })
-            
-            with st.spinner("답변 생성 중..."):
-                response = generate_saju_insight(st.session_state['user_info'], quick_questions["인간관계"])
-                st.session_state['chat_messages'].append({
-                    'role': 'assistant',  # 'ai'에서 'assistant'로 변경
-                    'content': response,
-                    'add_to_roadmap': False
-                })
-            
-            # 페이지 리렌더링
-            st.rerun()
-    
-    with col3:
-        if st.button("📚 자기계발", key="development_chip"):
-            st.session_state['chat_messages'].append({
-                'role': 'user',
-                'content': quick_questions["자기계발"]
-            })
-            
-            with st.spinner("답변 생성 중..."):
-                response = generate_saju_insight(st.session_state['user_info'], quick_questions["자기계발"])
-                st.session_state['chat_messages'].append({
-                    'role': 'assistant',  # 'ai'에서 'assistant'로 변경
-                    'content': response,
-                    'add_to_roadmap': False
-                })
-            
-            # 페이지 리렌더링
-            st.rerun()
-    
-    with col4:
-        if st.button("🧘 스트레스 관리", key="stress_chip"):
-            st.session_state['chat_messages'].append({
-                'role': 'user',
-                'content': quick_questions["스트레스 관리"]
-            })
-            
-            with st.spinner("답변 생성 중..."):
-                response = generate_saju_insight(st.session_state['user_info'], quick_questions["스트레스 관리"])
-                st.session_state['chat_messages'].append({
-                    'role': 'assistant',  # 'ai'에서 'assistant'로 변경
-                    'content': response,
-                    'add_to_roadmap': False
-                })
-            
-            # 페이지 리렌더링
-            st.rerun()
+    chip_buttons = [
+        (col1, "💼 커리어 고민", "career_chip", "커리어 고민"),
+        (col2, "👥 인간관계", "relationship_chip", "인간관계"),
+        (col3, "📚 자기계발", "development_chip", "자기계발"),
+        (col4, "🧘 스트레스 관리", "stress_chip", "스트레스 관리"),
+    ]
+    
+    for col, label, key, topic in chip_buttons:
+        with col:
+            if st.button(label, key=key):
+                mark_rerun_action('chip_click')
+                _answer_question(quick_questions[topic])
+                
+                # 페이지 리렌더링
+                st.rerun()
     
     st.markdown('</div>', unsafe_allow_html=True)
     
     # 채팅 입력 사용
     user_question = st.chat_input("질문을 입력하세요...")
     if user_question:
-        st.session_state['chat_messages'].append({
-            'role': 'user',
-            'content': user_question
-        })
-        
-        with st.spinner("답변 생성 중..."):
-            response = generate_saju_insight(st.session_state['user_info'], user_question)
-            st.session_state['chat_messages'].append({
-                'role': 'assistant',  # 'ai'에서 'assistant'로 변경
-                'content': response,
-                'add_to_roadmap': False
-            })
-            
-            if 'chat_history' not in st.session_state:
-                st.session_state['chat_history'] = []
-            
-            st.session_state['chat_history'].append({
-                'question': user_question,
-                'answer': response
-            })
+        mark_rerun_action('chat_input')
+        response = _answer_question(user_question)
+        if response is None:
+            return
         
         # 페이지 리렌더링
         st.rerun()
+
+def _show_history_search():
+    """보관된 대화를 포함한 지난 대화와 이전 고민을 검색하는 영역을 표시합니다."""
+    with st.expander("🔎 지난 대화·고민 검색"):
+        query = st.text_input("검색어", key="history_search_query", placeholder="예: 이직, 인간관계",
+                              label_visibility="collapsed")
+        if not query.strip():
+            return
+        mark_rerun_action('history_search')
+        hits = get_search_index().search(query, limit=SEARCH_RESULT_LIMIT)
+        if not hits:
+            st.caption("검색 결과가 없어요.")
+            return
+        for hit in hits:
+            if hit.kind == 'concern':
+                label = f"📝 고민 · {hit.label}" if hit.label else "📝 고민"
+            else:
+                label = "🙋 나" if hit.label == 'user' else "🔮 멘토"
+            snippet = hit.snippet + ("…" if len(hit.snippet) >= SNIPPET_CHARS else "")
+            st.markdown(f"**{label}** {snippet}")
+
+@traced('action.answer_question')
+def _answer_question(question: str) -> Optional[str]:
+    """
+    사용자 질문과 AI 답변을 대화에 추가하고, 답변 이후의 대화 요약을 미리 계산하도록 예약합니다.
+    같은 질문이 연달아 제출되면(중복 클릭 등) 새 생성을 시작하지 않습니다.
+    
+    Args:
+        question: 사용자 질문
+        
+    Returns:
+        Optional[str]: AI 답변 (중복 제출이거나 생성이 취소·실패한 경우 None)
+    """
+    registry = get_inflight_registry()
+    session_id = current_session_id()
+    key = idempotency_key('chat', question)
+    if registry.find(session_id, key) is not None:
+        return None
+    
+    summarizer = get_speculative_summarizer()
+    messages: MessageStore = st.session_state['chat_messages']
+    
+    history = list(messages)
+    messages.append('user', question)
+    # 새 메시지가 추가되었으므로 이전 대화 기준의 요약은 버림
+    summarizer.invalidate()
+    
+    with st.spinner("답변 생성 중..."):
+        try:
+            response = registry.submit(session_id, key, generate_saju_insight,
+                                       st.session_state['user_info'], question, history=history).result()
+        except GenerationCancelled:
+            # 답변 없이 남은 질문은 되돌림
+            messages.pop()
+            st.toast("답변 생성이 취소되었어요. 다시 시도해주세요.")
+            return None
+        if is_degraded(response):
+            # 장애 안내 문구는 대화 기록에 남기지 않음
+            messages.pop()
+            st.toast(response)
+            return None
+        messages.append('assistant', response)
+    
+    # 사용자가 다음 행동을 고르는 동안 백그라운드에서 핵심 고민 요약
+    summarizer.schedule(messages)
+    
+    return response
+
+@traced('action.create_weekly_plan')
+def _create_weekly_plan() -> bool:
+    """
+    대화 내용을 바탕으로 7일 계획을 스트리밍 생성합니다.
+    각 Day 항목은 파싱되는 즉시 태스크로 추가되고 카드로 표시됩니다.
+    같은 대화로 이미 생성 중이거나 방금 생성한 경우 다시 생성하지 않습니다.
+    
+    Returns:
+        bool: 새 계획이 생성되었는지 여부
+    """
+    from utils.saju import stream_weekly_plan
+    from utils.calendar import add_task_to_date, remove_tasks
+    from components.roadmap import render_plan_card
+    
+    registry = get_inflight_registry()
+    session_id = current_session_id()
+    messages = list(st.session_state['chat_messages'])
+    key = idempotency_key('plan', conversation_fingerprint(messages))
+    if registry.find(session_id, key) is not None:
+        return False
+    
+    status = st.empty()
+    status.caption("대화 내용을 분석하고 7일 계획을 생성하고 있습니다...")
+    concern_box = st.empty()
+    
+    # 선계산된 핵심 고민 요약이 있으면 재사용하고, 없으면 요약과 계획 생성을 한 번의 요청으로 처리
+    extracted_concern = get_speculative_summarizer().result(messages, timeout=SPECULATIVE_WAIT_SECONDS)
+    if is_degraded(extracted_concern):
+        extracted_concern = None
+    
+    # 항목은 도착하는 대로 태스크로 추가하되, 세션의 현재 계획은 생성이 끝까지 성공했을 때만 바꿈
+    plan_task_ids = []
+    additional_explanation = ""
+    failure = None
+    
+    current_date = datetime.datetime.now().date()
+    events = registry.stream(session_id, key, stream_weekly_plan(
+        st.session_state['user_info'], concern=extracted_concern, messages=messages
+    ))
+    try:
+        for kind, value in events:
+            if kind == 'concern':
+                if is_degraded(value):
+                    continue
+                extracted_concern = value
+                concern_box.info(f"{extracted_concern}")
+            elif kind == 'reused':
+                # 같은 사주에서 비슷한 고민으로 만든 계획을 재사용 (utils.plan_library)
+                st.toast("비슷한 고민으로 만든 계획을 바로 가져왔어요.")
+            elif kind == 'explanation':
+                additional_explanation = value
+            elif kind == 'error':
+                failure = value
+            elif kind == 'day':
+                i = len(plan_task_ids)
+                task_date = current_date + datetime.timedelta(days=i)
+                
+                # 태스크 추가
+                plan_task_ids.append(add_task_to_date(task_date.strftime('%Y-%m-%d'), {
+                    'title': value.title,
+                    'description': value.description,
+                    'completed': False,
+                    'created_at': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }))
+                render_plan_card(i, value, task_date, current_date)
+    except GenerationCancelled:
+        failure = "7일 계획 생성이 취소되었습니다. 다시 시도해주세요."
+    
+    if failure is None and not plan_task_ids:
+        failure = "지금은 7일 계획을 만들기 어려워요. 잠시 후 다시 시도해주세요."
+    if failure is not None:
+        # 중간까지 추가된 태스크는 지우고 기존 계획을 그대로 둠
+        remove_tasks(plan_task_ids)
+        status.warning(failure)
+        return False
+    
+    status.empty()
+    st.session_state['plan_task_ids'] = plan_task_ids
+    st.session_state['plan_additional_explanation'] = additional_explanation
+    if extracted_concern:
+        st.session_state['current_concern'] = extracted_concern
+    record_session_event('plan.set', task_ids=plan_task_ids, concern=extracted_concern or '')
+    
+    # 이전 고민 기록에도 추가 (필요한 경우)
+    if not extracted_concern:
+        return True
+    if 'previous_concerns' not in st.session_state:
+        st.session_state['previous_concerns'] = []
+    
+    # 이미 있는 고민인지 확인 (검색 색인의 해시 집합으로 바로 확인)
+    search_index = get_search_index()
+    if not search_index.contains('concern', extracted_concern):
+        created_at = datetime.datetime.now().strftime('%Y-%m-%d')
+        st.session_state['previous_concerns'].append({
+            'concern': extracted_concern,
+            'created_at': created_at
+        })
+        search_index.add('concern', extracted_concern, extracted_concern, created_at)
+        record_session_event('concern.add', concern=extracted_concern, created_at=created_at)
+    
+    return True
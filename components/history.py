@@ -0,0 +1,51 @@
+"""
+기록 내보내기·가져오기 컴포넌트
+
+사용자의 전체 기록을 NDJSON 파일로 내려받거나, 내려받은 파일을 현재 세션에 다시 가져옵니다.
+기록을 이어서 불러올 때 쓰는 이어하기 코드(utils.session.start_user_session)도 이 영역에 표시합니다.
+(형식과 처리 방식은 utils.history_export 참고)
+
+Export 형태:
+- from components.history import show_history_transfer
+- 또는 import components.history as history 후 history.show_history_transfer() 형태로 사용
+"""
+import datetime
+import io
+import streamlit as st
+from utils.history_export import (HistoryImportError, encode_ndjson, import_session_history,
+                                  session_history_records)
+from utils.rerun_profiler import mark_rerun_action
+from utils.tracing import traced
+
+@traced('render.history_transfer')
+def show_history_transfer():
+    """기록 내보내기·가져오기 영역을 표시합니다."""
+    with st.expander("📦 이어하기 코드 · 내 기록 내보내기 / 가져오기"):
+        resume_token = st.session_state.get('resume_token')
+        if resume_token:
+            st.caption("나중에 시작 화면에서 이 이어하기 코드를 입력하면 지금까지의 기록을 이어서 볼 수 있어요. "
+                       "코드를 가진 사람은 누구나 기록을 볼 수 있으니 다른 사람에게 알려주지 마세요.")
+            st.code(resume_token, language=None)
+        
+        # 긴 기록을 매 실행마다 만들지 않도록, 요청했을 때만 파일을 만들어 내려받기 버튼을 표시
+        if st.button("내보내기 파일 만들기", key="prepare_history_export"):
+            mark_rerun_action('history_export')
+            with st.spinner("기록을 모으고 있어요..."):
+                data = b"".join(encode_ndjson(session_history_records(st.session_state)))
+            st.download_button(
+                "⬇️ 기록 파일 내려받기", data=data,
+                file_name=f"saju-mentor-{datetime.date.today().isoformat()}.ndjson",
+                mime="application/x-ndjson", key="download_history"
+            )
+
+        uploaded = st.file_uploader("가져올 기록 파일", type=["ndjson", "jsonl"], key="history_upload")
+        if uploaded is not None and st.button("기록 가져오기", key="import_history"):
+            mark_rerun_action('history_import')
+            try:
+                with st.spinner("기록을 가져오고 있어요..."):
+                    counts = import_session_history(io.TextIOWrapper(uploaded, encoding='utf-8'), st.session_state)
+            except (HistoryImportError, UnicodeDecodeError) as e:
+                st.error(f"기록을 가져오지 못했어요: {e}")
+            else:
+                st.success(f"대화 {counts['messages']}개, 태스크 {counts['tasks']}개, "
+                           f"완료 기록 {counts['completions']}개, 이전 고민 {counts['concerns']}개를 가져왔어요.")
@@ -7,8 +7,15 @@ Export 형태:
 """
 import datetime
 import streamlit as st
-from utils.saju import analyze_saju, generate_saju_insight
+from utils.saju import generate_core_traits
+from utils.llm import is_degraded
+from utils.inflight import GenerationCancelled, idempotency_key, run_generation
+from utils.onboarding_job import start_saju_analysis_job
+from utils.rerun_profiler import mark_rerun_action
+from utils.session import record_session_event, resume_user_session, start_user_session
+from utils.tracing import traced
 
+@traced('render.onboarding')
 def show_onboarding():
     """온보딩 화면을 표시합니다."""
     st.markdown('<div class="main-content">', unsafe_allow_html=True)
@@ -31,35 +38,57 @@ def show_onboarding():
             "모름"
         ]
         birth_hour = st.selectbox("태어난 시간", options=birth_hour_options, index=len(birth_hour_options)-1)
+        resume_code = st.text_input(
+            "이어하기 코드 (선택)", type="password",
+            help="이전에 받은 이어하기 코드를 입력하면 대화·계획 기록을 이어서 불러옵니다."
+        )
         
         submit_button = st.form_submit_button("✨ 시작하기")
         
         if submit_button:
-            if not name:
+            mark_rerun_action('onboarding_submit')
+            if resume_code.strip():
+                # 이어하기 코드를 가진 사용자에게만 이전 기록(대화·계획·분석 결과)을 복원
+                if not resume_user_session(resume_code):
+                    st.error("이어하기 코드에 해당하는 기록을 찾지 못했어요. 코드를 다시 확인해주세요.")
+                else:
+                    if 'saju_analysis' not in st.session_state['user_info']:
+                        start_saju_analysis_job(st.session_state['user_info'])
+                    st.session_state['onboarding_complete'] = True
+                    st.rerun()
+            elif not name:
                 st.error("이름을 입력해주세요.")
             else:
-                # 로딩 애니메이션
-                with st.spinner("당신의 사주를 분석하고 있어요..."):
-                    # 사용자 정보 저장
-                    st.session_state['user_info'] = {
-                        'name': name,
-                        'birthdate': birthdate,
-                        'birth_hour': birth_hour
-                    }
-                    
-                    # 사주 분석 수행
-                    analysis_result = analyze_saju(name, birthdate, birth_hour)
-                    
-                    # 분석 결과 저장
-                    st.session_state['user_info']['saju_analysis'] = analysis_result['full_analysis']
-                    st.session_state['user_info']['core_traits'] = analysis_result['core_traits']
-                    
-                    # 최초 로드맵 생성
-                    roadmap = generate_saju_insight(st.session_state['user_info'])
-                    st.session_state['roadmap'] = roadmap
+                # 같은 입력으로 연달아 제출해도 진행 중인 분석을 재사용
+                key = idempotency_key('onboarding', name, birthdate, birth_hour)
                 
-                st.session_state['onboarding_complete'] = True
-                st.rerun()
+                # 로딩 애니메이션
+                try:
+                    with st.spinner("당신의 사주를 분석하고 있어요..."):
+                        # 사용자 정보 저장
+                        st.session_state['user_info'] = {
+                            'name': name,
+                            'birthdate': birthdate,
+                            'birth_hour': birth_hour
+                        }
+                        
+                        # 새 이어하기 코드로 기록 시작 (코드는 메인 화면의 기록 영역에 표시)
+                        start_user_session(st.session_state['user_info'])
+                        
+                        # 핵심 특성 한 줄만 먼저 생성 (짧은 응답이라 빠름)
+                        core_traits = run_generation(key, generate_core_traits, name, birthdate, birth_hour)
+                        if not is_degraded(core_traits):
+                            # 실패 안내 문구는 저장하지 않고, 전체 분석이 끝나면 거기서 채움
+                            st.session_state['user_info']['core_traits'] = core_traits
+                            record_session_event('user_info.update', core_traits=core_traits)
+                        
+                        # 전체 분석과 최초 로드맵은 메인 화면을 연 뒤 백그라운드에서 생성
+                        start_saju_analysis_job(st.session_state['user_info'])
+                except GenerationCancelled:
+                    st.error("사주 분석이 취소되었어요. 잠시 후 다시 시도해주세요.")
+                else:
+                    st.session_state['onboarding_complete'] = True
+                    st.rerun()
     
     # 서비스 설명 섹션
     st.markdown("---")
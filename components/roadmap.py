@@ -4,161 +4,177 @@
 사용자의 고민을 7일간의 실천 계획으로 변환하여 표시합니다.
 
 Export 형태:
-- from components.roadmap import show_roadmap_tab
+- from components.roadmap import show_roadmap_tab, render_plan_card
 - 또는 import components.roadmap as roadmap 후 roadmap.show_roadmap_tab() 형태로 사용
 """
 import datetime
-import re
+import html
+import time
+from functools import lru_cache
 import streamlit as st
-from utils.saju import generate_saju_insight, generate_weekly_plan
-from utils.calendar import (
-    get_date_tasks, add_task_to_date, toggle_task_completion,
-    get_tasks_stats, format_date, parse_date
+from typing import Union
+from utils.saju import generate_saju_insight
+from utils.calendar import get_task, toggle_task_completion, get_tasks_stats, parse_date
+from components.calendar_ui import render_calendar
+from utils.inflight import GenerationCancelled, current_session_id, get_inflight_registry, idempotency_key
+from utils.onboarding_job import get_saju_analysis_job
+from utils.llm import is_degraded
+from utils.session import MAIN_TABS, record_session_event
+from utils.records import PlanItem, Task
+from utils.rerun_profiler import mark_rerun_action
+from utils.tracing import traced
+
+# 백그라운드 인사이트 생성 완료 여부를 확인하는 간격 (초)
+INSIGHT_POLL_SECONDS = 0.5
+
+WEEKDAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+PLAN_CARD_ICONS = {'completed': '✅', 'today': '⏳', 'future': '▶️', 'past': '⏹️'}
+
+@lru_cache(maxsize=256)
+def _plan_card_html(i: int, title: str, description: str, plan_date: datetime.date, state: str) -> str:
+    """
+    7일 계획 카드 HTML을 만듭니다. 스타일은 styles.styles의 plan-card 클래스를 사용합니다.
+    
+    Args:
+        i: 0부터 시작하는 날짜 인덱스
+        title: 계획 제목
+        description: 계획 설명
+        plan_date: 해당 계획의 날짜
+        state: 'completed', 'today', 'future', 'past' 중 하나
+        
+    Returns:
+        str: 카드 HTML
+    """
+    day_label = f"Day {i+1}: {plan_date.strftime('%m월 %d일')} ({WEEKDAY_NAMES[plan_date.weekday()]})"
+    return (
+        f"<div class='plan-card plan-card--{state}'><div>"
+        f"<h4>{day_label}</h4><h3>{html.escape(title)}</h3><p>{html.escape(description)}</p>"
+        f"</div><div>{PLAN_CARD_ICONS[state]}</div></div>"
+    )
+
+@lru_cache(maxsize=64)
+def _stat_card_html(value: str, label: str, tone: str, heading: str = 'h2') -> str:
+    """통계 카드 HTML을 만듭니다. (tone: 'blue', 'green', 'red')"""
+    return (
+        f"<div class='stat-card'><{heading} class='stat-card__value--{tone}'>{value}</{heading}>"
+        f"<p>{label}</p></div>"
+    )
+
+@lru_cache(maxsize=64)
+def _banner_html(kind: str, title: str, body: str) -> str:
+    """로드맵 안내 배너 HTML을 만듭니다. (kind: 'concern', 'guide')"""
+    return f"<div class='banner banner--{kind}'><h4>{title}</h4><p>{body}</p></div>"
+
+EMPTY_PLAN_BANNER = (
+    "<div class='banner banner--empty'><div class='banner__icon'>🔮</div>"
+    "<h3>아직 생성된 7일 계획이 없습니다</h3>"
+    "<p>고민 상담실에서 AI와 대화한 후 '이 고민을 7일 계획으로 생성' 버튼을 클릭하면<br>"
+    "고민을 해결하기 위한 7일간의 실천 계획을 생성해드립니다.</p></div>"
 )
 
+def render_plan_card(i: int, plan: Union[PlanItem, Task], plan_date: datetime.date,
+                     today: datetime.date, is_completed: bool = False):
+    """
+    7일 계획의 하루치 카드를 표시합니다.
+    카드 HTML은 (계획 항목, 완료 여부, 날짜)별로 재사용됩니다.
+    
+    Args:
+        i: 0부터 시작하는 날짜 인덱스
+        plan: 계획 항목 또는 계획으로 만든 태스크 (title, description 사용)
+        plan_date: 해당 계획의 날짜
+        today: 오늘 날짜
+        is_completed: 완료 여부
+    """
+    if is_completed:
+        state = 'completed'
+    elif plan_date == today:
+        state = 'today'
+    elif plan_date > today:
+        state = 'future'
+    else:
+        state = 'past'
+    st.markdown(_plan_card_html(i, plan.title, plan.description, plan_date, state),
+                unsafe_allow_html=True)
+
+@traced('render.roadmap_tab')
 def show_roadmap_tab():
     """주간 계획 및 로드맵 탭 UI를 표시합니다."""
     st.markdown("### 🗺️ 7일 실천 계획")
     st.markdown("당신의 사주를 기반으로 7일간의 맞춤형 실천 계획을 제안합니다.")
     
-    # 고민 입력 및 계획 생성
-    if 'weekly_plan' not in st.session_state:
-        st.session_state['weekly_plan'] = []
+    # 현재 계획의 태스크 (계획 항목의 내용과 완료 여부는 태스크 저장소가 원본)
+    plan_tasks = [task for task in map(get_task, st.session_state.get('plan_task_ids', [])) if task is not None]
         
     if 'current_concern' not in st.session_state:
         st.session_state['current_concern'] = ""
         
     # 현재 주간 계획이 없으면 상담실로 이동하라는 안내 표시
-    if not st.session_state['weekly_plan']:
-        st.markdown("""
-        <div style='background-color: #f5f5f5; padding: 20px; border-radius: 10px; text-align: center;'>
-            <div style='font-size: 30px; margin-bottom: 10px;'>🔮</div>
-            <h3>아직 생성된 7일 계획이 없습니다</h3>
-            <p>고민 상담실에서 AI와 대화한 후 '이 고민을 7일 계획으로 생성' 버튼을 클릭하면<br>고민을 해결하기 위한 7일간의 실천 계획을 생성해드립니다.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    if not plan_tasks:
+        st.markdown(EMPTY_PLAN_BANNER, unsafe_allow_html=True)
         
-        # 상담실로 이동 버튼
-        if st.button("고민 상담실로 이동하기"):
-            # 탭 인덱스 설정
-            st.session_state['active_tab'] = 0
-            
-            # JavaScript를 사용한 탭 전환
-            js = """
-            <script>
-                window.parent.document.querySelectorAll('.stTabs button[role="tab"]')[0].click();
-            </script>
-            """
-            st.components.v1.html(js, height=0, width=0)
-            st.rerun()
+        # 상담실로 이동 버튼 (탭 선택 위젯보다 뒤에 그려지므로 콜백에서 탭 인덱스를 바꿈)
+        st.button("고민 상담실로 이동하기", on_click=_go_to_chat_tab)
     
     # 7일 계획 표시
-    if st.session_state['weekly_plan']:
+    if plan_tasks:
         # 고민 표시
-        st.markdown(f"""<div style='background-color: #f0f7ff; padding: 15px; border-radius: 10px; margin-bottom: 20px;'>
-                    <h4 style='margin-top: 0;'>현재 고민 해결하기</h4>
-                    <p><strong>"{st.session_state['current_concern']}"</strong></p>
-                    </div>""", unsafe_allow_html=True)
+        concern = html.escape(st.session_state['current_concern'])
+        st.markdown(_banner_html('concern', "현재 고민 해결하기", f'<strong>"{concern}"</strong>'),
+                    unsafe_allow_html=True)
         
         # 추가 설명 표시 (있는 경우에만)
         if st.session_state.get('plan_additional_explanation'):
-            st.markdown(f"""<div style='background-color: #fffde7; padding: 15px; border-radius: 10px; margin-bottom: 20px;'>
-                        <h4 style='margin-top: 0;'>계획 가이드</h4>
-                        <p>{st.session_state['plan_additional_explanation']}</p>
-                        </div>""", unsafe_allow_html=True)
+            st.markdown(_banner_html('guide', "계획 가이드",
+                                     html.escape(st.session_state['plan_additional_explanation'])),
+                        unsafe_allow_html=True)
 
         # 통계 카드
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.markdown(f"""
-            <div style='background-color: #f5f5f5; padding: 15px; border-radius: 10px; text-align: center;'>
-                <h2 style='margin:0; color: #1e88e5;'>{len([p for p in st.session_state['weekly_plan'] if p.get('completed', False)])}/7</h2>
-                <p style='margin:0;'>완료한 활동</p>
-            </div>
-            """, unsafe_allow_html=True)
+            completed_count = sum(1 for task in plan_tasks if task.completed)
+            st.markdown(_stat_card_html(f"{completed_count}/7", "완료한 활동", 'blue'), unsafe_allow_html=True)
         
         with col2:
             today = datetime.datetime.now().date()
             start_date = today
             end_date = today + datetime.timedelta(days=6)
-            st.markdown(f"""
-            <div style='background-color: #f5f5f5; padding: 15px; border-radius: 10px; text-align: center;'>
-                <h3 style='margin:0; color: #43a047;'>{start_date.strftime('%m.%d')} - {end_date.strftime('%m.%d')}</h3>
-                <p style='margin:0;'>실천 기간</p>
-            </div>
-            """, unsafe_allow_html=True)
+            period = f"{start_date.strftime('%m.%d')} - {end_date.strftime('%m.%d')}"
+            st.markdown(_stat_card_html(period, "실천 기간", 'green', 'h3'), unsafe_allow_html=True)
         
         with col3:
             # 오늘이 7일 중 몇일째인지 계산
             days_passed = min(7, (datetime.datetime.now().date() - datetime.datetime.now().date()).days + 1)
             progress = int((days_passed / 7) * 100)
-            st.markdown(f"""
-            <div style='background-color: #f5f5f5; padding: 15px; border-radius: 10px; text-align: center;'>
-                <h2 style='margin:0; color: #e53935;'>{progress}%</h2>
-                <p style='margin:0;'>진행률</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(_stat_card_html(f"{progress}%", "진행률", 'red'), unsafe_allow_html=True)
+        
+        # 연속 실천 기록
+        stats = get_tasks_stats()
+        st.caption(f"🔥 연속 실천 {stats['streak_days']}일 · 최장 기록 {stats['longest_streak']}일")
         
         # 7일 계획 표시
         st.markdown("### 일주일 실천 계획")
         
         # 각 날짜별 활동 표시
         today = datetime.datetime.now().date()
-        for i, plan in enumerate(st.session_state['weekly_plan']):
-            plan_date = today + datetime.timedelta(days=i)
-            date_str = plan_date.strftime("%Y-%m-%d")
+        for i, task in enumerate(plan_tasks):
+            plan_date = parse_date(task.date).date()
             is_today = plan_date == today
-            is_future = plan_date > today
-            
-            # 날짜에 해당하는 태스크 가져오기
-            date_tasks = get_date_tasks(date_str)
-            task_id = f"{date_str}_plan_{i}" if date_tasks else None
-            task = None
-            
-            # 해당 ID의 태스크 찾기
-            if task_id and date_tasks:
-                for t in date_tasks:
-                    if t.get('id') == task_id:
-                        task = t
-                        break
-            
-            # 완료 상태 가져오기
-            is_completed = task and task.get('completed', False)
-            
-            # 스타일 설정
-            bg_color = "#e8f5e9" if is_completed else "#fff8e1" if is_today else "#f5f5f5" if is_future else "#ffffff"
-            border_color = "#2e7d32" if is_completed else "#fb8c00" if is_today else "#bdbdbd"
+            is_completed = task.completed
             
             # 카드 UI
-            st.markdown(f"""
-            <div style='background-color: {bg_color}; border-left: 5px solid {border_color}; padding: 15px; border-radius: 5px; margin-bottom: 10px;'>
-                <div style='display: flex; justify-content: space-between; align-items: center;'>
-                    <div>
-                        <h4 style='margin: 0; color: #333;'>Day {i+1}: {plan_date.strftime('%m월 %d일')} ({['월','화','수','목','금','토','일'][plan_date.weekday()]})</h4>
-                        <h3 style='margin: 5px 0; color: {'#2e7d32' if is_completed else '#333'};'>{plan['title']}</h3>
-                        <p style='margin: 0;'>{plan['description']}</p>
-                    </div>
-                    <div>
-                        {'✅' if is_completed else '⏳' if is_today else '▶️' if is_future else '⏹️'}
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            render_plan_card(i, task, plan_date, today, is_completed)
             
             # 오늘 할일이면 완료 버튼 표시
-            if is_today and not is_completed and task_id:
-                if st.button(f"활동 완료 표시", key=f"complete_task_{task_id}"):
+            if is_today and not is_completed:
+                if st.button(f"활동 완료 표시", key=f"complete_task_{task.id}"):
+                    mark_rerun_action('complete_task')
                     # 태스크 완료 상태 업데이트
-                    toggle_task_completion(task_id)
-                    
-                    # 세션 상태에서 직접 계획 업데이트
-                    st.session_state['weekly_plan'][i]['completed'] = True
+                    toggle_task_completion(task.id)
                     
                     # 성공 메시지 표시
                     st.success('오늘의 활동을 완료했습니다! 축하합니다! 🎉')
                     
                     # UI 새로고침 전에 잠시 대기
-                    import time
                     time.sleep(0.5)
                     
                     # 새로고침
@@ -166,12 +182,58 @@ def show_roadmap_tab():
                     
     st.markdown("---")
     
+    st.markdown("### 📆 월간 실천 캘린더")
+    render_calendar()
+    
+    st.markdown("---")
+    
     st.markdown("### 📜 사주 기반 성장 인사이트")
     
     if st.session_state.get('roadmap'):
         st.markdown(st.session_state['roadmap'])
+    elif get_saju_analysis_job() is not None:
+        # 온보딩 직후 백그라운드에서 생성 중
+        st.info("사주 기반 성장 인사이트를 준비하고 있어요...")
     else:
-        with st.spinner("인사이트 생성 중..."):
-            roadmap = generate_saju_insight(st.session_state['user_info'])
-            st.session_state['roadmap'] = roadmap
-            st.markdown(roadmap)
+        _follow_insight_generation(st.empty())
+
+def _go_to_chat_tab():
+    """고민 상담실 탭을 선택합니다. (버튼 콜백)"""
+    st.session_state['active_tab'] = MAIN_TABS[0]
+
+def _follow_insight_generation(insight_box):
+    """
+    사주 기반 성장 인사이트를 백그라운드에서 생성하고, 끝나면 결과를 세션 상태에 반영합니다.
+    
+    탭의 마지막 영역이므로 기다리는 동안 다른 화면 요소를 막지 않으며,
+    안내 문구를 갱신할 때마다 Streamlit의 중단 지점이 되므로 사용자가 다른 동작을 하면 대기는 곧바로 중단됩니다.
+    생성은 세션의 진행 중 생성으로 계속되어, 다시 이 탭을 열면 이어서 기다립니다.
+    
+    Args:
+        insight_box: 인사이트를 표시할 st.empty() 영역
+    """
+    generation = st.session_state.get('insight_generation')
+    if generation is None or generation.cancelled:
+        user_info = st.session_state['user_info']
+        generation = get_inflight_registry().submit(
+            current_session_id(), idempotency_key('insight', user_info), generate_saju_insight, user_info
+        )
+        st.session_state['insight_generation'] = generation
+    
+    # 실행 직전에 취소되면 done이 늦게 설정될 수 있으므로 취소 여부도 함께 확인
+    while not generation.done and not generation.cancelled:
+        insight_box.info("사주 기반 성장 인사이트를 준비하고 있어요...")
+        time.sleep(INSIGHT_POLL_SECONDS)
+    
+    del st.session_state['insight_generation']
+    try:
+        roadmap = generation.result()
+    except GenerationCancelled:
+        insight_box.warning("인사이트 생성이 취소되었습니다.")
+        return
+    if is_degraded(roadmap):
+        insight_box.warning(roadmap)
+        return
+    st.session_state['roadmap'] = roadmap
+    record_session_event('roadmap.set', text=roadmap)
+    insight_box.markdown(roadmap)
@@ -0,0 +1,130 @@
+"""
+사용자 기록 내보내기·가져오기 도구 (지원용)
+
+사용자 이벤트 로그(utils.event_log, EVENT_LOG_PATH)에 저장된 한 사용자의 기록을
+화면의 내보내기와 같은 NDJSON 형식(utils.history_export)으로 내보내거나, 내보낸 파일로 기록을 복원합니다.
+
+사용자는 화면의 이어하기 코드(--resume-token) 또는 이벤트 로그의 사용자 키(--user-key)로 지정합니다.
+가져올 때 둘 다 없으면 새 이어하기 코드를 발급해 출력하며, 사용자는 시작 화면에서 그 코드로 기록을 불러옵니다.
+
+사용법:
+    python scripts/history_transfer.py export --resume-token <이어하기 코드> -o history.ndjson
+    python scripts/history_transfer.py import history.ndjson
+    python scripts/history_transfer.py import history.ndjson --resume-token <이어하기 코드> --merge
+"""
+import argparse
+import datetime
+import sys
+from itertools import chain, islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.event_log import get_event_log  # noqa: E402
+from utils.history_export import (IMPORT_BATCH_SIZE, HistoryImportError, encode_ndjson,  # noqa: E402
+                                  history_events, iter_history_records, parse_ndjson)
+from utils.records import Task  # noqa: E402
+from utils.session import get_journal_key, new_resume_token  # noqa: E402
+
+def resolve_user_key(args: argparse.Namespace) -> str:
+    """
+    명령줄 인자로 이벤트 로그의 사용자 키를 구합니다.
+
+    Args:
+        args: 파싱된 인자
+
+    Returns:
+        str: 사용자 키
+    """
+    if args.user_key:
+        return args.user_key
+    if args.resume_token:
+        return get_journal_key(args.resume_token)
+    sys.exit("--resume-token 또는 --user-key를 지정해주세요.")
+
+def export_history(args: argparse.Namespace) -> None:
+    """이벤트 로그를 재생한 상태를 NDJSON으로 한 줄씩 씁니다."""
+    _, state, _ = get_event_log().replay(resolve_user_key(args))
+    user_info = dict(state['user_info'])
+    if user_info.get('birthdate'):
+        user_info['birthdate'] = datetime.date.fromisoformat(user_info['birthdate'])
+    tasks = state['tasks']
+    records = iter_history_records(
+        user_info,
+        (tuple(message) for message in state['messages']),
+        (Task(task_id, task['date'], task['title'], task['description'], False, task['created_at'])
+         for task_id, task in tasks.items()),
+        ((task_id, datetime.date.fromisoformat(task['completed_on'] or task['date']))
+         for task_id, task in tasks.items() if task['completed']),
+        state['plan_task_ids'], state['current_concern'], state.get('previous_concerns', []),
+    )
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for line in encode_ndjson(records):
+            out.write(line)
+    finally:
+        if args.output:
+            out.close()
+
+def import_history(args: argparse.Namespace) -> None:
+    """기록 파일을 이벤트로 바꿔 묶음 단위 트랜잭션으로 이벤트 로그에 기록합니다."""
+    resume_token = None
+    if args.user_key or args.resume_token:
+        user_key = resolve_user_key(args)
+    else:
+        # 새 사용자로 복원 (완료 후 이어하기 코드를 알려줌)
+        resume_token = new_resume_token()
+        user_key = get_journal_key(resume_token)
+    log = get_event_log()
+
+    imported = 0
+    with open(args.file, encoding='utf-8') as f:
+        # 기존 기록을 지우기 전에 파일 전체의 형식을 먼저 확인 (한 줄씩 읽으므로 메모리는 일정)
+        try:
+            for _ in history_events(parse_ndjson(f)):
+                pass
+        except HistoryImportError as e:
+            sys.exit(f"가져올 수 없는 파일입니다: {e}")
+        f.seek(0)
+
+        events = history_events(parse_ndjson(f))
+        if not args.merge:
+            # 기존 기록을 버리고 파일 내용으로 복원 (첫 묶음과 같은 트랜잭션)
+            events = chain([('reset', {})], events)
+        while True:
+            batch = list(islice(events, args.batch_size))
+            if not batch:
+                break
+            imported += log.append_many(user_key, batch)
+    # 쌓인 이벤트를 스냅숏으로 압축해 다음 접속 때 바로 불러오도록 함
+    log.compact(user_key)
+    print(f"{user_key}: 이벤트 {imported}개를 가져왔습니다.")
+    if resume_token is not None:
+        print(f"이어하기 코드: {resume_token}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="사용자 기록 내보내기·가져오기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_user_arguments(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument("--resume-token", help="이어하기 코드 (화면의 기록 영역에 표시됨)")
+        sub.add_argument("--user-key", help="이벤트 로그의 사용자 키 (utils.session.get_journal_key)")
+
+    export_parser = subparsers.add_parser("export", help="기록을 NDJSON으로 내보내기")
+    add_user_arguments(export_parser)
+    export_parser.add_argument("-o", "--output", help="출력 파일 (없으면 표준 출력)")
+    export_parser.set_defaults(func=export_history)
+
+    import_parser = subparsers.add_parser("import", help="NDJSON 기록 파일로 복원하기")
+    import_parser.add_argument("file", help="가져올 기록 파일")
+    add_user_arguments(import_parser)
+    import_parser.add_argument("--merge", action="store_true", help="기존 기록을 지우지 않고 뒤에 더하기")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="한 트랜잭션에 기록할 이벤트 수")
+    import_parser.set_defaults(func=import_history)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+느린 실행 프로파일 보고서
+
+utils.rerun_profiler가 저장한 느린 실행 프로파일(PROFILE_DIR)을 모아
+동작·화면별 실행 수와 소요 시간, 그리고 해당 실행들을 합친 상위 함수 목록을 출력합니다.
+
+사용법:
+    python scripts/profile_report.py
+    python scripts/profile_report.py --action chip_click --sort tottime --top 40
+    python scripts/profile_report.py --screen chat --since-hours 24 --min-seconds 2
+"""
+import argparse
+import json
+import os
+import pstats
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.rerun_profiler import DEFAULT_PROFILE_DIR  # noqa: E402
+
+def load_entries(profile_dir: str) -> List[Dict[str, Any]]:
+    """
+    프로파일 목록(index.jsonl)에서 파일이 남아 있는 항목을 읽습니다.
+
+    Args:
+        profile_dir: 프로파일 디렉터리
+
+    Returns:
+        List[Dict[str, Any]]: file, recorded_at, seconds, screen, action, session_id
+    """
+    index_path = os.path.join(profile_dir, "index.jsonl")
+    if not os.path.exists(index_path):
+        return []
+    entries = []
+    with open(index_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if os.path.exists(os.path.join(profile_dir, entry['file'])):
+                entries.append(entry)
+    return entries
+
+def print_summary(entries: List[Dict[str, Any]]) -> None:
+    """
+    동작·화면별 느린 실행 수와 소요 시간을 출력합니다.
+
+    Args:
+        entries: 프로파일 항목 목록
+    """
+    groups: Dict[tuple, List[float]] = defaultdict(list)
+    for entry in entries:
+        groups[(entry['action'], entry['screen'])].append(entry['seconds'])
+    print(f"{'동작':<20}{'화면':<12}{'횟수':>6}{'평균(초)':>10}{'최대(초)':>10}{'세션 수':>8}")
+    for (action, screen), seconds in sorted(groups.items(), key=lambda item: sum(item[1]), reverse=True):
+        sessions = {entry['session_id'] for entry in entries
+                    if entry['action'] == action and entry['screen'] == screen}
+        print(f"{action:<20}{screen:<12}{len(seconds):>6}{sum(seconds) / len(seconds):>10.2f}"
+              f"{max(seconds):>10.2f}{len(sessions):>8}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="느린 실행 프로파일 보고서")
+    parser.add_argument("--dir", default=os.environ.get("PROFILE_DIR", DEFAULT_PROFILE_DIR), help="프로파일 디렉터리")
+    parser.add_argument("--action", help="이 동작의 실행만 (예: chip_click, chat_input, plan_button)")
+    parser.add_argument("--screen", help="이 화면의 실행만 (onboarding, chat, roadmap)")
+    parser.add_argument("--session", help="이 세션 ID로 시작하는 실행만")
+    parser.add_argument("--since-hours", type=float, help="최근 N시간 안에 저장된 실행만")
+    parser.add_argument("--min-seconds", type=float, default=0, help="이보다 오래 걸린 실행만")
+    parser.add_argument("--sort", default="cumulative", choices=["cumulative", "tottime", "ncalls"],
+                        help="상위 함수 정렬 기준")
+    parser.add_argument("--top", type=int, default=30, help="출력할 상위 함수 수")
+    args = parser.parse_args()
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else 0
+    entries = [
+        entry for entry in load_entries(args.dir)
+        if (not args.action or entry['action'] == args.action)
+        and (not args.screen or entry['screen'] == args.screen)
+        and (not args.session or entry['session_id'].startswith(args.session))
+        and entry['recorded_at'] >= since and entry['seconds'] >= args.min_seconds
+    ]
+    if not entries:
+        print(f"조건에 맞는 프로파일이 없습니다: {args.dir}")
+        return
+
+    print_summary(entries)
+    print()
+    stats = pstats.Stats(*(os.path.join(args.dir, entry['file']) for entry in entries))
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+if __name__ == "__main__":
+    main()
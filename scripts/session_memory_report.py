@@ -0,0 +1,103 @@
+"""
+세션 메모리 보고서 집계
+
+각 워커가 기록한 세션 메모리 보고서(utils.session_memory, SESSION_MEMORY_REPORT_DIR/<pid>.json)를 모아
+워커별 세션 수·메모리 합계, 가장 무거운 세션과 키, 한도를 넘은 세션·키를 출력합니다.
+오래전에 기록된 보고서(종료된 워커)는 건너뜁니다.
+
+사용법:
+    python scripts/session_memory_report.py
+    python scripts/session_memory_report.py --dir .cache/session_memory --top 10 --max-age 600
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.session_memory import DEFAULT_REPORT_DIR  # noqa: E402
+
+def load_reports(report_dir: str, max_age: float) -> List[Dict[str, Any]]:
+    """
+    최근에 기록된 워커 보고서를 읽습니다.
+
+    Args:
+        report_dir: 보고서 디렉터리
+        max_age: 이보다 오래전(초)에 기록된 보고서는 제외
+
+    Returns:
+        List[Dict[str, Any]]: 워커 보고서 목록
+    """
+    reports = []
+    for path in sorted(glob.glob(os.path.join(report_dir, "*.json"))):
+        if time.time() - os.path.getmtime(path) > max_age:
+            continue
+        with open(path, encoding="utf-8") as f:
+            reports.append(json.load(f))
+    return reports
+
+def _mb(size: float) -> str:
+    return f"{size / (1024 * 1024):.2f} MB"
+
+def print_report(reports: List[Dict[str, Any]], top_n: int) -> None:
+    """
+    워커 보고서를 합쳐 출력합니다.
+
+    Args:
+        reports: 워커 보고서 목록
+        top_n: 출력할 상위 세션·키 수
+    """
+    print(f"{'워커 PID':<10}{'세션 수':>8}{'합계':>14}{'세션 평균':>14}")
+    for report in reports:
+        count = report['session_count']
+        average = report['total_bytes'] / count if count else 0
+        print(f"{report['pid']:<10}{count:>8}{_mb(report['total_bytes']):>14}{_mb(average):>14}")
+
+    sessions = sorted(
+        (dict(session, pid=report['pid']) for report in reports for session in report['top_sessions']),
+        key=lambda session: session['bytes'], reverse=True
+    )[:top_n]
+    print("\n가장 무거운 세션")
+    for session in sessions:
+        keys = ", ".join(f"{key}={_mb(size)}" for key, size in session['keys'])
+        print(f"  [{session['pid']}] {session['session_id']}  {_mb(session['bytes'])}  ({keys})")
+
+    keys: Dict[str, Dict[str, float]] = {}
+    for report in reports:
+        for stats in report['top_keys']:
+            merged = keys.setdefault(stats['key'], {'bytes': 0, 'sessions': 0, 'max': 0})
+            merged['bytes'] += stats['bytes']
+            merged['sessions'] += stats['sessions']
+            merged['max'] = max(merged['max'], stats['max'])
+    print("\n가장 무거운 세션 상태 키")
+    for key, stats in sorted(keys.items(), key=lambda item: item[1]['bytes'], reverse=True)[:top_n]:
+        average = stats['bytes'] / stats['sessions']
+        print(f"  {key:<28}합계 {_mb(stats['bytes']):>11}  평균 {_mb(average):>11}  최대 {_mb(stats['max']):>11}")
+
+    alerts = [dict(alert, pid=report['pid']) for report in reports for alert in report['alerts']]
+    print(f"\n한도 초과 {len(alerts)}건")
+    for alert in alerts:
+        print(f"  [{alert['pid']}] {alert['session_id']}  {alert['key'] or '(세션 전체)'}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="세션 메모리 보고서 집계")
+    parser.add_argument("--dir", default=os.environ.get("SESSION_MEMORY_REPORT_DIR", DEFAULT_REPORT_DIR),
+                        help="보고서 디렉터리")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 세션·키 수")
+    parser.add_argument("--max-age", type=float, default=600, help="이보다 오래된(초) 워커 보고서는 제외")
+    args = parser.parse_args()
+
+    reports = load_reports(args.dir, args.max_age)
+    if not reports:
+        print(f"최근 보고서가 없습니다: {args.dir}")
+        return
+    print_report(reports, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+사주 서명별 템플릿 사전 생성 작업
+
+자주 요청되는 사주 서명부터 이름 없는 분석·인사이트·핵심 특성 템플릿을 미리 생성하여
+콘텐츠 저장소(utils.content_store)에 채웁니다. 채워진 서명의 사용자는 온보딩 시 LLM 호출 없이 결과를 받습니다.
+
+대상 서명 순서:
+1. 실제 요청 기록(demand 테이블)에서 요청이 많은 순, 아직 템플릿이 없는 서명
+2. --enumerate 를 주면 나머지 전체 서명 (기본 선택지인 '모름' 시간대부터)
+
+사용법:
+    GEMINI_API_KEY=... python scripts/warm_content_store.py --limit 200
+    GEMINI_API_KEY=... python scripts/warm_content_store.py --enumerate --hours 모름 --workers 4
+    python scripts/warm_content_store.py --dry-run
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.content_store import ContentStore, set_content_store  # noqa: E402
+from utils.llm import set_api_key  # noqa: E402
+from utils.saju import get_signature_template, saju_signature  # noqa: E402
+
+BIRTH_HOURS = [
+    "모름", "23-01시", "01-03시", "03-05시", "05-07시", "07-09시", "09-11시",
+    "11-13시", "13-15시", "15-17시", "17-19시", "19-21시", "21-23시",
+]
+KINDS = ("core_traits", "analysis", "insight")
+
+def representative_inputs(hours: Iterable[str]) -> Dict[str, Tuple[datetime.date, str]]:
+    """
+    모든 사주 서명에 대해 그 서명을 만드는 대표 (생년월일, 태어난 시간)을 구합니다.
+    서명은 연도의 60갑자, 월, 일의 10간, 시지로만 정해지므로 60년 × 12개월 × 10일이면 전부 나옵니다.
+
+    Args:
+        hours: 포함할 태어난 시간 목록
+
+    Returns:
+        Dict[str, Tuple[datetime.date, str]]: 서명 → (대표 생년월일, 태어난 시간)
+    """
+    inputs: Dict[str, Tuple[datetime.date, str]] = {}
+    for birth_hour in hours:
+        for year in range(1964, 2024):
+            for month in range(1, 13):
+                for day in range(1, 11):
+                    birthdate = datetime.date(year, month, day)
+                    inputs.setdefault(saju_signature(birthdate, birth_hour), (birthdate, birth_hour))
+    return inputs
+
+def plan_targets(store: ContentStore, kind: str, limit: int, enumerate_all: bool,
+                 hours: List[str]) -> List[Tuple[str, datetime.date, str]]:
+    """
+    템플릿을 생성할 (서명, 대표 생년월일, 태어난 시간) 목록을 우선순위 순으로 만듭니다.
+
+    Args:
+        store: 콘텐츠 저장소
+        kind: 템플릿 종류
+        limit: 최대 개수
+        enumerate_all: 요청 기록 외에 전체 서명도 포함할지 여부
+        hours: 전체 서명에 포함할 태어난 시간 목록
+
+    Returns:
+        List[Tuple[str, datetime.date, str]]: 생성 대상 목록
+    """
+    inputs = representative_inputs(BIRTH_HOURS)
+    targets = []
+    seen = set()
+    for signature, _requests in store.most_requested_missing(kind, limit):
+        if signature in inputs:
+            targets.append((signature, *inputs[signature]))
+            seen.add(signature)
+    if enumerate_all:
+        for signature, (birthdate, birth_hour) in representative_inputs(hours).items():
+            if len(targets) >= limit:
+                break
+            if signature not in seen and store.get(kind, signature) is None:
+                targets.append((signature, birthdate, birth_hour))
+                seen.add(signature)
+    return targets[:limit]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="사주 서명별 이름 없는 템플릿 사전 생성")
+    parser.add_argument("--store", default=os.environ.get("CONTENT_STORE_PATH", str(ROOT / ".cache" / "content.db")),
+                        help="콘텐츠 저장소 SQLite 경로")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS), help="생성할 템플릿 종류")
+    parser.add_argument("--limit", type=int, default=100, help="종류별 최대 생성 개수")
+    parser.add_argument("--enumerate", action="store_true", help="요청 기록이 없는 서명도 생성")
+    parser.add_argument("--hours", nargs="+", default=["모름"], help="--enumerate 시 포함할 태어난 시간")
+    parser.add_argument("--workers", type=int, default=2, help="동시 생성 수")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_API_KEY"), help="Gemini API 키")
+    parser.add_argument("--dry-run", action="store_true", help="생성하지 않고 대상만 출력")
+    args = parser.parse_args()
+
+    store = ContentStore(args.store)
+    set_content_store(store)
+    if not args.dry_run:
+        if not args.api_key:
+            parser.error("GEMINI_API_KEY 환경 변수 또는 --api-key 가 필요합니다.")
+        set_api_key(args.api_key)
+
+    for kind in args.kinds:
+        targets = plan_targets(store, kind, args.limit, args.enumerate, args.hours)
+        print(f"[{kind}] 생성 대상 {len(targets)}개 (저장됨 {store.count(kind)}개)")
+        if args.dry_run:
+            for signature, birthdate, birth_hour in targets[:20]:
+                print(f"  {signature}  ({birthdate.isoformat()}, {birth_hour})")
+            continue
+
+        started = time.perf_counter()
+        failures = 0
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(get_signature_template, kind, birthdate, birth_hour, record_demand=False): signature
+                for signature, birthdate, birth_hour in targets
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"  실패 {futures[future]}: {e}")
+        print(f"[{kind}] 완료: 성공 {len(targets) - failures}개, 실패 {failures}개, "
+              f"{time.perf_counter() - started:.1f}초")
+
+if __name__ == "__main__":
+    main()
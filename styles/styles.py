@@ -1,14 +1,13 @@
 """
 사주기반 멘토 - AI 사주 멘토 앱의 스타일 관련 유틸리티 모듈
 """
+import re
+from functools import lru_cache
+
 import streamlit as st
 
-def load_styles():
-    """
-    앱에 사용되는 CSS 스타일을 로드합니다.
-    스타일은 Streamlit의 markdown 함수를 통해 직접 삽입됩니다.
-    """
-    st.markdown("""
+# 앱 전역 CSS (load_styles()가 압축해서 삽입)
+APP_STYLES = """
     <style>
         /* Global styles */
         [data-testid="stAppViewContainer"] {
@@ -87,18 +86,24 @@ def load_styles():
             align-items: center;
         }
         
-        /* Tabs */
-        .stTabs [data-baseweb="tab-list"] {
+        /* Tabs (메인 화면 탭 선택 라디오) */
+        .stRadio div[role="radiogroup"] {
             gap: 8px;
+            border-bottom: 1px solid #e6e6f0;
         }
         
-        .stTabs [data-baseweb="tab"] {
+        .stRadio div[role="radiogroup"] > label {
             background-color: #f0f0f7;
             border-radius: 8px 8px 0 0;
             padding: 10px 20px;
+            margin-right: 0;
+        }
+        
+        .stRadio div[role="radiogroup"] > label > div:first-child {
+            display: none;
         }
         
-        .stTabs [aria-selected="true"] {
+        .stRadio div[role="radiogroup"] > label:has(input:checked) {
             background-color: white;
             border-bottom: 2px solid #6c5ce7;
         }
@@ -371,6 +376,28 @@ def load_styles():
             color: #ccc;
         }
         
+        .calendar-day-count {
+            font-size: 0.7rem;
+            color: #666;
+        }
+        
+        .calendar-day.density-1 {
+            background-color: #f3f1fd;
+        }
+        
+        .calendar-day.density-2 {
+            background-color: #e3defb;
+        }
+        
+        .calendar-day.density-3 {
+            background-color: #cfc6f7;
+        }
+        
+        .calendar-day.all-done .calendar-day-count {
+            color: #2e7d32;
+            font-weight: 600;
+        }
+        
         /* 로드맵 카드 스타일 */
         .roadmap-card {
             background-color: white;
@@ -513,8 +540,114 @@ def load_styles():
             margin-bottom: 20px;
             color: #d1d1e0;
         }
+        
+        /* 7일 계획 카드 (components.roadmap) */
+        .plan-card {
+            background-color: #ffffff;
+            border-left: 5px solid #bdbdbd;
+            padding: 15px;
+            border-radius: 5px;
+            margin-bottom: 10px;
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+        }
+        
+        .plan-card--future {
+            background-color: #f5f5f5;
+        }
+        
+        .plan-card--today {
+            background-color: #fff8e1;
+            border-left-color: #fb8c00;
+        }
+        
+        .plan-card--completed {
+            background-color: #e8f5e9;
+            border-left-color: #2e7d32;
+        }
+        
+        .plan-card h4 {
+            margin: 0;
+            color: #333;
+        }
+        
+        .plan-card h3 {
+            margin: 5px 0;
+            color: #333;
+        }
+        
+        .plan-card--completed h3 {
+            color: #2e7d32;
+        }
+        
+        .plan-card p {
+            margin: 0;
+        }
+        
+        /* 계획 통계 카드 */
+        .stat-card {
+            background-color: #f5f5f5;
+            padding: 15px;
+            border-radius: 10px;
+            text-align: center;
+        }
+        
+        .stat-card h2, .stat-card h3, .stat-card p {
+            margin: 0;
+        }
+        
+        .stat-card__value--blue { color: #1e88e5; }
+        .stat-card__value--green { color: #43a047; }
+        .stat-card__value--red { color: #e53935; }
+        
+        /* 로드맵 안내 배너 */
+        .banner {
+            padding: 15px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        }
+        
+        .banner h4 {
+            margin-top: 0;
+        }
+        
+        .banner--concern {
+            background-color: #f0f7ff;
+        }
+        
+        .banner--guide {
+            background-color: #fffde7;
+        }
+        
+        .banner--empty {
+            background-color: #f5f5f5;
+            padding: 20px;
+            text-align: center;
+        }
+        
+        .banner__icon {
+            font-size: 30px;
+            margin-bottom: 10px;
+        }
     </style>
-    """, unsafe_allow_html=True)
+"""
+
+def load_styles():
+    """
+    앱에 사용되는 CSS 스타일을 로드합니다.
+    스타일은 Streamlit의 markdown 함수를 통해 직접 삽입됩니다.
+    스크립트가 실행될 때마다 다시 전송되므로 주석과 공백을 걷어낸 문자열을 보냅니다.
+    """
+    st.markdown(_minified_styles(), unsafe_allow_html=True)
+
+@lru_cache(maxsize=1)
+def _minified_styles() -> str:
+    """APP_STYLES에서 주석과 불필요한 공백을 제거한 문자열을 반환합니다."""
+    css = re.sub(r'/\*.*?\*/', '', APP_STYLES, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    return css.replace(': ', ':').strip()
 
 def get_custom_css():
     """
@@ -0,0 +1,16 @@
+"""
+pytest 공용 설정
+
+- 저장소 루트를 모듈 검색 경로에 추가하여 utils, components 패키지를 그대로 임포트합니다.
+- 테스트가 저장소의 .cache 아래 파일을 건드리지 않도록 SQLite 저장소 경로를 임시 디렉터리로 지정합니다.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_STORE_DIR = tempfile.mkdtemp(prefix="saju-tests-")
+for _name, _file in (("CHAT_ARCHIVE_PATH", "chat_archive.db"), ("CONTENT_STORE_PATH", "content.db"),
+                     ("EVENT_LOG_PATH", "events.db"), ("PLAN_LIBRARY_PATH", "plan_library.db")):
+    os.environ.setdefault(_name, os.path.join(_STORE_DIR, _file))
@@ -0,0 +1,127 @@
+"""utils.cache_backend 테스트"""
+import os
+import types
+
+import pytest
+
+from utils.cache_backend import (REPO_ROOT, CacheBackend, MemoryLRUBackend, RateLimiter, RedisBackend,
+                                 SQLiteBackend, create_cache_backend)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryLRUBackend(max_entries=2)
+    backend.set('a', b'1')
+    backend.set('b', b'2')
+    backend.get('a')
+    backend.set('c', b'3')
+
+    assert backend.get('b') is None
+    assert backend.get('a') == b'1' and backend.get('c') == b'3'
+
+
+def test_memory_backend_ttl_and_incr():
+    clock = _Clock()
+    backend = MemoryLRUBackend(clock=clock)
+    backend.set('k', b'v', ttl=10)
+    assert backend.incr('n', 2, ttl=5) == 2
+    assert backend.incr('n', 3, ttl=100) == 5
+
+    clock.now += 6
+    # 카운터의 ttl은 처음 만들 때 값이 유지됨
+    assert backend.get('n') is None
+    assert backend.get('k') == b'v'
+    clock.now += 5
+    assert backend.get('k') is None
+
+
+def test_sqlite_backend_roundtrip_and_incr(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.db'))
+    backend.set('k', b'\x00bytes')
+    assert backend.get('k') == b'\x00bytes'
+    assert backend.incr('n') == 1
+    assert backend.incr('n', 4) == 5
+    backend.delete('k')
+    assert backend.get('k') is None
+    # 다른 연결(다른 워커)에서도 같은 값을 봄
+    assert SQLiteBackend(str(tmp_path / 'cache.db')).incr('n') == 6
+
+
+def test_sqlite_backend_purges_expired_rows_on_write(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.db'), purge_interval=0)
+    backend.set('old', b'1', ttl=-1)
+    backend.set('keep', b'2')
+    backend.incr('window', ttl=-1)
+    backend.set('trigger', b'3')
+
+    rows = backend._conn().execute("SELECT key FROM kv ORDER BY key").fetchall()
+    assert [row[0] for row in rows] == ['keep', 'trigger']
+
+
+def test_create_cache_backend_urls(tmp_path):
+    assert isinstance(create_cache_backend('memory://?max_entries=3'), MemoryLRUBackend)
+
+    absolute = create_cache_backend(f'sqlite:///{tmp_path}/abs.db')
+    assert absolute._path == f'{tmp_path}/abs.db'
+
+    relative = create_cache_backend('sqlite:///.cache/test-relative.db')
+    try:
+        assert relative._path == os.path.join(REPO_ROOT, '.cache', 'test-relative.db')
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(relative._path + suffix):
+                os.remove(relative._path + suffix)
+
+    redis = create_cache_backend('redis://example:6380/2')
+    assert redis._address == ('example', 6380) and redis._db == 2
+
+    with pytest.raises(ValueError):
+        create_cache_backend('ftp://nope')
+
+
+def test_rate_limiter_counts_per_window():
+    limiter = RateLimiter(MemoryLRUBackend(), limit=2, window_seconds=3600)
+    assert [limiter.allow('user') for _ in range(3)] == [True, True, False]
+    assert limiter.allow('other') is True
+    assert RateLimiter(MemoryLRUBackend(), limit=0).allow('user') is True
+
+
+def _broken_redis(monkeypatch):
+    """연결은 되지만 응답을 읽을 때마다 끊기는 Redis 백엔드와 보낸 명령 목록"""
+    backend = RedisBackend()
+    sent = []
+    monkeypatch.setattr(backend, '_connect',
+                        lambda: setattr(backend, '_sock', types.SimpleNamespace(close=lambda: None)))
+    monkeypatch.setattr(backend, '_send', lambda *args: sent.append(args))
+
+    def read_reply():
+        raise ConnectionError("끊김")
+
+    monkeypatch.setattr(backend, '_read_reply', read_reply)
+    return backend, sent
+
+
+def test_redis_does_not_resend_incr(monkeypatch):
+    backend, sent = _broken_redis(monkeypatch)
+    with pytest.raises(ConnectionError):
+        backend.incr('counter')
+    assert sent == [('INCRBY', 'counter', 1)]
+
+
+def test_redis_retries_idempotent_commands_once(monkeypatch):
+    backend, sent = _broken_redis(monkeypatch)
+    with pytest.raises(ConnectionError):
+        backend.get('key')
+    assert sent == [('GET', 'key'), ('GET', 'key')]
@@ -0,0 +1,142 @@
+"""utils.circuit_breaker.CircuitBreaker 상태 전이와 utils.llm 부정 캐시 테스트"""
+import asyncio
+
+import pytest
+
+import utils.llm as llm
+from utils.circuit_breaker import CircuitBreaker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock, **kwargs):
+    return CircuitBreaker('test', failure_threshold=3, recovery_timeout=10.0, clock=clock, **kwargs)
+
+
+def test_opens_after_consecutive_failures():
+    breaker = _breaker(_Clock())
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is False
+
+
+def test_success_resets_failure_count():
+    breaker = _breaker(_Clock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_limited_probes_then_closes():
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now = 9.9
+    assert breaker.allow() is False
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is True
+    # 시험 호출이 끝나기 전에는 더 허용하지 않음
+    assert breaker.allow() is False
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()['failures'] == 0
+
+
+def test_failed_probe_reopens_for_another_timeout():
+    clock = _Clock()
+    breaker = _breaker(clock, half_open_max_calls=2)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow() and breaker.allow()
+    assert breaker.allow() is False
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()['opened_at'] == 10.0
+    clock.now = 19.0
+    assert breaker.allow() is False
+    clock.now = 20.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_released_probe_can_be_retried():
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10.0
+    assert breaker.allow() is True
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    # 닫힌 상태에서는 아무 영향이 없음
+    breaker.record_success()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+
+class _HangingDispatcher:
+    async def generate_async(self, session_id, model_name, prompt, generation_config=None, cached_content=None):
+        await asyncio.Event().wait()
+
+
+def test_cancelled_probe_does_not_wedge_half_open(monkeypatch):
+    import utils.llm_dispatcher
+
+    clock = _Clock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 10.0
+    monkeypatch.setitem(llm._breakers, 'test-cancelled-probe', breaker)
+    monkeypatch.setattr(utils.llm_dispatcher, 'get_llm_dispatcher', lambda: _HangingDispatcher())
+
+    async def cancel_probe():
+        task = asyncio.create_task(llm.generate_text_async('시험 호출', model_name='test-cancelled-probe'))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.snapshot()['failures'] == 3
+    assert breaker.allow() is True
+
+
+def test_failed_request_is_negatively_cached(monkeypatch):
+    calls = []
+
+    def failing_call(model_name, prompt, generation_config, cached_content=None):
+        calls.append(prompt)
+        raise RuntimeError("모델 오류")
+
+    monkeypatch.setattr(llm, '_call_model', failing_call)
+    with pytest.raises(RuntimeError):
+        llm.generate_text('같은 요청', model_name='test-negative-cache')
+    with pytest.raises(llm.LLMUnavailable):
+        llm.generate_text('같은 요청', model_name='test-negative-cache')
+    with pytest.raises(RuntimeError):
+        llm.generate_text('다른 요청', model_name='test-negative-cache')
+
+    assert calls == ['같은 요청', '다른 요청']
+    assert llm.get_circuit_breaker('test-negative-cache').snapshot()['failures'] == 2
@@ -0,0 +1,146 @@
+"""utils.context_cache.ContextCacheManager 테스트 (로컬 대체 백엔드 사용)"""
+import types
+
+import pytest
+
+import utils.llm as llm
+from utils.context_cache import (
+    COUNSELLING_INSTRUCTIONS, CREATE_FAILURE_BACKOFF_SECONDS, SWEEP_INTERVAL_SECONDS, ContextCacheManager,
+    LocalCachingBackend,
+)
+
+TTL = 600
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def backend():
+    return LocalCachingBackend()
+
+
+@pytest.fixture
+def manager(backend, clock):
+    return ContextCacheManager(backend, model_name='m', ttl_seconds=TTL, clock=clock)
+
+
+def test_creates_once_and_reuses_cache(manager, backend):
+    first = manager.prefix_for('user', '프로필', '첫 질문')
+    second = manager.prefix_for('user', '프로필', '두 번째 질문')
+
+    assert backend.creates == 1 and len(manager) == 1
+    assert second.handle is first.handle and second.key == first.key
+    assert (second.model_name, second.contents) == ('m', '두 번째 질문')
+    assert first.handle.prefix == f"{COUNSELLING_INSTRUCTIONS}\n프로필"
+
+
+def test_changed_profile_replaces_cache(manager, backend):
+    first = manager.prefix_for('user', '프로필', '질문')
+    second = manager.prefix_for('user', '바뀐 프로필', '질문')
+
+    assert second.key != first.key
+    assert backend.creates == 2 and backend.deletes == 1 and len(backend) == 1
+
+
+def test_refreshes_when_half_of_ttl_left_and_recreates_after_expiry(manager, backend, clock):
+    first = manager.prefix_for('user', '프로필', '질문')
+    clock.now = TTL / 2 - 1
+    manager.prefix_for('user', '프로필', '질문')
+    assert backend.refreshes == 0
+
+    clock.now = TTL / 2 + 1
+    assert manager.prefix_for('user', '프로필', '질문').key == first.key
+    assert backend.refreshes == 1
+
+    clock.now += TTL
+    assert manager.prefix_for('user', '프로필', '질문').key != first.key
+    assert backend.creates == 2 and len(backend) == 1
+
+
+def test_sweep_deletes_abandoned_caches(manager, backend, clock):
+    manager.prefix_for('abandoned', '프로필', '질문')
+    clock.now = SWEEP_INTERVAL_SECONDS / 2
+    manager.prefix_for('active', '다른 프로필', '질문')
+
+    clock.now = TTL + SWEEP_INTERVAL_SECONDS
+    manager.prefix_for('active', '다른 프로필', '질문')
+    assert len(manager) == 1 and len(backend) == 1
+
+    clock.now += TTL
+    assert manager.cleanup_expired() == 1
+    assert len(backend) == 0
+
+
+def test_release_waits_for_last_session(manager, backend):
+    manager.prefix_for('user', '프로필', '질문', session_id='s1')
+    prefix = manager.prefix_for('user', '프로필', '질문', session_id='s2')
+
+    manager.release('user', 's1')
+    assert len(backend) == 1
+    assert manager.prefix_for('user', '프로필', '질문', session_id='s2').key == prefix.key
+
+    manager.release('user', 's2')
+    assert len(manager) == 0 and len(backend) == 0
+
+
+def test_discard_keeps_newer_cache(manager, backend):
+    old = manager.prefix_for('user', '프로필', '질문')
+    old.discard()
+    new = manager.prefix_for('user', '프로필', '질문')
+    old.discard()
+
+    assert new.key != old.key and len(backend) == 1
+
+
+def test_create_failure_backs_off(backend, clock):
+    calls = []
+
+    def failing_create(*args):
+        calls.append(args)
+        raise RuntimeError("최소 토큰 수 미달")
+
+    backend.create = failing_create
+    manager = ContextCacheManager(backend, model_name='m', ttl_seconds=TTL, clock=clock)
+
+    assert manager.prefix_for('user', '프로필', '질문') is None
+    assert manager.prefix_for('user', '프로필', '질문') is None
+    clock.now = CREATE_FAILURE_BACKOFF_SECONDS
+    assert manager.prefix_for('user', '프로필', '질문') is None
+    assert len(calls) == 2
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+def test_cached_prefix_is_sent_through_local_model(manager, monkeypatch):
+    prompts = []
+
+    class _GenerativeModel:
+        def __init__(self, model_name):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, generation_config=None):
+            prompts.append(prompt)
+            return _Response('답변')
+
+        async def generate_content_async(self, prompt, generation_config=None):
+            return self.generate_content(prompt, generation_config)
+
+    monkeypatch.setattr(llm, 'get_genai', lambda: types.SimpleNamespace(GenerativeModel=_GenerativeModel))
+    prefix = manager.prefix_for('user', '프로필', '이번 질문')
+
+    assert llm.generate_text('전체 프롬프트', model_name='m', cached_prefix=prefix) == '답변'
+    assert prompts == [f"{COUNSELLING_INSTRUCTIONS}\n프로필\n이번 질문"]
@@ -0,0 +1,81 @@
+"""utils.event_log 재생·압축 테스트와 이어하기 코드(utils.session) 테스트"""
+import datetime
+
+from utils.event_log import EventJournal, EventLog, apply_event, empty_state
+from utils.session import get_journal_key, new_resume_token
+
+AT = datetime.datetime(2024, 3, 10, 12).timestamp()
+
+
+def _task(task_id, completed=False):
+    return {'id': task_id, 'date': '2024-03-10', 'title': task_id, 'description': '', 'completed': completed,
+            'created_at': ''}
+
+
+def test_apply_event_builds_state():
+    state = empty_state()
+    for kind, data in (
+        ('user_info.update', {'name': '홍길동'}),
+        ('message.append', {'role': 'user', 'content': '안녕'}),
+        ('message.append', {'role': 'assistant', 'content': '반가워요'}),
+        ('message.pop', {}),
+        ('task.add', _task('a')),
+        ('task.add', _task('b', completed=True)),
+        ('task.completed', {'id': 'a', 'completed': True, 'on': '2024-03-01'}),
+        ('task.remove', {'id': 'b'}),
+        ('task.remove', {'id': 'missing'}),
+        ('plan.set', {'task_ids': ['a'], 'concern': '진로'}),
+        ('unknown.kind', {}),
+    ):
+        apply_event(state, kind, data, AT)
+
+    assert state['user_info'] == {'name': '홍길동'}
+    assert state['messages'] == [['user', '안녕']]
+    assert list(state['tasks']) == ['a']
+    assert state['tasks']['a']['completed_on'] == '2024-03-01'
+    assert state['plan_task_ids'] == ['a'] and state['current_concern'] == '진로'
+
+    apply_event(state, 'reset', {}, AT)
+    assert state == empty_state()
+
+
+def test_replay_after_compaction_matches_full_replay(tmp_path):
+    log = EventLog(str(tmp_path / 'events.db'))
+    log.append_many('user', [('task.add', _task(f't{i}')) for i in range(5)])
+    log.append('user', 'task.remove', {'id': 't1'})
+    log.append('other', 'message.append', {'role': 'user', 'content': '다른 사용자'})
+    _, before, applied = log.replay('user')
+    assert applied == 6
+
+    assert log.compact('user') == 6
+    assert log.compact('user') == 0
+    log.append('user', 'task.completed', {'id': 't2', 'completed': True})
+
+    last_id, after, applied = log.replay('user')
+    assert applied == 1
+    assert list(after['tasks']) == ['t0', 't2', 't3', 't4']
+    assert after['tasks']['t2']['completed']
+    assert {key: value for key, value in after.items() if key != 'tasks'} == \
+        {key: value for key, value in before.items() if key != 'tasks'}
+    assert log.replay('other')[1]['messages'] == [['user', '다른 사용자']]
+
+
+def test_journal_records_and_replays(tmp_path):
+    journal = EventJournal('user', EventLog(str(tmp_path / 'events.db')))
+    journal.record('user_info.update', name='홍길동')
+    journal.record_many('task.add', [_task('a'), _task('b')])
+
+    state = journal.replay()
+    assert state['user_info']['name'] == '홍길동'
+    assert sorted(state['tasks']) == ['a', 'b']
+
+
+def test_resume_token_maps_to_stable_private_key():
+    token = new_resume_token()
+    assert token != new_resume_token()
+    assert len(token) >= 20
+
+    key = get_journal_key(token)
+    assert key == get_journal_key(f"  {token}\n")
+    assert key != get_journal_key(new_resume_token())
+    assert token not in key
@@ -0,0 +1,91 @@
+"""utils.history_export NDJSON 내보내기·가져오기 테스트"""
+import datetime
+
+import pytest
+
+from utils.calendar import TaskStore
+from utils.history_export import (
+    HistoryImportError, encode_ndjson, history_events, import_session_history, parse_ndjson,
+    session_history_records,
+)
+from utils.records import MessageStore
+from utils.streak import StreakTracker
+
+HEADER = '{"type":"header","format":"saju-mentor-history","version":1}'
+
+
+def _session(name='홍길동'):
+    return {
+        'chat_messages': MessageStore(), 'task_store': TaskStore(), 'streak_tracker': StreakTracker(),
+        'user_info': {'name': name, 'birthdate': datetime.date(1990, 5, 17), 'birth_hour': '오시',
+                      'core_traits': '성실함'},
+        'plan_task_ids': [], 'current_concern': '', 'previous_concerns': [],
+    }
+
+
+def _filled_session():
+    state = _session()
+    state['chat_messages'].extend([('user', '안녕하세요'), ('assistant', '반갑습니다\n줄바꿈도 있어요')])
+    store = state['task_store']
+    first = store.add('2024-03-01', {'title': '산책', 'description': '30분', 'completed': False, 'created_at': ''})
+    second = store.add('2024-03-02', {'title': '독서', 'description': '', 'completed': False, 'created_at': ''})
+    store.toggle(first)
+    state['streak_tracker'].mark(first, True, datetime.date(2024, 3, 3))
+    state['plan_task_ids'] = [first, second]
+    state['current_concern'] = '진로 고민'
+    state['previous_concerns'] = [{'concern': '이직 고민', 'created_at': '2024-02-01'}]
+    return state
+
+
+def test_export_import_roundtrip():
+    lines = list(encode_ndjson(session_history_records(_filled_session())))
+    assert all(line.endswith(b"\n") for line in lines)
+
+    target = _session()
+    target['task_store'].add('2024-01-01', {'title': '기존', 'description': '', 'completed': False,
+                                            'created_at': ''})
+    counts = import_session_history(lines, target, batch_size=1)
+
+    assert counts == {'messages': 2, 'tasks': 2, 'completions': 1, 'concerns': 1}
+    assert [(m.role, m.content) for m in target['chat_messages'].all_messages()] == \
+        [('user', '안녕하세요'), ('assistant', '반갑습니다\n줄바꿈도 있어요')]
+    plan = [target['task_store'].get(task_id) for task_id in target['plan_task_ids']]
+    assert [task.title for task in plan] == ['산책', '독서']
+    assert plan[0].completed and not plan[1].completed
+    assert target['streak_tracker'].completed_on(plan[0].id) == datetime.date(2024, 3, 3)
+    assert target['current_concern'] == '진로 고민'
+    assert target['previous_concerns'] == [{'concern': '이직 고민', 'created_at': '2024-02-01'}]
+
+    # 같은 고민은 다시 가져와도 한 번만 남음
+    assert import_session_history(lines, target)['concerns'] == 0
+
+
+@pytest.mark.parametrize('lines', [
+    [],
+    ["\n"],
+    ['{"type":"message","role":"user","content":"헤더 없음"}'],
+    ['{"type":"header","format":"other","version":1}'],
+    ['{"type":"header","format":"saju-mentor-history","version":99}'],
+    [HEADER, '{"role":"user"}'],
+    [HEADER, '{"type":"message",'],
+])
+def test_parse_rejects_malformed_files(lines):
+    with pytest.raises(HistoryImportError):
+        list(parse_ndjson(lines))
+
+
+def test_parse_skips_blank_lines_and_accepts_bytes():
+    lines = [HEADER.encode(), b"\n", '{"type":"message","role":"user","content":"안녕"}'.encode()]
+    assert list(parse_ndjson(lines)) == [{'type': 'message', 'role': 'user', 'content': '안녕'}]
+
+
+def test_history_events_keep_identity_fields():
+    records = parse_ndjson(encode_ndjson(session_history_records(_filled_session())))
+    events = list(history_events(records))
+    kinds = [kind for kind, _ in events]
+
+    assert kinds == ['user_info.update', 'message.append', 'message.append', 'task.add', 'task.add',
+                     'task.completed', 'plan.set', 'concern.add']
+    assert events[0][1] == {'name': '홍길동', 'birthdate': '1990-05-17', 'birth_hour': '오시',
+                            'core_traits': '성실함'}
+    assert events[5][1]['on'] == '2024-03-03'
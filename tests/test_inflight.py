@@ -0,0 +1,141 @@
+"""utils.inflight.InflightRegistry 테스트 (취소·중복 제출·시간 제한)"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.inflight import GenerationCancelled, InflightRegistry, current_session_id
+from utils.llm_dispatcher import LLMDispatcher
+
+
+@pytest.fixture(scope='module')
+def dispatcher():
+    return LLMDispatcher()
+
+
+@pytest.fixture
+def alive():
+    return {}
+
+
+@pytest.fixture
+def registry(dispatcher, alive):
+    return InflightRegistry(dispatcher, dedup_window=0.5, session_alive=lambda session_id: alive.get(session_id, True))
+
+
+def _recorder(delay=0.0):
+    calls = []
+
+    async def generate(value):
+        calls.append(('start', value))
+        await asyncio.sleep(delay)
+        calls.append(('end', value))
+        return value * 2
+
+    return calls, generate
+
+
+def test_submit_runs_coroutine_and_exposes_session_id(registry):
+    async def whoami():
+        return current_session_id()
+
+    assert registry.submit('s1', 'who', whoami).result() == 's1'
+
+
+def test_duplicate_submit_reuses_generation_within_window(registry):
+    calls, generate = _recorder()
+    first = registry.submit('s1', 'k', generate, 1)
+    assert registry.submit('s1', 'k', generate, 1) is first
+    assert first.result() == 2
+    assert registry.find('s1', 'k') is first
+
+    time.sleep(0.6)
+    assert registry.find('s1', 'k') is None
+    assert registry.submit('s1', 'k', generate, 1) is not first
+    # 다른 세션의 같은 키는 따로 실행
+    assert registry.submit('s2', 'k', generate, 1) is not first
+
+
+def test_cancel_before_start_skips_generation(dispatcher, registry):
+    release = threading.Event()
+
+    async def block_loop():
+        # 루프를 붙잡아 다음 생성이 시작되지 못하게 함
+        release.wait(5)
+
+    blocker = dispatcher.run_coroutine(block_loop())
+    calls, generate = _recorder()
+    generation = registry.submit('s1', 'skip', generate, 1)
+
+    assert registry.cancel_session('s1', 'reset') == 1
+    assert generation.done and not generation.started
+    release.set()
+    blocker.result(5)
+    time.sleep(0.05)
+
+    assert calls == []
+    with pytest.raises(GenerationCancelled) as error:
+        generation.result()
+    assert error.value.reason == 'reset'
+
+
+def test_cancel_interrupts_running_generation(registry):
+    calls, generate = _recorder(delay=1.0)
+    generation = registry.submit('s1', 'running', generate, 1)
+    while not calls:
+        time.sleep(0.01)
+
+    assert generation.cancel('superseded') is True
+    assert generation.cancel('superseded') is False
+    deadline = time.monotonic() + 2
+    while not generation.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert generation.done
+    assert calls == [('start', 1)]
+    assert registry.active_count('s1') == 0
+
+
+def test_result_times_out_and_cancels(registry):
+    calls, generate = _recorder(delay=1.0)
+    generation = registry.submit('s1', 'slow', generate, 1, timeout=0.2)
+
+    with pytest.raises(TimeoutError):
+        generation.result(wait_seconds=0.05)
+    with pytest.raises(GenerationCancelled) as error:
+        generation.result()
+    assert error.value.reason == 'timeout'
+
+
+def test_sweep_cancels_disconnected_sessions(registry, alive):
+    calls, generate = _recorder(delay=1.0)
+    generation = registry.submit('gone', 'k', generate, 1)
+    alive['gone'] = False
+
+    registry.sweep()
+
+    assert generation.cancelled and generation.cancel_reason == 'disconnect'
+    assert registry.active_count() == 0
+
+
+def test_submit_rejects_plain_functions(registry):
+    with pytest.raises(TypeError):
+        registry.submit('s1', 'sync', lambda: 1)
+
+
+def test_stream_stops_when_cancelled(registry):
+    received = []
+    with pytest.raises(GenerationCancelled):
+        for item in registry.stream('s1', 'stream', iter(range(5))):
+            received.append(item)
+            if item == 1:
+                registry.cancel_session('s1', 'reset')
+    assert received == [0, 1]
+
+
+def test_abandoned_stream_is_cancelled(registry):
+    items = registry.stream('s1', 'abandon', iter(range(5)))
+    next(items)
+    items.close()
+    assert registry.find('s1', 'abandon') is None
@@ -0,0 +1,153 @@
+"""utils.llm_dispatcher.LLMDispatcher 테스트 (세션별 공정 순서, 동시 실행 제한, 취소, 코루틴 실행)"""
+import asyncio
+import time
+
+import pytest
+
+import utils.llm as llm
+from utils.llm_dispatcher import LLMDispatcher
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Chunks:
+    def __init__(self, parts):
+        self._parts = parts
+
+    async def __aiter__(self):
+        for part in self._parts:
+            await asyncio.sleep(0)
+            yield _Response(part)
+
+
+class _FakeModel:
+    """generate_content_async 호출 순서와 동시 실행 수를 기록하는 가짜 모델"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.order = []
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            self.order.append(prompt)
+            if stream:
+                return _Chunks([prompt[:2], prompt[2:]])
+            return _Response(f"ok:{prompt}")
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = _FakeModel(delay=0.05)
+    monkeypatch.setattr(llm, 'get_model', lambda model_name=None, cached_content=None: fake)
+    return fake
+
+
+def test_limits_concurrency_and_alternates_sessions(model):
+    dispatcher = LLMDispatcher(max_concurrency=1)
+    futures = [dispatcher.submit('A', 'm', f'A{i}') for i in range(3)]
+    futures += [dispatcher.submit('B', 'm', f'B{i}') for i in range(2)]
+
+    assert [future.result(5) for future in futures][0] == 'ok:A0'
+    assert model.peak == 1
+    # A0은 제출 즉시 시작되고, 대기열에서는 A가 먼저 쌓아 두어도 B의 호출이 A 뒤로 밀리지 않음
+    assert model.order == ['A0', 'A1', 'B0', 'A2', 'B1']
+
+
+def test_cancelled_queued_call_is_skipped(model):
+    dispatcher = LLMDispatcher(max_concurrency=1)
+    first = dispatcher.submit('A', 'm', 'first')
+    queued = dispatcher.submit('A', 'm', 'queued')
+    assert queued.cancel()
+
+    first.result(5)
+    time.sleep(0.1)
+    assert model.order == ['first']
+
+
+def test_coroutines_await_calls_without_threads(model):
+    dispatcher = LLMDispatcher(max_concurrency=8)
+
+    async def generation(index):
+        text = await dispatcher.generate_async('S', 'm', f'p{index}')
+        parts = [part async for part in dispatcher.stream_async('S', 'm', f'st{index}')]
+        return text, parts
+
+    futures = [dispatcher.run_coroutine(generation(index)) for index in range(20)]
+
+    assert futures[3].result(5) == ('ok:p3', ['st', '3'])
+    assert all(future.result(5) for future in futures)
+    assert model.peak <= 8
+
+
+def test_cancelling_run_coroutine_cancels_its_call(model):
+    model.delay = 1.0
+    dispatcher = LLMDispatcher()
+
+    async def generation():
+        return await dispatcher.generate_async('S', 'm', 'slow')
+
+    future = dispatcher.run_coroutine(generation())
+    time.sleep(0.1)
+    assert model.active == 1
+    future.cancel()
+    time.sleep(0.1)
+
+    assert model.active == 0
+    assert model.order == []
+    assert dispatcher.running_count == 0
+
+
+class _SlowBackend:
+    """읽기·쓰기마다 잠시 멈추는 캐시 백엔드 (원격 Redis·디스크 I/O 대역)"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def get(self, key):
+        time.sleep(self.delay)
+        return None
+
+    def set(self, key, value, ttl=None):
+        time.sleep(self.delay)
+
+    def incr(self, key, amount=1, ttl=None):
+        time.sleep(self.delay)
+        return amount
+
+
+def test_cache_backend_io_does_not_block_dispatcher_loop(model, monkeypatch):
+    import utils.llm_dispatcher
+    from utils.inflight import current_session_id
+
+    # 첫 호출의 지연 임포트(Streamlit 런타임) 시간은 측정에서 제외
+    current_session_id()
+
+    dispatcher = LLMDispatcher()
+    monkeypatch.setattr(utils.llm_dispatcher, 'get_llm_dispatcher', lambda: dispatcher)
+    monkeypatch.setattr(llm, 'get_cache_backend', lambda: _SlowBackend(0.2))
+    monkeypatch.setattr(llm, '_rate_limiter', None)
+
+    async def ticker():
+        gaps, last = [], time.monotonic()
+        for _ in range(40):
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            gaps.append(now - last)
+            last = now
+        return max(gaps)
+
+    generation = dispatcher.run_coroutine(llm.generate_text_async('느린 캐시', model_name='m', cache_ttl=60))
+    largest_gap = dispatcher.run_coroutine(ticker()).result(5)
+
+    assert generation.result(5) == 'ok:느린 캐시'
+    assert largest_gap < 0.15
@@ -0,0 +1,71 @@
+"""utils.onboarding_job.SajuAnalysisJob 테스트 (중복 제출, 취소)"""
+import asyncio
+import time
+
+import pytest
+
+import utils.onboarding_job as onboarding_job
+import utils.saju as saju
+from utils.inflight import InflightRegistry
+from utils.llm_dispatcher import LLMDispatcher
+
+USER = {'name': '홍길동', 'birthdate': '1990-05-17', 'birth_hour': '오시'}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = InflightRegistry(LLMDispatcher(), session_alive=lambda session_id: True)
+    monkeypatch.setattr(onboarding_job, 'get_inflight_registry', lambda: registry)
+    return registry
+
+
+@pytest.fixture
+def slow_generation(monkeypatch):
+    async def stream_saju_analysis(name, birthdate, birth_hour):
+        for chunk in ('사주 ', '분석'):
+            await asyncio.sleep(0.05)
+            yield chunk
+
+    async def generate_saju_insight(user_info):
+        await asyncio.sleep(0.05)
+        return '로드맵'
+
+    monkeypatch.setattr(saju, 'stream_saju_analysis', stream_saju_analysis)
+    monkeypatch.setattr(saju, 'generate_saju_insight', generate_saju_insight)
+
+
+def _wait_finished(*jobs, timeout=5.0):
+    give_up_at = time.monotonic() + timeout
+    while not all(job.finished for job in jobs) and time.monotonic() < give_up_at:
+        time.sleep(0.01)
+
+
+def test_job_streams_analysis_then_roadmap(registry, slow_generation):
+    job = onboarding_job.SajuAnalysisJob(USER)
+    job.start('s1')
+    _wait_finished(job)
+
+    assert job.done and job.analysis_done and not job.cancelled
+    assert job.text == '사주 분석' and job.roadmap == '로드맵' and job.error is None
+
+
+def test_same_user_jobs_each_run_their_own_generation(registry, slow_generation):
+    first = onboarding_job.SajuAnalysisJob(USER)
+    second = onboarding_job.SajuAnalysisJob(USER)
+    first.start('s1')
+    second.start('s1')
+    _wait_finished(first, second)
+
+    assert first.done and second.done
+    assert second.text == '사주 분석' and second.roadmap == '로드맵'
+
+
+def test_cancelled_job_is_finished_without_roadmap(registry, slow_generation):
+    job = onboarding_job.SajuAnalysisJob(USER)
+    job.start('s1')
+    time.sleep(0.02)
+    job.cancel('superseded')
+    _wait_finished(job)
+
+    assert job.finished and job.cancelled
+    assert job.roadmap is None
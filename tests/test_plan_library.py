@@ -0,0 +1,118 @@
+"""utils.plan_library 계획 재사용 색인과 utils.saju 계획 익명화 테스트"""
+import datetime
+
+import numpy as np
+import pytest
+
+import utils.saju as saju
+from utils.plan_library import PlanLibrary, concern_vector
+from utils.records import Message
+from utils.saju import NAME_PLACEHOLDER, _depersonalize_plan_texts, render_with_name
+
+ITEMS = [(f'{i}일차 {NAME_PLACEHOLDER}님의 산책', '30분 걷기') for i in range(1, 8)]
+
+
+def test_concern_vector_is_normalized_and_ignores_boilerplate():
+    vector = concern_vector('어떻게 커리어 방향을 찾을 수 있을까요?')
+    assert vector.shape == (1024,)
+    assert np.isclose(np.linalg.norm(vector), 1.0)
+    assert np.allclose(vector, concern_vector('커리어 방향을 찾'))
+    assert np.allclose(vector, concern_vector('커리어방향을  찾!'))
+    assert not concern_vector('?').any()
+
+
+def test_find_reuses_only_similar_plans_of_same_signature(tmp_path):
+    library = PlanLibrary(str(tmp_path / 'plans.db'))
+    assert library.find('sig', '커리어 방향') is None
+
+    plan_id = library.add('sig', '커리어 방향을 찾고 싶어요', ITEMS, '추가 설명')
+    library.add('other', '건강 관리를 하고 싶어요', ITEMS, '')
+
+    stored = library.find('sig', '어떻게 커리어 방향을 찾을 수 있을까요?')
+    assert stored is not None and stored.plan_id == plan_id
+    assert stored.similarity >= 0.8
+    assert stored.items == ITEMS and stored.explanation == '추가 설명'
+
+    assert library.find('sig', '건강 관리를 하고 싶어요') is None
+    assert library.find('other', '커리어 방향을 찾고 싶어요') is None
+    assert library.find('sig', '커리어 방향', threshold=1.01) is None
+    assert library.count() == 2 and library.count('sig') == 1
+
+
+def test_plans_added_by_other_workers_extend_index(tmp_path):
+    path = str(tmp_path / 'plans.db')
+    library = PlanLibrary(path)
+    library.add('sig', '커리어 방향을 찾고 싶어요', ITEMS, '')
+    assert library.find('sig', '건강 관리') is None
+
+    other_id = PlanLibrary(path).add('sig', '건강 관리를 하고 싶어요', ITEMS, '')
+    stored = library.find('sig', '건강 관리를 하고 싶어요')
+    assert stored is not None and stored.plan_id == other_id
+
+
+def test_depersonalize_replaces_name_before_honorific():
+    texts = _depersonalize_plan_texts(['홍길동님의 산책', '길동 씨, 오늘은 쉬어요', '동네 한 바퀴'], '홍길동', None, '')
+    assert texts == [f'{NAME_PLACEHOLDER}님의 산책', f'{NAME_PLACEHOLDER} 씨, 오늘은 쉬어요', '동네 한 바퀴']
+    assert render_with_name(texts[0], '김철수') == '김철수님의 산책'
+
+
+@pytest.mark.parametrize('texts', [
+    ['홍길동의 하루'],
+    ['hong@example.com 으로 연락하기'],
+    ['010-1234-5678 에 전화하기'],
+])
+def test_depersonalize_rejects_identifying_texts(texts):
+    assert _depersonalize_plan_texts(texts, '홍길동', None, '') is None
+
+
+def test_depersonalize_rejects_copied_user_messages():
+    messages = [Message('user', '저는 작은 빵집을 운영하고 있어요'), Message('assistant', '오늘 아침 산책을 해 보세요')]
+    concern = '빵집 운영이 힘들어요'
+
+    assert _depersonalize_plan_texts(['작은 빵집을 운영하고 있어요를 돌아보기'], '홍길동', messages, concern) is None
+    # 멘토 답변이나 고민 문구와 겹치는 것은 괜찮음
+    assert _depersonalize_plan_texts(['오늘 아침 산책을 해 보세요'], '홍길동', messages, concern) is not None
+    assert _depersonalize_plan_texts(['빵집 운영이 힘들어요 정리하기'], '홍길동', messages, concern) is not None
+    assert _depersonalize_plan_texts(['짧은 이름'], '홍', messages, concern) is None
+
+
+USER_INFO = {'name': '홍길동', 'birthdate': datetime.date(1990, 1, 1), 'birth_hour': '07-09시'}
+MESSAGES = [Message('user', '저는 작은 빵집을 운영하고 있어요')]
+
+
+def _plan_text(description):
+    return "".join(f"Day {day}: 제목{day} - {description}\n" for day in range(1, 8)) + \
+        "ADDITIONAL_EXPLANATION: 꾸준히 해보세요\n"
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    library = PlanLibrary(str(tmp_path / 'plans.db'))
+    monkeypatch.setattr(saju, '_get_plan_library', lambda: library)
+    return library
+
+
+def _fallback_plan(monkeypatch, plan_text, messages):
+    def empty_stream(task, prompt, cache_ttl=None):
+        yield from ()
+
+    monkeypatch.setattr(saju, 'stream_for_task', empty_stream)
+    monkeypatch.setattr(saju, 'generate_for_task', lambda task, prompt, cache_ttl=None: plan_text)
+    return list(saju.stream_weekly_plan(USER_INFO, concern='가게 운영 고민', messages=messages))
+
+
+def test_plan_without_conversation_is_not_stored(library, monkeypatch):
+    monkeypatch.setattr(saju, 'generate_for_task', lambda task, prompt, cache_ttl=None: _plan_text('설명'))
+    plans, _ = saju.generate_weekly_plan(USER_INFO, '가게 운영 고민')
+
+    assert len(plans) == 7
+    assert library.count() == 0
+
+
+def test_fallback_plan_is_checked_against_conversation(library, monkeypatch):
+    events = _fallback_plan(monkeypatch, _plan_text('작은 빵집을 운영하고 있어요 돌아보기'), MESSAGES)
+    assert [kind for kind, _ in events].count('day') == 7
+    assert library.count() == 0
+
+    _fallback_plan(monkeypatch, _plan_text('30분 산책하기'), MESSAGES)
+    assert library.count() == 1
@@ -0,0 +1,96 @@
+"""utils.saju 7일 계획 파서(PlanStreamParser, _parse_plan_text)와 스트리밍 실패 처리 테스트"""
+import datetime
+
+import utils.saju as saju
+from utils.records import PlanItem
+from utils.saju import PlanStreamParser, _parse_plan_text
+
+PLAN_TEXT = (
+    "CONCERN: 어떻게 커리어 방향을 찾을 수 있을까요?\n"
+    + "".join(f"Day {day}: 제목{day} - 설명{day}\n" for day in range(1, 8))
+    + "ADDITIONAL_EXPLANATION: 꾸준히 해보세요\n"
+)
+
+
+def _feed_in_chunks(text, size):
+    parser = PlanStreamParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    events.extend(parser.close())
+    return parser, events
+
+
+def test_stream_parser_emits_events_in_order_for_any_chunking():
+    for size in (1, 7, len(PLAN_TEXT)):
+        parser, events = _feed_in_chunks(PLAN_TEXT, size)
+        kinds = [kind for kind, _ in events]
+        assert kinds == ['concern'] + ['day'] * 7 + ['explanation']
+        assert events[0][1] == '어떻게 커리어 방향을 찾을 수 있을까요?'
+        assert events[3][1] == PlanItem('Day 3', '제목3', '설명3')
+        assert parser.additional_explanation == '꾸준히 해보세요'
+
+
+def test_stream_parser_emits_day_as_soon_as_line_completes():
+    parser = PlanStreamParser()
+    assert parser.feed("Day 1: 산책 - 30분") == []
+    assert parser.feed(" 걷기\nDay 2") == [('day', PlanItem('Day 1', '산책', '30분 걷기'))]
+
+
+def test_stream_parser_uses_next_line_as_description():
+    parser = PlanStreamParser()
+    events = parser.feed("Day 1: 일기 쓰기\n하루를 돌아봅니다\nDay 2: 독서\n")
+    events += parser.close()
+
+    assert events == [('day', PlanItem('Day 1', '일기 쓰기', '하루를 돌아봅니다')),
+                      ('day', PlanItem('Day 2', '독서', '2일차 활동을 진행하세요.'))]
+
+
+def test_stream_parser_ignores_days_after_seventh():
+    text = "".join(f"Day {day}: 제목{day} - 설명{day}\n" for day in range(1, 10))
+    parser, events = _feed_in_chunks(text, 5)
+
+    assert len(parser.plans) == 7
+    assert [item.day for _, item in events] == [f'Day {day}' for day in range(1, 8)]
+
+
+def test_parse_plan_text_matches_stream_parser():
+    plans, explanation = _parse_plan_text(PLAN_TEXT)
+    parser, _ = _feed_in_chunks(PLAN_TEXT, 11)
+
+    assert plans == parser.plans
+    assert explanation == parser.additional_explanation
+
+
+def test_parse_plan_text_without_days():
+    assert _parse_plan_text("죄송합니다. 계획을 만들 수 없습니다.") == ([], "")
+
+
+USER_INFO = {'name': '홍길동', 'birthdate': datetime.date(1990, 1, 1), 'birth_hour': '07-09시'}
+
+
+def _failing_stream(days_before_error):
+    def stream(task, prompt, cache_ttl=None):
+        for day in range(1, days_before_error + 1):
+            yield f"Day {day}: 제목{day} - 설명{day}\n"
+        raise RuntimeError("연결 끊김")
+    return stream
+
+
+def test_stream_weekly_plan_reports_error_after_partial_plan(monkeypatch):
+    monkeypatch.setattr(saju, 'find_reusable_plan', lambda user_info, concern: None)
+    monkeypatch.setattr(saju, 'stream_for_task', _failing_stream(2))
+
+    events = list(saju.stream_weekly_plan(USER_INFO, concern='고민'))
+
+    assert [kind for kind, _ in events] == ['concern', 'day', 'day', 'error']
+
+
+def test_stream_weekly_plan_falls_back_before_first_day(monkeypatch):
+    monkeypatch.setattr(saju, 'find_reusable_plan', lambda user_info, concern: None)
+    monkeypatch.setattr(saju, 'stream_for_task', _failing_stream(0))
+    monkeypatch.setattr(saju, 'generate_for_task', lambda task, prompt, cache_ttl=None: PLAN_TEXT)
+
+    events = list(saju.stream_weekly_plan(USER_INFO, concern='고민'))
+
+    assert [kind for kind, _ in events] == ['concern'] + ['day'] * 7 + ['explanation']
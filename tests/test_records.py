@@ -0,0 +1,94 @@
+"""utils.records.MessageStore 보관소 이동·복원·삭제 테스트"""
+import pytest
+
+from utils.records import ChatArchive, Message, MessageStore, set_chat_archive
+from utils.search_index import SearchIndex
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = ChatArchive(str(tmp_path / 'archive.db'))
+    set_chat_archive(archive)
+    yield archive
+    set_chat_archive(None)
+
+
+class _Journal:
+    def __init__(self):
+        self.events = []
+
+    def record(self, kind, **data):
+        self.events.append((kind, data))
+
+    def record_many(self, kind, items):
+        self.events.extend((kind, item) for item in items)
+
+
+def _conversation(count):
+    return [('user' if i % 2 == 0 else 'assistant', f"메시지 {i}") for i in range(count)]
+
+
+def test_old_messages_move_to_archive_and_read_back_in_order(archive):
+    store = MessageStore(live_limit=4)
+    for role, content in _conversation(11):
+        store.append(role, content)
+
+    assert len(store) <= 4 and store.archived_count > 0
+    assert store.total == 11
+    assert [m.content for m in store] == [f"메시지 {i}" for i in range(store.archived_count, 11)]
+    assert [(m.role, m.content) for m in store.all_messages()] == _conversation(11)
+    assert len(list(archive.load(store.id))) == store.archived_count
+
+
+def test_extend_archives_overflow_in_one_batch(archive):
+    store = MessageStore(live_limit=4)
+    assert store.extend(_conversation(10)) == 10
+
+    assert store.archived_count == 8 and len(store) == 2
+    assert [(m.role, m.content) for m in store.all_messages()] == _conversation(10)
+
+
+def test_exchanges_span_archived_messages(archive):
+    store = MessageStore(live_limit=2)
+    store.extend(_conversation(6))
+
+    assert list(store.exchanges()) == [("메시지 0", "메시지 1"), ("메시지 2", "메시지 3"), ("메시지 4", "메시지 5")]
+
+
+def test_discard_removes_only_this_store(archive):
+    store, other = MessageStore(live_limit=2), MessageStore(live_limit=2)
+    store.extend(_conversation(6))
+    other.extend(_conversation(4))
+
+    store.discard()
+    assert store.total == 0 and list(store.all_messages()) == []
+    assert list(archive.load(store.id)) == []
+    assert [(m.role, m.content) for m in other.all_messages()] == _conversation(4)
+
+    # 초기화한 뒤에도 다시 쓸 수 있음
+    store.append('user', '새 대화')
+    assert [m.content for m in store.all_messages()] == ['새 대화']
+
+
+def test_pop_updates_journal_and_search_index(archive):
+    store = MessageStore(live_limit=2)
+    store.journal = _Journal()
+    store.search_index = SearchIndex()
+    store.extend(_conversation(3))
+    store.append('user', '취소될 질문')
+
+    assert store.pop() == Message('user', '취소될 질문')
+    assert store.total == 3
+    assert store.search_index.search('취소') == []
+    assert [hit.ref for hit in store.search_index.search('메시지')] == [2, 1, 0]
+    assert [kind for kind, _ in store.journal.events] == ['message.append'] * 4 + ['message.pop']
+
+
+def test_archive_roundtrips_unicode_batches(tmp_path):
+    archive = ChatArchive(str(tmp_path / 'archive.db'))
+    archive.append('s', 1, [Message('assistant', '두 번째 묶음')])
+    archive.append('s', 0, [Message('user', '첫 묶음 😀\n줄바꿈')])
+
+    assert list(archive.load('s')) == [Message('user', '첫 묶음 😀\n줄바꿈'), Message('assistant', '두 번째 묶음')]
+    archive.delete('s')
+    assert list(archive.load('s')) == []
@@ -0,0 +1,153 @@
+"""utils.routing 등급 선택·대체·회복 테스트"""
+import asyncio
+
+import pytest
+
+import utils.routing as routing
+from utils.llm import CircuitOpenError, LLMUnavailable, RateLimitExceeded
+from utils.routing import ERROR_COOLDOWN_SECONDS, ERROR_THRESHOLD, MODEL_TIERS, ROUTES, TierHealth
+
+STANDARD, FAST = MODEL_TIERS['standard'], MODEL_TIERS['fast']
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def health(monkeypatch, clock):
+    health = TierHealth(clock)
+    monkeypatch.setattr(routing, '_health', health)
+    return health
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """모델별로 정한 결과(문자열 또는 예외)를 돌려주는 가짜 generate_text"""
+    outcomes, made = {}, []
+
+    def generate_text(prompt, model_name, cache_ttl=None, generation_config=None, cached_prefix=None):
+        made.append(model_name)
+        outcome = outcomes.get(model_name, f"ok:{model_name}")
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def generate_text_async(*args, **kwargs):
+        return generate_text(*args, **kwargs)
+
+    monkeypatch.setattr(routing, 'generate_text', generate_text)
+    monkeypatch.setattr(routing, 'generate_text_async', generate_text_async)
+    return outcomes, made
+
+
+def test_health_demotes_after_errors_and_recovers_after_cooldown(health, clock):
+    for _ in range(ERROR_THRESHOLD - 1):
+        health.record_error('standard')
+    assert health.is_usable('standard', 10.0)
+
+    health.record_error('standard')
+    assert not health.is_usable('standard', 10.0)
+    clock.now = ERROR_COOLDOWN_SECONDS
+    assert health.is_usable('standard', 10.0)
+
+    health.record_success('standard', 12.0)
+    assert health.snapshot()['standard']['consecutive_errors'] == 0
+    assert not health.is_usable('standard', 10.0)
+    assert health.is_usable('standard', 15.0)
+
+
+def test_uses_primary_tier_when_healthy(health, calls):
+    _, made = calls
+    assert routing.generate_for_task('chat_reply', '질문') == f"ok:{STANDARD}"
+    assert made == [STANDARD]
+    assert health.snapshot()['standard']['calls'] == 1
+
+
+def test_falls_back_and_demotes_failing_tier(health, calls, clock):
+    outcomes, made = calls
+    outcomes[STANDARD] = RuntimeError("모델 오류")
+
+    for _ in range(ERROR_THRESHOLD):
+        assert routing.generate_for_task('chat_reply', '질문') == f"ok:{FAST}"
+    assert made == [STANDARD, FAST] * ERROR_THRESHOLD
+    # 쉬는 동안에는 대체 등급을 먼저 시도
+    assert routing._candidate_tiers(ROUTES['chat_reply']) == ['fast', 'standard']
+
+    del outcomes[STANDARD]
+    clock.now = ERROR_COOLDOWN_SECONDS
+    made.clear()
+    assert routing.generate_for_task('chat_reply', '질문') == f"ok:{STANDARD}"
+    assert made == [STANDARD]
+
+
+@pytest.mark.parametrize('error', [CircuitOpenError("열림"), LLMUnavailable("방금 실패")])
+def test_rejections_before_call_are_not_tier_errors(health, calls, error):
+    outcomes, _ = calls
+    outcomes[STANDARD] = error
+
+    for _ in range(ERROR_THRESHOLD):
+        assert routing.generate_for_task('chat_reply', '질문') == f"ok:{FAST}"
+    assert 'standard' not in health.snapshot()
+    assert routing._candidate_tiers(ROUTES['chat_reply']) == ['standard', 'fast']
+
+
+def test_rate_limit_is_not_retried_on_other_tiers(health, calls):
+    outcomes, made = calls
+    outcomes[STANDARD] = RateLimitExceeded("제한")
+
+    with pytest.raises(RateLimitExceeded):
+        routing.generate_for_task('chat_reply', '질문')
+    assert made == [STANDARD]
+
+
+def test_all_tiers_failing_raises_last_error(health, calls):
+    outcomes, _ = calls
+    outcomes[STANDARD] = RuntimeError("표준 오류")
+    outcomes[FAST] = RuntimeError("빠른 모델 오류")
+
+    with pytest.raises(RuntimeError, match="빠른 모델 오류"):
+        routing.generate_for_task('chat_reply', '질문')
+
+
+def test_async_generation_falls_back(health, calls):
+    outcomes, made = calls
+    outcomes[STANDARD] = CircuitOpenError("열림")
+
+    assert asyncio.run(routing.generate_for_task_async('chat_reply', '질문')) == f"ok:{FAST}"
+    assert made == [STANDARD, FAST]
+
+
+def _stream_text(plan):
+    def stream_text(prompt, model_name, cache_ttl=None, generation_config=None):
+        for part in plan[model_name]:
+            if isinstance(part, Exception):
+                raise part
+            yield part
+    return stream_text
+
+
+def test_stream_falls_back_only_before_first_chunk(health, monkeypatch):
+    monkeypatch.setattr(routing, 'stream_text', _stream_text({
+        STANDARD: [RuntimeError("연결 실패")], FAST: ['가', '나'],
+    }))
+    assert list(routing.stream_for_task('chat_reply', '질문')) == ['가', '나']
+    assert health.snapshot()['standard']['errors'] == 1
+
+    monkeypatch.setattr(routing, 'stream_text', _stream_text({
+        STANDARD: ['가', RuntimeError("중간 끊김")], FAST: ['다른 답변'],
+    }))
+    received = []
+    with pytest.raises(RuntimeError, match="중간 끊김"):
+        for chunk in routing.stream_for_task('chat_reply', '질문'):
+            received.append(chunk)
+    assert received == ['가']
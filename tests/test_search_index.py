@@ -0,0 +1,55 @@
+"""utils.search_index 역색인 테스트"""
+from utils.search_index import SearchIndex, normalize_text, tokenize
+
+
+def test_tokenize_uses_character_bigrams():
+    assert tokenize('커리어가 고민') == ['커리', '리어', '어가', '고민']
+    assert tokenize('나 A, B') == ['나', 'a', 'b']
+    assert normalize_text('  Ｈello\n  세상 ') == 'hello 세상'
+
+
+def test_search_ranks_matches_and_filters_kinds():
+    index = SearchIndex()
+    index.add_many('message', [
+        (0, '요즘 커리어 방향이 고민이에요', 'user'),
+        (1, '오늘 날씨가 좋네요', 'user'),
+        (2, '커리어 전환을 준비해 보세요', 'assistant'),
+    ])
+    index.add('concern', '커리어 고민', '커리어 고민', '2024-03-01')
+
+    hits = index.search('커리어')
+    assert {(hit.kind, hit.ref) for hit in hits} == {('message', 0), ('message', 2), ('concern', '커리어 고민')}
+    assert hits[0].kind == 'concern'  # 가장 짧은 문서가 BM25에서 가장 높은 점수
+    assert [hit.ref for hit in index.search('커리어', kinds=['message'])] == [2, 0]
+    assert len(index.search('커리어', limit=1)) == 1
+    assert index.search('없는말') == [] and index.search('!!') == []
+
+
+def test_equal_scores_prefer_recent_documents():
+    index = SearchIndex()
+    index.add_many('message', [(i, '같은 문장', 'user') for i in range(3)])
+    assert [hit.ref for hit in index.search('문장')] == [2, 1, 0]
+
+
+def test_replace_and_remove_update_postings_and_digests():
+    index = SearchIndex()
+    index.add('message', 0, '첫 질문입니다', 'user')
+    assert index.contains('message', '  첫   질문입니다 ')
+    assert not index.contains('concern', '첫 질문입니다')
+
+    index.add('message', 0, '바뀐 질문', 'user')
+    assert len(index) == 1
+    assert not index.contains('message', '첫 질문입니다')
+    assert index.search('입니') == []
+
+    index.remove('message', 0, '바뀐 질문')
+    index.remove('message', 0)
+    assert len(index) == 0
+    assert index.search('질문') == []
+    assert not index.contains('message', '바뀐 질문')
+
+
+def test_snippet_is_truncated():
+    index = SearchIndex()
+    index.add('message', 0, '가' * 500)
+    assert len(index.search('가가')[0].snippet) == 120
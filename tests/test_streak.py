@@ -0,0 +1,47 @@
+"""utils.streak.StreakTracker 테스트"""
+import datetime
+
+from utils.streak import StreakTracker
+
+DAY = datetime.date(2024, 3, 10)
+
+
+def _days(offset):
+    return DAY + datetime.timedelta(days=offset)
+
+
+def test_current_streak_keeps_yesterday_until_today_is_done():
+    tracker = StreakTracker()
+    for offset, task_id in ((-2, 'a'), (-1, 'b')):
+        tracker.mark(task_id, True, _days(offset))
+
+    assert tracker.current_streak(DAY) == 2
+    tracker.mark('c', True, DAY)
+    assert tracker.current_streak(DAY) == 3
+    # 하루를 건너뛰면 끊김
+    assert tracker.current_streak(_days(2)) == 0
+
+
+def test_longest_streak_recomputed_after_gap():
+    tracker = StreakTracker()
+    for offset in range(4):
+        tracker.mark(f't{offset}', True, _days(offset))
+    tracker.mark('later', True, _days(10))
+    assert tracker.longest_streak() == 4
+
+    # 가운데 날의 완료를 취소하면 구간이 나뉨
+    tracker.mark('t1', False, DAY)
+    assert tracker.longest_streak() == 2
+    assert tracker.completed_on('t1') is None
+    assert tracker.completed_on('t2') == _days(2)
+
+
+def test_mark_is_idempotent_and_extends_backwards():
+    tracker = StreakTracker()
+    tracker.mark('a', True, DAY)
+    tracker.mark('a', True, _days(1))
+    tracker.mark('b', True, _days(-3))
+
+    assert tracker.history(_days(-3), _days(1)) == [1, 0, 0, 1, 0]
+    assert tracker.history(_days(1), DAY) == []
+    assert StreakTracker().history(DAY, _days(2)) == [0, 0, 0]
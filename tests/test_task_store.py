@@ -0,0 +1,101 @@
+"""utils.calendar.TaskStore 테스트"""
+from utils.calendar import TaskStore
+
+
+class _Journal:
+    """기록된 이벤트를 모아 두는 가짜 이벤트 로그"""
+
+    def __init__(self):
+        self.events = []
+
+    def record(self, kind, **data):
+        self.events.append((kind, data))
+
+    def record_many(self, kind, items):
+        self.events.extend((kind, item) for item in items)
+
+
+def _task(title, completed=False):
+    return {'title': title, 'description': '', 'completed': completed, 'created_at': ''}
+
+
+def test_add_indexes_by_date_and_counts():
+    store = TaskStore()
+    first = store.add('2024-03-02', _task('a'))
+    store.add('2024-03-01', _task('b', completed=True))
+    store.add('2024-03-02', _task('c'))
+
+    assert len(store) == 3 and store.total == 3 and store.completed == 1
+    assert [task.title for task in store.tasks_on('2024-03-02')] == ['a', 'c']
+    assert store.get(first).date == '2024-03-02'
+    assert store.dates_between('2024-03-01', '2024-03-31') == ['2024-03-01', '2024-03-02']
+    assert store.day_summaries('2024-03-01', '2024-03-02') == {'2024-03-01': (1, 1), '2024-03-02': (2, 0)}
+
+
+def test_explicit_id_collision_gets_new_id():
+    store = TaskStore()
+    store.add('2024-03-01', _task('a'), task_id='x')
+    second = store.add('2024-03-01', _task('b'), task_id='x')
+
+    assert second != 'x'
+    assert store.get('x').title == 'a'
+
+
+def test_toggle_updates_counters():
+    store = TaskStore()
+    task_id = store.add('2024-03-01', _task('a'))
+
+    assert store.toggle(task_id) is True
+    assert store.completed == 1
+    assert store.day_summaries('2024-03-01', '2024-03-01') == {'2024-03-01': (1, 1)}
+    assert store.set_completed(task_id, True) is False
+    assert store.toggle(task_id) is False
+    assert store.completed == 0
+    assert store.toggle('missing') is False
+
+
+def test_remove_many_updates_indexes_and_journal():
+    store = TaskStore()
+    keep = store.add('2024-03-01', _task('keep'))
+    done = store.add('2024-03-02', _task('done', completed=True))
+    other = store.add('2024-03-03', _task('other'))
+    store.journal = _Journal()
+
+    assert store.remove_many([done, other, 'missing']) == [done, other]
+    assert list(store) == [store.get(keep)]
+    assert store.completed == 0
+    assert store.dates_between('2024-01-01', '2024-12-31') == ['2024-03-01']
+    assert store.journal.events == [('task.remove', {'id': done}), ('task.remove', {'id': other})]
+
+    # 지운 날짜에 다시 추가해도 인덱스가 어긋나지 않음
+    store.add('2024-03-02', _task('again'))
+    assert store.dates_between('2024-01-01', '2024-12-31') == ['2024-03-01', '2024-03-02']
+
+
+def test_add_many_records_one_batch():
+    store = TaskStore()
+    store.journal = _Journal()
+
+    task_ids = store.add_many([('2024-03-01', _task('a'), None), ('2024-03-02', _task('b'), 'fixed')])
+
+    assert task_ids[1] == 'fixed'
+    assert [kind for kind, _ in store.journal.events] == ['task.add', 'task.add']
+    assert store.journal.events[1][1]['title'] == 'b'
+
+
+def test_ids_are_not_reused_after_event_log_replay(tmp_path):
+    from utils.event_log import EventJournal, EventLog
+
+    journal = EventJournal('user', EventLog(str(tmp_path / 'events.db')))
+    store = TaskStore()
+    store.journal = journal
+    removed = [store.add('2024-03-01', _task(f'removed{i}')) for i in range(3)]
+    kept = store.add('2024-03-01', _task('kept'))
+    store.remove_many(removed)
+
+    resumed = TaskStore()
+    resumed.add_many((task['date'], task, task_id) for task_id, task in journal.replay()['tasks'].items())
+    assert list(resumed) == [resumed.get(kept)]
+
+    new_ids = {resumed.add('2024-03-01', _task('new')) for _ in range(10)}
+    assert not new_ids & {kept, *removed}
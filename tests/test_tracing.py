@@ -0,0 +1,250 @@
+"""utils.tracing.traced 테스트 (함수·생성기·비동기 생성기·코루틴의 구간 중첩과 내보내기)"""
+import asyncio
+import json
+
+import pytest
+
+from utils import tracing
+from utils.tracing import current_span, span, traced
+
+
+class _Collector:
+    """끝난 구간을 모으는 내보내기 대역"""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span_):
+        self.spans.append(span_)
+
+    def flush(self):
+        pass
+
+    def named(self, name):
+        matches = [s for s in self.spans if s.name == name]
+        assert len(matches) == 1, f"{name}: {len(matches)}개"
+        return matches[0]
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    collector = _Collector()
+    monkeypatch.setattr(tracing, 'TRACING_ENABLED', True)
+    monkeypatch.setattr(tracing, '_exporter', collector)
+    return collector
+
+
+def _assert_child(child, parent):
+    assert child.trace_id == parent.trace_id
+    assert child.parent_id == parent.span_id
+
+
+def test_sync_functions_nest_and_record_errors(exported):
+    @traced('inner')
+    def inner(fail):
+        if fail:
+            raise ValueError('망가짐')
+        return 1
+
+    @traced('outer')
+    def outer():
+        with pytest.raises(ValueError):
+            inner(True)
+        return inner(False)
+
+    assert outer() == 1
+    assert current_span() is None
+
+    outer_span = exported.named('outer')
+    assert outer_span.parent_id is None and outer_span.error is None
+    failed, succeeded = [s for s in exported.spans if s.name == 'inner']
+    _assert_child(failed, outer_span)
+    _assert_child(succeeded, outer_span)
+    assert failed.error == 'ValueError: 망가짐' and succeeded.error is None
+    # 하위 구간이 먼저 끝나 먼저 내보내짐
+    assert exported.spans[-1] is outer_span
+
+
+def test_generator_span_covers_iteration_without_leaking(exported):
+    seen = []
+
+    @traced('child')
+    def child():
+        return current_span()
+
+    @traced('gen')
+    def gen():
+        for i in range(3):
+            seen.append(child())
+            yield i
+
+    with span('caller') as caller:
+        items = gen()
+        assert exported.spans == []  # 반복을 시작하기 전에는 구간이 끝나지 않음
+        for _ in items:
+            # 항목 사이에서는 호출자 구간이 현재 구간
+            assert current_span() is caller
+        gen_span = exported.named('gen')
+
+    _assert_child(gen_span, caller)
+    assert gen_span.end_ns is not None and gen_span.error is None
+    for child_span in seen:
+        _assert_child(child_span, gen_span)
+
+
+def test_partially_consumed_generator_ends_span_on_close(exported):
+    cleaned_up = []
+
+    @traced('gen')
+    def gen():
+        try:
+            yield 1
+            yield 2
+        finally:
+            cleaned_up.append(current_span())
+
+    items = gen()
+    assert next(items) == 1
+    items.close()
+
+    gen_span = exported.named('gen')
+    assert gen_span.end_ns is not None and gen_span.error is None
+    # 정리 코드도 생성기 구간 안에서 실행됨
+    assert cleaned_up == [gen_span]
+
+
+def test_generator_error_is_recorded(exported):
+    @traced('gen')
+    def gen():
+        yield 1
+        raise RuntimeError('중간 실패')
+
+    with pytest.raises(RuntimeError):
+        list(gen())
+    assert exported.named('gen').error == 'RuntimeError: 중간 실패'
+
+
+def test_async_generator_nests_and_ends_on_aclose(exported):
+    @traced('child')
+    async def child():
+        await asyncio.sleep(0)
+        return current_span()
+
+    @traced('agen')
+    async def agen():
+        try:
+            for i in range(3):
+                yield await child()
+        finally:
+            await asyncio.sleep(0)
+
+    async def main():
+        with span('caller') as caller:
+            full = [item async for item in agen()]
+            partial = agen()
+            first = await partial.__anext__()
+            assert current_span() is caller
+            await partial.aclose()
+        return caller, full, first
+
+    caller, full, first = asyncio.run(main())
+    full_span, partial_span = [s for s in exported.spans if s.name == 'agen']
+    for agen_span in (full_span, partial_span):
+        _assert_child(agen_span, caller)
+        assert agen_span.end_ns is not None and agen_span.error is None
+    for child_span in full:
+        _assert_child(child_span, full_span)
+    _assert_child(first, partial_span)
+
+
+def test_coroutines_nest_across_awaits_and_tasks(exported):
+    @traced('leaf')
+    async def leaf():
+        await asyncio.sleep(0)
+        return current_span()
+
+    @traced('root')
+    async def root():
+        # gather가 만드는 작업도 시작 시점의 컨텍스트를 이어받음
+        return await asyncio.gather(leaf(), leaf())
+
+    leaves = asyncio.run(root())
+    root_span = exported.named('root')
+    assert root_span.parent_id is None
+    for leaf_span in leaves:
+        _assert_child(leaf_span, root_span)
+    assert root_span.end_ns >= max(leaf_span.end_ns for leaf_span in leaves)
+
+
+def test_cancelled_coroutine_ends_span(exported):
+    @traced('slow')
+    async def slow(ready):
+        ready.set()
+        await asyncio.sleep(10)
+
+    async def main():
+        ready = asyncio.Event()
+        with span('caller') as caller:
+            task = asyncio.create_task(slow(ready))
+            await ready.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert current_span() is caller
+        return caller
+
+    caller = asyncio.run(main())
+    slow_span = exported.named('slow')
+    _assert_child(slow_span, caller)
+    assert slow_span.end_ns is not None
+    assert slow_span.error.startswith('CancelledError')
+
+
+def test_disabled_tracing_records_nothing(monkeypatch):
+    collector = _Collector()
+    monkeypatch.setattr(tracing, 'TRACING_ENABLED', False)
+    monkeypatch.setattr(tracing, '_exporter', collector)
+
+    @traced('gen')
+    def gen():
+        yield current_span()
+
+    @traced('coro')
+    async def coro():
+        return current_span()
+
+    assert list(gen()) == [None]
+    assert asyncio.run(coro()) is None
+    assert collector.spans == []
+
+
+def test_exported_file_is_otlp_json(exported, tmp_path):
+    @traced('child', kind=tracing.SPAN_KIND_CLIENT)
+    def child():
+        tracing.set_attributes(model='gemini', skipped=None)
+        tracing.add_event('retry', attempt=2)
+
+    @traced('parent')
+    def parent():
+        child()
+
+    parent()
+    exporter = tracing._SpanExporter('', str(tmp_path / 'traces.jsonl'))
+    for span_ in exported.spans:
+        exporter.export(span_)
+    exporter.flush()
+
+    lines = (tmp_path / 'traces.jsonl').read_text(encoding='utf-8').splitlines()
+    encoded = [s for line in lines
+               for resource in json.loads(line)['resourceSpans']
+               for scope in resource['scopeSpans']
+               for s in scope['spans']]
+    by_name = {s['name']: s for s in encoded}
+    assert set(by_name) == {'child', 'parent'}
+    assert by_name['child']['parentSpanId'] == by_name['parent']['spanId']
+    assert 'parentSpanId' not in by_name['parent']
+    assert by_name['child']['kind'] == tracing.SPAN_KIND_CLIENT
+    assert by_name['child']['attributes'] == [{'key': 'model', 'value': {'stringValue': 'gemini'}}]
+    assert by_name['child']['events'][0]['name'] == 'retry'
+    assert by_name['child']['events'][0]['attributes'] == [{'key': 'attempt', 'value': {'intValue': '2'}}]
+    assert by_name['parent']['status'] == {'code': 0}
@@ -0,0 +1,389 @@
+"""
+캐시/공유 상태 백엔드 유틸리티 모듈
+
+LLM 응답 캐시와 호출 횟수 제한 카운터가 사용할 키-값 저장소 인터페이스와
+세 가지 구현을 제공합니다. 여러 워커 프로세스로 확장할 때는 SQLite 파일이나
+Redis를 지정하여 워커 간에 캐시와 카운터를 공유합니다.
+
+- MemoryLRUBackend: 프로세스 내 LRU (기본값)
+- SQLiteBackend: 같은 호스트의 워커들이 공유하는 SQLite 파일
+- RedisBackend: Redis 프로토콜(RESP) 서버 (redis 패키지 없이 직접 통신)
+
+백엔드는 CACHE_BACKEND_URL 환경 변수로 선택합니다.
+- memory://  |  memory://?max_entries=2048
+- sqlite:///.cache/cache.db (저장소 루트 기준 상대 경로)  |  sqlite:////절대/경로/cache.db
+- redis://호스트:포트/DB번호
+
+Export 형태:
+- from utils.cache_backend import CacheBackend, MemoryLRUBackend, SQLiteBackend, RedisBackend
+- from utils.cache_backend import create_cache_backend, get_cache_backend
+- from utils.cache_backend import RateLimiter
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# sqlite:/// 뒤의 상대 경로를 해석하는 기준 (저장소 루트)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# SQLite 백엔드가 쓰기 중에 만료 항목을 정리하는 최소 간격 (초)
+SQLITE_PURGE_INTERVAL = float(os.environ.get('CACHE_SQLITE_PURGE_INTERVAL', '60'))
+
+class CacheBackend(ABC):
+    """
+    키-값 캐시 백엔드 인터페이스
+
+    값은 bytes로 저장하며, ttl(초)을 지정하면 그 이후에는 조회되지 않습니다.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """키의 값을 반환합니다. (없거나 만료되었으면 None)"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """키에 값을 저장합니다. ttl이 없으면 만료되지 않습니다."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """키를 삭제합니다. (없으면 무시)"""
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """
+        정수 카운터를 증가시키고 증가 후 값을 반환합니다.
+        ttl은 카운터가 새로 만들어질 때만 적용됩니다.
+        """
+
+
+class MemoryLRUBackend(CacheBackend):
+    """프로세스 내 LRU 캐시 백엔드"""
+
+    def __init__(self, max_entries: int = 1024, clock=time.monotonic) -> None:
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+
+    def _get_live(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """만료되지 않은 항목을 반환하고 최근 사용으로 표시합니다. (lock 보유 상태에서 호출)"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= self._clock():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def _put(self, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._get_live(key)
+            return item[0] if item else None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._put(key, value, self._clock() + ttl if ttl else None)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        with self._lock:
+            item = self._get_live(key)
+            if item is None:
+                value = amount
+                expires_at = self._clock() + ttl if ttl else None
+            else:
+                value = int(item[0]) + amount
+                expires_at = item[1]
+            self._put(key, str(value).encode(), expires_at)
+            return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    SQLite 파일 기반 공유 캐시 백엔드
+
+    같은 호스트의 여러 워커 프로세스가 하나의 파일을 공유합니다.
+    WAL 모드를 사용하며, 스레드별로 연결을 따로 엽니다.
+    만료된 항목(호출 횟수 윈도우, 부정 캐시 등)은 purge_interval 초마다 쓰기 중에 정리합니다.
+    """
+
+    def __init__(self, path: str, purge_interval: float = SQLITE_PURGE_INTERVAL) -> None:
+        self._path = path
+        self._local = threading.local()
+        self._purge_interval = purge_interval
+        self._next_purge = time.time() + purge_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def _maybe_purge(self, now: float) -> None:
+        """마지막 정리 후 purge_interval이 지났으면 만료 항목을 정리합니다. (쓰기 후 호출)"""
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self._purge_interval
+        try:
+            self.purge_expired()
+        except sqlite3.Error:
+            # 다른 워커가 쓰기 잠금을 잡고 있으면 다음 기회에 정리
+            pass
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + ttl if ttl else None)
+        )
+        self._maybe_purge(now)
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                value = amount
+                conn.execute(
+                    "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, str(value).encode(), now + ttl if ttl else None)
+                )
+            else:
+                value = int(bytes(row[0])) + amount
+                conn.execute("UPDATE kv SET value = ? WHERE key = ?", (str(value).encode(), key))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_purge(now)
+        return value
+
+    def purge_expired(self) -> int:
+        """만료된 항목을 삭제하고 삭제된 개수를 반환합니다."""
+        cursor = self._conn().execute(
+            "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis 프로토콜(RESP2) 백엔드
+
+    redis 패키지 의존성 없이 소켓으로 GET/SET/DEL/INCRBY/PEXPIRE 명령만 사용하므로
+    Redis 호환 서버나 로컬 대체 서버로도 테스트할 수 있습니다.
+    연결 오류가 나면 멱등 명령만 한 번 다시 보냅니다. INCRBY는 서버에서 이미 실행되었을 수 있으므로
+    다시 보내지 않고 오류를 그대로 올립니다. (중복 집계 방지)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 timeout: float = 2.0) -> None:
+        self._address = (host, port)
+        self._db = db
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection(self._address, timeout=self._timeout)
+        self._reader = self._sock.makefile("rb")
+        if self._db:
+            self._send("SELECT", str(self._db))
+            self._read_reply()
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def _send(self, *args) -> None:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._sock.sendall(b"".join(parts))
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis 연결이 끊어졌습니다")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RuntimeError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(payload)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"알 수 없는 RESP 응답: {line!r}")
+
+    def _command(self, *args, idempotent: bool = True):
+        """
+        명령을 보내고 응답을 반환합니다.
+
+        연결이 끊어진 경우 재연결하며, 멱등 명령이면 한 번 다시 보냅니다.
+        멱등이 아닌 명령은 오류를 그대로 올리고 다음 명령 때 재연결합니다.
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._send(*args)
+                    return self._read_reply()
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt or not idempotent:
+                        raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl:
+            self._command("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self._command("SET", key, value)
+
+    def delete(self, key: str) -> None:
+        self._command("DEL", key)
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        value = self._command("INCRBY", key, amount, idempotent=False)
+        if ttl and value == amount:
+            # 새로 만들어진 카운터에만 만료 시간 설정
+            self._command("PEXPIRE", key, int(ttl * 1000))
+        return value
+
+
+def create_cache_backend(url: str) -> CacheBackend:
+    """
+    URL로부터 캐시 백엔드를 생성합니다.
+
+    sqlite:/// 뒤의 경로는 저장소 루트 기준 상대 경로이며, 절대 경로는 sqlite:////절대/경로 처럼 슬래시를 하나 더 씁니다.
+
+    Args:
+        url: memory://, sqlite:///경로, redis://호스트:포트/DB 형식의 URL
+
+    Returns:
+        CacheBackend: 생성된 백엔드
+
+    Raises:
+        ValueError: 지원하지 않는 URL 스킴
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        options = parse_qs(parsed.query)
+        return MemoryLRUBackend(max_entries=int(options.get("max_entries", ["1024"])[0]))
+    if parsed.scheme == "sqlite":
+        # urlparse는 sqlite:///a.db 의 경로를 '/a.db'로 돌려주므로 앞의 슬래시 하나를 구분자로 보고 제거
+        path = parsed.path[1:] if parsed.path.startswith("/") else parsed.path
+        return SQLiteBackend(os.path.join(REPO_ROOT, path or "cache.db"))
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisBackend(parsed.hostname or "127.0.0.1", parsed.port or 6379, db)
+    raise ValueError(f"지원하지 않는 캐시 백엔드입니다: {url}")
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+def get_cache_backend() -> CacheBackend:
+    """
+    CACHE_BACKEND_URL 환경 변수에 따라 프로세스 전역 캐시 백엔드를 반환합니다.
+
+    Returns:
+        CacheBackend: 전역 캐시 백엔드 (기본값: 프로세스 내 LRU)
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_cache_backend(os.environ.get("CACHE_BACKEND_URL", "memory://"))
+    return _backend
+
+
+class RateLimiter:
+    """
+    고정 윈도우 호출 횟수 제한기
+
+    카운터를 캐시 백엔드에 두므로, 공유 백엔드를 사용하면 모든 워커에 대해 합산된 제한이 적용됩니다.
+    """
+
+    def __init__(self, backend: CacheBackend, limit: int, window_seconds: float = 60.0,
+                 prefix: str = "ratelimit") -> None:
+        self._backend = backend
+        self._limit = limit
+        self._window = window_seconds
+        self._prefix = prefix
+
+    def allow(self, key: str) -> bool:
+        """
+        이번 호출을 허용할지 반환합니다. 허용 여부와 관계없이 호출 횟수는 증가합니다.
+
+        Args:
+            key: 제한 단위 키 (예: 'global', 사용자 키)
+
+        Returns:
+            bool: 현재 윈도우의 호출 횟수가 제한 이하이면 True
+        """
+        if self._limit <= 0:
+            return True
+        window = int(time.time() // self._window)
+        count = self._backend.incr(f"{self._prefix}:{key}:{window}", 1, ttl=self._window * 2)
+        return count <= self._limit
@@ -3,14 +3,22 @@
 
 Export 형태:
 - from utils.calendar import get_month_calendar, get_prev_month, get_next_month
-- from utils.calendar import get_date_tasks, add_task_to_date, toggle_task_completion
-- from utils.calendar import get_tasks_stats, format_date, parse_date
+- from utils.calendar import TaskStore
+- from utils.calendar import get_date_tasks, get_task, add_task_to_date, remove_tasks, toggle_task_completion
+- from utils.calendar import get_tasks_stats, get_month_task_summary, format_date, parse_date
 - 또는 import utils.calendar as calendar_utils 후 calendar_utils.format_date() 형태로 사용
 """
+import bisect
 import datetime
 import calendar as py_calendar
+import functools
+import uuid
 import streamlit as st
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from utils.records import Task
+from utils.streak import StreakTracker
+from utils.tracing import traced
 
 def get_month_calendar(year: int, month: int) -> List[List[int]]:
     """ 
@@ -23,13 +31,21 @@ def get_month_calendar(year: int, month: int) -> List[List[int]]:
     Returns:
         List[List[int]]: 달력 그리드 (6주 x 7일)
     """
+    return [list(week) for week in _month_grid(year, month)]
+
+@functools.lru_cache(maxsize=64)
+def _month_grid(year: int, month: int) -> tuple:
+    """ 
+    (연도, 월)별 6주 x 7일 달력 그리드를 메모이제이션합니다.
+    캐시를 공유하므로 호출자가 수정할 수 없도록 튜플로 반환합니다.
+    """
     cal = py_calendar.monthcalendar(year, month)
     
     # 캘린더가 6주가 되도록 행 추가
     while len(cal) < 6:
         cal.append([0] * 7)
     
-    return cal
+    return tuple(tuple(week) for week in cal)
 
 def get_prev_month(date: datetime.datetime) -> datetime.datetime:
     """ 
@@ -60,7 +76,267 @@ def get_next_month(date: datetime.datetime) -> datetime.datetime:
     else:
         return datetime.datetime(date.year, date.month + 1, 1)
 
-def get_date_tasks(date_str: str) -> List[Dict[str, Any]]:
+class TaskStore:
+    """
+    태스크 저장소
+    
+    태스크 ID → 태스크(Task 레코드), 날짜 → 태스크 ID 목록의 두 인덱스를 함께 유지하고,
+    전체/완료 태스크 수는 추가·토글 시점에 증분으로 갱신합니다.
+    따라서 조회와 통계 계산 비용이 누적된 태스크 수와 무관합니다.
+    사용자 이벤트 로그(utils.event_log)가 연결되어 있으면 추가·삭제·완료 상태 변경을 이벤트로 기록합니다.
+    """
+    
+    def __init__(self) -> None:
+        self._tasks: Dict[str, Task] = {}
+        self._date_index: Dict[str, List[str]] = {}
+        self._sorted_dates: List[str] = []
+        self._completed_by_date: Dict[str, int] = {}
+        self._completed_count = 0
+        # 사용자 이벤트 로그 (utils.event_log.EventJournal, 연결되지 않았으면 None)
+        self.journal = None
+    
+    def __len__(self) -> int:
+        return len(self._tasks)
+    
+    def __iter__(self) -> Iterator[Task]:
+        """태스크를 추가된 순서대로 반환합니다."""
+        return iter(list(self._tasks.values()))
+    
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+    
+    @property
+    def total(self) -> int:
+        """전체 태스크 수"""
+        return len(self._tasks)
+    
+    @property
+    def completed(self) -> int:
+        """완료된 태스크 수"""
+        return self._completed_count
+    
+    def _new_id(self, date_str: str) -> str:
+        """
+        저장소 내에서 재사용되지 않는 태스크 ID를 생성합니다.
+        무작위 접미사를 사용하므로 이벤트 로그를 재생해 다시 만든 저장소에서도
+        이미 삭제된 태스크의 ID를 다시 쓰지 않아, 삭제나 가져오기 이후에도 충돌하지 않습니다.
+        """
+        while True:
+            task_id = f"{date_str}_{uuid.uuid4().hex[:12]}"
+            if task_id not in self._tasks:
+                return task_id
+    
+    def add(self, date_str: str, task: Dict[str, Any], task_id: Optional[str] = None) -> str:
+        """
+        태스크를 추가하고 인덱스와 카운터를 갱신합니다.
+        
+        Args:
+            date_str: YYYY-MM-DD 형식의 날짜 문자열
+            task: 추가할 태스크 정보 (title, description, completed, created_at)
+            task_id: 지정하면 이 ID로 추가 (이벤트 로그에서 복원할 때 사용, 없으면 새로 생성)
+            
+        Returns:
+            str: 생성된 태스크 ID
+        """
+        if task_id is None or task_id in self._tasks:
+            task_id = self._new_id(date_str)
+        completed = bool(task.get('completed', False))
+        record = Task(task_id, date_str, task.get('title', ''), task.get('description', ''),
+                      completed, task.get('created_at', ''))
+        
+        if date_str not in self._date_index:
+            self._date_index[date_str] = []
+            self._completed_by_date[date_str] = 0
+            # YYYY-MM-DD 문자열은 사전순이 곧 날짜순
+            bisect.insort(self._sorted_dates, date_str)
+        
+        self._tasks[task_id] = record
+        self._date_index[date_str].append(task_id)
+        if completed:
+            self._completed_count += 1
+            self._completed_by_date[date_str] += 1
+        
+        if self.journal is not None:
+            self.journal.record('task.add', id=task_id, date=date_str, title=record.title,
+                                description=record.description, completed=completed, created_at=record.created_at)
+        return task_id
+    
+    def add_many(self, tasks: Iterable[Tuple[str, Dict[str, Any], Optional[str]]]) -> List[str]:
+        """
+        태스크 여러 개를 한꺼번에 추가합니다. (기록 가져오기에서 사용)
+        이벤트 로그에는 한 번의 트랜잭션으로 기록합니다.
+        
+        Args:
+            tasks: (날짜 문자열, 태스크 정보, 지정할 태스크 ID 또는 None) 목록
+            
+        Returns:
+            List[str]: 추가된 태스크 ID 목록 (ID가 이미 있으면 새로 생성된 ID)
+        """
+        journal, self.journal = self.journal, None
+        try:
+            task_ids = [self.add(date_str, task, task_id=task_id) for date_str, task, task_id in tasks]
+        finally:
+            self.journal = journal
+        if journal is not None:
+            journal.record_many('task.add', [
+                {'id': task.id, 'date': task.date, 'title': task.title, 'description': task.description,
+                 'completed': task.completed, 'created_at': task.created_at}
+                for task in map(self._tasks.__getitem__, task_ids)
+            ])
+        return task_ids
+    
+    def remove_many(self, task_ids: Iterable[str]) -> List[str]:
+        """
+        태스크 여러 개를 지우고 인덱스와 카운터를 갱신합니다. (생성이 실패한 7일 계획의 태스크 정리 등)
+        이벤트 로그에는 한 번의 트랜잭션으로 기록합니다.
+        
+        Args:
+            task_ids: 지울 태스크 ID 목록
+            
+        Returns:
+            List[str]: 실제로 지워진 태스크 ID 목록
+        """
+        removed = []
+        for task_id in task_ids:
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                continue
+            self._date_index[task.date].remove(task_id)
+            if task.completed:
+                self._completed_count -= 1
+                self._completed_by_date[task.date] -= 1
+            if not self._date_index[task.date]:
+                del self._date_index[task.date]
+                del self._completed_by_date[task.date]
+                self._sorted_dates.pop(bisect.bisect_left(self._sorted_dates, task.date))
+            removed.append(task_id)
+        if self.journal is not None and removed:
+            self.journal.record_many('task.remove', [{'id': task_id} for task_id in removed])
+        return removed
+    
+    def get(self, task_id: str) -> Optional[Task]:
+        """ID로 태스크를 조회합니다. 없으면 None을 반환합니다."""
+        return self._tasks.get(task_id)
+    
+    def tasks_on(self, date_str: str) -> List[Task]:
+        """해당 날짜의 태스크 목록을 추가된 순서대로 반환합니다."""
+        return [self._tasks[task_id] for task_id in self._date_index.get(date_str, [])]
+    
+    def count_on(self, date_str: str) -> int:
+        """해당 날짜의 태스크 수를 반환합니다."""
+        return len(self._date_index.get(date_str, []))
+    
+    def dates_between(self, start: str, end: str) -> List[str]:
+        """ 
+        태스크가 있는 날짜 중 [start, end] 구간에 속하는 날짜를 정렬된 순서로 반환합니다.
+        정렬된 날짜 인덱스를 이분 탐색하므로 비용은 구간 내 날짜 수에 비례합니다.
+        
+        Args:
+            start: 시작 날짜 (YYYY-MM-DD, 포함)
+            end: 종료 날짜 (YYYY-MM-DD, 포함)
+            
+        Returns:
+            List[str]: 구간 내 날짜 목록
+        """
+        lo = bisect.bisect_left(self._sorted_dates, start)
+        hi = bisect.bisect_right(self._sorted_dates, end)
+        return self._sorted_dates[lo:hi]
+    
+    def day_summaries(self, start: str, end: str) -> Dict[str, Tuple[int, int]]:
+        """ 
+        구간 내 날짜별 (태스크 수, 완료 수)를 반환합니다.
+        
+        Args:
+            start: 시작 날짜 (YYYY-MM-DD, 포함)
+            end: 종료 날짜 (YYYY-MM-DD, 포함)
+            
+        Returns:
+            Dict[str, Tuple[int, int]]: 날짜 → (태스크 수, 완료 수)
+        """
+        return {
+            date_str: (len(self._date_index[date_str]), self._completed_by_date[date_str])
+            for date_str in self.dates_between(start, end)
+        }
+    
+    def is_completed(self, task_id: str) -> bool:
+        """태스크 완료 여부를 반환합니다."""
+        task = self._tasks.get(task_id)
+        return task is not None and task.completed
+    
+    def set_completed(self, task_id: str, completed: bool) -> bool:
+        """
+        태스크 완료 상태를 지정하고 완료 카운터를 갱신합니다.
+        
+        Args:
+            task_id: 태스크 ID
+            completed: 지정할 완료 상태
+            
+        Returns:
+            bool: 상태가 실제로 바뀌었는지 여부
+        """
+        if task_id not in self._tasks:
+            return False
+        
+        task = self._tasks[task_id]
+        if task.completed == completed:
+            return False
+        
+        delta = 1 if completed else -1
+        task.completed = completed
+        self._completed_count += delta
+        self._completed_by_date[task.date] += delta
+        if self.journal is not None:
+            self.journal.record('task.completed', id=task_id, completed=completed)
+        return True
+    
+    def complete_many(self, completions: Iterable[Tuple[str, datetime.date]]) -> List[str]:
+        """
+        태스크 여러 개를 완료 처리합니다. (기록 가져오기에서 사용)
+        이벤트 로그에는 원래 완료일과 함께 한 번의 트랜잭션으로 기록합니다.
+        
+        Args:
+            completions: (태스크 ID, 완료 처리한 날짜) 목록
+            
+        Returns:
+            List[str]: 실제로 완료 상태가 바뀐 태스크 ID 목록
+        """
+        journal, self.journal = self.journal, None
+        try:
+            changed = [(task_id, day) for task_id, day in completions if self.set_completed(task_id, True)]
+        finally:
+            self.journal = journal
+        if journal is not None:
+            journal.record_many('task.completed', [
+                {'id': task_id, 'completed': True, 'on': day.isoformat()} for task_id, day in changed
+            ])
+        return [task_id for task_id, _ in changed]
+    
+    def toggle(self, task_id: str) -> bool:
+        """
+        태스크 완료 상태를 토글합니다.
+        
+        Returns:
+            bool: 토글 후 상태 (존재하지 않는 태스크는 False)
+        """
+        if task_id not in self._tasks:
+            return False
+        status = not self._tasks[task_id].completed
+        self.set_completed(task_id, status)
+        return status
+
+def _get_task_store() -> TaskStore:
+    """세션에 저장된 태스크 저장소를 반환합니다. 없으면 새로 만듭니다."""
+    if 'task_store' not in st.session_state:
+        st.session_state['task_store'] = TaskStore()
+    return st.session_state['task_store']
+
+def _get_streak_tracker() -> StreakTracker:
+    """세션에 저장된 스트릭 계산기를 반환합니다. 없으면 새로 만듭니다."""
+    if 'streak_tracker' not in st.session_state:
+        st.session_state['streak_tracker'] = StreakTracker()
+    return st.session_state['streak_tracker']
+
+def get_date_tasks(date_str: str) -> List[Task]:
     """ 
     해당 날짜의 태스크 가져오기
     
@@ -68,12 +344,23 @@ def get_date_tasks(date_str: str) -> List[Dict[str, Any]]:
         date_str: YYYY-MM-DD 형식의 날짜 문자열
         
     Returns:
-        List[Dict[str, Any]]: 해당 날짜의 태스크 목록
+        List[Task]: 해당 날짜의 태스크 목록
     """
-    if date_str in st.session_state['tasks']:
-        return st.session_state['tasks'][date_str]
-    return []
+    return _get_task_store().tasks_on(date_str)
 
+def get_task(task_id: str) -> Optional[Task]:
+    """ 
+    태스크 ID로 태스크 가져오기
+    
+    Args:
+        task_id: 태스크 ID
+        
+    Returns:
+        Optional[Task]: 태스크 (없으면 None)
+    """
+    return _get_task_store().get(task_id)
+
+@traced('state.add_task')
 def add_task_to_date(date_str: str, task: Dict[str, Any]) -> str:
     """ 
     해당 날짜에 태스크 추가하기
@@ -85,18 +372,22 @@ def add_task_to_date(date_str: str, task: Dict[str, Any]) -> str:
     Returns:
         str: 생성된 태스크 ID
     """
-    if date_str not in st.session_state['tasks']:
-        st.session_state['tasks'][date_str] = []
-    
-    # 태스크 ID 부여
-    task_id = f"{date_str}_{len(st.session_state['tasks'][date_str])}"
-    task['id'] = task_id
-    
-    st.session_state['tasks'][date_str].append(task)
-    st.session_state['task_completion'][task_id] = False
+    return _get_task_store().add(date_str, task)
+
+@traced('state.remove_tasks')
+def remove_tasks(task_ids: Iterable[str]) -> List[str]:
+    """ 
+    태스크 여러 개 지우기
     
-    return task_id
+    Args:
+        task_ids: 지울 태스크 ID 목록
+        
+    Returns:
+        List[str]: 실제로 지워진 태스크 ID 목록
+    """
+    return _get_task_store().remove_many(task_ids)
 
+@traced('state.toggle_task')
 def toggle_task_completion(task_id: str) -> bool:
     """ 
     태스크 완료 상태 토글
@@ -107,14 +398,16 @@ def toggle_task_completion(task_id: str) -> bool:
     Returns:
         bool: 토글 후 상태 (True: 완료, False: 미완료)
     """
-    current_status = st.session_state['task_completion'].get(task_id, False)
-    st.session_state['task_completion'][task_id] = not current_status
+    store = _get_task_store()
+    if task_id not in store:
+        return False
     
-    # 연속 실천일수 계산
-    if not current_status:  # 완료로 변경되었을 때
-        st.session_state['streak_days'] += 1
+    completed = store.toggle(task_id)
     
-    return not current_status
+    # 연속 실천일수 기록 (완료 취소 시에도 해당 날짜 카운트를 되돌림)
+    _get_streak_tracker().mark(task_id, completed, datetime.date.today())
+    
+    return completed
 
 def get_tasks_stats() -> Dict[str, int]:
     """ 
@@ -123,18 +416,33 @@ def get_tasks_stats() -> Dict[str, int]:
     Returns:
         Dict[str, int]: 태스크 통계 정보
     """
-    total_tasks = sum(len(tasks) for tasks in st.session_state['tasks'].values())
-    completed_tasks = sum(1 for status in st.session_state['task_completion'].values() if status)
-    ongoing_roadmaps = len(st.session_state['roadmap_items'])
-    streak_days = st.session_state['streak_days']
+    store = _get_task_store()
+    tracker = _get_streak_tracker()
     
     return {
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'ongoing_roadmaps': ongoing_roadmaps,
-        'streak_days': streak_days
+        'total_tasks': store.total,
+        'completed_tasks': store.completed,
+        'ongoing_roadmaps': len(st.session_state['roadmap_items']),
+        'streak_days': tracker.current_streak(datetime.date.today()),
+        'longest_streak': tracker.longest_streak()
     }
 
+def get_month_task_summary(year: int, month: int) -> Dict[str, Tuple[int, int]]:
+    """ 
+    해당 월의 날짜별 태스크 밀도 가져오기
+    
+    Args:
+        year: 연도
+        month: 월
+        
+    Returns:
+        Dict[str, Tuple[int, int]]: 날짜 → (태스크 수, 완료 수), 태스크가 있는 날짜만 포함
+    """
+    last_day = py_calendar.monthrange(year, month)[1]
+    start = f"{year:04d}-{month:02d}-01"
+    end = f"{year:04d}-{month:02d}-{last_day:02d}"
+    return _get_task_store().day_summaries(start, end)
+
 def format_date(date: datetime.datetime) -> str:
     """ 
     날짜를 YYYY-MM-DD 형식의 문자열로 변환
@@ -0,0 +1,113 @@
+"""
+회로 차단기(circuit breaker) 유틸리티 모듈
+
+외부 호출이 연달아 실패하면 회로를 열어(open) 일정 시간 동안 호출을 즉시 거절하고,
+시간이 지나면 시험 호출만 허용(half-open)하여 성공하면 다시 닫습니다(closed).
+장애 중에 모든 세션이 같은 속도로 재시도하며 지연과 호출 한도를 소모하는 것을 막습니다.
+
+Export 형태:
+- from utils.circuit_breaker import CircuitBreaker
+"""
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from utils import metrics
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 회로 차단기
+
+    - closed: 모든 호출 허용. 연속 실패가 failure_threshold에 이르면 open
+    - open: 모든 호출 거절. recovery_timeout이 지나면 half-open
+    - half-open: 시험 호출을 half_open_max_calls개까지만 허용. 성공하면 closed, 실패하면 다시 open
+
+    allow()로 허용받은 호출은 record_success(), record_failure(), release() 중 하나로 반드시 끝내야 합니다.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, clock: Callable[[], float] = time.monotonic) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self) -> None:
+        """열린 뒤 회복 대기 시간이 지났으면 half-open으로 바꿉니다. (lock 보유 상태에서 호출)"""
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self._recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+
+    def allow(self) -> bool:
+        """
+        지금 호출해도 되는지 반환합니다. half-open 상태에서 허용되면 시험 호출로 집계됩니다.
+
+        Returns:
+            bool: 호출 허용 여부
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes < self._half_open_max_calls:
+                self._probes += 1
+                return True
+        metrics.increment(f"circuit.{self.name}.rejected")
+        return False
+
+    def record_success(self) -> None:
+        """호출 성공을 기록합니다."""
+        with self._lock:
+            if self._state != self.CLOSED:
+                metrics.increment(f"circuit.{self.name}.closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        """호출 실패를 기록합니다."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+                if self._state != self.OPEN:
+                    metrics.increment(f"circuit.{self.name}.opened")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probes = 0
+
+    def release(self) -> None:
+        """
+        결과 없이 끝난 호출(취소, 소비 중단)을 기록합니다. half-open 시험 호출이었으면 그 자리를 돌려주어
+        다음 호출이 시험 호출이 될 수 있게 합니다.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        현재 상태를 반환합니다.
+
+        Returns:
+            Dict[str, Any]: state, failures, opened_at
+        """
+        with self._lock:
+            self._refresh()
+            return {'state': self._state, 'failures': self._failures, 'opened_at': self._opened_at}
@@ -0,0 +1,153 @@
+"""
+사주 서명별 생성 콘텐츠 저장소 모듈
+
+이름이 들어가지 않은 사주 분석·인사이트·핵심 특성 템플릿을 사주 서명(천간·지지·월지·일간·시지)별로
+SQLite 파일에 영구 보관합니다. 같은 서명의 사용자는 LLM 호출 없이 저장된 템플릿에
+이름만 넣어 받습니다. (utils.saju 참고)
+
+서명별 요청 횟수도 함께 기록하여, 사전 생성 작업(scripts/warm_content_store.py)이
+자주 요청되는 서명부터 채울 수 있도록 합니다.
+
+Export 형태:
+- from utils.content_store import ContentStore, get_content_store, set_content_store
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+DEFAULT_CONTENT_STORE_PATH = os.path.join(".cache", "content.db")
+
+
+class ContentStore:
+    """
+    (종류, 사주 서명) → 템플릿 텍스트 영구 저장소
+
+    여러 워커 프로세스가 같은 파일을 공유할 수 있도록 WAL 모드를 사용하며, 스레드별로 연결을 따로 엽니다.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS content ("
+            "kind TEXT NOT NULL, signature TEXT NOT NULL, body TEXT NOT NULL, "
+            "created_at REAL NOT NULL, PRIMARY KEY (kind, signature))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS demand ("
+            "kind TEXT NOT NULL, signature TEXT NOT NULL, requests INTEGER NOT NULL, "
+            "PRIMARY KEY (kind, signature))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, kind: str, signature: str) -> Optional[str]:
+        """
+        저장된 템플릿을 반환합니다.
+
+        Args:
+            kind: 콘텐츠 종류 ('analysis', 'insight', 'core_traits')
+            signature: 사주 서명
+
+        Returns:
+            Optional[str]: 템플릿 텍스트 (없으면 None)
+        """
+        row = self._conn().execute(
+            "SELECT body FROM content WHERE kind = ? AND signature = ?", (kind, signature)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, kind: str, signature: str, body: str) -> None:
+        """
+        템플릿을 저장합니다. 같은 키가 있으면 덮어씁니다.
+
+        Args:
+            kind: 콘텐츠 종류
+            signature: 사주 서명
+            body: 이름 자리표시자가 들어간 템플릿 텍스트
+        """
+        self._conn().execute(
+            "INSERT OR REPLACE INTO content (kind, signature, body, created_at) VALUES (?, ?, ?, ?)",
+            (kind, signature, body, time.time())
+        )
+
+    def record_request(self, kind: str, signature: str) -> None:
+        """서명별 요청 횟수를 1 늘립니다."""
+        self._conn().execute(
+            "INSERT INTO demand (kind, signature, requests) VALUES (?, ?, 1) "
+            "ON CONFLICT (kind, signature) DO UPDATE SET requests = requests + 1",
+            (kind, signature)
+        )
+
+    def most_requested_missing(self, kind: str, limit: int) -> List[Tuple[str, int]]:
+        """
+        요청 횟수가 많은 순으로, 아직 템플릿이 없는 서명을 반환합니다.
+
+        Args:
+            kind: 콘텐츠 종류
+            limit: 최대 개수
+
+        Returns:
+            List[Tuple[str, int]]: (서명, 요청 횟수) 목록
+        """
+        return self._conn().execute(
+            "SELECT d.signature, d.requests FROM demand d "
+            "LEFT JOIN content c ON c.kind = d.kind AND c.signature = d.signature "
+            "WHERE d.kind = ? AND c.signature IS NULL ORDER BY d.requests DESC LIMIT ?",
+            (kind, limit)
+        ).fetchall()
+
+    def count(self, kind: Optional[str] = None) -> int:
+        """
+        저장된 템플릿 수를 반환합니다.
+
+        Args:
+            kind: 지정하면 해당 종류만 셈
+
+        Returns:
+            int: 템플릿 수
+        """
+        if kind is None:
+            return self._conn().execute("SELECT COUNT(*) FROM content").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM content WHERE kind = ?", (kind,)).fetchone()[0]
+
+
+_store: Optional[ContentStore] = None
+_store_lock = threading.Lock()
+
+def get_content_store() -> ContentStore:
+    """
+    프로세스 전역 콘텐츠 저장소를 반환합니다. 경로는 CONTENT_STORE_PATH 환경 변수로 지정합니다.
+
+    Returns:
+        ContentStore: 콘텐츠 저장소
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ContentStore(os.environ.get("CONTENT_STORE_PATH", DEFAULT_CONTENT_STORE_PATH))
+    return _store
+
+def set_content_store(store: Optional[ContentStore]) -> None:
+    """
+    전역 콘텐츠 저장소를 교체합니다. (사전 생성 스크립트나 테스트에서 사용)
+
+    Args:
+        store: 사용할 저장소 (None이면 다음 호출 시 기본 저장소 생성)
+    """
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,385 @@
+"""
+상담 프롬프트 컨텍스트 캐시 유틸리티 모듈
+
+고민 상담 답변마다 반복되는 정적 상담 지침과 사용자별 사주 프로필을
+Gemini context caching(cached content)에 한 번 올려두고,
+이후 대화 턴에서는 최근 대화와 새 질문만 전송합니다.
+
+캐시 핸들은 사용자별로 TTL과 함께 관리되며, 세션 종료(처음으로) 시 또는 만료 시 정리됩니다.
+답변 생성은 캐시 핸들을 담은 CachedPrefix를 utils.routing.generate_for_task에 넘겨 일반 호출과 같은 경로
+(회로 차단기, 호출 횟수 제한, 디스패처, 등급 대체, 추적)로 실행합니다.
+SDK가 캐싱을 지원하지 않거나 캐시 생성이 실패하면 전체 프롬프트 방식으로 돌아갑니다.
+
+캐시 생성·연장·삭제는 원격 호출이므로 사용자별 잠금만 잡고 실행하며,
+전체 잠금은 목록 조회·갱신에만 사용해 한 사용자의 캐시 작업이 다른 사용자의 답변을 막지 않습니다.
+같은 사용자 정보로 여러 세션이 열려 있으면 캐시를 함께 쓰고, 마지막 세션이 끝날 때 삭제합니다.
+
+CONTEXT_CACHE_BACKEND=local 이면 원격 캐시 대신 로컬 대체 백엔드(LocalCachingBackend)를 사용합니다.
+(캐싱을 지원하지 않는 SDK에서의 개발·테스트용, 캐시된 앞부분을 매 호출 프롬프트 앞에 붙여 전송)
+
+Export 형태:
+- from utils.context_cache import COUNSELLING_INSTRUCTIONS
+- from utils.context_cache import ContextCacheManager, GeminiCachingBackend, LocalCachingBackend
+- from utils.context_cache import get_context_cache, set_context_cache
+"""
+import datetime
+import hashlib
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from utils.llm import DEFAULT_MODEL, CachedPrefix, get_genai
+from utils.routing import MODEL_TIERS, ROUTES
+
+# 고민 상담 답변의 정적 지침 (모든 사용자·모든 턴에서 동일)
+COUNSELLING_INSTRUCTIONS = """
+당신은 사주 전문 상담사입니다.
+편안한 반말로 대화하되, 전문성은 유지합니다.
+마치 오래 알고 지낸 선배나 친구처럼 대화하세요.
+
+# 중요한 규칙
+1. 2-3문장으로 짧게 답변
+2. 질문을 통해 상담자가 스스로 깨달을 수 있도록 유도
+3. 사주 특성은 자연스럽게 녹여서 표현
+4. 조언보다는 공감과 탐색이 우선
+
+# 답변 구조
+1. 공감 (1문장)
+2. 사주 특성 언급 + 탐색 질문 (1-2문장)
+
+# 말투 설정
+- 편안한 반말 사용 (친구같은 상담사)
+- 너무 캐주얼하지 않게 (야, 어이 같은 표현 금지)
+- 따뜻하고 친근한 톤 유지
+
+# 예시
+"적성 찾기 정말 어렵지.
+네 사주를 보니 창의적인 기운이 강한데,
+최근에 가장 재미있었던 일이 뭐였어?"
+
+# 피해야 할 것
+- 긴 설명
+- 일방적인 조언
+- 섣부른 해결책 제시
+- 지나치게 가벼운 말투
+"""
+
+DEFAULT_TTL_SECONDS = 30 * 60
+# 캐시 생성이 실패(미지원, 최소 토큰 수 미달 등)한 뒤 다시 시도하기까지의 대기 시간
+CREATE_FAILURE_BACKOFF_SECONDS = 10 * 60
+# 만료된 캐시를 정리하는 최소 간격
+SWEEP_INTERVAL_SECONDS = 60
+# 캐시 백엔드 ('gemini' 또는 'local')
+CONTEXT_CACHE_BACKEND = os.environ.get('CONTEXT_CACHE_BACKEND', 'gemini')
+
+
+class GeminiCachingBackend:
+    """google.generativeai.caching 을 사용하는 실제 캐시 백엔드"""
+
+    def is_supported(self) -> bool:
+        """설치된 SDK가 context caching을 지원하는지 반환합니다."""
+        return hasattr(get_genai(), 'caching')
+
+    def create(self, model_name: str, system_instruction: str, contents: str, ttl_seconds: int) -> Any:
+        genai = get_genai()
+        return genai.caching.CachedContent.create(
+            model=f"models/{model_name}" if not model_name.startswith("models/") else model_name,
+            system_instruction=system_instruction,
+            contents=[contents],
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+
+    def refresh(self, handle: Any, ttl_seconds: int) -> None:
+        handle.update(ttl=datetime.timedelta(seconds=ttl_seconds))
+
+    def delete(self, handle: Any) -> None:
+        handle.delete()
+
+
+class _PrefixedModel:
+    """캐시된 앞부분을 프롬프트 앞에 붙여 일반 모델을 호출하는 모델 (LocalCachingBackend용)"""
+
+    def __init__(self, model: Any, prefix: str) -> None:
+        self._model = model
+        self._prefix = prefix
+
+    def generate_content(self, contents: str, **kwargs: Any) -> Any:
+        return self._model.generate_content(f"{self._prefix}\n{contents}", **kwargs)
+
+    async def generate_content_async(self, contents: str, **kwargs: Any) -> Any:
+        return await self._model.generate_content_async(f"{self._prefix}\n{contents}", **kwargs)
+
+
+@dataclass
+class LocalCachedContent:
+    """LocalCachingBackend가 만든 캐시 핸들"""
+    name: str
+    model_name: str
+    prefix: str
+
+    def to_model(self) -> Any:
+        """
+        이 캐시를 앞부분으로 쓰는 모델을 만듭니다. (utils.llm.get_model에서 호출)
+
+        Returns:
+            Any: generate_content / generate_content_async를 제공하는 모델
+        """
+        from utils.llm import get_model
+        return _PrefixedModel(get_model(self.model_name), self.prefix)
+
+
+class LocalCachingBackend:
+    """
+    로컬 대체 캐시 백엔드 (테스트·개발용)
+
+    캐시된 앞부분을 메모리에 보관하고, 모델 호출 때 앞부분과 이번 내용을 이어 붙여 일반 모델에 전달합니다.
+    생성·연장·삭제 횟수를 기록합니다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[str, LocalCachedContent] = {}
+        self._seq = itertools.count(1)
+        self.creates = 0
+        self.refreshes = 0
+        self.deletes = 0
+
+    def is_supported(self) -> bool:
+        return True
+
+    def create(self, model_name: str, system_instruction: str, contents: str, ttl_seconds: int) -> LocalCachedContent:
+        handle = LocalCachedContent(f"local-cache/{next(self._seq)}", model_name, f"{system_instruction}\n{contents}")
+        with self._lock:
+            self._entries[handle.name] = handle
+            self.creates += 1
+        return handle
+
+    def refresh(self, handle: LocalCachedContent, ttl_seconds: int) -> None:
+        with self._lock:
+            if handle.name not in self._entries:
+                raise KeyError(handle.name)
+            self.refreshes += 1
+
+    def delete(self, handle: LocalCachedContent) -> None:
+        with self._lock:
+            if self._entries.pop(handle.name, None) is not None:
+                self.deletes += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class _CacheEntry:
+    handle: Any
+    profile_hash: str
+    expires_at: float
+    # 캐시를 구분하는 키 (다시 만든 캐시는 다른 키를 가짐)
+    key: str
+
+
+class ContextCacheManager:
+    """
+    사용자별 캐시 핸들 관리자
+
+    - 사용자 키마다 (정적 지침 + 사주 프로필) 캐시를 하나씩 유지합니다.
+    - 프로필이 바뀌거나 TTL이 지나면 새로 만들고, 만료가 가까우면 TTL을 연장합니다.
+    - 캐시 생성이 실패하면 일정 시간 동안 재시도하지 않습니다.
+    - 사용자 키마다 캐시를 쓰는 세션을 기록하여, 마지막 세션이 release()할 때만 삭제합니다.
+    """
+
+    def __init__(self, backend: Any, model_name: str = DEFAULT_MODEL,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self._backend = backend
+        self._model_name = model_name
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        # 캐시 목록과 사용자별 잠금 목록 보호용 (원격 호출 중에는 잡지 않음)
+        self._lock = threading.Lock()
+        self._user_locks: Dict[str, threading.Lock] = {}
+        self._entries: Dict[str, _CacheEntry] = {}
+        # 사용자 키별로 캐시를 사용 중인 세션 ID
+        self._sessions: Dict[str, Set[str]] = {}
+        self._disabled_until = 0.0
+        self._last_sweep = clock()
+        self._seq = itertools.count(1)
+
+    def _user_lock(self, user_key: str) -> threading.Lock:
+        with self._lock:
+            return self._user_locks.setdefault(user_key, threading.Lock())
+
+    def _entry_for(self, user_key: str, profile_text: str) -> Optional[_CacheEntry]:
+        """사용자 캐시를 반환합니다. 필요하면 생성하거나 TTL을 연장합니다. (사용자별 잠금 보유 상태에서 호출)"""
+        now = self._clock()
+        if now < self._disabled_until or not self._backend.is_supported():
+            return None
+
+        profile_hash = hashlib.sha1(profile_text.encode()).hexdigest()
+        with self._lock:
+            entry = self._entries.get(user_key)
+            if entry is not None and (entry.profile_hash != profile_hash or entry.expires_at <= now):
+                stale = self._entries.pop(user_key)
+                entry = None
+            else:
+                stale = None
+        if stale is not None:
+            self._delete(stale)
+
+        if entry is not None:
+            # 남은 TTL이 절반 이하이면 연장
+            if entry.expires_at - now < self._ttl_seconds / 2:
+                try:
+                    self._backend.refresh(entry.handle, self._ttl_seconds)
+                    entry.expires_at = now + self._ttl_seconds
+                except Exception:
+                    self.discard(user_key, entry.handle)
+                    entry = None
+
+        if entry is None:
+            try:
+                handle = self._backend.create(self._model_name, COUNSELLING_INSTRUCTIONS,
+                                              profile_text, self._ttl_seconds)
+            except Exception:
+                self._disabled_until = now + CREATE_FAILURE_BACKOFF_SECONDS
+                return None
+            entry = _CacheEntry(handle, profile_hash, now + self._ttl_seconds,
+                                f"context-cache:{profile_hash}:{next(self._seq)}")
+            with self._lock:
+                self._entries[user_key] = entry
+
+        return entry
+
+    def prefix_for(self, user_key: str, profile_text: str, contents: str,
+                   session_id: str = 'local') -> Optional[CachedPrefix]:
+        """
+        사용자의 (지침 + 프로필) 캐시를 준비하고, 그 뒤에 contents를 이어 보낼 CachedPrefix를 만듭니다.
+        반환값을 utils.routing.generate_for_task에 넘기면 캐시를 만든 모델의 등급에서 캐시를 사용합니다.
+
+        Args:
+            user_key: 사용자 식별 키
+            profile_text: 사용자 사주 프로필 텍스트 (캐시 대상)
+            contents: 이번 턴에 전송할 내용 (최근 대화 + 새 질문)
+            session_id: 캐시를 사용하는 세션 ID (release() 참고)
+
+        Returns:
+            Optional[CachedPrefix]: 캐시를 사용할 수 없으면 None
+        """
+        self._sweep()
+        with self._lock:
+            self._sessions.setdefault(user_key, set()).add(session_id)
+        with self._user_lock(user_key):
+            entry = self._entry_for(user_key, profile_text)
+        if entry is None:
+            return None
+        handle = entry.handle
+        return CachedPrefix(handle, self._model_name, entry.key, contents,
+                            lambda: self.discard(user_key, handle))
+
+    def discard(self, user_key: str, handle: Any) -> None:
+        """
+        사용할 수 없게 된 사용자 캐시를 버립니다. 그 사이 새로 만든 캐시는 그대로 둡니다.
+
+        Args:
+            user_key: 사용자 식별 키
+            handle: 버릴 캐시 핸들
+        """
+        with self._lock:
+            entry = self._entries.get(user_key)
+            if entry is None or entry.handle is not handle:
+                return
+            del self._entries[user_key]
+        self._delete(entry)
+
+    def _delete(self, entry: _CacheEntry) -> None:
+        """백엔드에서 캐시를 삭제합니다. (잠금 없이 호출)"""
+        try:
+            self._backend.delete(entry.handle)
+        except Exception:
+            pass
+
+    def _pop_expired(self, now: float) -> List[_CacheEntry]:
+        """만료된 캐시를 목록에서 빼서 반환합니다. (lock 보유 상태에서 호출)"""
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        return [self._entries.pop(key) for key in expired]
+
+    def _sweep(self) -> None:
+        """마지막 정리 후 SWEEP_INTERVAL_SECONDS가 지났으면 세션이 끝나지 않고 버려진 사용자 캐시를 정리합니다."""
+        now = self._clock()
+        with self._lock:
+            if now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+                return
+            self._last_sweep = now
+            expired = self._pop_expired(now)
+        for entry in expired:
+            self._delete(entry)
+
+    def release(self, user_key: str, session_id: str = 'local') -> None:
+        """
+        세션이 끝났음을 기록하고, 그 사용자의 캐시를 쓰는 다른 세션이 없으면 캐시를 삭제합니다.
+
+        Args:
+            user_key: 사용자 식별 키
+            session_id: 끝난 세션 ID
+        """
+        with self._lock:
+            sessions = self._sessions.get(user_key)
+            if sessions is not None:
+                sessions.discard(session_id)
+                if sessions:
+                    return
+                del self._sessions[user_key]
+            entry = self._entries.pop(user_key, None)
+            self._user_locks.pop(user_key, None)
+        if entry is not None:
+            self._delete(entry)
+
+    def cleanup_expired(self) -> int:
+        """
+        만료된 캐시 항목을 정리합니다.
+
+        Returns:
+            int: 정리된 항목 수
+        """
+        with self._lock:
+            expired = self._pop_expired(self._clock())
+        for entry in expired:
+            self._delete(entry)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_manager: Optional[ContextCacheManager] = None
+_manager_lock = threading.Lock()
+
+def get_context_cache() -> ContextCacheManager:
+    """
+    프로세스 전역 컨텍스트 캐시 관리자를 반환합니다.
+
+    Returns:
+        ContextCacheManager: Gemini 캐싱 백엔드(CONTEXT_CACHE_BACKEND=local이면 로컬 대체 백엔드)를 사용하는 관리자
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                backend = LocalCachingBackend() if CONTEXT_CACHE_BACKEND == 'local' else GeminiCachingBackend()
+                # 캐시는 만든 모델에서만 쓸 수 있으므로 상담 답변의 기본 등급 모델로 만듦
+                _manager = ContextCacheManager(backend, model_name=MODEL_TIERS[ROUTES['chat_reply'].tier])
+    return _manager
+
+def set_context_cache(manager: Optional[ContextCacheManager]) -> None:
+    """
+    전역 컨텍스트 캐시 관리자를 교체합니다. (테스트·도구에서 사용)
+
+    Args:
+        manager: 사용할 관리자 (None이면 다음 호출 시 기본 관리자 생성)
+    """
+    global _manager
+    with _manager_lock:
+        _manager = manager
@@ -0,0 +1,86 @@
+"""
+스크립트 실행별 전송량 측정 유틸리티 모듈
+
+Streamlit은 스크립트가 다시 실행될 때마다 화면 요소를 ForwardMsg(델타)로 브라우저에 보냅니다.
+이 모듈은 현재 세션의 전송 함수를 감싸 한 번의 실행에서 보낸 메시지 크기(바이트)와
+화면 요소 수를 세고, 실행이 끝나면 지표(utils.metrics)에 기록합니다.
+
+기록되는 지표:
+- rerun.delta_bytes.<화면>: 실행 한 번에 보낸 바이트 수
+- rerun.elements.<화면>: 실행 한 번에 보낸 화면 요소(델타) 수
+
+Export 형태:
+- from utils.delta_meter import DeltaMeter, start_delta_meter, finish_delta_meter
+"""
+from typing import Any, Callable, Optional
+
+from utils import metrics
+
+
+class DeltaMeter:
+    """한 번의 스크립트 실행에서 보낸 메시지 크기와 화면 요소 수"""
+
+    def __init__(self) -> None:
+        self.bytes = 0
+        self.elements = 0
+        self.messages = 0
+
+    def record(self, msg: Any) -> None:
+        self.messages += 1
+        self.bytes += msg.ByteSize()
+        if msg.WhichOneof('type') == 'delta':
+            self.elements += 1
+
+
+class _MeteredEnqueue:
+    """세션의 전송 함수를 감싸 현재 실행의 DeltaMeter에 메시지를 기록합니다."""
+
+    def __init__(self, enqueue: Callable[[Any], None]) -> None:
+        self._enqueue = enqueue
+        self.meter: Optional[DeltaMeter] = None
+
+    def __call__(self, msg: Any) -> None:
+        meter = self.meter
+        if meter is not None:
+            meter.record(msg)
+        self._enqueue(msg)
+
+
+def _current_enqueue() -> Optional[_MeteredEnqueue]:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    # 실행 컨텍스트는 같은 세션의 재실행 사이에 재사용되므로 한 번만 감쌈
+    if not isinstance(ctx._enqueue, _MeteredEnqueue):
+        ctx._enqueue = _MeteredEnqueue(ctx._enqueue)
+    return ctx._enqueue
+
+def start_delta_meter() -> Optional[DeltaMeter]:
+    """
+    현재 스크립트 실행의 전송량 측정을 시작합니다.
+
+    Returns:
+        Optional[DeltaMeter]: 측정기 (스크립트 실행 밖이면 None)
+    """
+    enqueue = _current_enqueue()
+    if enqueue is None:
+        return None
+    enqueue.meter = DeltaMeter()
+    return enqueue.meter
+
+def finish_delta_meter(meter: Optional[DeltaMeter], screen: str) -> None:
+    """
+    측정을 끝내고 지표에 기록합니다.
+
+    Args:
+        meter: start_delta_meter()가 반환한 측정기
+        screen: 지표 이름에 붙일 화면 이름 (예: 'onboarding', 'chat', 'roadmap')
+    """
+    if meter is None:
+        return
+    enqueue = _current_enqueue()
+    if enqueue is not None and enqueue.meter is meter:
+        enqueue.meter = None
+    metrics.observe(f"rerun.delta_bytes.{screen}", meter.bytes)
+    metrics.observe(f"rerun.elements.{screen}", meter.elements)
@@ -0,0 +1,389 @@
+"""
+사용자별 상태 변경 이벤트 로그 모듈
+
+세션 상태를 바꾸는 동작(메시지 추가, 태스크 추가·완료, 7일 계획·인사이트 저장 등)을
+작은 이벤트 하나씩 사용자별 추가 전용(append-only) 로그(SQLite)에 기록합니다.
+세션 전체를 다시 직렬화하지 않고 바뀐 내용만 쓰므로 기록 비용이 작고,
+브라우저 연결이 끊기거나 프로세스가 재시작되어도 사용자가 이어하기 코드를 입력하면 로그를 재생해 상태를 복원합니다.
+(사용자 키는 이어하기 코드의 해시이며, 이름·생년월일처럼 다른 사람도 입력할 수 있는 값으로 만들지 않습니다)
+
+- 상태 = 마지막 스냅숏 + 그 뒤의 이벤트를 apply_event()로 차례로 적용한 결과
+- 마지막 압축 이후 이벤트가 EVENT_LOG_COMPACT_EVERY개 쌓이면 백그라운드에서 스냅숏을 새로 쓰고
+  스냅숏에 반영된 이벤트를 지웁니다. 따라서 재생 비용은 전체 이력 길이와 무관합니다.
+- EVENT_LOG=0 이면 기록하지 않습니다. 파일 경로는 EVENT_LOG_PATH 환경 변수로 지정합니다.
+
+이벤트 종류 (data 필드):
+- user_info.update: 바뀐 사용자 정보 필드 (name, birthdate, birth_hour, core_traits, saju_analysis)
+- message.append (role, content) / message.pop
+- task.add (id, date, title, description, completed, created_at)
+- task.completed (id, completed, on: 완료 처리한 날짜 - 없으면 기록 시각의 날짜) / task.remove (id)
+- plan.set (task_ids, concern) / roadmap.set (text) / concern.add (concern, created_at)
+- reset: 세션 초기화 (이전 상태를 모두 버림)
+
+Export 형태:
+- from utils.event_log import EventLog, EventJournal, get_event_log, set_event_log
+- from utils.event_log import EVENT_LOG_ENABLED, empty_state, apply_event
+"""
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils import metrics
+
+EVENT_LOG_ENABLED = os.environ.get('EVENT_LOG', '1') != '0'
+DEFAULT_EVENT_LOG_PATH = os.path.join(".cache", "event_log.db")
+
+# 마지막 압축 이후 이만큼 이벤트가 쌓이면 스냅숏으로 압축
+EVENT_LOG_COMPACT_EVERY = int(os.environ.get('EVENT_LOG_COMPACT_EVERY', '200'))
+
+
+def empty_state() -> Dict[str, Any]:
+    """
+    이벤트를 하나도 적용하지 않은 사용자 상태를 반환합니다.
+
+    Returns:
+        Dict[str, Any]: user_info, messages ([역할, 내용] 목록), tasks (ID → 태스크 필드),
+            plan_task_ids, current_concern, roadmap, previous_concerns
+    """
+    return {'user_info': {}, 'messages': [], 'tasks': {}, 'plan_task_ids': [],
+            'current_concern': '', 'roadmap': '', 'previous_concerns': []}
+
+def apply_event(state: Dict[str, Any], kind: str, data: Dict[str, Any], at: float) -> None:
+    """
+    이벤트 하나를 상태에 적용합니다. 알 수 없는 종류는 무시합니다.
+
+    Args:
+        state: empty_state() 형태의 상태 (직접 수정됨)
+        kind: 이벤트 종류
+        data: 이벤트 내용
+        at: 이벤트 기록 시각 (유닉스 시간)
+    """
+    if kind == 'message.append':
+        state['messages'].append([data['role'], data['content']])
+    elif kind == 'message.pop':
+        if state['messages']:
+            state['messages'].pop()
+    elif kind == 'task.add':
+        state['tasks'][data['id']] = {
+            'date': data['date'], 'title': data.get('title', ''), 'description': data.get('description', ''),
+            'completed': bool(data.get('completed')), 'created_at': data.get('created_at', ''),
+            'completed_on': datetime.date.fromtimestamp(at).isoformat() if data.get('completed') else None,
+        }
+    elif kind == 'task.remove':
+        state['tasks'].pop(data['id'], None)
+    elif kind == 'task.completed':
+        task = state['tasks'].get(data['id'])
+        if task is not None:
+            task['completed'] = bool(data['completed'])
+            # 스트릭은 완료 처리한 날짜 기준이므로 이벤트 시각(가져온 기록이면 원래 완료일)의 날짜를 함께 보관
+            if data['completed']:
+                task['completed_on'] = data.get('on') or datetime.date.fromtimestamp(at).isoformat()
+            else:
+                task['completed_on'] = None
+    elif kind == 'user_info.update':
+        state['user_info'].update(data)
+    elif kind == 'plan.set':
+        state['plan_task_ids'] = list(data.get('task_ids', []))
+        if data.get('concern'):
+            state['current_concern'] = data['concern']
+    elif kind == 'roadmap.set':
+        state['roadmap'] = data.get('text', '')
+    elif kind == 'concern.add':
+        # 이전 버전 스냅숏에는 previous_concerns가 없음
+        state.setdefault('previous_concerns', []).append(
+            {'concern': data['concern'], 'created_at': data.get('created_at', '')})
+    elif kind == 'reset':
+        state.clear()
+        state.update(empty_state())
+
+
+class EventLog:
+    """
+    사용자별 이벤트 로그와 스냅숏 저장소
+
+    utils.content_store와 같은 WAL·스레드별 연결 방식을 사용하므로 여러 워커가 같은 파일을 공유할 수 있습니다.
+    이벤트 ID는 파일 전체에서 단조 증가하며, 스냅숏에는 반영된 마지막 이벤트 ID가 함께 저장됩니다.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, user_key TEXT NOT NULL, "
+            "at REAL NOT NULL, kind TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS events_user ON events (user_key, id)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "user_key TEXT PRIMARY KEY, last_id INTEGER NOT NULL, state BLOB NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, user_key: str, kind: str, data: Dict[str, Any]) -> int:
+        """
+        이벤트를 추가합니다.
+
+        Args:
+            user_key: 사용자 키 (utils.session.get_journal_key)
+            kind: 이벤트 종류
+            data: 이벤트 내용 (JSON으로 저장)
+
+        Returns:
+            int: 이벤트 ID
+        """
+        cursor = self._conn().execute(
+            "INSERT INTO events (user_key, at, kind, data) VALUES (?, ?, ?, ?)",
+            (user_key, time.time(), kind, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+        )
+        return cursor.lastrowid
+
+    def append_many(self, user_key: str, events: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        이벤트 여러 개를 한 번의 트랜잭션으로 추가합니다.
+
+        Args:
+            user_key: 사용자 키
+            events: (종류, 내용) 목록
+
+        Returns:
+            int: 추가한 이벤트 수
+        """
+        now = time.time()
+        rows = [(user_key, now, kind, json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+                for kind, data in events]
+        if not rows:
+            return 0
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT INTO events (user_key, at, kind, data) VALUES (?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+    def events(self, user_key: str, after_id: int = 0) -> Iterator[Tuple[int, float, str, Dict[str, Any]]]:
+        """
+        after_id 이후의 이벤트를 기록 순서대로 반환합니다.
+
+        Args:
+            user_key: 사용자 키
+            after_id: 이 ID 이후의 이벤트만
+
+        Yields:
+            Tuple[int, float, str, Dict[str, Any]]: (이벤트 ID, 기록 시각, 종류, 내용)
+        """
+        rows = self._conn().execute(
+            "SELECT id, at, kind, data FROM events WHERE user_key = ? AND id > ? ORDER BY id",
+            (user_key, after_id)
+        ).fetchall()
+        for event_id, at, kind, data in rows:
+            yield event_id, at, kind, json.loads(data)
+
+    def snapshot(self, user_key: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        마지막 스냅숏을 반환합니다.
+
+        Args:
+            user_key: 사용자 키
+
+        Returns:
+            Tuple[int, Optional[Dict[str, Any]]]: (반영된 마지막 이벤트 ID, 상태) - 없으면 (0, None)
+        """
+        row = self._conn().execute(
+            "SELECT last_id, state FROM snapshots WHERE user_key = ?", (user_key,)
+        ).fetchone()
+        if row is None:
+            return 0, None
+        return row[0], json.loads(zlib.decompress(row[1]))
+
+    def replay(self, user_key: str) -> Tuple[int, Dict[str, Any], int]:
+        """
+        스냅숏에 그 뒤의 이벤트를 적용해 현재 상태를 만듭니다.
+
+        Args:
+            user_key: 사용자 키
+
+        Returns:
+            Tuple[int, Dict[str, Any], int]: (반영된 마지막 이벤트 ID, 상태, 스냅숏 뒤에 적용한 이벤트 수)
+        """
+        last_id, state = self.snapshot(user_key)
+        if state is None:
+            state = empty_state()
+        applied = 0
+        for event_id, at, kind, data in self.events(user_key, last_id):
+            apply_event(state, kind, data, at)
+            last_id = event_id
+            applied += 1
+        return last_id, state, applied
+
+    def compact(self, user_key: str) -> int:
+        """
+        현재 상태를 스냅숏으로 저장하고 스냅숏에 반영된 이벤트를 지웁니다.
+        압축하는 동안 추가된 이벤트는 남으므로 기록과 동시에 실행해도 됩니다.
+
+        Args:
+            user_key: 사용자 키
+
+        Returns:
+            int: 지운 이벤트 수
+        """
+        last_id, state, applied = self.replay(user_key)
+        if not applied:
+            return 0
+        payload = zlib.compress(json.dumps(state, ensure_ascii=False, separators=(',', ':')).encode())
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 다른 워커가 더 최근 스냅숏을 먼저 썼으면 덮어쓰지 않음
+            conn.execute(
+                "INSERT INTO snapshots (user_key, last_id, state) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_key) DO UPDATE SET last_id = excluded.last_id, state = excluded.state "
+                "WHERE excluded.last_id > snapshots.last_id",
+                (user_key, last_id, payload)
+            )
+            deleted = conn.execute(
+                "DELETE FROM events WHERE user_key = ? AND id <= ?", (user_key, last_id)
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted
+
+
+_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+_compactor: Optional[ThreadPoolExecutor] = None
+
+def get_event_log() -> EventLog:
+    """
+    프로세스 전역 이벤트 로그를 반환합니다. 경로는 EVENT_LOG_PATH 환경 변수로 지정합니다.
+
+    Returns:
+        EventLog: 이벤트 로그
+    """
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = EventLog(os.environ.get("EVENT_LOG_PATH", DEFAULT_EVENT_LOG_PATH))
+    return _log
+
+def set_event_log(log: Optional[EventLog]) -> None:
+    """
+    전역 이벤트 로그를 교체합니다. (테스트·도구에서 사용)
+
+    Args:
+        log: 사용할 이벤트 로그 (None이면 다음 호출 시 기본 로그 생성)
+    """
+    global _log
+    with _log_lock:
+        _log = log
+
+def _get_compactor() -> ThreadPoolExecutor:
+    global _compactor
+    if _compactor is None:
+        with _log_lock:
+            if _compactor is None:
+                # 압축은 순서대로 하나씩 실행
+                _compactor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-log-compact")
+    return _compactor
+
+def _compact(log: EventLog, user_key: str) -> None:
+    started = time.monotonic()
+    try:
+        metrics.increment("event_log.compacted_events", log.compact(user_key))
+    except sqlite3.Error:
+        metrics.increment("event_log.errors")
+        return
+    metrics.observe("event_log.compact_seconds", time.monotonic() - started)
+
+
+class EventJournal:
+    """
+    한 사용자의 이벤트 로그에 이벤트를 기록하는 객체
+
+    세션 상태의 MessageStore·TaskStore와 세션 모듈이 같은 객체를 공유합니다.
+    기록에 실패해도 화면 동작은 계속되도록 오류는 지표로만 남깁니다.
+    """
+
+    def __init__(self, user_key: str, log: Optional[EventLog] = None) -> None:
+        self.user_key = user_key
+        self._log = log
+        self._since_compaction = 0
+
+    @property
+    def log(self) -> EventLog:
+        return self._log if self._log is not None else get_event_log()
+
+    def record(self, kind: str, **data: Any) -> None:
+        """
+        이벤트를 기록합니다. 압축 주기가 되면 백그라운드 압축을 예약합니다.
+
+        Args:
+            kind: 이벤트 종류
+            **data: 이벤트 내용
+        """
+        log = self.log
+        try:
+            log.append(self.user_key, kind, data)
+        except sqlite3.Error:
+            metrics.increment("event_log.errors")
+            return
+        metrics.increment("event_log.appended")
+        self._count(1, force=kind == 'reset')
+
+    def record_many(self, kind: str, items: List[Dict[str, Any]]) -> None:
+        """
+        같은 종류의 이벤트 여러 개를 한 번의 트랜잭션으로 기록합니다. (기록 가져오기 등 대량 변경에서 사용)
+
+        Args:
+            kind: 이벤트 종류
+            items: 이벤트 내용 목록
+        """
+        log = self.log
+        try:
+            appended = log.append_many(self.user_key, ((kind, data) for data in items))
+        except sqlite3.Error:
+            metrics.increment("event_log.errors")
+            return
+        metrics.increment("event_log.appended", appended)
+        self._count(appended)
+
+    def _count(self, appended: int, force: bool = False) -> None:
+        self._since_compaction += appended
+        if self._since_compaction >= EVENT_LOG_COMPACT_EVERY or force:
+            self._since_compaction = 0
+            _get_compactor().submit(_compact, self.log, self.user_key)
+
+    def replay(self) -> Dict[str, Any]:
+        """
+        로그를 재생해 이 사용자의 현재 상태를 만듭니다.
+
+        Returns:
+            Dict[str, Any]: empty_state() 형태의 상태 (기록이 없으면 빈 상태)
+        """
+        started = time.monotonic()
+        _, state, applied = self.log.replay(self.user_key)
+        self._since_compaction = applied
+        metrics.observe("event_log.replay_seconds", time.monotonic() - started)
+        return state
@@ -0,0 +1,301 @@
+"""
+사용자 기록 내보내기·가져오기 모듈
+
+한 사용자의 전체 기록(사용자 정보, 대화, 태스크, 완료 기록, 현재 7일 계획, 이전 고민)을
+한 줄에 레코드 하나인 NDJSON으로 내보내고 다시 가져옵니다.
+
+- 내보내기는 제너레이터로 한 줄씩 만들므로 문서 전체를 한 번에 만들지 않습니다.
+  보관소로 옮겨진 오래된 대화도 보관 묶음 단위로 읽어 바로 내보냅니다.
+- 가져오기는 파일을 한 줄씩 읽어 IMPORT_BATCH_SIZE개씩 모은 뒤 대화·태스크 저장소에 한꺼번에 넣습니다.
+  이벤트 로그(utils.event_log)가 연결되어 있으면 묶음마다 한 번의 트랜잭션으로 기록합니다.
+- 화면에서는 components.history, 명령줄에서는 scripts/history_transfer.py로 사용합니다.
+
+레코드 형식 (type 필드로 구분, header가 항상 첫 줄):
+- header: format, version, exported_at
+- user_info: name, birthdate, birth_hour, core_traits, saju_analysis
+- message: role, content
+- task: id, date, title, description, created_at
+- task_completion: id, on (완료 처리한 날짜)
+- weekly_plan: task_ids, concern
+- concern: concern, created_at
+
+Export 형태:
+- from utils.history_export import iter_history_records, session_history_records, encode_ndjson
+- from utils.history_export import parse_ndjson, history_events, import_session_history, HistoryImportError
+"""
+import datetime
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple, Union
+
+from utils import metrics
+from utils.calendar import TaskStore
+from utils.records import Message, MessageStore, Task
+from utils.streak import StreakTracker
+
+HISTORY_FORMAT = 'saju-mentor-history'
+HISTORY_VERSION = 1
+
+# 가져오기에서 저장소에 한 번에 넣는 레코드 수
+IMPORT_BATCH_SIZE = int(os.environ.get('HISTORY_IMPORT_BATCH_SIZE', '500'))
+
+# 가져올 때 세션에 없으면 채우는 사용자 정보 필드 (이름·생년월일은 현재 세션 값을 유지)
+IMPORTED_USER_FIELDS = ('core_traits', 'saju_analysis')
+# 명령줄 가져오기에서 이벤트 로그에 함께 기록하는 사용자 식별 정보
+IDENTITY_FIELDS = ('name', 'birthdate', 'birth_hour')
+
+
+class HistoryImportError(ValueError):
+    """가져올 기록 파일의 형식이 잘못된 경우"""
+
+
+def iter_history_records(user_info: Dict[str, Any], messages: Iterable[Union[Message, Tuple[str, str]]],
+                         tasks: Iterable[Task], completions: Iterable[Tuple[str, datetime.date]],
+                         plan_task_ids: List[str], current_concern: str,
+                         previous_concerns: Iterable[Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+    """
+    사용자 기록을 내보내기 레코드로 하나씩 만듭니다. 입력도 하나씩 읽으므로 긴 이력도 한꺼번에 펼치지 않습니다.
+
+    Args:
+        user_info: 사용자 정보 딕셔너리
+        messages: 전체 대화 (Message 또는 (role, content))
+        tasks: 태스크 목록
+        completions: (태스크 ID, 완료 처리한 날짜) 목록
+        plan_task_ids: 현재 7일 계획의 태스크 ID 목록
+        current_concern: 현재 7일 계획의 고민
+        previous_concerns: 이전 고민 목록 (concern, created_at)
+
+    Yields:
+        Dict[str, Any]: 레코드 (모듈 설명의 형식)
+    """
+    yield {'type': 'header', 'format': HISTORY_FORMAT, 'version': HISTORY_VERSION,
+           'exported_at': datetime.datetime.now().isoformat(timespec='seconds')}
+    birthdate = user_info.get('birthdate')
+    yield {
+        'type': 'user_info', 'name': user_info.get('name', ''),
+        'birthdate': birthdate.isoformat() if isinstance(birthdate, datetime.date) else birthdate,
+        'birth_hour': user_info.get('birth_hour', ''),
+        **{field: user_info[field] for field in IMPORTED_USER_FIELDS if user_info.get(field)},
+    }
+    for message in messages:
+        role, content = (message.role, message.content) if isinstance(message, Message) else message
+        yield {'type': 'message', 'role': role, 'content': content}
+    for task in tasks:
+        yield {'type': 'task', 'id': task.id, 'date': task.date, 'title': task.title,
+               'description': task.description, 'created_at': task.created_at}
+    for task_id, day in completions:
+        yield {'type': 'task_completion', 'id': task_id, 'on': day.isoformat()}
+    if plan_task_ids:
+        yield {'type': 'weekly_plan', 'task_ids': list(plan_task_ids), 'concern': current_concern or ''}
+    for concern in previous_concerns:
+        yield {'type': 'concern', 'concern': concern['concern'], 'created_at': concern.get('created_at', '')}
+
+def session_history_records(session_state: MutableMapping[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    세션 상태에서 내보내기 레코드를 만듭니다.
+
+    Args:
+        session_state: st.session_state
+
+    Returns:
+        Iterator[Dict[str, Any]]: 레코드
+    """
+    messages = session_state.get('chat_messages')
+    task_store = session_state.get('task_store')
+    streak_tracker = session_state.get('streak_tracker')
+
+    def completions() -> Iterator[Tuple[str, datetime.date]]:
+        for task in task_store or ():
+            if task.completed:
+                day = streak_tracker.completed_on(task.id) if streak_tracker is not None else None
+                yield task.id, day or datetime.date.fromisoformat(task.date)
+
+    return iter_history_records(
+        session_state.get('user_info', {}),
+        messages.all_messages() if isinstance(messages, MessageStore) else (),
+        task_store or (), completions(),
+        session_state.get('plan_task_ids', []), session_state.get('current_concern', ''),
+        session_state.get('previous_concerns', []),
+    )
+
+def encode_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    레코드를 NDJSON 한 줄씩 UTF-8 바이트로 인코딩합니다.
+
+    Args:
+        records: 레코드
+
+    Yields:
+        bytes: 줄바꿈으로 끝나는 JSON 한 줄
+    """
+    for record in records:
+        yield (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+def parse_ndjson(lines: Iterable[Union[str, bytes]]) -> Iterator[Dict[str, Any]]:
+    """
+    NDJSON을 한 줄씩 읽어 레코드로 반환합니다. 첫 레코드는 이 형식의 header여야 합니다.
+
+    Args:
+        lines: 파일 줄 (str 또는 bytes)
+
+    Yields:
+        Dict[str, Any]: header를 제외한 레코드
+
+    Raises:
+        HistoryImportError: JSON이 아니거나, header가 없거나, 지원하지 않는 버전인 경우
+    """
+    header_seen = False
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise HistoryImportError(f"{line_no}번째 줄을 읽을 수 없습니다: {e}") from e
+        if not isinstance(record, dict) or 'type' not in record:
+            raise HistoryImportError(f"{line_no}번째 줄에 레코드 종류(type)가 없습니다.")
+        if not header_seen:
+            if record['type'] != 'header' or record.get('format') != HISTORY_FORMAT:
+                raise HistoryImportError("사주기반 멘토 기록 파일이 아닙니다.")
+            if record.get('version', 0) > HISTORY_VERSION:
+                raise HistoryImportError(f"지원하지 않는 기록 파일 버전입니다: {record.get('version')}")
+            header_seen = True
+            continue
+        yield record
+    if not header_seen:
+        raise HistoryImportError("빈 기록 파일입니다.")
+
+def history_events(records: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    가져온 레코드를 이벤트 로그(utils.event_log) 이벤트로 바꿉니다. (명령줄 가져오기에서 사용)
+
+    Args:
+        records: parse_ndjson()이 반환한 레코드
+
+    Yields:
+        Tuple[str, Dict[str, Any]]: (이벤트 종류, 내용)
+    """
+    for record in records:
+        kind = record['type']
+        if kind == 'user_info':
+            # 이어하기 코드로 복원할 때 사용자 정보도 함께 되살리도록 이름·생년월일도 기록
+            fields = {field: record[field] for field in IDENTITY_FIELDS + IMPORTED_USER_FIELDS if record.get(field)}
+            if fields:
+                yield 'user_info.update', fields
+        elif kind == 'message':
+            yield 'message.append', {'role': record['role'], 'content': record['content']}
+        elif kind == 'task':
+            yield 'task.add', {'id': record['id'], 'date': record['date'], 'title': record.get('title', ''),
+                               'description': record.get('description', ''), 'completed': False,
+                               'created_at': record.get('created_at', '')}
+        elif kind == 'task_completion':
+            yield 'task.completed', {'id': record['id'], 'completed': True, 'on': record['on']}
+        elif kind == 'weekly_plan':
+            yield 'plan.set', {'task_ids': record.get('task_ids', []), 'concern': record.get('concern', '')}
+        elif kind == 'concern':
+            yield 'concern.add', {'concern': record['concern'], 'created_at': record.get('created_at', '')}
+
+def import_session_history(lines: Iterable[Union[str, bytes]], session_state: MutableMapping[str, Any],
+                           batch_size: int = IMPORT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    내보낸 기록을 현재 세션에 더합니다. 대화는 기존 대화 뒤에, 태스크는 기존 태스크와 함께 추가되며
+    태스크 ID가 겹치면 새 ID를 받고, 완료 기록과 7일 계획의 ID도 그에 맞게 바뀝니다.
+
+    Args:
+        lines: 기록 파일 줄 (str 또는 bytes)
+        session_state: st.session_state (chat_messages, task_store, streak_tracker가 초기화된 상태)
+        batch_size: 저장소에 한 번에 넣는 레코드 수
+
+    Returns:
+        Dict[str, int]: 종류별 가져온 수 (messages, tasks, completions, concerns)
+
+    Raises:
+        HistoryImportError: 파일 형식이 잘못된 경우 (오류 이전 묶음까지는 이미 반영됨)
+    """
+    messages: MessageStore = session_state['chat_messages']
+    task_store: TaskStore = session_state['task_store']
+    streak_tracker: StreakTracker = session_state['streak_tracker']
+    journal = session_state.get('event_journal')
+    user_info = session_state['user_info']
+    previous_concerns = session_state.setdefault('previous_concerns', [])
+    known_concerns = {concern['concern'] for concern in previous_concerns}
+    search_index = session_state.get('search_index')
+
+    counts = {'messages': 0, 'tasks': 0, 'completions': 0, 'concerns': 0}
+    id_map: Dict[str, str] = {}
+    pending_messages: List[Tuple[str, str]] = []
+    pending_tasks: List[Tuple[str, Dict[str, Any], Optional[str]]] = []
+    pending_completions: List[Tuple[str, datetime.date]] = []
+
+    def flush_messages() -> None:
+        counts['messages'] += messages.extend(pending_messages)
+        pending_messages.clear()
+
+    def flush_tasks() -> None:
+        new_ids = task_store.add_many(pending_tasks)
+        for (_, _, old_id), new_id in zip(pending_tasks, new_ids):
+            id_map[old_id] = new_id
+        counts['tasks'] += len(new_ids)
+        pending_tasks.clear()
+
+    def flush_completions() -> None:
+        days = dict(pending_completions)
+        for task_id in task_store.complete_many(pending_completions):
+            streak_tracker.mark(task_id, True, days[task_id])
+            counts['completions'] += 1
+        pending_completions.clear()
+
+    for record in parse_ndjson(lines):
+        kind = record['type']
+        if kind == 'message':
+            pending_messages.append((record['role'], record['content']))
+            if len(pending_messages) >= batch_size:
+                flush_messages()
+        elif kind == 'task':
+            pending_tasks.append((record['date'], record, record['id']))
+            if len(pending_tasks) >= batch_size:
+                flush_tasks()
+        elif kind == 'task_completion':
+            if pending_tasks:
+                flush_tasks()
+            task_id = id_map.get(record['id'])
+            if task_id is not None:
+                pending_completions.append((task_id, datetime.date.fromisoformat(record['on'])))
+            if len(pending_completions) >= batch_size:
+                flush_completions()
+        elif kind == 'weekly_plan':
+            if pending_tasks:
+                flush_tasks()
+            task_ids = [id_map[task_id] for task_id in record.get('task_ids', []) if task_id in id_map]
+            if task_ids:
+                session_state['plan_task_ids'] = task_ids
+                if record.get('concern'):
+                    session_state['current_concern'] = record['concern']
+                if journal is not None:
+                    journal.record('plan.set', task_ids=task_ids, concern=record.get('concern', ''))
+        elif kind == 'concern':
+            if record['concern'] in known_concerns:
+                continue
+            known_concerns.add(record['concern'])
+            previous_concerns.append({'concern': record['concern'], 'created_at': record.get('created_at', '')})
+            counts['concerns'] += 1
+            if search_index is not None:
+                search_index.add('concern', record['concern'], record['concern'], record.get('created_at', ''))
+            if journal is not None:
+                journal.record('concern.add', concern=record['concern'], created_at=record.get('created_at', ''))
+        elif kind == 'user_info':
+            fields = {field: record[field] for field in IMPORTED_USER_FIELDS
+                      if record.get(field) and not user_info.get(field)}
+            if fields:
+                user_info.update(fields)
+                if journal is not None:
+                    journal.record('user_info.update', **fields)
+
+    flush_messages()
+    flush_tasks()
+    flush_completions()
+    if counts['messages']:
+        session_state['has_initial_greeting'] = True
+    for name, value in counts.items():
+        metrics.increment(f"history.imported_{name}", value)
+    return counts
@@ -0,0 +1,411 @@
+"""
+진행 중인 LLM 생성 관리 유틸리티 모듈
+
+채팅 답변, 온보딩 분석, 7일 계획 등 LLM 생성 작업을 세션별로 등록해 두고
+다음 경우에 취소합니다.
+- 세션 초기화('처음으로' 버튼, reset_session)
+- 생성 시간 제한 초과
+- 브라우저 연결 종료 (Streamlit 런타임에서 세션이 사라진 경우)
+
+생성 함수는 코루틴 함수이며 LLM 디스패처(utils.llm_dispatcher)의 이벤트 루프에서 실행됩니다.
+모델 호출을 기다리는 동안 스레드를 차지하지 않으므로, 동시 생성 수가 스레드 수에 묶이지 않습니다.
+아직 시작되지 않은 작업은 실행되지 않고, 실행 중인 작업은 다음 대기 지점에서 중단되며
+(진행 중이던 모델 호출도 함께 취소) '낭비된 생성'으로 지표(utils.metrics)에 기록됩니다.
+제출마다 멱등성 키를 붙여, 같은 요청이 짧은 시간 안에 다시 제출되면 새 호출을 만들지 않습니다.
+
+Export 형태:
+- from utils.inflight import InflightRegistry, Generation, GenerationCancelled
+- from utils.inflight import get_inflight_registry, current_session_id, idempotency_key, run_generation
+"""
+import contextvars
+import hashlib
+import inspect
+import threading
+import time
+from concurrent.futures import Future, wait
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional
+
+from utils import metrics, tracing
+from utils.llm_dispatcher import LLMDispatcher, get_llm_dispatcher
+
+# 생성 하나에 허용하는 최대 시간 (초)
+GENERATION_TIMEOUT_SECONDS = 90.0
+# 같은 멱등성 키의 재제출을 중복으로 보는 기간 (초)
+DEDUP_WINDOW_SECONDS = 10.0
+# 시간 초과·연결 종료 세션을 점검하는 주기 (초)
+JANITOR_INTERVAL_SECONDS = 5.0
+# 대기 중 취소 여부를 확인하는 간격 (초)
+_POLL_SECONDS = 0.1
+
+# 디스패처 루프에서 지금 실행 중인 생성의 세션 ID (생성마다 태스크 컨텍스트가 따로 있음)
+_generation_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('generation_session',
+                                                                                     default=None)
+
+
+class GenerationCancelled(Exception):
+    """생성이 취소되었을 때 발생하는 예외 (reason: 'reset', 'timeout', 'disconnect', 'superseded' 등)"""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"생성이 취소되었습니다: {reason}")
+        self.reason = reason
+
+
+class Generation:
+    """세션에 등록된 생성 작업 하나"""
+
+    def __init__(self, session_id: str, key: str, timeout: float) -> None:
+        self.session_id = session_id
+        self.key = key
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + timeout
+        self.finished_at: Optional[float] = None
+        self.cancel_reason: Optional[str] = None
+        # 디스패처 루프에서 실행되는 생성 코루틴의 Future
+        self.future: Optional[Future] = None
+        self.started = False
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def cancel(self, reason: str) -> bool:
+        """
+        생성을 취소합니다. 이미 끝났거나 취소된 경우 아무것도 하지 않습니다.
+
+        Args:
+            reason: 취소 사유
+
+        Returns:
+            bool: 이번 호출로 취소되었는지 여부
+        """
+        if self.done or self._cancel_event.is_set():
+            return False
+        self.cancel_reason = reason
+        self._cancel_event.set()
+        metrics.increment(f"inflight.cancelled.{reason}")
+        # 실행 중이면 루프의 태스크가 취소되어 다음 대기 지점에서 멈춤 (_run의 finally에서 완료 처리)
+        if self.future is not None and self.future.cancel() and not self.started:
+            # 루프에서 시작되기 전이므로 LLM 호출 자체가 일어나지 않음
+            self.finished_at = time.monotonic()
+            metrics.increment("inflight.skipped")
+        return True
+
+    def result(self, wait_seconds: Optional[float] = None) -> Any:
+        """
+        생성 결과를 기다립니다. 기다리는 동안 취소·시간 초과를 확인합니다.
+
+        Args:
+            wait_seconds: 이번 호출에서 기다릴 최대 시간 (None이면 완료 또는 시간 제한까지)
+
+        Returns:
+            Any: 생성 결과
+
+        Raises:
+            GenerationCancelled: 취소되었거나 시간 제한을 넘긴 경우
+            TimeoutError: wait_seconds 안에 끝나지 않은 경우 (생성은 계속 진행됨)
+        """
+        give_up_at = time.monotonic() + wait_seconds if wait_seconds is not None else None
+        while True:
+            if self._cancel_event.is_set():
+                raise GenerationCancelled(self.cancel_reason)
+            done, _ = wait([self.future], timeout=_POLL_SECONDS)
+            if done and not self._cancel_event.is_set():
+                return self.future.result()
+            now = time.monotonic()
+            if now >= self.deadline:
+                self.cancel('timeout')
+                raise GenerationCancelled('timeout')
+            if give_up_at is not None and now >= give_up_at:
+                raise TimeoutError(self.key)
+
+    async def _run(self, fn: Callable[..., Awaitable[Any]], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """디스패처 루프에서 실행되는 본체. 시작 직전에 취소되었으면 호출하지 않습니다."""
+        self.started = True
+        # 태스크마다 컨텍스트가 복사되므로 다른 생성의 세션 ID와 섞이지 않음
+        _generation_session.set(self.session_id)
+        try:
+            # cancel()이 시작 전이라고 판단한 직후 루프에서 시작된 경우 (완료 처리는 cancel()이 함)
+            if self._cancel_event.is_set():
+                raise GenerationCancelled(self.cancel_reason)
+            with tracing.span('inflight.generation', **{'inflight.key': self.key}):
+                return await fn(*args, **kwargs)
+        finally:
+            if not self.done:
+                self._finish()
+
+    def _finish(self) -> None:
+        self.finished_at = time.monotonic()
+        elapsed = self.finished_at - self.started_at
+        if self._cancel_event.is_set():
+            # 아무도 읽지 않을 결과를 위해 자원을 쓴 경우
+            metrics.increment("inflight.wasted")
+            metrics.observe("inflight.wasted_seconds", elapsed)
+        else:
+            metrics.increment("inflight.completed")
+            metrics.observe("inflight.duration_seconds", elapsed)
+
+
+class InflightRegistry:
+    """
+    세션별 진행 중 생성 목록
+
+    - submit(): 멱등성 키로 생성 작업을 제출합니다. 같은 키가 진행 중이거나 방금 끝났으면 그 작업을 재사용합니다.
+    - stream(): 스크립트 스레드에서 소비하는 스트리밍 생성을 등록하고, 취소되면 소비를 중단합니다.
+    - cancel_session(): 세션의 모든 생성을 취소합니다.
+    """
+
+    def __init__(self, dispatcher: Optional[LLMDispatcher] = None, dedup_window: float = DEDUP_WINDOW_SECONDS,
+                 session_alive: Optional[Callable[[str], bool]] = None) -> None:
+        # 생성 코루틴을 실행할 디스패처 (None이면 처음 제출할 때 전역 디스패처 사용)
+        self._dispatcher = dispatcher
+        self._dedup_window = dedup_window
+        self._session_alive = session_alive or _streamlit_session_alive
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict[str, Generation]] = {}
+        self._janitor: Optional[threading.Thread] = None
+
+    def find(self, session_id: str, key: str) -> Optional[Generation]:
+        """
+        진행 중이거나 중복 판정 기간 안에 끝난 같은 키의 생성을 찾습니다.
+
+        Args:
+            session_id: 세션 ID
+            key: 멱등성 키
+
+        Returns:
+            Optional[Generation]: 재사용할 생성 (없으면 None)
+        """
+        with self._lock:
+            return self._find(session_id, key)
+
+    def _find(self, session_id: str, key: str) -> Optional[Generation]:
+        generation = self._sessions.get(session_id, {}).get(key)
+        if generation is None or generation.cancelled:
+            return None
+        if generation.done and time.monotonic() - generation.finished_at > self._dedup_window:
+            return None
+        return generation
+
+    def submit(self, session_id: str, key: str, fn: Callable[..., Awaitable[Any]], *args: Any,
+               timeout: float = GENERATION_TIMEOUT_SECONDS, **kwargs: Any) -> Generation:
+        """
+        생성 작업을 LLM 디스패처의 이벤트 루프에 제출합니다.
+
+        Args:
+            session_id: 세션 ID
+            key: 멱등성 키
+            fn: 실행할 생성 코루틴 함수
+            *args, **kwargs: fn에 전달할 인자
+            timeout: 생성 시간 제한 (초)
+
+        Returns:
+            Generation: 제출된(또는 재사용된) 생성
+
+        Raises:
+            TypeError: fn이 코루틴 함수가 아닌 경우
+        """
+        if not inspect.iscoroutinefunction(fn):
+            raise TypeError(f"생성 함수는 코루틴 함수여야 합니다: {fn!r}")
+        self._ensure_janitor()
+        with self._lock:
+            existing = self._find(session_id, key)
+            if existing is not None:
+                metrics.increment("inflight.deduplicated")
+                return existing
+            generation = Generation(session_id, key, timeout)
+            self._sessions.setdefault(session_id, {})[key] = generation
+            if self._dispatcher is None:
+                self._dispatcher = get_llm_dispatcher()
+            # 제출한 쪽의 추적 구간 등 컨텍스트는 루프의 태스크로 이어짐
+            generation.future = self._dispatcher.run_coroutine(generation._run(fn, args, kwargs))
+        metrics.increment("inflight.started")
+        return generation
+
+    def stream(self, session_id: str, key: str, items: Iterable[Any],
+               timeout: float = GENERATION_TIMEOUT_SECONDS) -> Iterator[Any]:
+        """
+        스트리밍 생성을 등록하고 항목을 그대로 전달합니다. 취소되거나 시간 제한을 넘기면 소비를 멈춥니다.
+
+        Args:
+            session_id: 세션 ID
+            key: 멱등성 키
+            items: 스트리밍 생성기
+            timeout: 생성 시간 제한 (초)
+
+        Yields:
+            Any: items의 각 항목
+
+        Raises:
+            GenerationCancelled: 소비 도중 취소된 경우
+        """
+        self._ensure_janitor()
+        generation = Generation(session_id, key, timeout)
+        with self._lock:
+            self._sessions.setdefault(session_id, {})[key] = generation
+        metrics.increment("inflight.started")
+
+        iterator = iter(items)
+        exhausted = False
+        try:
+            for item in iterator:
+                if not generation.cancelled and time.monotonic() >= generation.deadline:
+                    generation.cancel('timeout')
+                if generation.cancelled:
+                    raise GenerationCancelled(generation.cancel_reason)
+                yield item
+            exhausted = True
+        finally:
+            if not exhausted:
+                # 스크립트 실행이 중단되는 등 소비자가 끝까지 읽지 않은 경우
+                generation.cancel('abandoned')
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            generation._finish()
+
+    def cancel_session(self, session_id: str, reason: str) -> int:
+        """
+        세션의 진행 중인 생성을 모두 취소하고 세션 기록을 지웁니다.
+
+        Args:
+            session_id: 세션 ID
+            reason: 취소 사유
+
+        Returns:
+            int: 취소된 생성 수
+        """
+        with self._lock:
+            generations = self._sessions.pop(session_id, {})
+        return sum(1 for generation in generations.values() if generation.cancel(reason))
+
+    def sweep(self) -> None:
+        """시간 제한을 넘긴 생성과 연결이 끊긴 세션의 생성을 취소하고, 오래된 기록을 정리합니다."""
+        now = time.monotonic()
+        with self._lock:
+            session_ids = list(self._sessions)
+        for session_id in session_ids:
+            if not self._session_alive(session_id):
+                self.cancel_session(session_id, 'disconnect')
+                continue
+            with self._lock:
+                generations = self._sessions.get(session_id, {})
+                for key, generation in list(generations.items()):
+                    if not generation.done and now >= generation.deadline:
+                        generation.cancel('timeout')
+                    if generation.cancelled or (generation.done and now - generation.finished_at > self._dedup_window):
+                        del generations[key]
+                if not generations:
+                    self._sessions.pop(session_id, None)
+
+    def active_count(self, session_id: Optional[str] = None) -> int:
+        """
+        진행 중인 생성 수를 반환합니다.
+
+        Args:
+            session_id: 지정하면 해당 세션만 셈
+
+        Returns:
+            int: 진행 중인 생성 수
+        """
+        with self._lock:
+            sessions = [self._sessions.get(session_id, {})] if session_id else list(self._sessions.values())
+            return sum(1 for generations in sessions for generation in generations.values()
+                       if not generation.done and not generation.cancelled)
+
+    def _ensure_janitor(self) -> None:
+        if self._janitor is not None:
+            return
+        with self._lock:
+            if self._janitor is None:
+                self._janitor = threading.Thread(target=self._janitor_loop, name="inflight-janitor", daemon=True)
+                self._janitor.start()
+
+    def _janitor_loop(self) -> None:
+        while True:
+            time.sleep(JANITOR_INTERVAL_SECONDS)
+            try:
+                self.sweep()
+            except Exception:
+                pass
+
+
+def _streamlit_session_alive(session_id: str) -> bool:
+    """Streamlit 런타임에 해당 세션의 브라우저 연결이 살아 있는지 반환합니다."""
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return True
+        return Runtime.instance().is_active_session(session_id)
+    except Exception:
+        return True
+
+def current_session_id() -> str:
+    """
+    현재 스크립트 실행의 Streamlit 세션 ID를 반환합니다.
+    디스패처 루프에서 실행 중인 생성 안에서는 그 생성을 제출한 세션 ID를 반환합니다.
+
+    Returns:
+        str: 세션 ID (스크립트 실행 밖이면 'local')
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    # 디스패처 루프에서도 호출되므로 컨텍스트가 없다는 경고는 끔
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is not None:
+        return ctx.session_id
+    return _generation_session.get() or 'local'
+
+def idempotency_key(kind: str, *parts: Any) -> str:
+    """
+    제출 종류와 내용으로 멱등성 키를 만듭니다.
+
+    Args:
+        kind: 제출 종류 (예: 'chat', 'onboarding', 'plan')
+        *parts: 제출 내용
+
+    Returns:
+        str: '종류:해시' 형태의 키
+    """
+    digest = hashlib.sha1("\x00".join(str(part) for part in parts).encode()).hexdigest()[:16]
+    return f"{kind}:{digest}"
+
+_registry: Optional[InflightRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_inflight_registry() -> InflightRegistry:
+    """
+    프로세스 전역 생성 관리자를 반환합니다.
+
+    Returns:
+        InflightRegistry: 생성 관리자
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = InflightRegistry()
+    return _registry
+
+def run_generation(key: str, fn: Callable[..., Awaitable[Any]], *args: Any,
+                   timeout: float = GENERATION_TIMEOUT_SECONDS, **kwargs: Any) -> Any:
+    """
+    현재 세션에 생성을 등록하고 결과를 기다립니다. (스크립트 스레드에서 호출)
+
+    Args:
+        key: 멱등성 키
+        fn: 실행할 생성 코루틴 함수
+        *args, **kwargs: fn에 전달할 인자
+        timeout: 생성 시간 제한 (초)
+
+    Returns:
+        Any: 생성 결과
+
+    Raises:
+        GenerationCancelled: 취소되었거나 시간 제한을 넘긴 경우
+    """
+    generation = get_inflight_registry().submit(current_session_id(), key, fn, *args, timeout=timeout, **kwargs)
+    return generation.result()
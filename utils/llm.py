@@ -0,0 +1,508 @@
+"""
+Gemini SDK 접근 유틸리티 모듈
+
+google.generativeai 는 임포트 비용이 큰 패키지이므로 모듈 로드 시점이 아니라
+실제로 모델이 필요해지는 시점에 한 번만 임포트하고 API 키를 설정합니다.
+
+generate_text()와 stream_text()는 텍스트 생성 공용 진입점으로, 호출 횟수 제한과
+응답 캐시(utils.cache_backend)를 적용합니다. 공유 백엔드를 설정하면
+여러 워커가 같은 캐시와 카운터를 사용합니다.
+
+모델별 회로 차단기(utils.circuit_breaker)가 연속 실패 시 호출을 잠시 차단하고,
+실패한 (모델, 프롬프트)는 짧은 기간 동안 부정 캐시되어 다시 호출하지 않고 바로 실패합니다.
+실패 시 호출자가 보여줄 안내 문구는 DegradedResponse로 표시하여 콘텐츠로 저장되지 않도록 합니다.
+
+실제 모델 호출은 기본적으로 비동기 디스패처(utils.llm_dispatcher)의 이벤트 루프에서 실행되고,
+호출한 스레드는 결과 Future만 기다립니다. LLM_ASYNC_DISPATCH=0 이면 호출한 스레드에서 직접 실행합니다.
+진행 중 생성(utils.inflight)은 디스패처 루프의 코루틴으로 실행되므로 generate_text_async()와
+stream_text_async()를 사용해 스레드 없이 호출 결과를 기다립니다.
+
+Export 형태:
+- from utils.llm import set_api_key, get_genai, get_model
+- from utils.llm import generate_text, stream_text, RateLimitExceeded
+- from utils.llm import generate_text_async, stream_text_async
+- from utils.llm import LLMUnavailable, CircuitOpenError, DegradedResponse, is_degraded, get_circuit_breaker
+- from utils.llm import record_token_usage, CachedPrefix
+- 또는 import utils.llm as llm 후 llm.get_model() 형태로 사용
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from utils import metrics, tracing
+from utils.cache_backend import RateLimiter, get_cache_backend
+from utils.circuit_breaker import CircuitBreaker
+
+DEFAULT_MODEL = 'gemini-1.5-flash'
+
+# 전체 워커 합산 분당 LLM 호출 제한 (0이면 제한 없음)
+LLM_RATE_LIMIT_PER_MINUTE = int(os.environ.get('LLM_RATE_LIMIT_PER_MINUTE', '0'))
+
+# 모델별 연속 실패가 이 횟수에 이르면 회로를 열고, 이 시간(초) 뒤에 시험 호출 허용
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('LLM_CIRCUIT_FAILURE_THRESHOLD', '5'))
+LLM_CIRCUIT_RECOVERY_SECONDS = float(os.environ.get('LLM_CIRCUIT_RECOVERY_SECONDS', '30'))
+# 실패한 (모델, 프롬프트)를 다시 호출하지 않는 기간 (초)
+NEGATIVE_CACHE_TTL = 15.0
+
+# 모델 호출을 비동기 디스패처로 보낼지 여부와, 디스패처 결과를 기다리는 최대 시간 (초)
+LLM_ASYNC_DISPATCH = os.environ.get('LLM_ASYNC_DISPATCH', '1') != '0'
+LLM_CALL_TIMEOUT_SECONDS = 120.0
+
+class RateLimitExceeded(Exception):
+    """LLM 호출 횟수 제한을 초과했을 때 발생하는 예외"""
+
+class LLMUnavailable(Exception):
+    """최근 같은 요청이 실패하여(부정 캐시) LLM 호출을 생략했을 때 발생하는 예외"""
+
+class CircuitOpenError(LLMUnavailable):
+    """모델의 회로 차단기가 열려 있어 호출을 거절했을 때 발생하는 예외"""
+
+@dataclass(frozen=True)
+class CachedPrefix:
+    """
+    컨텍스트 캐시(utils.context_cache)에 올려 둔 프롬프트 앞부분과 그 뒤에 이어 보낼 내용
+
+    handle은 model_name으로 만든 캐시이므로 같은 모델을 호출할 때만 사용합니다.
+    key는 캐시된 내용을 구분하는 값이고, discard()는 서버에서 캐시가 만료·삭제되어 호출이 실패했을 때
+    캐시를 버려 다음 호출에서 다시 만들도록 합니다.
+    """
+    handle: Any
+    model_name: str
+    key: str
+    contents: str
+    discard: Callable[[], None]
+
+class DegradedResponse(str):
+    """
+    LLM 장애 등으로 실제 생성 결과 대신 돌려주는 안내 문구
+
+    일반 문자열처럼 화면에 표시할 수 있지만, 세션 상태나 저장소에 콘텐츠로 저장해서는 안 됩니다.
+    """
+
+def is_degraded(value: Any) -> bool:
+    """
+    값이 실제 생성 결과가 아닌 안내 문구(DegradedResponse)인지 반환합니다.
+
+    Args:
+        value: 생성 함수의 반환값
+
+    Returns:
+        bool: 안내 문구이면 True
+    """
+    return isinstance(value, DegradedResponse)
+
+_genai = None
+_api_key: Optional[str] = None
+_lock = threading.Lock()
+
+def set_api_key(api_key: str) -> None:
+    """
+    API 키를 등록합니다. SDK가 이미 로드된 경우 즉시 적용합니다.
+
+    Args:
+        api_key: Gemini API 키
+    """
+    global _api_key
+    with _lock:
+        _api_key = api_key
+        if _genai is not None:
+            _genai.configure(api_key=api_key)
+
+def get_genai() -> Any:
+    """
+    google.generativeai 모듈을 반환합니다. 첫 호출 시 임포트하고 API 키를 설정합니다.
+
+    Returns:
+        Any: google.generativeai 모듈
+    """
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+                if _api_key:
+                    genai.configure(api_key=_api_key)
+                _genai = genai
+    return _genai
+
+def get_model(model_name: str = DEFAULT_MODEL, cached_content: Any = None) -> Any:
+    """
+    Gemini 모델 객체를 생성합니다.
+
+    Args:
+        model_name: 모델 이름
+        cached_content: 지정하면 이 컨텍스트 캐시(cached content)를 앞부분으로 쓰는 모델을 생성
+            (캐시를 만든 모델이 사용되므로 model_name은 무시됨)
+
+    Returns:
+        Any: genai.GenerativeModel 객체
+    """
+    if cached_content is not None:
+        if hasattr(cached_content, 'to_model'):
+            # 로컬 대체 캐시(utils.context_cache.LocalCachingBackend)는 자체 모델을 만듦
+            return cached_content.to_model()
+        return get_genai().GenerativeModel.from_cached_content(cached_content=cached_content)
+    return get_genai().GenerativeModel(model_name)
+
+_rate_limiter: Optional[RateLimiter] = None
+
+def _get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(get_cache_backend(), LLM_RATE_LIMIT_PER_MINUTE, 60.0, prefix="llm-rate")
+    return _rate_limiter
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_circuit_breaker(model_name: str) -> CircuitBreaker:
+    """
+    모델별 회로 차단기를 반환합니다.
+
+    Args:
+        model_name: 모델 이름
+
+    Returns:
+        CircuitBreaker: 회로 차단기
+    """
+    breaker = _breakers.get(model_name)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.setdefault(model_name, CircuitBreaker(
+                f"llm.{model_name}", LLM_CIRCUIT_FAILURE_THRESHOLD, LLM_CIRCUIT_RECOVERY_SECONDS
+            ))
+    return breaker
+
+def _response_cache_key(model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+    raw = f"{model_name}\x00{prompt}"
+    if generation_config:
+        raw += "\x00" + json.dumps(generation_config, sort_keys=True, ensure_ascii=False)
+    return "llm-response:" + hashlib.sha256(raw.encode()).hexdigest()
+
+def _cached_response(cache_key: Optional[str]) -> Optional[str]:
+    if not cache_key:
+        return None
+    try:
+        cached = get_cache_backend().get(cache_key)
+    except Exception:
+        return None  # 캐시 백엔드 장애는 캐시 미스로 처리
+    return cached.decode() if cached is not None else None
+
+def _store_response(cache_key: Optional[str], text: str, cache_ttl: Optional[float]) -> None:
+    if not cache_key:
+        return
+    try:
+        get_cache_backend().set(cache_key, text.encode(), ttl=cache_ttl)
+    except Exception:
+        pass
+
+def _negative_cache_key(cache_key: str) -> str:
+    return "llm-negative:" + cache_key.split(":", 1)[1]
+
+def _check_available(model_name: str, negative_key: str) -> CircuitBreaker:
+    """
+    부정 캐시, 호출 횟수 제한, 회로 차단기를 차례로 확인하고 호출할 수 있으면 회로 차단기를 반환합니다.
+    회로 차단기를 마지막에 확인하여, half-open 시험 호출 자격을 얻은 뒤에는 반드시 실제 호출이 일어나도록 합니다.
+    """
+    _check_backend_limits(negative_key)
+    return _acquire_breaker(model_name)
+
+def _check_backend_limits(negative_key: str) -> None:
+    """부정 캐시와 호출 횟수 제한을 확인합니다. (캐시 백엔드 I/O가 있으므로 비동기 경로에서는 스레드에서 호출)"""
+    try:
+        recently_failed = get_cache_backend().get(negative_key) is not None
+    except Exception:
+        recently_failed = False
+    if recently_failed:
+        metrics.increment("llm.negative_cache.hit")
+        raise LLMUnavailable("같은 요청이 방금 실패했습니다. 잠시 후 다시 시도해주세요.")
+    
+    _check_rate_limit()
+
+def _acquire_breaker(model_name: str) -> CircuitBreaker:
+    """회로 차단기의 호출 허가를 받습니다. (메모리 안의 상태만 확인하므로 이벤트 루프에서 바로 호출 가능)"""
+    breaker = get_circuit_breaker(model_name)
+    if not breaker.allow():
+        raise CircuitOpenError("AI 응답이 일시적으로 원활하지 않습니다. 잠시 후 다시 시도해주세요.")
+    return breaker
+
+def _record_failure(breaker: CircuitBreaker, negative_key: str) -> None:
+    breaker.record_failure()
+    metrics.increment("llm.failures")
+    try:
+        get_cache_backend().set(negative_key, b"1", ttl=NEGATIVE_CACHE_TTL)
+    except Exception:
+        pass
+
+def _check_rate_limit() -> None:
+    try:
+        allowed = _get_rate_limiter().allow('global')
+    except Exception:
+        allowed = True
+    if not allowed:
+        raise RateLimitExceeded("LLM 호출이 많아 잠시 후 다시 시도해주세요.")
+
+def record_token_usage(response: Any) -> None:
+    """
+    모델 응답(또는 스트리밍 조각)의 토큰 수를 현재 추적 구간에 기록합니다.
+    응답에 사용량 정보(usage_metadata)가 없는 SDK 버전에서는 후보 응답의 토큰 수만 기록합니다.
+
+    Args:
+        response: generate_content 응답
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        tracing.set_attributes(**{'llm.prompt_tokens': getattr(usage, 'prompt_token_count', None),
+                                  'llm.output_tokens': getattr(usage, 'candidates_token_count', None)})
+        return
+    output_tokens = sum(getattr(candidate, 'token_count', 0) or 0
+                        for candidate in getattr(response, 'candidates', None) or [])
+    if output_tokens:
+        tracing.set_attributes(**{'llm.output_tokens': output_tokens})
+
+def _call_model(model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]],
+                cached_content: Any = None) -> str:
+    """모델을 호출해 텍스트를 받습니다. 디스패처를 쓰면 이벤트 루프에서 실행하고 결과만 기다립니다."""
+    if not LLM_ASYNC_DISPATCH:
+        response = get_model(model_name, cached_content).generate_content(prompt, generation_config=generation_config)
+        record_token_usage(response)
+        return response.text
+    
+    from utils.inflight import current_session_id
+    from utils.llm_dispatcher import get_llm_dispatcher
+    
+    future = get_llm_dispatcher().submit(current_session_id(), model_name, prompt, generation_config, cached_content)
+    try:
+        return future.result(timeout=LLM_CALL_TIMEOUT_SECONDS)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+def _stream_model(model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]]) -> Iterator[str]:
+    """모델을 스트리밍 호출해 텍스트 조각을 받습니다."""
+    if not LLM_ASYNC_DISPATCH:
+        for chunk in get_model(model_name).generate_content(prompt, generation_config=generation_config, stream=True):
+            record_token_usage(chunk)
+            yield chunk.text
+        return
+    
+    from utils.inflight import current_session_id
+    from utils.llm_dispatcher import get_llm_dispatcher
+    
+    yield from get_llm_dispatcher().stream(current_session_id(), model_name, prompt, generation_config)
+
+@dataclass
+class _Request:
+    """generate/stream 공통 요청 정보 (캐시 키, 부정 캐시 키, 캐시된 응답)"""
+    prompt: str
+    cached_content: Any
+    cache_key: Optional[str]
+    negative_key: str
+    cached: Optional[str]
+
+def _begin_request(prompt: str, model_name: str, cache_ttl: Optional[float],
+                   generation_config: Optional[Dict[str, Any]],
+                   cached_prefix: Optional[CachedPrefix] = None) -> _Request:
+    """캐시 키를 만들고 캐시된 응답을 찾습니다. (현재 추적 구간에 요청 속성 기록)"""
+    cached_content = None
+    if cached_prefix is not None:
+        # 캐시된 앞부분은 key로 구분하고 이번 내용만 전송
+        prompt = cached_prefix.contents
+        cached_content = cached_prefix.handle
+        request_key = _response_cache_key(model_name, f"{cached_prefix.key}\x00{prompt}", generation_config)
+    else:
+        request_key = _response_cache_key(model_name, prompt, generation_config)
+    cache_key = request_key if cache_ttl else None
+    cached = _cached_response(cache_key)
+    tracing.set_attributes(**{'llm.model': model_name, 'llm.prompt_chars': len(prompt),
+                              'llm.cache_hit': cached is not None,
+                              'llm.context_cache': cached_content is not None})
+    return _Request(prompt, cached_content, cache_key, _negative_cache_key(request_key), cached)
+
+@tracing.traced('llm.generate', tracing.SPAN_KIND_CLIENT)
+def generate_text(prompt: str, model_name: str = DEFAULT_MODEL, cache_ttl: Optional[float] = None,
+                  generation_config: Optional[Dict[str, Any]] = None,
+                  cached_prefix: Optional[CachedPrefix] = None) -> str:
+    """
+    프롬프트로 텍스트를 생성합니다.
+    
+    Args:
+        prompt: 프롬프트
+        model_name: 모델 이름
+        cache_ttl: 지정하면 같은 (모델, 프롬프트, 생성 설정)의 응답을 이 기간(초) 동안 재사용
+        generation_config: 생성 설정 (예: {'max_output_tokens': 64})
+        cached_prefix: 지정하면 prompt 대신 컨텍스트 캐시 뒤에 cached_prefix.contents만 전송
+            (cached_prefix.model_name과 model_name이 같아야 함)
+        
+    Returns:
+        str: 생성된 텍스트
+        
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        LLMUnavailable: 회로 차단기가 열려 있거나 같은 요청이 방금 실패한 경우
+    """
+    request = _begin_request(prompt, model_name, cache_ttl, generation_config, cached_prefix)
+    if request.cached is not None:
+        return request.cached
+    
+    breaker = _check_available(model_name, request.negative_key)
+    try:
+        text = _call_model(model_name, request.prompt, generation_config, request.cached_content)
+    except Exception:
+        _record_failure(breaker, request.negative_key)
+        raise
+    except BaseException:
+        # 취소·소비 중단은 실패가 아니지만 half-open 시험 호출 자리는 돌려줌 (돌려주지 않으면 회로가 계속 거절)
+        breaker.release()
+        raise
+    breaker.record_success()
+    tracing.set_attributes(**{'llm.response_chars': len(text)})
+    
+    _store_response(request.cache_key, text, cache_ttl)
+    return text
+
+@tracing.traced('llm.generate', tracing.SPAN_KIND_CLIENT)
+async def generate_text_async(prompt: str, model_name: str = DEFAULT_MODEL, cache_ttl: Optional[float] = None,
+                              generation_config: Optional[Dict[str, Any]] = None,
+                              cached_prefix: Optional[CachedPrefix] = None) -> str:
+    """
+    generate_text()의 비동기 버전입니다. 디스패처 루프에서 실행되는 코루틴(utils.inflight의 생성)에서 사용하며,
+    모델 호출을 기다리는 동안 스레드를 차지하지 않습니다. (LLM_ASYNC_DISPATCH와 관계없이 디스패처 사용)
+    
+    Args:
+        prompt: 프롬프트
+        model_name: 모델 이름
+        cache_ttl: 응답 재사용 기간 (초, generate_text 참고)
+        generation_config: 생성 설정
+        cached_prefix: 컨텍스트 캐시 (generate_text 참고)
+        
+    Returns:
+        str: 생성된 텍스트
+        
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        LLMUnavailable: 회로 차단기가 열려 있거나 같은 요청이 방금 실패한 경우
+    """
+    from utils.inflight import current_session_id
+    from utils.llm_dispatcher import get_llm_dispatcher
+    
+    # 캐시 백엔드 I/O는 스레드에서 실행하여 디스패처 루프의 다른 세션 생성을 멈추지 않음
+    request = await asyncio.to_thread(_begin_request, prompt, model_name, cache_ttl, generation_config, cached_prefix)
+    if request.cached is not None:
+        return request.cached
+    
+    await asyncio.to_thread(_check_backend_limits, request.negative_key)
+    # 시험 호출 자격은 루프에서 받아, 스레드 실행 중 취소되어도 자격이 새지 않도록 함
+    breaker = _acquire_breaker(model_name)
+    try:
+        text = await get_llm_dispatcher().generate_async(current_session_id(), model_name, request.prompt,
+                                                         generation_config, request.cached_content)
+    except Exception:
+        await asyncio.to_thread(_record_failure, breaker, request.negative_key)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record_success()
+    tracing.set_attributes(**{'llm.response_chars': len(text)})
+    
+    await asyncio.to_thread(_store_response, request.cache_key, text, cache_ttl)
+    return text
+
+@tracing.traced('llm.stream', tracing.SPAN_KIND_CLIENT)
+def stream_text(prompt: str, model_name: str = DEFAULT_MODEL, cache_ttl: Optional[float] = None,
+                generation_config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """
+    프롬프트로 텍스트를 스트리밍 생성합니다. 캐시된 응답이 있으면 한 번에 내보냅니다.
+    
+    Args:
+        prompt: 프롬프트
+        model_name: 모델 이름
+        cache_ttl: 지정하면 끝까지 받은 응답을 이 기간(초) 동안 재사용 (generate_text와 같은 캐시 키)
+        generation_config: 생성 설정
+        
+    Yields:
+        str: 도착한 텍스트 조각
+        
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        LLMUnavailable: 회로 차단기가 열려 있거나 같은 요청이 방금 실패한 경우
+    """
+    request = _begin_request(prompt, model_name, cache_ttl, generation_config)
+    if request.cached is not None:
+        yield request.cached
+        return
+    
+    breaker = _check_available(model_name, request.negative_key)
+    parts = []
+    try:
+        for text in _stream_model(model_name, prompt, generation_config):
+            if not parts:
+                # 첫 조각이 도착하면 호출 성공으로 판단
+                breaker.record_success()
+            parts.append(text)
+            yield text
+    except Exception:
+        _record_failure(breaker, request.negative_key)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    _finish_stream(breaker, request, parts, cache_ttl)
+
+@tracing.traced('llm.stream', tracing.SPAN_KIND_CLIENT)
+async def stream_text_async(prompt: str, model_name: str = DEFAULT_MODEL, cache_ttl: Optional[float] = None,
+                            generation_config: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """
+    stream_text()의 비동기 버전입니다. 디스패처 루프에서 실행되는 코루틴에서 사용합니다.
+    
+    Args:
+        prompt: 프롬프트
+        model_name: 모델 이름
+        cache_ttl: 응답 재사용 기간 (초, stream_text 참고)
+        generation_config: 생성 설정
+        
+    Yields:
+        str: 도착한 텍스트 조각
+        
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        LLMUnavailable: 회로 차단기가 열려 있거나 같은 요청이 방금 실패한 경우
+    """
+    from utils.inflight import current_session_id
+    from utils.llm_dispatcher import get_llm_dispatcher
+    
+    request = await asyncio.to_thread(_begin_request, prompt, model_name, cache_ttl, generation_config)
+    if request.cached is not None:
+        yield request.cached
+        return
+    
+    await asyncio.to_thread(_check_backend_limits, request.negative_key)
+    breaker = _acquire_breaker(model_name)
+    parts = []
+    try:
+        async for text in get_llm_dispatcher().stream_async(current_session_id(), model_name, prompt,
+                                                            generation_config):
+            if not parts:
+                breaker.record_success()
+            parts.append(text)
+            yield text
+    except Exception:
+        await asyncio.to_thread(_record_failure, breaker, request.negative_key)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    await asyncio.to_thread(_finish_stream, breaker, request, parts, cache_ttl)
+
+def _finish_stream(breaker: CircuitBreaker, request: _Request, parts: List[str], cache_ttl: Optional[float]) -> None:
+    """끝까지 받은 스트리밍 응답을 기록하고 캐시합니다."""
+    if not parts:
+        breaker.record_success()
+    tracing.set_attributes(**{'llm.chunks': len(parts), 'llm.response_chars': sum(len(part) for part in parts)})
+    
+    # 중간에 소비가 중단되면 여기까지 오지 않으므로 완전한 응답만 캐시됨
+    _store_response(request.cache_key, "".join(parts), cache_ttl)
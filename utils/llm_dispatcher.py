@@ -0,0 +1,341 @@
+"""
+비동기 LLM 호출 디스패처 모듈
+
+블로킹 generate_content 호출은 생성이 끝날 때까지 호출한 스레드를 붙잡아 두므로,
+동시 세션이 많으면 스레드 수가 곧 처리량의 한계가 됩니다.
+이 모듈은 백그라운드 스레드 하나에서 asyncio 이벤트 루프를 돌리며 SDK의 generate_content_async로
+모든 LLM 호출을 다중화하고, 스크립트 스레드에는 스레드 안전한 Future(또는 스트리밍 반복자)를 돌려줍니다.
+
+- 동시 실행 수는 max_concurrency로 제한하고, 넘치는 호출은 세션별 대기열에 쌓입니다.
+- 빈 자리가 나면 세션을 돌아가며(round-robin) 하나씩 꺼내므로,
+  한 세션이 호출을 많이 쌓아도 다른 세션의 호출이 그 뒤로 밀리지 않습니다.
+- 반환된 Future를 취소하면 대기 중인 호출은 실행되지 않고, 실행 중인 호출은 루프에서 중단됩니다.
+- 루프에서 실행되는 코루틴은 generate_async()/stream_async()로 스레드를 붙잡지 않고 결과를 기다립니다.
+- run_coroutine()은 생성 작업 전체(코루틴)를 루프에서 실행하고 스레드 안전한 Future를 돌려줍니다.
+  (utils.inflight가 세션별 생성을 이 방식으로 실행하므로, 생성 하나가 스레드 하나를 차지하지 않습니다)
+- 호출은 제출한 스레드의 컨텍스트에서 실행되므로 추적 구간(utils.tracing)이 제출한 구간 아래에 이어집니다.
+
+Export 형태:
+- from utils.llm_dispatcher import LLMDispatcher, get_llm_dispatcher
+"""
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Coroutine, Deque, Dict, Iterator, Optional
+
+from utils import metrics, tracing
+
+# 루프에서 동시에 실행할 최대 LLM 호출 수
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '32'))
+
+# 스트리밍 종료 표시
+_DONE = object()
+
+
+@dataclass
+class _Call:
+    """디스패처 대기열의 LLM 호출 하나"""
+    session_id: str
+    model_name: str
+    prompt: Any
+    generation_config: Optional[Dict[str, Any]]
+    # 컨텍스트 캐시 (utils.context_cache, 없으면 None)
+    cached_content: Any = None
+    future: Future = field(default_factory=Future)
+    # 스트리밍 호출이면 도착한 조각을 넣을 큐 (스레드에서 읽으면 queue.Queue, 루프에서 읽으면 asyncio.Queue)
+    chunks: Any = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    task: Optional[asyncio.Task] = None
+    # 제출한 스레드의 컨텍스트 (추적 구간 전달용)
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+
+
+class LLMDispatcher:
+    """
+    백그라운드 asyncio 루프 하나에서 LLM 호출을 실행하는 디스패처
+
+    submit()과 stream()은 어느 스레드에서나 호출할 수 있습니다.
+    대기열과 실행 상태는 루프 스레드에서만 바꾸므로 별도의 잠금이 필요 없습니다.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._queues: Dict[str, Deque[_Call]] = {}
+        # 대기 중인 호출이 있는 세션의 순환 순서
+        self._ready: Deque[str] = deque()
+        self._running = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="llm-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def pending_count(self) -> int:
+        """대기열에 있는 호출 수 (근사값)"""
+        return sum(len(calls) for calls in list(self._queues.values()))
+
+    @property
+    def running_count(self) -> int:
+        """루프에서 실행 중인 호출 수 (근사값)"""
+        return self._running
+
+    def submit(self, session_id: str, model_name: str, prompt: Any,
+               generation_config: Optional[Dict[str, Any]] = None, cached_content: Any = None) -> Future:
+        """
+        LLM 호출을 제출합니다.
+
+        Args:
+            session_id: 호출한 세션 ID (세션별 공정 순서에 사용)
+            model_name: 모델 이름
+            prompt: 프롬프트
+            generation_config: 생성 설정
+            cached_content: 프롬프트 앞에 쓸 컨텍스트 캐시 (utils.llm.get_model 참고)
+
+        Returns:
+            Future: 생성된 텍스트로 완료되는 Future
+        """
+        call = _Call(session_id, model_name, prompt, generation_config, cached_content)
+        self._schedule(call)
+        return call.future
+
+    def stream(self, session_id: str, model_name: str, prompt: Any,
+               generation_config: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        LLM 호출을 스트리밍으로 제출하고 도착한 텍스트 조각을 차례로 돌려줍니다.
+        소비자가 도중에 반복을 멈추면 루프의 호출도 중단됩니다.
+
+        Args:
+            session_id: 호출한 세션 ID
+            model_name: 모델 이름
+            prompt: 프롬프트
+            generation_config: 생성 설정
+
+        Yields:
+            str: 도착한 텍스트 조각
+
+        Raises:
+            Exception: 호출 중 발생한 오류
+        """
+        call = _Call(session_id, model_name, prompt, generation_config, chunks=queue.Queue())
+        self._schedule(call)
+        try:
+            while True:
+                item = call.chunks.get()
+                if item is _DONE:
+                    break
+                yield item
+            call.future.result()
+        finally:
+            call.future.cancel()
+
+    async def generate_async(self, session_id: str, model_name: str, prompt: Any,
+                             generation_config: Optional[Dict[str, Any]] = None,
+                             cached_content: Any = None) -> str:
+        """
+        LLM 호출을 제출하고 결과를 기다립니다. (디스패처 루프에서 실행되는 코루틴에서 사용)
+        기다리는 코루틴이 취소되면 호출도 취소됩니다.
+
+        Args:
+            session_id: 호출한 세션 ID
+            model_name: 모델 이름
+            prompt: 프롬프트
+            generation_config: 생성 설정
+            cached_content: 프롬프트 앞에 쓸 컨텍스트 캐시
+
+        Returns:
+            str: 생성된 텍스트
+
+        Raises:
+            Exception: 호출 중 발생한 오류
+        """
+        call = _Call(session_id, model_name, prompt, generation_config, cached_content)
+        self._schedule(call)
+        try:
+            return await asyncio.wrap_future(call.future)
+        finally:
+            call.future.cancel()
+
+    async def stream_async(self, session_id: str, model_name: str, prompt: Any,
+                           generation_config: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """
+        stream()의 비동기 버전입니다. (디스패처 루프에서 실행되는 코루틴에서 사용)
+
+        Args:
+            session_id: 호출한 세션 ID
+            model_name: 모델 이름
+            prompt: 프롬프트
+            generation_config: 생성 설정
+
+        Yields:
+            str: 도착한 텍스트 조각
+
+        Raises:
+            Exception: 호출 중 발생한 오류
+        """
+        call = _Call(session_id, model_name, prompt, generation_config, chunks=asyncio.Queue())
+        self._schedule(call)
+        try:
+            while True:
+                item = await call.chunks.get()
+                if item is _DONE:
+                    break
+                yield item
+            await asyncio.wrap_future(call.future)
+        finally:
+            call.future.cancel()
+
+    def run_coroutine(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """
+        코루틴을 디스패처 루프에서 실행합니다. 어느 스레드에서나 호출할 수 있습니다.
+        코루틴은 호출한 스레드의 컨텍스트(추적 구간 등)를 이어받습니다.
+
+        Args:
+            coro: 실행할 코루틴
+
+        Returns:
+            Future: 코루틴의 결과로 완료되는 Future (취소하면 대기 중인 코루틴은 시작되지 않고,
+                실행 중인 코루틴에는 CancelledError가 전달됨)
+        """
+        future: Future = Future()
+        context = contextvars.copy_context()
+
+        def start() -> None:
+            if future.cancelled():
+                coro.close()
+                return
+            task = self._loop.create_task(coro, context=context)
+            task.add_done_callback(lambda _: _copy_outcome(task, future))
+            future.add_done_callback(
+                lambda _: future.cancelled() and self._loop.call_soon_threadsafe(task.cancel)
+            )
+
+        self._loop.call_soon_threadsafe(start)
+        return future
+
+    def _schedule(self, call: _Call) -> None:
+        call.future.add_done_callback(lambda future: self._on_done(call))
+        metrics.increment("llm.dispatch.submitted")
+        self._loop.call_soon_threadsafe(self._enqueue, call)
+
+    def _on_done(self, call: _Call) -> None:
+        """Future가 취소되면 실행 중인 태스크도 중단합니다. (임의의 스레드에서 호출됨)"""
+        if call.future.cancelled():
+            self._loop.call_soon_threadsafe(self._cancel_task, call)
+
+    def _cancel_task(self, call: _Call) -> None:
+        if call.task is not None and not call.task.done():
+            call.task.cancel()
+
+    def _enqueue(self, call: _Call) -> None:
+        if call.future.done():
+            return
+        calls = self._queues.get(call.session_id)
+        if calls is None:
+            calls = self._queues[call.session_id] = deque()
+            self._ready.append(call.session_id)
+        calls.append(call)
+        self._pump()
+
+    def _pump(self) -> None:
+        """빈 자리만큼 세션을 돌아가며 대기 중인 호출을 하나씩 시작합니다."""
+        while self._running < self._max_concurrency and self._ready:
+            session_id = self._ready.popleft()
+            calls = self._queues[session_id]
+            call = calls.popleft()
+            if calls:
+                self._ready.append(session_id)
+            else:
+                del self._queues[session_id]
+            if call.future.done():
+                # 대기 중에 취소된 호출
+                metrics.increment("llm.dispatch.skipped")
+                continue
+            self._running += 1
+            # 태스크는 만들 때의 컨텍스트를 복사하므로 제출 시점 컨텍스트 안에서 만듦
+            call.task = call.context.run(self._loop.create_task, self._execute(call))
+
+    async def _execute(self, call: _Call) -> None:
+        from utils.llm import get_model, record_token_usage
+
+        started = time.monotonic()
+        metrics.observe("llm.dispatch.queue_seconds", started - call.enqueued_at)
+        with tracing.span('llm.dispatch', tracing.SPAN_KIND_CLIENT,
+                          **{'llm.model': call.model_name, 'llm.stream': call.chunks is not None,
+                             'llm.queue_seconds': round(started - call.enqueued_at, 4)}):
+            try:
+                model = get_model(call.model_name, call.cached_content)
+                if call.chunks is None:
+                    response = await model.generate_content_async(
+                        call.prompt, generation_config=call.generation_config
+                    )
+                    record_token_usage(response)
+                    _resolve(call.future, result=response.text)
+                else:
+                    response = await model.generate_content_async(
+                        call.prompt, generation_config=call.generation_config, stream=True
+                    )
+                    async for chunk in response:
+                        record_token_usage(chunk)
+                        call.chunks.put_nowait(chunk.text)
+                    _resolve(call.future, result=None)
+            except asyncio.CancelledError:
+                metrics.increment("llm.dispatch.cancelled")
+                tracing.set_attributes(**{'llm.cancelled': True})
+            except Exception as e:
+                tracing.set_attributes(**{'llm.error': type(e).__name__})
+                _resolve(call.future, error=e)
+            finally:
+                metrics.observe("llm.dispatch.duration_seconds", time.monotonic() - started)
+                if call.chunks is not None:
+                    call.chunks.put_nowait(_DONE)
+                self._running -= 1
+                self._pump()
+
+
+def _resolve(future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    """취소되지 않은 Future에 결과나 오류를 설정합니다."""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        # 그 사이 호출자가 취소한 경우
+        pass
+
+
+def _copy_outcome(task: asyncio.Task, future: Future) -> None:
+    """끝난 태스크의 결과나 오류를 Future에 옮깁니다. (Future가 먼저 취소된 경우 무시)"""
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        _resolve(future, error=task.exception())
+    else:
+        _resolve(future, result=task.result())
+
+
+_dispatcher: Optional[LLMDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+def get_llm_dispatcher() -> LLMDispatcher:
+    """
+    프로세스 전역 LLM 디스패처를 반환합니다. 처음 호출할 때 이벤트 루프 스레드를 시작합니다.
+
+    Returns:
+        LLMDispatcher: LLM 디스패처
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = LLMDispatcher()
+    return _dispatcher
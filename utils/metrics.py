@@ -0,0 +1,64 @@
+"""
+운영 지표 수집 유틸리티 모듈
+
+프로세스 전역 카운터와 관측값(합계·횟수·최대값)을 스레드 안전하게 누적합니다.
+LLM 호출, 취소·낭비된 생성 등 운영 중 확인해야 할 수치를 기록하는 데 사용합니다.
+
+Export 형태:
+- from utils.metrics import increment, observe, get_metrics, reset_metrics
+- 또는 import utils.metrics as metrics 후 metrics.increment('이름') 형태로 사용
+"""
+import threading
+from typing import Any, Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_observations: Dict[str, Dict[str, float]] = {}
+
+def increment(name: str, value: float = 1) -> None:
+    """
+    카운터를 증가시킵니다.
+
+    Args:
+        name: 지표 이름 (예: 'inflight.wasted')
+        value: 증가량
+    """
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def observe(name: str, value: float) -> None:
+    """
+    관측값(소요 시간 등)을 기록합니다. 합계, 횟수, 최대값이 누적됩니다.
+
+    Args:
+        name: 지표 이름 (예: 'inflight.wasted_seconds')
+        value: 관측값
+    """
+    with _lock:
+        stats = _observations.get(name)
+        if stats is None:
+            _observations[name] = {'count': 1, 'sum': value, 'max': value}
+        else:
+            stats['count'] += 1
+            stats['sum'] += value
+            if value > stats['max']:
+                stats['max'] = value
+
+def get_metrics() -> Dict[str, Any]:
+    """
+    현재까지 누적된 지표의 사본을 반환합니다.
+
+    Returns:
+        Dict[str, Any]: {'counters': {...}, 'observations': {이름: {'count', 'sum', 'max'}}}
+    """
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'observations': {name: dict(stats) for name, stats in _observations.items()},
+        }
+
+def reset_metrics() -> None:
+    """누적된 모든 지표를 비웁니다."""
+    with _lock:
+        _counters.clear()
+        _observations.clear()
@@ -0,0 +1,131 @@
+"""
+단계적 온보딩 백그라운드 작업 모듈
+
+온보딩 제출 시에는 짧은 핵심 특성 한 줄만 기다리고 곧바로 메인 화면을 엽니다.
+전체 사주 분석과 성장 로드맵은 이 모듈의 작업이 백그라운드에서 생성하며,
+분석 텍스트는 도착하는 대로 쌓여 메인 화면의 '내 사주 자세히 보기'에 스트리밍 표시됩니다.
+
+작업은 세션의 진행 중 생성(utils.inflight)으로 등록되어 LLM 디스패처 루프의 코루틴으로 실행되며,
+세션 초기화·연결 종료 시 함께 취소됩니다.
+
+Export 형태:
+- from utils.onboarding_job import SajuAnalysisJob
+- from utils.onboarding_job import start_saju_analysis_job, get_saju_analysis_job
+"""
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+
+from utils.inflight import Generation, current_session_id, get_inflight_registry, idempotency_key
+
+
+class SajuAnalysisJob:
+    """
+    전체 사주 분석(스트리밍)과 성장 로드맵을 차례로 생성하는 백그라운드 작업
+
+    스크립트 스레드는 text, analysis_done, roadmap, error, finished 속성을 읽기만 합니다.
+    """
+
+    def __init__(self, user_info: Dict[str, Any]) -> None:
+        # 작업마다 고유한 ID (같은 사용자의 작업이 두 번 제출되어도 각 작업이 자신의 생성을 가짐)
+        self.id = uuid.uuid4().hex
+        self._user_info = dict(user_info)
+        self._lock = threading.Lock()
+        self._chunks: List[str] = []
+        self._generation: Optional[Generation] = None
+        self.roadmap: Optional[str] = None
+        self.error: Optional[str] = None
+        # 분석 스트리밍이 끝나고 로드맵을 생성하는 단계인지 여부
+        self.analysis_done = False
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        """지금까지 도착한 분석 텍스트"""
+        with self._lock:
+            return "".join(self._chunks)
+
+    def start(self, session_id: str) -> None:
+        """
+        작업을 세션의 진행 중 생성으로 제출합니다.
+
+        Args:
+            session_id: 세션 ID
+        """
+        # 같은 사용자라도 키에 작업 ID를 넣어, 중복 제거로 다른 작업의 생성을 돌려받아
+        # 이 작업의 _run이 실행되지 않는(done이 설정되지 않는) 일이 없도록 함
+        key = idempotency_key('onboarding-analysis', self.id)
+        self._generation = get_inflight_registry().submit(session_id, key, self._run)
+
+    def cancel(self, reason: str) -> None:
+        """
+        작업을 취소합니다. (이미 끝난 작업은 그대로 둠)
+
+        Args:
+            reason: 취소 사유 (utils.inflight.GenerationCancelled 참고)
+        """
+        if self._generation is not None:
+            self._generation.cancel(reason)
+
+    @property
+    def cancelled(self) -> bool:
+        """세션 초기화·시간 초과 등으로 작업이 취소되었는지 여부"""
+        return self._generation is not None and self._generation.cancelled
+
+    @property
+    def finished(self) -> bool:
+        """작업이 끝났거나 취소되어 더 기다릴 필요가 없는지 여부"""
+        return self.done or self.cancelled
+
+    async def _run(self) -> None:
+        from utils.saju import generate_saju_insight, stream_saju_analysis
+
+        info = self._user_info
+        try:
+            async for chunk in stream_saju_analysis(info['name'], info['birthdate'], info['birth_hour']):
+                if self.cancelled:
+                    # 아래에서 취소 여부를 다시 확인하므로 여기서는 스트리밍만 멈춤 (done은 항상 설정)
+                    break
+                with self._lock:
+                    self._chunks.append(chunk)
+        except Exception as e:
+            self.error = f"분석 중 오류가 발생했습니다: {str(e)}"
+        self.analysis_done = True
+
+        try:
+            if not self.cancelled:
+                # 로드맵은 '나의 7일 계획' 탭에서 보므로 분석 뒤에 이어서 생성
+                self.roadmap = await generate_saju_insight(info)
+        finally:
+            self.done = True
+
+
+def start_saju_analysis_job(user_info: Dict[str, Any]) -> SajuAnalysisJob:
+    """
+    현재 세션에서 전체 사주 분석 작업을 시작하고 세션 상태에 보관합니다.
+    (온보딩 양식이 두 번 제출된 경우 등) 진행 중인 이전 작업은 취소합니다.
+
+    Args:
+        user_info: 사용자 정보 딕셔너리 (이름, 생년월일, 태어난 시간 포함)
+
+    Returns:
+        SajuAnalysisJob: 시작된 작업
+    """
+    previous = get_saju_analysis_job()
+    if previous is not None and not previous.finished:
+        previous.cancel('superseded')
+    job = SajuAnalysisJob(user_info)
+    job.start(current_session_id())
+    st.session_state['saju_analysis_job'] = job
+    return job
+
+def get_saju_analysis_job() -> Optional[SajuAnalysisJob]:
+    """
+    현재 세션에서 진행 중이거나 결과가 아직 반영되지 않은 분석 작업을 반환합니다.
+
+    Returns:
+        Optional[SajuAnalysisJob]: 분석 작업 (없으면 None)
+    """
+    return st.session_state.get('saju_analysis_job')
@@ -0,0 +1,230 @@
+"""
+7일 계획 재사용 라이브러리 모듈
+
+생성한 7일 계획을 (사주 서명, 핵심 고민)과 함께 SQLite 파일에 보관하고,
+같은 서명의 사용자가 비슷한 고민으로 계획을 요청하면 새로 생성하지 않고 보관된 계획을 재사용합니다.
+(같은 사용자의 이전 고민이든, 같은 서명을 가진 다른 사용자의 고민이든 같은 방식으로 찾습니다)
+
+- 고민 문장은 공백을 없앤 문자 2·3-gram을 해시하여 VECTOR_DIM 차원의 NumPy 벡터로 만들고 길이를 1로 맞춥니다.
+  ('어떻게 ... 할 수 있을까요?' 같은 요약 형식 문구는 유사도를 부풀리므로 먼저 지웁니다)
+- 서명별로 보관된 고민 벡터를 행렬 하나로 메모리에 두고, 질의 벡터와의 행렬 곱으로 코사인 유사도를 한 번에 계산합니다.
+- 유사도가 PLAN_REUSE_THRESHOLD 이상이면 재사용합니다. 다른 워커가 추가한 계획은 다음 조회 때 행렬에 덧붙습니다.
+- 계획 문구의 사용자 이름은 자리표시자로 바꿔 저장하고, 재사용할 때 요청한 사용자 이름을 채웁니다.
+  이름이 호칭 밖에 남거나 대화 내용·연락처가 들어간 계획은 다른 사용자에게 보여줄 수 없으므로 보관하지 않습니다. (utils.saju 참고)
+- NumPy는 온보딩 첫 화면의 시작 시간을 늘리지 않도록 처음 계획을 찾거나 보관할 때 임포트합니다.
+
+PLAN_REUSE=0 이면 재사용하지 않습니다. 파일 경로는 PLAN_LIBRARY_PATH 환경 변수로 지정합니다.
+
+Export 형태:
+- from utils.plan_library import PlanLibrary, StoredPlan, get_plan_library, set_plan_library, concern_vector
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import metrics
+from utils.search_index import normalize_text
+
+PLAN_REUSE = os.environ.get('PLAN_REUSE', '1') != '0'
+# 이 값 이상의 코사인 유사도면 보관된 계획을 재사용
+PLAN_REUSE_THRESHOLD = float(os.environ.get('PLAN_REUSE_THRESHOLD', '0.8'))
+DEFAULT_PLAN_LIBRARY_PATH = os.path.join(".cache", "plan_library.db")
+
+# 고민 벡터 차원과 n-gram 길이
+VECTOR_DIM = 1024
+NGRAM_SIZES = (2, 3)
+# 서명별로 메모리에 두는 최근 계획 수
+MAX_PLANS_PER_SIGNATURE = int(os.environ.get('PLAN_LIBRARY_MAX_PER_SIGNATURE', '500'))
+
+# 고민 요약 형식 문구와 문장부호 (고민 내용과 관계없이 모든 요약에 들어가므로 비교에서 제외)
+_CONCERN_BOILERPLATE = re.compile(r'어떻게|(?:할|될|을|를)?\s*수\s*있을까요|할까요|싶어요|[^\w\s]')
+
+
+def concern_vector(concern: str) -> Any:
+    """
+    고민 문장을 해시한 문자 n-gram 빈도 벡터로 만듭니다. (길이 1로 정규화, n-gram이 없으면 0 벡터)
+
+    Args:
+        concern: 고민 문장
+
+    Returns:
+        numpy.ndarray: VECTOR_DIM 차원 float32 벡터
+    """
+    import numpy as np
+
+    # 띄어쓰기가 달라도 같은 고민으로 보도록 공백을 모두 없앰
+    text = "".join(_CONCERN_BOILERPLATE.sub(" ", normalize_text(concern)).split())
+    indices = [zlib.crc32(text[i:i + n].encode()) % VECTOR_DIM
+               for n in NGRAM_SIZES for i in range(len(text) - n + 1)]
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    if indices:
+        np.add.at(vector, indices, 1.0)
+        vector /= np.linalg.norm(vector)
+    return vector
+
+
+@dataclass(frozen=True, slots=True)
+class StoredPlan:
+    """보관된 7일 계획 (items: (제목, 설명) 목록, 이름은 자리표시자 상태)"""
+    plan_id: int
+    concern: str
+    items: List[Tuple[str, str]]
+    explanation: str
+    similarity: float
+
+
+@dataclass(slots=True)
+class _SignatureIndex:
+    # ids: 계획 ID 배열, matrix: 고민 벡터 행렬 (numpy.ndarray)
+    last_id: int
+    ids: Any
+    matrix: Any
+
+
+class PlanLibrary:
+    """
+    (사주 서명, 고민) → 7일 계획 보관소와 서명별 고민 유사도 색인
+
+    utils.content_store와 같은 WAL·스레드별 연결 방식을 사용하므로 여러 워커가 같은 파일을 공유할 수 있습니다.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._local = threading.local()
+        self._indexes: Dict[str, _SignatureIndex] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, signature TEXT NOT NULL, concern TEXT NOT NULL, "
+            "items TEXT NOT NULL, explanation TEXT NOT NULL, created_at REAL NOT NULL, "
+            "uses INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS plans_signature ON plans (signature, id)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _index(self, signature: str) -> Optional[_SignatureIndex]:
+        """서명의 유사도 색인을 반환합니다. 마지막으로 읽은 뒤 추가된 계획이 있으면 행렬에 덧붙입니다."""
+        import numpy as np
+
+        conn = self._conn()
+        (latest,) = conn.execute("SELECT MAX(id) FROM plans WHERE signature = ?", (signature,)).fetchone()
+        if latest is None:
+            return None
+        with self._lock:
+            index = self._indexes.get(signature)
+            if index is not None and index.last_id >= latest:
+                return index
+            after = index.last_id if index is not None else 0
+            rows = conn.execute(
+                "SELECT id, concern FROM plans WHERE signature = ? AND id > ? ORDER BY id DESC LIMIT ?",
+                (signature, after, MAX_PLANS_PER_SIGNATURE)
+            ).fetchall()[::-1]
+            ids = np.array([row[0] for row in rows], dtype=np.int64)
+            matrix = np.stack([concern_vector(row[1]) for row in rows])
+            if index is not None:
+                ids = np.concatenate([index.ids, ids])[-MAX_PLANS_PER_SIGNATURE:]
+                matrix = np.concatenate([index.matrix, matrix])[-MAX_PLANS_PER_SIGNATURE:]
+            index = _SignatureIndex(int(ids[-1]), ids, matrix)
+            self._indexes[signature] = index
+            return index
+
+    def find(self, signature: str, concern: str, threshold: float = PLAN_REUSE_THRESHOLD) -> Optional[StoredPlan]:
+        """
+        같은 서명에서 고민이 가장 비슷한 계획을 찾습니다.
+
+        Args:
+            signature: 사주 서명 (utils.saju.saju_signature)
+            concern: 핵심 고민
+            threshold: 재사용할 최소 코사인 유사도
+
+        Returns:
+            Optional[StoredPlan]: 유사도가 threshold 이상인 계획 (없으면 None)
+        """
+        import numpy as np
+
+        index = self._index(signature)
+        if index is None:
+            return None
+        similarities = index.matrix @ concern_vector(concern)
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < threshold:
+            return None
+        plan_id = int(index.ids[best])
+        conn = self._conn()
+        row = conn.execute("SELECT concern, items, explanation FROM plans WHERE id = ?", (plan_id,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE plans SET uses = uses + 1 WHERE id = ?", (plan_id,))
+        return StoredPlan(plan_id, row[0], [tuple(item) for item in json.loads(row[1])], row[2], similarity)
+
+    def add(self, signature: str, concern: str, items: List[Tuple[str, str]], explanation: str) -> int:
+        """
+        생성한 계획을 보관합니다.
+
+        Args:
+            signature: 사주 서명
+            concern: 핵심 고민
+            items: (제목, 설명) 목록 (7개)
+            explanation: 추가 설명
+
+        Returns:
+            int: 계획 ID
+        """
+        cursor = self._conn().execute(
+            "INSERT INTO plans (signature, concern, items, explanation, created_at) VALUES (?, ?, ?, ?, ?)",
+            (signature, concern, json.dumps(items, ensure_ascii=False), explanation, time.time())
+        )
+        metrics.increment("plan_library.stored")
+        return cursor.lastrowid
+
+    def count(self, signature: Optional[str] = None) -> int:
+        """보관된 계획 수를 반환합니다. (서명을 주면 그 서명만)"""
+        if signature is None:
+            return self._conn().execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM plans WHERE signature = ?", (signature,)).fetchone()[0]
+
+
+_library: Optional[PlanLibrary] = None
+_library_lock = threading.Lock()
+
+def get_plan_library() -> PlanLibrary:
+    """
+    프로세스 전역 계획 라이브러리를 반환합니다. 경로는 PLAN_LIBRARY_PATH 환경 변수로 지정합니다.
+
+    Returns:
+        PlanLibrary: 계획 라이브러리
+    """
+    global _library
+    if _library is None:
+        with _library_lock:
+            if _library is None:
+                _library = PlanLibrary(os.environ.get("PLAN_LIBRARY_PATH", DEFAULT_PLAN_LIBRARY_PATH))
+    return _library
+
+def set_plan_library(library: Optional[PlanLibrary]) -> None:
+    """
+    전역 계획 라이브러리를 교체합니다. (테스트·도구에서 사용)
+
+    Args:
+        library: 사용할 라이브러리 (None이면 다음 호출 시 기본 라이브러리 생성)
+    """
+    global _library
+    with _library_lock:
+        _library = library
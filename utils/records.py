@@ -0,0 +1,284 @@
+"""
+세션 데이터 레코드 모듈
+
+대화 메시지, 7일 계획 항목, 태스크를 __slots__ 데이터클래스로 표현합니다.
+대화는 세션마다 MessageStore 하나에만 보관하며, (질문, 답변) 목록 같은 다른 형태는
+복사해 두지 않고 필요할 때 MessageStore에서 만들어 씁니다.
+
+최근 메시지만 세션 메모리에 두고, 오래된 메시지는 묶음 단위로 압축하여
+대화 보관소(SQLite, CHAT_ARCHIVE_PATH 환경 변수)로 옮깁니다.
+LLM 프롬프트는 최근 대화만 사용하므로 보관된 메시지는 내보내기 등 전체 대화가 필요할 때만 읽습니다.
+사용자 이벤트 로그(utils.event_log)가 연결되어 있으면 메시지 추가·되돌리기를 이벤트로 기록하고,
+검색 색인(utils.search_index)이 연결되어 있으면 함께 갱신합니다.
+
+Export 형태:
+- from utils.records import Message, PlanItem, Task
+- from utils.records import MessageStore, ChatArchive, get_chat_archive, set_chat_archive
+"""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from utils import tracing
+
+DEFAULT_CHAT_ARCHIVE_PATH = os.path.join(".cache", "chat_archive.db")
+
+# 세션 메모리에 유지할 최대 메시지 수 (넘으면 오래된 절반을 보관소로 옮김)
+LIVE_MESSAGE_LIMIT = int(os.environ.get('LIVE_MESSAGE_LIMIT', '40'))
+
+
+@dataclass(frozen=True, slots=True)
+class Message:
+    """대화 메시지 하나 (role: 'user' 또는 'assistant')"""
+    role: str
+    content: str
+
+
+@dataclass(frozen=True, slots=True)
+class PlanItem:
+    """LLM 응답에서 파싱한 7일 계획의 하루치 항목"""
+    day: str
+    title: str
+    description: str
+
+
+@dataclass(slots=True)
+class Task:
+    """캘린더 태스크 (7일 계획 항목도 태스크로 저장됨)"""
+    id: str
+    date: str
+    title: str
+    description: str
+    completed: bool = False
+    created_at: str = ""
+
+
+class ChatArchive:
+    """
+    세션 메모리에서 밀려난 대화 메시지 보관소
+
+    메시지 묶음을 zlib으로 압축한 JSON으로 저장합니다. (utils.content_store와 같은 WAL·스레드별 연결 방식)
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS chat_archive ("
+            "store_id TEXT NOT NULL, seq INTEGER NOT NULL, payload BLOB NOT NULL, "
+            "PRIMARY KEY (store_id, seq))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, store_id: str, seq: int, messages: List[Message]) -> None:
+        """
+        메시지 묶음을 보관합니다.
+
+        Args:
+            store_id: MessageStore ID
+            seq: 묶음 순번 (보관 순서)
+            messages: 보관할 메시지 목록
+        """
+        payload = zlib.compress(json.dumps([[m.role, m.content] for m in messages], ensure_ascii=False).encode())
+        self._conn().execute(
+            "INSERT OR REPLACE INTO chat_archive (store_id, seq, payload) VALUES (?, ?, ?)",
+            (store_id, seq, payload)
+        )
+
+    def load(self, store_id: str) -> Iterator[Message]:
+        """
+        보관된 메시지를 보관 순서대로 반환합니다.
+
+        Args:
+            store_id: MessageStore ID
+
+        Yields:
+            Message: 보관된 메시지
+        """
+        # 묶음을 하나씩 읽어 긴 대화도 압축 해제한 묶음 하나만 메모리에 둠
+        rows = self._conn().execute(
+            "SELECT payload FROM chat_archive WHERE store_id = ? ORDER BY seq", (store_id,)
+        )
+        for (payload,) in rows:
+            for role, content in json.loads(zlib.decompress(payload)):
+                yield Message(role, content)
+
+    def delete(self, store_id: str) -> None:
+        """보관된 메시지를 모두 삭제합니다."""
+        self._conn().execute("DELETE FROM chat_archive WHERE store_id = ?", (store_id,))
+
+
+_archive: Optional[ChatArchive] = None
+_archive_lock = threading.Lock()
+
+def get_chat_archive() -> ChatArchive:
+    """
+    프로세스 전역 대화 보관소를 반환합니다. 경로는 CHAT_ARCHIVE_PATH 환경 변수로 지정합니다.
+
+    Returns:
+        ChatArchive: 대화 보관소
+    """
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = ChatArchive(os.environ.get("CHAT_ARCHIVE_PATH", DEFAULT_CHAT_ARCHIVE_PATH))
+    return _archive
+
+def set_chat_archive(archive: Optional[ChatArchive]) -> None:
+    """
+    전역 대화 보관소를 교체합니다. (테스트·도구에서 사용)
+
+    Args:
+        archive: 사용할 보관소 (None이면 다음 호출 시 기본 보관소 생성)
+    """
+    global _archive
+    with _archive_lock:
+        _archive = archive
+
+
+class MessageStore:
+    """
+    세션의 유일한 대화 저장소
+
+    반복·인덱싱·len()은 세션 메모리에 있는 최근 메시지(live)만 대상으로 합니다.
+    전체 대화가 필요하면 all_messages()나 exchanges()를 사용합니다.
+    """
+
+    def __init__(self, live_limit: int = LIVE_MESSAGE_LIMIT) -> None:
+        self.id = uuid.uuid4().hex
+        self._live: List[Message] = []
+        self._live_limit = max(2, live_limit)
+        self._archived_count = 0
+        self._archived_batches = 0
+        # 사용자 이벤트 로그 (utils.event_log.EventJournal, 연결되지 않았으면 None)
+        self.journal = None
+        # 지난 대화 검색 색인 (utils.search_index.SearchIndex, 연결되지 않았으면 None)
+        self.search_index = None
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._live)
+
+    def __getitem__(self, index):
+        return self._live[index]
+
+    @property
+    def archived_count(self) -> int:
+        """보관소로 옮긴 메시지 수 (최근 메시지의 인덱스에 더하면 대화 전체에서의 위치)"""
+        return self._archived_count
+
+    @property
+    def total(self) -> int:
+        """보관된 메시지를 포함한 전체 메시지 수"""
+        return self._archived_count + len(self._live)
+
+    def append(self, role: str, content: str) -> Message:
+        """
+        메시지를 추가합니다. 최근 메시지가 한도를 넘으면 오래된 절반을 보관소로 옮깁니다.
+
+        Args:
+            role: 'user' 또는 'assistant'
+            content: 메시지 내용
+
+        Returns:
+            Message: 추가된 메시지
+        """
+        message = Message(role, content)
+        self._live.append(message)
+        tracing.add_event('state.message_appended', role=role, chars=len(content))
+        if self.journal is not None:
+            self.journal.record('message.append', role=role, content=content)
+        if self.search_index is not None:
+            self.search_index.add('message', self.total - 1, content, role)
+        if len(self._live) > self._live_limit:
+            self._archive_oldest(len(self._live) - self._live_limit // 2)
+        return message
+
+    def extend(self, messages: Iterable[Tuple[str, str]]) -> int:
+        """
+        메시지 여러 개를 한꺼번에 추가합니다. (기록 가져오기에서 사용)
+        이벤트 로그에는 한 번의 트랜잭션으로 기록하고, 한도를 넘은 메시지는 한 묶음으로 보관소로 옮깁니다.
+
+        Args:
+            messages: (role, content) 목록
+
+        Returns:
+            int: 추가한 메시지 수
+        """
+        batch = [Message(role, content) for role, content in messages]
+        start = self.total
+        self._live.extend(batch)
+        if self.journal is not None:
+            self.journal.record_many('message.append', [{'role': m.role, 'content': m.content} for m in batch])
+        if self.search_index is not None:
+            self.search_index.add_many('message', ((start + i, m.content, m.role) for i, m in enumerate(batch)))
+        if len(self._live) > self._live_limit:
+            self._archive_oldest(len(self._live) - self._live_limit // 2)
+        return len(batch)
+
+    def pop(self) -> Message:
+        """마지막 메시지를 꺼냅니다. (답변 생성이 취소·실패한 질문을 되돌릴 때 사용)"""
+        message = self._live.pop()
+        if self.journal is not None:
+            self.journal.record('message.pop')
+        if self.search_index is not None:
+            self.search_index.remove('message', self.total, message.content)
+        return message
+
+    def _archive_oldest(self, count: int) -> None:
+        batch, self._live = self._live[:count], self._live[count:]
+        get_chat_archive().append(self.id, self._archived_batches, batch)
+        self._archived_batches += 1
+        self._archived_count += len(batch)
+        tracing.add_event('state.messages_archived', count=len(batch))
+
+    def all_messages(self) -> Iterator[Message]:
+        """
+        보관된 메시지를 포함한 전체 대화를 순서대로 반환합니다.
+
+        Yields:
+            Message: 메시지
+        """
+        if self._archived_count:
+            yield from get_chat_archive().load(self.id)
+        yield from list(self._live)
+
+    def exchanges(self) -> Iterator[Tuple[str, str]]:
+        """
+        전체 대화에서 (사용자 질문, 바로 이어진 AI 답변) 쌍을 만듭니다.
+
+        Yields:
+            Tuple[str, str]: (질문, 답변)
+        """
+        question: Optional[str] = None
+        for message in self.all_messages():
+            if message.role == 'user':
+                question = message.content
+            elif question is not None:
+                yield question, message.content
+                question = None
+
+    def discard(self) -> None:
+        """메모리와 보관소의 대화를 모두 지웁니다. (세션 초기화 시 호출)"""
+        self._live = []
+        if self._archived_count:
+            get_chat_archive().delete(self.id)
+        self._archived_count = 0
+        self._archived_batches = 0
@@ -0,0 +1,138 @@
+"""
+스크립트 실행별 프로파일러 모듈
+
+요청 시에만 스크립트 실행(재실행) 하나를 cProfile로 감싸 측정하고,
+SLOW_RERUN_SECONDS보다 오래 걸린 실행의 프로파일만 파일로 저장합니다.
+저장한 프로파일에는 세션 ID와 그 실행을 일으킨 사용자 동작(칩 클릭, 채팅 입력, 계획 버튼 등)이 붙으며,
+scripts/profile_report.py로 동작별 상위 함수 보고서를 만들 수 있습니다.
+
+프로파일링 켜는 방법:
+- PROFILE_RERUNS=1 환경 변수: 모든 세션의 모든 실행
+- PROFILE_QUERY_TOKEN 환경 변수를 정해 두고 주소에 ?profile=<토큰>을 붙이면 그 브라우저 세션의 실행만 (관리자용)
+
+저장 위치는 PROFILE_DIR 환경 변수로 지정합니다. (<시각>_<화면>_<동작>_<세션>.prof 파일과 index.jsonl)
+
+기록되는 지표:
+- profiler.rerun_seconds.<화면>: 프로파일링한 실행 한 번의 소요 시간
+- profiler.slow_reruns: 저장한 느린 실행 수
+
+Export 형태:
+- from utils.rerun_profiler import RerunProfile, start_rerun_profile, finish_rerun_profile, mark_rerun_action
+"""
+import cProfile
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from utils import metrics, tracing
+
+PROFILE_RERUNS = os.environ.get('PROFILE_RERUNS', '').lower() in ('1', 'true', 'yes')
+# 주소의 ?profile= 값과 비교할 관리자 토큰 (비어 있으면 주소로 켤 수 없음)
+PROFILE_QUERY_TOKEN = os.environ.get('PROFILE_QUERY_TOKEN', '')
+# 이보다 오래 걸린 실행만 프로파일을 저장 (초)
+SLOW_RERUN_SECONDS = float(os.environ.get('SLOW_RERUN_SECONDS', '1.0'))
+DEFAULT_PROFILE_DIR = os.path.join(".cache", "profiles")
+
+# 동작을 따로 표시하지 않은 실행 (탭 전환, 진행 상황 갱신 등)
+DEFAULT_ACTION = 'rerun'
+
+# 스크립트 스레드별 진행 중인 프로파일
+_current = threading.local()
+_index_lock = threading.Lock()
+
+
+class RerunProfile:
+    """스크립트 실행 하나의 프로파일"""
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self.action = DEFAULT_ACTION
+        self.profiler = cProfile.Profile()
+        self.started = time.perf_counter()
+
+
+def _profiling_requested() -> bool:
+    if PROFILE_RERUNS:
+        return True
+    if not PROFILE_QUERY_TOKEN:
+        return False
+    import streamlit as st
+    try:
+        token = st.query_params.get('profile', '')
+    except Exception:
+        return False
+    return hmac.compare_digest(token.encode(), PROFILE_QUERY_TOKEN.encode())
+
+def start_rerun_profile() -> Optional[RerunProfile]:
+    """
+    프로파일링이 요청된 경우 현재 스크립트 실행의 프로파일링을 시작합니다.
+
+    Returns:
+        Optional[RerunProfile]: 프로파일 (요청되지 않았으면 None)
+    """
+    if not _profiling_requested():
+        return None
+    from utils.inflight import current_session_id
+    profile = RerunProfile(current_session_id())
+    try:
+        profile.profiler.enable()
+    except ValueError:
+        # 이 스레드에서 다른 프로파일러가 이미 동작 중
+        metrics.increment("profiler.skipped")
+        return None
+    _current.profile = profile
+    return profile
+
+def mark_rerun_action(action: str) -> None:
+    """
+    현재 실행을 일으킨 사용자 동작을 프로파일과 추적 최상위 구간(utils.tracing)에 기록합니다.
+
+    Args:
+        action: 동작 이름 (예: 'chip_click', 'chat_input', 'plan_button')
+    """
+    tracing.annotate_rerun(**{'ui.action': action})
+    profile = getattr(_current, 'profile', None)
+    if profile is not None:
+        profile.action = action
+
+def finish_rerun_profile(profile: Optional[RerunProfile], screen: str) -> Optional[str]:
+    """
+    프로파일링을 끝내고, 실행이 SLOW_RERUN_SECONDS보다 오래 걸렸으면 프로파일을 저장합니다.
+
+    Args:
+        profile: start_rerun_profile()이 반환한 프로파일
+        screen: 화면 이름 (예: 'onboarding', 'chat', 'roadmap')
+
+    Returns:
+        Optional[str]: 저장한 프로파일 파일 경로 (저장하지 않았으면 None)
+    """
+    if profile is None:
+        return None
+    profile.profiler.disable()
+    if getattr(_current, 'profile', None) is profile:
+        _current.profile = None
+    elapsed = time.perf_counter() - profile.started
+    metrics.observe(f"profiler.rerun_seconds.{screen}", elapsed)
+    if elapsed < SLOW_RERUN_SECONDS:
+        return None
+
+    profile_dir = os.environ.get("PROFILE_DIR", DEFAULT_PROFILE_DIR)
+    os.makedirs(profile_dir, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+    name = "_".join(re.sub(r'[^0-9A-Za-z-]', '-', part)
+                    for part in (stamp, screen, profile.action, profile.session_id[:8]))
+    path = os.path.join(profile_dir, f"{name}.prof")
+    profile.profiler.dump_stats(path)
+    entry = {
+        'file': os.path.basename(path), 'recorded_at': now, 'seconds': round(elapsed, 4),
+        'screen': screen, 'action': profile.action, 'session_id': profile.session_id,
+    }
+    with _index_lock, open(os.path.join(profile_dir, "index.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    metrics.increment("profiler.slow_reruns")
+    return path
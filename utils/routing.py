@@ -0,0 +1,398 @@
+"""
+작업별 모델 라우팅 및 생성 설정 모듈
+
+LLM을 쓰는 작업(상담 답변, 고민 요약, 7일 계획, 사주 분석 등)마다
+모델 등급(tier)과 생성 설정(최대 출력 토큰, temperature, 중단 시퀀스, 응답 MIME 타입)을 정해 두고,
+기본 등급이 느리거나 오류가 나면 대체 등급으로 넘어갑니다.
+
+등급별 모델 이름은 환경 변수(LLM_MODEL_FAST, LLM_MODEL_STANDARD, LLM_MODEL_PRO)로 바꿀 수 있습니다.
+
+Export 형태:
+- from utils.routing import GenerationProfile, Route, ROUTES, MODEL_TIERS
+- from utils.routing import generate_for_task, stream_for_task, get_route, get_tier_health
+- from utils.routing import generate_for_task_async, stream_for_task_async (디스패처 루프의 코루틴용)
+"""
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.llm import (DEFAULT_MODEL, CachedPrefix, LLMUnavailable, RateLimitExceeded, generate_text,
+                       generate_text_async, get_genai, stream_text, stream_text_async)
+
+# 등급별 모델 이름
+MODEL_TIERS: Dict[str, str] = {
+    'fast': os.environ.get('LLM_MODEL_FAST', 'gemini-1.5-flash-8b'),
+    'standard': os.environ.get('LLM_MODEL_STANDARD', DEFAULT_MODEL),
+    'pro': os.environ.get('LLM_MODEL_PRO', 'gemini-1.5-pro'),
+}
+
+# 연속 오류가 이 횟수 이상이면 쿨다운 동안 해당 등급을 건너뜀
+ERROR_THRESHOLD = 3
+ERROR_COOLDOWN_SECONDS = 60.0
+# 지연 시간 이동 평균의 가중치
+LATENCY_EWMA_ALPHA = 0.3
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """작업별 생성 설정"""
+    max_output_tokens: int
+    temperature: float
+    stop_sequences: Tuple[str, ...] = ()
+    response_mime_type: Optional[str] = None
+
+    def to_config(self) -> Dict[str, Any]:
+        """
+        SDK에 전달할 generation_config 딕셔너리를 만듭니다.
+        설치된 SDK가 지원하지 않는 항목(response_mime_type 등)은 제외합니다.
+
+        Returns:
+            Dict[str, Any]: generation_config
+        """
+        config: Dict[str, Any] = {
+            'max_output_tokens': self.max_output_tokens,
+            'temperature': self.temperature,
+        }
+        if self.stop_sequences:
+            config['stop_sequences'] = list(self.stop_sequences)
+        if self.response_mime_type and _supports_config_field('response_mime_type'):
+            config['response_mime_type'] = self.response_mime_type
+        return config
+
+
+@dataclass(frozen=True)
+class Route:
+    """작업 하나의 라우팅 규칙"""
+    tier: str
+    profile: GenerationProfile
+    fallback_tiers: Tuple[str, ...] = ()
+    # 이 등급의 평균 지연이 예산(초)을 넘으면 대체 등급을 먼저 시도
+    latency_budget: float = 20.0
+
+
+ROUTES: Dict[str, Route] = {
+    # 온보딩 첫 화면의 핵심 특성 한 줄
+    'core_traits': Route('fast', GenerationProfile(64, 0.4, ('\n\n',)), ('standard',), latency_budget=3.0),
+    # 2-3문장 상담 답변
+    'chat_reply': Route('standard', GenerationProfile(256, 0.8), ('fast',), latency_budget=8.0),
+    # 한 문장 핵심 고민 요약
+    'concern_summary': Route('fast', GenerationProfile(96, 0.2, ('\n\n',)), ('standard',), latency_budget=4.0),
+    # Day 1~7 형식의 구조화된 계획 (요약+계획 통합 요청 포함)
+    'weekly_plan': Route('standard', GenerationProfile(1024, 0.6, response_mime_type='text/plain'),
+                         ('fast',), latency_budget=20.0),
+    # 5개 항목의 장문 사주 분석
+    'analysis': Route('standard', GenerationProfile(1536, 0.7), ('pro',), latency_budget=30.0),
+    # 성장 로드맵 인사이트 (400~600자)
+    'insight': Route('standard', GenerationProfile(1024, 0.7), ('pro',), latency_budget=25.0),
+}
+
+_config_fields: Optional[set] = None
+
+def _supports_config_field(name: str) -> bool:
+    """설치된 SDK의 GenerationConfig가 해당 항목을 지원하는지 반환합니다."""
+    global _config_fields
+    if _config_fields is None:
+        try:
+            config_type = get_genai().types.GenerationConfig
+            _config_fields = set(getattr(config_type, '__dataclass_fields__', None)
+                                 or getattr(config_type, '__annotations__', {}))
+        except Exception:
+            _config_fields = set()
+    return name in _config_fields
+
+
+@dataclass
+class _TierStats:
+    latency_ewma: Optional[float] = None
+    consecutive_errors: int = 0
+    open_until: float = 0.0
+    calls: int = 0
+    errors: int = 0
+
+
+class TierHealth:
+    """
+    등급별 지연 시간 이동 평균과 연속 오류 수를 추적합니다.
+
+    모델 호출을 시도하지 않은 거절(회로 차단기, 부정 캐시: LLMUnavailable)은 오류로 세지 않습니다.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._stats: Dict[str, _TierStats] = {}
+
+    def record_success(self, tier: str, latency: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(tier, _TierStats())
+            stats.calls += 1
+            stats.consecutive_errors = 0
+            if stats.latency_ewma is None:
+                stats.latency_ewma = latency
+            else:
+                stats.latency_ewma += LATENCY_EWMA_ALPHA * (latency - stats.latency_ewma)
+
+    def record_error(self, tier: str) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(tier, _TierStats())
+            stats.calls += 1
+            stats.errors += 1
+            stats.consecutive_errors += 1
+            if stats.consecutive_errors >= ERROR_THRESHOLD:
+                stats.open_until = self._clock() + ERROR_COOLDOWN_SECONDS
+
+    def is_usable(self, tier: str, latency_budget: float) -> bool:
+        """
+        등급을 지금 우선 시도해도 되는지 반환합니다.
+
+        Args:
+            tier: 모델 등급
+            latency_budget: 작업의 지연 예산 (초)
+
+        Returns:
+            bool: 최근 연속 오류로 쉬는 중이 아니고 평균 지연이 예산 이내이면 True
+        """
+        with self._lock:
+            stats = self._stats.get(tier)
+            if stats is None:
+                return True
+            if self._clock() < stats.open_until:
+                return False
+            return stats.latency_ewma is None or stats.latency_ewma <= latency_budget
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """등급별 통계 사본을 반환합니다."""
+        with self._lock:
+            return {tier: dict(vars(stats)) for tier, stats in self._stats.items()}
+
+
+_health = TierHealth()
+
+def get_tier_health() -> TierHealth:
+    """
+    프로세스 전역 등급 상태 추적기를 반환합니다.
+
+    Returns:
+        TierHealth: 등급 상태 추적기
+    """
+    return _health
+
+def get_route(task: str) -> Route:
+    """
+    작업의 라우팅 규칙을 반환합니다.
+
+    Args:
+        task: 작업 이름 (ROUTES의 키)
+
+    Returns:
+        Route: 라우팅 규칙
+    """
+    return ROUTES[task]
+
+def _candidate_tiers(route: Route) -> List[str]:
+    """시도할 등급 순서를 정합니다. 상태가 나쁜 등급은 뒤로 보냅니다."""
+    tiers = [route.tier] + [tier for tier in route.fallback_tiers if tier != route.tier]
+    usable = [tier for tier in tiers if _health.is_usable(tier, route.latency_budget)]
+    return usable + [tier for tier in tiers if tier not in usable]
+
+def _generate_on_tier(prompt: str, model_name: str, cache_ttl: Optional[float], config: Dict[str, Any],
+                      cached_prefix: Optional[CachedPrefix]) -> str:
+    """
+    한 등급의 모델로 텍스트를 생성합니다. 컨텍스트 캐시가 이 모델의 것이면 캐시 뒤에 이어 보내고,
+    캐시를 쓴 호출이 실패하면(서버에서 만료·삭제 등) 캐시를 버리고 전체 프롬프트로 다시 보냅니다.
+    """
+    if cached_prefix is not None and cached_prefix.model_name == model_name:
+        try:
+            return generate_text(prompt, model_name=model_name, generation_config=config,
+                                 cached_prefix=cached_prefix)
+        except (RateLimitExceeded, LLMUnavailable):
+            raise
+        except Exception:
+            cached_prefix.discard()
+    return generate_text(prompt, model_name=model_name, cache_ttl=cache_ttl, generation_config=config)
+
+async def _generate_on_tier_async(prompt: str, model_name: str, cache_ttl: Optional[float], config: Dict[str, Any],
+                                  cached_prefix: Optional[CachedPrefix]) -> str:
+    """_generate_on_tier()의 비동기 버전"""
+    if cached_prefix is not None and cached_prefix.model_name == model_name:
+        try:
+            return await generate_text_async(prompt, model_name=model_name, generation_config=config,
+                                             cached_prefix=cached_prefix)
+        except (RateLimitExceeded, LLMUnavailable):
+            raise
+        except Exception:
+            # 캐시 삭제는 원격 호출이므로 스레드에서 실행
+            await asyncio.to_thread(cached_prefix.discard)
+    return await generate_text_async(prompt, model_name=model_name, cache_ttl=cache_ttl, generation_config=config)
+
+def generate_for_task(task: str, prompt: str, cache_ttl: Optional[float] = None,
+                      cached_prefix: Optional[CachedPrefix] = None) -> str:
+    """
+    작업의 라우팅 규칙에 따라 모델과 생성 설정을 골라 텍스트를 생성합니다.
+    오류가 나면 다음 등급으로 재시도합니다.
+
+    Args:
+        task: 작업 이름 (ROUTES의 키)
+        prompt: 프롬프트
+        cache_ttl: 응답 재사용 기간 (초, generate_text 참고)
+        cached_prefix: prompt의 앞부분을 올려 둔 컨텍스트 캐시 (캐시를 만든 모델의 등급에서만 사용)
+
+    Returns:
+        str: 생성된 텍스트
+
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        Exception: 모든 등급에서 실패한 경우 마지막 오류
+    """
+    route = ROUTES[task]
+    config = route.profile.to_config()
+    last_error: Optional[Exception] = None
+    for tier in _candidate_tiers(route):
+        started = time.monotonic()
+        try:
+            text = _generate_on_tier(prompt, MODEL_TIERS[tier], cache_ttl, config, cached_prefix)
+        except RateLimitExceeded:
+            raise
+        except LLMUnavailable as e:
+            # 호출 전에 거절된 것이므로 등급 오류로 세지 않고 (회로 차단기가 이미 반영) 다음 등급 시도
+            last_error = e
+            continue
+        except Exception as e:
+            _health.record_error(tier)
+            last_error = e
+            continue
+        _health.record_success(tier, time.monotonic() - started)
+        return text
+    raise last_error
+
+def stream_for_task(task: str, prompt: str, cache_ttl: Optional[float] = None) -> Iterator[str]:
+    """
+    작업의 라우팅 규칙에 따라 텍스트를 스트리밍 생성합니다.
+    첫 조각이 도착하기 전에 오류가 나면 다음 등급으로 재시도합니다.
+
+    Args:
+        task: 작업 이름 (ROUTES의 키)
+        prompt: 프롬프트
+        cache_ttl: 응답 재사용 기간 (초, stream_text 참고)
+
+    Yields:
+        str: 도착한 텍스트 조각
+
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        Exception: 모든 등급에서 실패했거나 스트리밍 도중 오류가 난 경우
+    """
+    route = ROUTES[task]
+    config = route.profile.to_config()
+    last_error: Optional[Exception] = None
+    for tier in _candidate_tiers(route):
+        started = time.monotonic()
+        received = False
+        try:
+            for chunk in stream_text(prompt, model_name=MODEL_TIERS[tier], cache_ttl=cache_ttl,
+                                     generation_config=config):
+                if not received:
+                    # 스트리밍은 첫 조각까지의 지연으로 등급 상태를 판단
+                    _health.record_success(tier, time.monotonic() - started)
+                    received = True
+                yield chunk
+        except RateLimitExceeded:
+            raise
+        except LLMUnavailable as e:
+            # 첫 조각 전에 거절된 것이므로 등급 오류로 세지 않고 다음 등급 시도
+            last_error = e
+            continue
+        except Exception as e:
+            _health.record_error(tier)
+            if received:
+                raise
+            last_error = e
+            continue
+        return
+    raise last_error
+
+async def generate_for_task_async(task: str, prompt: str, cache_ttl: Optional[float] = None,
+                                  cached_prefix: Optional[CachedPrefix] = None) -> str:
+    """
+    generate_for_task()의 비동기 버전입니다. 디스패처 루프에서 실행되는 코루틴에서 사용합니다.
+
+    Args:
+        task: 작업 이름 (ROUTES의 키)
+        prompt: 프롬프트
+        cache_ttl: 응답 재사용 기간 (초)
+        cached_prefix: prompt의 앞부분을 올려 둔 컨텍스트 캐시
+
+    Returns:
+        str: 생성된 텍스트
+
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        Exception: 모든 등급에서 실패한 경우 마지막 오류
+    """
+    route = ROUTES[task]
+    config = route.profile.to_config()
+    last_error: Optional[Exception] = None
+    for tier in _candidate_tiers(route):
+        started = time.monotonic()
+        try:
+            text = await _generate_on_tier_async(prompt, MODEL_TIERS[tier], cache_ttl, config, cached_prefix)
+        except RateLimitExceeded:
+            raise
+        except LLMUnavailable as e:
+            # 호출 전에 거절된 것이므로 등급 오류로 세지 않고 (회로 차단기가 이미 반영) 다음 등급 시도
+            last_error = e
+            continue
+        except Exception as e:
+            _health.record_error(tier)
+            last_error = e
+            continue
+        _health.record_success(tier, time.monotonic() - started)
+        return text
+    raise last_error
+
+async def stream_for_task_async(task: str, prompt: str, cache_ttl: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    stream_for_task()의 비동기 버전입니다. 디스패처 루프에서 실행되는 코루틴에서 사용합니다.
+
+    Args:
+        task: 작업 이름 (ROUTES의 키)
+        prompt: 프롬프트
+        cache_ttl: 응답 재사용 기간 (초)
+
+    Yields:
+        str: 도착한 텍스트 조각
+
+    Raises:
+        RateLimitExceeded: 분당 호출 제한을 초과한 경우
+        Exception: 모든 등급에서 실패했거나 스트리밍 도중 오류가 난 경우
+    """
+    route = ROUTES[task]
+    config = route.profile.to_config()
+    last_error: Optional[Exception] = None
+    for tier in _candidate_tiers(route):
+        started = time.monotonic()
+        received = False
+        try:
+            async for chunk in stream_text_async(prompt, model_name=MODEL_TIERS[tier], cache_ttl=cache_ttl,
+                                                 generation_config=config):
+                if not received:
+                    _health.record_success(tier, time.monotonic() - started)
+                    received = True
+                yield chunk
+        except RateLimitExceeded:
+            raise
+        except LLMUnavailable as e:
+            # 첫 조각 전에 거절된 것이므로 등급 오류로 세지 않고 다음 등급 시도
+            last_error = e
+            continue
+        except Exception as e:
+            _health.record_error(tier)
+            if received:
+                raise
+            last_error = e
+            continue
+        return
+    raise last_error
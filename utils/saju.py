@@ -1,19 +1,53 @@
 """
 사주 분석 및 생성과 관련된 유틸리티 함수 모듈
 
+generate_saju_insight, generate_core_traits, stream_saju_analysis, summarize_conversation_async는
+진행 중 생성(utils.inflight)으로 LLM 디스패처 루프에서 실행되는 코루틴(비동기 생성기) 함수입니다.
+
 Export 형태:
 - from utils.saju import get_saju_elements
 - from utils.saju import generate_saju_insight
-- from utils.saju import analyze_saju
-- 또는 import utils.saju as saju 후 saju.analyze_saju() 형태로 사용
+- from utils.saju import generate_core_traits, stream_saju_analysis, extract_core_traits
+- from utils.saju import saju_signature, get_signature_template, get_signature_template_async, render_with_name
+- from utils.saju import summarize_conversation, summarize_conversation_async, generate_weekly_plan
+- from utils.saju import stream_weekly_plan, PlanStreamParser, find_reusable_plan
+- 또는 import utils.saju as saju 후 saju.stream_weekly_plan() 형태로 사용
 """
+import asyncio
 import datetime
+import os
 import random
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, AsyncIterator, Iterator, Optional, List, Tuple
+
+from utils import metrics
+from utils.llm import DegradedResponse, LLMUnavailable, is_degraded
+from utils.records import Message, PlanItem
+from utils.routing import generate_for_task, generate_for_task_async, stream_for_task, stream_for_task_async
+from utils.context_cache import COUNSELLING_INSTRUCTIONS, get_context_cache
+from utils.session import get_user_key
+from utils.content_store import get_content_store
+from utils.plan_library import PLAN_REUSE, StoredPlan, get_plan_library
+from utils.tracing import traced
+
+# 고민 상담 답변 시 함께 보내는 최근 대화 메시지 수
+RECENT_TURNS = 4
+
+# 같은 입력에 대한 LLM 응답 재사용 기간 (초)
+INSIGHT_CACHE_TTL = 24 * 60 * 60
+PLAN_CACHE_TTL = 60 * 60
 
-import google.generativeai as genai
-import streamlit as st
+# 사주 분석·인사이트를 이름 없는 사주 서명별 템플릿으로 생성·재사용할지 여부
+NAME_FREE_CONTENT = os.environ.get('NAME_FREE_CONTENT', '1') != '0'
+# 이름 없는 템플릿에서 사용자 이름이 들어갈 자리
+NAME_PLACEHOLDER = "{{이름}}"
+NAME_PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*이름\s*\}\}')
+
+def _degraded(prefix: str, error: Exception) -> DegradedResponse:
+    """LLM 호출 실패 시 화면에 보여줄 안내 문구를 만듭니다. (콘텐츠로 저장되지 않음)"""
+    if isinstance(error, LLMUnavailable):
+        return DegradedResponse(str(error))
+    return DegradedResponse(f"{prefix}: {str(error)}")
 
 def get_saju_elements(birthdate: datetime.date, birth_hour: str) -> Dict[str, str]:
     """
@@ -47,63 +81,68 @@ def get_saju_elements(birthdate: datetime.date, birth_hour: str) -> Dict[str, st
     
     return elements
 
-def generate_saju_insight(user_info: Dict[str, Any], question: Optional[str] = None) -> str:
+def _build_counselling_profile(user_info: Dict[str, Any]) -> str:
+    """고민 상담용 상담자 정보 블록을 생성합니다. (사용자별로 고정되어 캐시 대상)"""
+    return f"""
+    상담자 정보:
+    - 이름: {user_info['name']}
+    - 생년월일: {user_info['birthdate'].strftime('%Y년 %m월 %d일')}
+    - 태어난 시간: {user_info['birth_hour']}
+    """
+
+def _build_counselling_turn(question: str, history: Optional[List[Message]] = None) -> str:
+    """최근 대화와 이번 질문으로 이번 턴에 전송할 내용을 생성합니다."""
+    recent = (history or [])[-RECENT_TURNS:]
+    recent_text = _format_conversation(recent) if recent else ""
+    if recent_text:
+        return f"""
+    최근 대화:
+    {recent_text}
+    상담 내용: {question}
+    """
+    return f"""
+    상담 내용: {question}
+    """
+
+@traced('saju.insight')
+async def generate_saju_insight(user_info: Dict[str, Any], question: Optional[str] = None,
+                          history: Optional[List[Message]] = None) -> str:
     """
     사주 정보를 기반으로 Gemini API를 통해 인사이트를 생성합니다.
     
     Args:
         user_info: 사용자 정보 딕셔너리 (이름, 생년월일, 태어난 시간 포함)
         question: 선택적 질문 (없으면 일반적인 사주 분석 제공)
+        history: 이번 질문 이전의 대화 메시지 목록 (최근 RECENT_TURNS개만 전송)
         
     Returns:
-        str: 생성된 사주 인사이트 텍스트
+        str: 생성된 사주 인사이트 텍스트 (생성에 실패하면 DegradedResponse)
     """
-    try:
-        gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-    except Exception as e:
-        return f"API 설정이 필요합니다: {e}"
-    
     saju_elements = get_saju_elements(user_info['birthdate'], user_info['birth_hour'])
     
     if question:
-        prompt = f"""
-        당신은 사주 전문 상담사입니다. 
-        편안한 반말로 대화하되, 전문성은 유지합니다.
-        마치 오래 알고 지낸 선배나 친구처럼 대화하세요.
+        # 정적 지침과 사주 프로필은 컨텍스트 캐시에 두고, 이번 턴의 대화만 전송
+        profile_text = _build_counselling_profile(user_info)
+        turn_text = _build_counselling_turn(question, history)
+        from utils.inflight import current_session_id
         
-        상담자 정보:
-        - 이름: {user_info['name']}
-        - 생년월일: {user_info['birthdate'].strftime('%Y년 %m월 %d일')}
-        - 태어난 시간: {user_info['birth_hour']}
-        
-        상담 내용: {question}
+        # 캐시 생성·갱신은 원격 호출이므로 루프를 막지 않도록 잠시 스레드에서 실행
+        cached_prefix = await asyncio.to_thread(get_context_cache().prefix_for, get_user_key(user_info),
+                                                profile_text, turn_text, current_session_id())
         
-        # 중요한 규칙
-        1. 2-3문장으로 짧게 답변
-        2. 질문을 통해 상담자가 스스로 깨달을 수 있도록 유도
-        3. 사주 특성은 자연스럽게 녹여서 표현
-        4. 조언보다는 공감과 탐색이 우선
-
-        # 답변 구조
-        1. 공감 (1문장)
-        2. 사주 특성 언급 + 탐색 질문 (1-2문장)
-
-        # 말투 설정
-        - 편안한 반말 사용 (친구같은 상담사)
-        - 너무 캐주얼하지 않게 (야, 어이 같은 표현 금지)
-        - 따뜻하고 친근한 톤 유지
-
-        # 예시
-        "적성 찾기 정말 어렵지. 
-        네 사주를 보니 창의적인 기운이 강한데, 
-        최근에 가장 재미있었던 일이 뭐였어?"
-
-        # 피해야 할 것
-        - 긴 설명
-        - 일방적인 조언
-        - 섣부른 해결책 제시
-        - 지나치게 가벼운 말투
+        # 캐시를 사용할 수 없거나 다른 등급으로 넘어가면 전체 프롬프트 전송
+        prompt = f"""
+        {COUNSELLING_INSTRUCTIONS}
+        {profile_text}
+        {turn_text}
         """
+    elif NAME_FREE_CONTENT:
+        # 이름 없는 템플릿을 사주 서명 단위로 재사용하고 이름만 채움
+        try:
+            template = await get_signature_template_async('insight', user_info['birthdate'], user_info['birth_hour'])
+            return render_with_name(template, user_info['name'])
+        except Exception as e:
+            return _degraded("생성 중 오류가 발생했습니다", e)
     else:
         prompt = f"""
         사용자 정보:
@@ -124,35 +163,41 @@ def generate_saju_insight(user_info: Dict[str, Any], question: Optional[str] = N
         """
     
     try:
-        response = gemini_model.generate_content(prompt)
-        return response.text
+        # 질문 없는 사주 인사이트는 같은 입력에 대해 재사용 가능
+        if question:
+            return await generate_for_task_async('chat_reply', prompt, cached_prefix=cached_prefix)
+        return await generate_for_task_async('insight', prompt, cache_ttl=INSIGHT_CACHE_TTL)
     except Exception as e:
-        return f"생성 중 오류가 발생했습니다: {str(e)}"
+        return _degraded("생성 중 오류가 발생했습니다", e)
 
 
-def summarize_conversation(messages: List[Dict[str, str]]) -> str:
+def _format_conversation(messages: List[Message]) -> str:
     """
-    대화 내용을 분석하여 핵심 고민을 추출합니다.
+    대화 메시지를 프롬프트에 넣을 텍스트로 정리합니다. (메시지당 최대 200자)
     
     Args:
         messages: 사용자와 AI 간의 대화 메시지 목록
         
     Returns:
-        str: 추출된 핵심 고민
+        str: "사용자: ...", "AI: ..." 형식의 대화 텍스트
     """
-    try:
-        gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-    except Exception as e:
-        return f"대화 요약 중 오류: {e}"
-    
-    # 대화 내용 정리 (사용자 메시지와 AI 응답 번갈아가며)
     conversation_text = ""
-    for i, msg in enumerate(messages):
-        role = "사용자" if msg['role'] == 'user' else "AI"
-        content = msg['content'][:200] + "..." if len(msg['content']) > 200 else msg['content']
+    for msg in messages:
+        role = "사용자" if msg.role == 'user' else "AI"
+        content = msg.content[:200] + "..." if len(msg.content) > 200 else msg.content
         conversation_text += f"{role}: {content}\n\n"
+    return conversation_text
+
+def _last_user_message(messages: List[Message]) -> Optional[str]:
+    """대화에서 마지막 사용자 메시지를 반환합니다."""
+    return next((msg.content for msg in reversed(messages) if msg.role == 'user'), None)
+
+def _build_summary_prompt(messages: List[Message]) -> str:
+    """핵심 고민 요약 프롬프트를 만듭니다."""
+    # 대화 내용 정리 (사용자 메시지와 AI 응답 번갈아가며)
+    conversation_text = _format_conversation(messages)
     
-    prompt = f"""
+    return f"""
     다음은 사용자와 AI 간의 대화입니다:
     
     {conversation_text}
@@ -163,43 +208,71 @@ def summarize_conversation(messages: List[Dict[str, str]]) -> str:
     
     핵심 고민: 
     """
-    
-    try:
-        response = gemini_model.generate_content(prompt)
-        extracted_concern = response.text.strip()
+
+def _finish_summary(messages: List[Message], extracted_concern: Optional[str],
+                    error: Optional[Exception] = None) -> str:
+    """요약 결과를 정리합니다. 너무 짧거나 실패했으면 마지막 사용자 메시지로 대체합니다."""
+    if error is None:
+        extracted_concern = extracted_concern.strip()
         # 너무 짧은 경우 원본 마지막 질문 사용
         if len(extracted_concern) < 10 and len(messages) > 0:
-            last_user_msg = next((msg['content'] for msg in reversed(messages) if msg['role'] == 'user'), None)
+            last_user_msg = _last_user_message(messages)
             if last_user_msg:
                 return last_user_msg
         return extracted_concern
+    if len(messages) > 0:
+        # 오류 발생 시 마지막 사용자 메시지 사용
+        last_user_msg = _last_user_message(messages)
+        if last_user_msg:
+            return last_user_msg
+    return _degraded("대화를 요약할 수 없습니다", error)
+
+@traced('saju.summarize_conversation')
+def summarize_conversation(messages: List[Message]) -> str:
+    """
+    대화 내용을 분석하여 핵심 고민을 추출합니다.
+    
+    Args:
+        messages: 사용자와 AI 간의 대화 메시지 목록
+        
+    Returns:
+        str: 추출된 핵심 고민
+    """
+    try:
+        return _finish_summary(messages, generate_for_task('concern_summary', _build_summary_prompt(messages)))
     except Exception as e:
-        if len(messages) > 0:
-            # 오류 발생 시 마지막 사용자 메시지 사용
-            last_user_msg = next((msg['content'] for msg in reversed(messages) if msg['role'] == 'user'), None)
-            if last_user_msg:
-                return last_user_msg
-        return f"대화를 요약할 수 없습니다: {e}"
+        return _finish_summary(messages, None, e)
 
-def generate_weekly_plan(user_info: Dict[str, Any], concern: str) -> List[Dict[str, str]]:
+@traced('saju.summarize_conversation')
+async def summarize_conversation_async(messages: List[Message]) -> str:
     """
-    사용자의 고민을 7일간의 실천 계획으로 변환합니다.
+    summarize_conversation()의 코루틴 버전입니다. (선계산 요약 등 진행 중 생성에서 사용)
     
     Args:
-        user_info: 사용자 정보 딕셔너리 (이름, 생년월일, 태어난 시간 포함)
-        concern: 사용자의 고민/질문
+        messages: 사용자와 AI 간의 대화 메시지 목록
         
     Returns:
-        List[Dict[str, str]]: 7일간의 실천 계획 목록
+        str: 추출된 핵심 고민
     """
     try:
-        gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+        text = await generate_for_task_async('concern_summary', _build_summary_prompt(messages))
     except Exception as e:
-        return [{'day': f'Day {i+1}', 'title': '계획을 생성할 수 없습니다', 'description': f"API 설정이 필요합니다: {e}"} for i in range(7)]
+        return _finish_summary(messages, None, e)
+    return _finish_summary(messages, text)
+
+def _build_profile_block(user_info: Dict[str, Any]) -> str:
+    """
+    사용자 정보와 사주 정보 프롬프트 블록을 생성합니다.
     
+    Args:
+        user_info: 사용자 정보 딕셔너리 (이름, 생년월일, 태어난 시간 포함)
+        
+    Returns:
+        str: 프롬프트에 삽입할 사용자/사주 정보 텍스트
+    """
     saju_elements = get_saju_elements(user_info['birthdate'], user_info['birth_hour'])
     
-    prompt = f"""
+    return f"""
     사용자 정보:
     - 이름: {user_info['name']}
     - 생년월일: {user_info['birthdate'].strftime('%Y년 %m월 %d일')}
@@ -211,14 +284,11 @@ def generate_weekly_plan(user_info: Dict[str, Any], concern: str) -> List[Dict[s
     - 월지: {saju_elements['월지']}
     - 일간: {saju_elements['일간']}
     - 시지: {saju_elements['시지']}
-    
-    사용자 고민: {concern}
-    
-    위 정보를 바탕으로 사용자의 고민을 해결하기 위한 7일간의 실천 계획을 만들어주세요.
-    사주를 고려하여 사용자의 특성과 성향에 맞는 단계적 접근법을 제시해주세요.
-    
-    응답형식:
-    1) 첫째로, 7일 계획을 정확히 다음 형식으로 제시하세요:
+    """
+
+# 7일 계획 응답 형식 (generate_weekly_plan, stream_weekly_plan 공용)
+PLAN_FORMAT_INSTRUCTIONS = """
+    7일 계획을 정확히 다음 형식으로 제시하세요:
     Day 1: [제목] - [설명] (30자 내외)
     Day 2: [제목] - [설명] (30자 내외)
     Day 3: [제목] - [설명] (30자 내외)
@@ -227,116 +297,578 @@ def generate_weekly_plan(user_info: Dict[str, Any], concern: str) -> List[Dict[s
     Day 6: [제목] - [설명] (30자 내외)
     Day 7: [제목] - [설명] (30자 내외)
     
-    2) 둘째로, 아래에 다음 형식으로 추가 설명을 제시하세요:
+    그 다음, 아래에 다음 형식으로 추가 설명을 제시하세요:
     
     ADDITIONAL_EXPLANATION: 이 계획이 사주 특성과 어떻게 연관되는지 설명해주세요. (100자 내외)
     
     각 날짜별 계획은 구체적이고 실천 가능해야 합니다. 다른 형식은 추가하지 마세요.
+"""
+
+DAY_LINE_PATTERN = re.compile(r'Day \d+:')
+
+def _parse_day_line(index: int, line: str, next_line: str = "") -> PlanItem:
     """
+    "Day N: 제목 - 설명" 형식의 한 줄을 계획 항목으로 변환합니다.
     
+    Args:
+        index: 0부터 시작하는 날짜 인덱스
+        line: Day 라인
+        next_line: 바로 다음 줄 (Day 라인에 설명이 없을 때 설명으로 사용)
+        
+    Returns:
+        PlanItem: 계획 항목
+    """
     try:
-        response = gemini_model.generate_content(prompt)
-        plan_text = response.text
+        # 다양한 형식 처리
+        # 1. "Day 1: 제목 - 설명" 형식
+        day_match = re.match(r'Day \d+:\s*(.*?)\s*-\s*(.*)', line)
+        if day_match:
+            title, description = day_match.groups()
+            return PlanItem(f'Day {index+1}', title.strip() or f'일일 계획 {index+1}',
+                            description.strip() or f'{index+1}일차 활동 내용을 제시해드립니다.')
+        
+        # 2. "Day 1: 제목" 형식 (설명 없음) - 다음 줄을 설명으로 처리
+        day_title_match = re.match(r'Day \d+:\s*(.*)', line)
+        if day_title_match:
+            title = day_title_match.group(1).strip()
+            description = ""
+            if next_line and not DAY_LINE_PATTERN.match(next_line) and 'ADDITIONAL_EXPLANATION' not in next_line:
+                description = next_line.strip()
+            
+            return PlanItem(f'Day {index+1}', title or f'일일 계획 {index+1}',
+                            description or f'{index+1}일차 활동을 진행하세요.')
         
-        # 디버깅용: 세션 상태에 원본 응답 저장
-        st.session_state['debug_raw_response'] = plan_text
+        # 3. 다른 형식의 경우 - 전체 내용을 설명으로 처리
+        return PlanItem(f'Day {index+1}', f'일일 활동 {index+1}', line)
+    except Exception:
+        return PlanItem(f'Day {index+1}', f'일일 계획 {index+1}', f'{index+1}일차 실천 계획입니다.')
+
+def _fill_plan_days(plans: List[PlanItem]) -> List[PlanItem]:
+    """7일이 채워지지 않았을 경우 나머지를 기본 항목으로 채웁니다."""
+    while len(plans) < 7:
+        i = len(plans)
+        plans.append(PlanItem(f'Day {i+1}', f'추가 활동 {i+1}', '추가 실천 계획을 세워보세요.'))
+    return plans
+
+def _parse_plan_text(plan_text: str) -> Tuple[List[PlanItem], str]:
+    """
+    7일 계획 응답 텍스트에서 Day 항목과 추가 설명을 추출합니다.
+    
+    Args:
+        plan_text: LLM 응답 원문
         
-        # 추가 설명 추출
-        additional_explanation = ""
-        explanation_match = re.search(r'ADDITIONAL_EXPLANATION:\s*(.*?)(?:\n|$)', plan_text, re.DOTALL)
-        if explanation_match:
-            additional_explanation = explanation_match.group(1).strip()
-        st.session_state['plan_additional_explanation'] = additional_explanation
+    Returns:
+        Tuple[List[PlanItem], str]: (파싱된 Day 항목 목록 (최대 7개, 빈 날짜 미포함), 추가 설명)
+    """
+    # 추가 설명 추출
+    additional_explanation = ""
+    explanation_match = re.search(r'ADDITIONAL_EXPLANATION:\s*(.*?)(?:\n|$)', plan_text, re.DOTALL)
+    if explanation_match:
+        additional_explanation = explanation_match.group(1).strip()
+    
+    # Day 1-7 형식의 라인만 추출
+    lines = [line.strip() for line in plan_text.strip().split('\n')]
+    plans = []
+    for line_no, line in enumerate(lines):
+        if len(plans) >= 7:
+            break
+        if DAY_LINE_PATTERN.match(line):
+            next_line = lines[line_no + 1] if line_no + 1 < len(lines) else ""
+            plans.append(_parse_day_line(len(plans), line, next_line))
+    
+    return plans, additional_explanation
+
+def _build_weekly_plan_prompt(user_info: Dict[str, Any], concern: str) -> str:
+    """고민이 주어졌을 때의 7일 계획 프롬프트를 생성합니다."""
+    return f"""
+    {_build_profile_block(user_info)}
+    
+    사용자 고민: {concern}
+    
+    위 정보를 바탕으로 사용자의 고민을 해결하기 위한 7일간의 실천 계획을 만들어주세요.
+    사주를 고려하여 사용자의 특성과 성향에 맞는 단계적 접근법을 제시해주세요.
+    
+    응답형식:
+    {PLAN_FORMAT_INSTRUCTIONS}
+    """
+
+def _build_fused_plan_prompt(user_info: Dict[str, Any], messages: List[Message]) -> str:
+    """대화에서 핵심 고민 추출과 7일 계획 생성을 함께 요청하는 프롬프트를 생성합니다."""
+    return f"""
+    {_build_profile_block(user_info)}
+    
+    다음은 사용자와 AI 간의 대화입니다:
+    
+    {_format_conversation(messages)}
+    
+    1) 먼저 위 대화를 분석하여 사용자의 핵심 고민을 한 문장으로 요약해 첫 줄에 다음 형식으로 적어주세요.
+    사용자가 여러 주제를 언급했다면, 가장 중요하거나 반복적으로 언급된 고민을 파악해주세요.
+    요약은 '어떻게 [문제/고민]을 해결할 수 있을까요?'와 같은 질문 형식으로 작성해주세요.
+    
+    CONCERN: [핵심 고민]
+    
+    2) 이어서 사용자 정보와 사주를 바탕으로 이 고민을 해결하기 위한 7일간의 실천 계획을 만들어주세요.
+    사주를 고려하여 사용자의 특성과 성향에 맞는 단계적 접근법을 제시해주세요.
+    {PLAN_FORMAT_INSTRUCTIONS}
+    """
+
+def _get_plan_library():
+    """계획 라이브러리를 반환합니다. 재사용이 꺼져 있거나 열 수 없으면 None (매번 생성)."""
+    if not PLAN_REUSE:
+        return None
+    try:
+        return get_plan_library()
+    except Exception:
+        return None
+
+def find_reusable_plan(user_info: Dict[str, Any], concern: str) -> Optional[StoredPlan]:
+    """
+    같은 사주 서명에서 고민이 비슷한 보관된 7일 계획을 찾습니다. (utils.plan_library 참고)
+    
+    Args:
+        user_info: 사용자 정보 딕셔너리 (생년월일, 태어난 시간 포함)
+        concern: 핵심 고민
+        
+    Returns:
+        Optional[StoredPlan]: 재사용할 계획 (없으면 None)
+    """
+    library = _get_plan_library()
+    if library is None or not concern or is_degraded(concern):
+        return None
+    try:
+        stored = library.find(saju_signature(user_info['birthdate'], user_info['birth_hour']), concern)
+    except Exception:
+        return None
+    metrics.increment("plan_library.hits" if stored is not None else "plan_library.misses")
+    return stored
+
+def _personalize_plan(stored: StoredPlan, name: str) -> Tuple[List[PlanItem], str]:
+    """보관된 계획의 이름 자리표시자를 사용자 이름으로 채워 계획 항목과 추가 설명으로 만듭니다."""
+    plans = [PlanItem(f'Day {i+1}', render_with_name(title, name), render_with_name(description, name))
+             for i, (title, description) in enumerate(stored.items)]
+    return _fill_plan_days(plans), render_with_name(stored.explanation, name)
+
+# 사용자 이름을 자리표시자로 바꾸는 호칭 (이 호칭 앞의 이름만 바꿈)
+NAME_HONORIFIC_PATTERN = r'\s*(?:님|씨)'
+# 사용자 메시지와 이 길이(공백 제외) 이상 겹치는 문구가 있으면 대화 내용이 들어간 계획으로 봄
+PRIVATE_SPAN_CHARS = 8
+# 연락처·주소처럼 다른 사용자에게 보여주면 안 되는 내용
+_IDENTIFYING_PATTERN = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+|https?://|www\.|\d{2,4}[-. ]\d{3,4}[-. ]\d{4}')
+
+def _depersonalize_plan_texts(texts: List[str], name: str, messages: Optional[List[Message]],
+                              concern: str) -> Optional[List[str]]:
+    """
+    다른 사용자와 공유할 수 있도록 계획 문구의 사용자 이름을 자리표시자로 바꿉니다.
+    
+    이름은 '님'·'씨' 호칭 앞에 있을 때만 바꾸므로 이름과 같은 일반 단어가 바뀌지 않습니다.
+    바꾸고 나서도 이름이 남아 있거나, 연락처 등 식별 정보나 사용자 메시지를 그대로 옮긴 문구가 있으면
+    공유하지 않습니다.
+    
+    Args:
+        texts: 계획 문구 목록 (제목, 설명, 추가 설명)
+        name: 사용자 이름
+        messages: 계획을 만든 대화 (없으면 대화 내용 확인을 건너뜀)
+        concern: 핵심 고민 (고민 문구와 겹치는 부분은 대화 내용으로 보지 않음)
         
-        # Day 1-7 형식의 라인만 추출
-        day_lines = []
-        for line in plan_text.strip().split('\n'):
-            if re.match(r'Day \d+:', line.strip()):
-                day_lines.append(line.strip())
+    Returns:
+        Optional[List[str]]: 이름을 자리표시자로 바꾼 문구 목록 (공유할 수 없으면 None)
+    """
+    name = name.strip()
+    if len(name) < 2:
+        return None
+    # 세 글자 이상 이름은 성을 뺀 이름으로 부르는 경우도 함께 처리 (예: '길동님')
+    names = [name, name[1:]] if len(name) >= 3 else [name]
+    pattern = re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, names)) + r')(?=' + NAME_HONORIFIC_PATTERN + r')')
+    texts = [pattern.sub(NAME_PLACEHOLDER, text) for text in texts]
+    if any(part in text for text in texts for part in names) or any(map(_IDENTIFYING_PATTERN.search, texts)):
+        return None
+    
+    if messages:
+        def spans(text: str) -> set:
+            text = "".join(text.split())
+            return {text[i:i + PRIVATE_SPAN_CHARS] for i in range(len(text) - PRIVATE_SPAN_CHARS + 1)}
+        private = set().union(*(spans(message.content) for message in messages if message.role == 'user'))
+        private -= spans(concern)
+        if any(private & spans(text) for text in texts):
+            return None
+    return texts
+
+def _remember_plan(user_info: Dict[str, Any], concern: str, plans: List[PlanItem], additional_explanation: str,
+                   messages: Optional[List[Message]] = None) -> None:
+    """
+    LLM이 7일을 모두 채워 생성한 계획을 다른 요청에서 재사용할 수 있도록 보관합니다.
+    사용자 이름은 자리표시자로 바꾸고, 공유할 수 없는 내용이 있는 계획은 보관하지 않습니다.
+    계획을 만든 대화가 없으면 대화 내용이 들어갔는지 확인할 수 없으므로 보관하지 않습니다.
+    """
+    library = _get_plan_library()
+    if library is None or not concern or is_degraded(concern) or len(plans) < 7:
+        return
+    if not messages:
+        metrics.increment("plan_library.not_shareable")
+        return
+    texts = [text for item in plans[:7] for text in (item.title, item.description)] + [additional_explanation]
+    texts = _depersonalize_plan_texts(texts, user_info.get('name', ''), messages, concern)
+    if texts is None:
+        metrics.increment("plan_library.not_shareable")
+        return
+    
+    try:
+        library.add(saju_signature(user_info['birthdate'], user_info['birth_hour']), concern,
+                    list(zip(texts[0:14:2], texts[1:14:2])), texts[14])
+    except Exception:
+        pass
+
+@traced('saju.weekly_plan')
+def generate_weekly_plan(user_info: Dict[str, Any], concern: str,
+                         messages: Optional[List[Message]] = None) -> Tuple[List[PlanItem], str]:
+    """
+    사용자의 고민을 7일간의 실천 계획으로 변환합니다.
+    같은 사주 서명에서 비슷한 고민으로 만든 계획이 있으면 생성하지 않고 재사용합니다.
+    
+    Args:
+        user_info: 사용자 정보 딕셔너리 (이름, 생년월일, 태어난 시간 포함)
+        concern: 사용자의 고민/질문
+        messages: 고민이 나온 대화 (없으면 생성한 계획을 재사용 라이브러리에 보관하지 않음)
         
-        # 추출된 라인을 파싱
-        plans = []
-        for i in range(min(7, len(day_lines))):
-            line = day_lines[i]
-                
-            try:
-                # 다양한 형식 처리
-                # 1. "Day 1: 제목 - 설명" 형식
-                day_match = re.match(r'Day \d+:\s*(.*?)\s*-\s*(.*)', line)
-                if day_match:
-                    title, description = day_match.groups()
-                    plans.append({
-                        'day': f'Day {i+1}',
-                        'title': title.strip() or f'일일 계획 {i+1}',
-                        'description': description.strip() or f'{i+1}일차 활동 내용을 제시해드립니다.'
-                    })
-                    continue
-                
-                # 2. "Day 1: 제목" 형식 (설명 없음)
-                day_title_match = re.match(r'Day \d+:\s*(.*)', line)
-                if day_title_match:
-                    title = day_title_match.group(1).strip()
-                    # 다음 줄 확인해서 설명으로 처리
-                    description = ""
-                    if i + 1 < len(lines) and not re.match(r'Day \d+:', lines[i+1]):
-                        description = lines[i+1].strip()
-                    
-                    plans.append({
-                        'day': f'Day {i+1}',
-                        'title': title or f'일일 계획 {i+1}',
-                        'description': description or f'{i+1}일차 활동을 진행하세요.'
-                    })
-                    continue
-                
-                # 3. 다른 형식의 경우 - 전체 내용을 설명으로 처리
-                plans.append({
-                    'day': f'Day {i+1}',
-                    'title': f'일일 활동 {i+1}',
-                    'description': line
-                })
-            except Exception as e:
-                plans.append({
-                    'day': f'Day {i+1}',
-                    'title': f'일일 계획 {i+1}',
-                    'description': f'{i+1}일차 실천 계획입니다.'
-                })
+    Returns:
+        Tuple[List[PlanItem], str]: (7일간의 실천 계획 목록, 추가 설명) (생성에 실패하면 빈 목록)
+    """
+    stored = find_reusable_plan(user_info, concern)
+    if stored is not None:
+        return _personalize_plan(stored, user_info['name'])
+    
+    prompt = _build_weekly_plan_prompt(user_info, concern)
+    
+    try:
+        plan_text = generate_for_task('weekly_plan', prompt, cache_ttl=PLAN_CACHE_TTL)
+    except Exception:
+        # 오류 문구를 계획 항목으로 만들면 태스크로 저장되므로 빈 목록을 반환
+        return [], ""
+    plans, additional_explanation = _parse_plan_text(plan_text)
+    if not plans:
+        # 형식에 맞는 항목이 하나도 없으면 기본 항목만으로 채운 계획을 만들지 않음
+        return [], ""
+    _remember_plan(user_info, concern, plans, additional_explanation, messages)
+    return _fill_plan_days(plans), additional_explanation
+
+class PlanStreamParser:
+    """
+    스트리밍 응답을 줄 단위로 파싱하여 완성된 항목을 즉시 내보내는 7일 계획 파서
+    
+    feed()에 청크를 넣을 때마다 새로 완성된 이벤트 목록을 반환합니다.
+    이벤트는 ('concern', str), ('day', PlanItem), ('explanation', str) 형태입니다.
+    """
+    
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pending_line: Optional[str] = None  # 설명이 다음 줄에 올 수 있는 "Day N: 제목" 라인
+        self.concern: Optional[str] = None
+        self.additional_explanation = ""
+        self.plans: List[PlanItem] = []
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        응답 청크를 추가하고 완성된 줄에서 나온 이벤트를 반환합니다.
         
-        # 7일이 채워지지 않았을 경우 나머지 채우기
-        while len(plans) < 7:
-            i = len(plans)
-            plans.append({
-                'day': f'Day {i+1}',
-                'title': f'추가 활동 {i+1}',
-                'description': '추가 실천 계획을 세워보세요.'
-            })
+        Args:
+            chunk: 스트리밍 응답 텍스트 조각
             
-        return plans
-    except Exception as e:
-        return [{'day': f'Day {i+1}', 'title': '계획을 생성할 수 없습니다', 'description': f"오류: {str(e)}"} for i in range(7)]
+        Returns:
+            List[Tuple[str, Any]]: 새로 완성된 이벤트 목록
+        """
+        self._buffer += chunk
+        events = []
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            events.extend(self._handle_line(line.strip()))
+        return events
+    
+    def close(self) -> List[Tuple[str, Any]]:
+        """스트림 종료 시 남은 버퍼를 처리하고 이벤트를 반환합니다."""
+        events = []
+        if self._buffer.strip():
+            events.extend(self._handle_line(self._buffer.strip()))
+        self._buffer = ""
+        if self._pending_line is not None:
+            events.extend(self._emit_day(self._pending_line, ""))
+            self._pending_line = None
+        return events
+    
+    def _emit_day(self, line: str, next_line: str) -> List[Tuple[str, Any]]:
+        if len(self.plans) >= 7:
+            return []
+        item = _parse_day_line(len(self.plans), line, next_line)
+        self.plans.append(item)
+        return [('day', item)]
+    
+    def _handle_line(self, line: str) -> List[Tuple[str, Any]]:
+        events = []
+        if self._pending_line is not None:
+            pending, self._pending_line = self._pending_line, None
+            events.extend(self._emit_day(pending, line))
+        
+        if not line:
+            return events
+        
+        concern_match = re.search(r'CONCERN:\s*(.+)', line)
+        if concern_match and self.concern is None:
+            self.concern = concern_match.group(1).strip()
+            events.append(('concern', self.concern))
+        elif DAY_LINE_PATTERN.match(line):
+            if re.match(r'Day \d+:\s*(.*?)\s*-\s*(.*)', line):
+                events.extend(self._emit_day(line, ""))
+            else:
+                self._pending_line = line
+        elif 'ADDITIONAL_EXPLANATION:' in line:
+            self.additional_explanation = line.split('ADDITIONAL_EXPLANATION:', 1)[1].strip()
+            events.append(('explanation', self.additional_explanation))
+        
+        return events
 
-def analyze_saju(name: str, birthdate: datetime.date, birth_hour: str) -> Dict[str, str]:
+@traced('saju.stream_weekly_plan')
+def stream_weekly_plan(user_info: Dict[str, Any], concern: Optional[str] = None,
+                       messages: Optional[List[Message]] = None) -> Iterator[Tuple[str, Any]]:
     """
-    사용자의 사주를 분석하고 결과를 반환합니다.
+    7일 계획을 스트리밍으로 생성하여 각 Day 항목이 완성되는 즉시 내보냅니다.
+    concern이 없으면 messages로부터 핵심 고민 추출까지 한 번의 요청으로 수행합니다.
+    
+    같은 사주 서명에서 비슷한 고민으로 만든 계획이 있으면 재사용합니다.
+    고민이 주어졌으면 생성을 시작하지 않고, 대화에서 추출하는 경우에는 고민 줄을 받은 즉시 생성을 중단합니다.
+    
+    Args:
+        user_info: 사용자 정보 딕셔너리 (이름, 생년월일, 태어난 시간 포함)
+        concern: 핵심 고민 (이미 추출된 경우)
+        messages: 사용자와 AI 간의 대화 메시지 목록 (concern이 없을 때 사용)
+        
+    Yields:
+        Tuple[str, Any]: ('concern', str), ('day', PlanItem), ('explanation', str) 이벤트와
+            보관된 계획을 재사용한 경우 ('reused', 유사도) 이벤트,
+            일부 항목을 내보낸 뒤 생성이 실패한 경우 마지막으로 ('error', 안내 문구) 이벤트
+    """
+    parser = PlanStreamParser()
+    stored = None
+    if concern is not None:
+        yield ('concern', concern)
+        stored = find_reusable_plan(user_info, concern)
+        prompt = _build_weekly_plan_prompt(user_info, concern)
+    else:
+        prompt = _build_fused_plan_prompt(user_info, messages or [])
+    
+    if stored is None:
+        chunks = None
+        try:
+            chunks = stream_for_task('weekly_plan', prompt)
+            for chunk in chunks:
+                for event in parser.feed(chunk):
+                    if event[0] == 'concern' and not parser.plans:
+                        stored = find_reusable_plan(user_info, event[1])
+                    yield event
+                    if stored is not None:
+                        break
+                if stored is not None:
+                    break
+        except Exception as e:
+            if parser.plans:
+                # 이미 내보낸 항목이 있으면 남은 날짜를 기본 항목으로 채우지 않고 실패를 알림
+                yield ('error', f"7일 계획 생성 중 오류가 발생했습니다: {str(e)}")
+                return
+            # 항목을 받기 전에 실패했으면 남은 버퍼를 버리고 아래에서 일반 요청으로 재시도
+            parser = PlanStreamParser()
+        finally:
+            # 재사용할 계획을 찾았으면 남은 생성을 취소
+            if chunks is not None:
+                chunks.close()
+    
+    if stored is not None:
+        plans, additional_explanation = _personalize_plan(stored, user_info['name'])
+        yield ('reused', stored.similarity)
+        for item in plans:
+            yield ('day', item)
+        if additional_explanation:
+            yield ('explanation', additional_explanation)
+        return
+    
+    for event in parser.close():
+        yield event
+    
+    # 핵심 고민을 얻지 못했으면 기존 요약 방식으로 대체
+    if concern is None:
+        concern = parser.concern
+        if concern is None:
+            concern = summarize_conversation(messages or [])
+            yield ('concern', concern)
+    
+    if not parser.plans:
+        # 스트리밍 응답에서 아무 항목도 얻지 못한 경우 일반 요청으로 재시도
+        plans, additional_explanation = generate_weekly_plan(user_info, concern, messages)
+        for item in plans:
+            yield ('day', item)
+        if additional_explanation:
+            yield ('explanation', additional_explanation)
+        return
+    
+    _remember_plan(user_info, concern, parser.plans, parser.additional_explanation, messages)
+    
+    # 응답이 정상적으로 끝났지만 7일이 채워지지 않았을 경우 나머지 채우기
+    parsed_count = len(parser.plans)
+    for item in _fill_plan_days(parser.plans)[parsed_count:]:
+        yield ('day', item)
+
+def saju_signature(birthdate: datetime.date, birth_hour: str) -> str:
+    """
+    이름 없는 템플릿의 키가 되는 사주 서명을 만듭니다.
+    같은 서명의 사용자는 같은 분석·인사이트 템플릿을 공유합니다.
     
     Args:
-        name: 사용자 이름
         birthdate: 생년월일 (datetime.date 객체)
         birth_hour: 태어난 시간 (예: "23-01시", "07-09시" 등)
         
     Returns:
-        Dict[str, str]: 분석 결과를 담은 딕셔너리 (full_analysis, core_traits 키 포함)
+        str: 천간-지지-월지-일간-시지 형태의 서명 (예: "경-오-인-갑-미정")
     """
-    try:
-        gemini_model = genai.GenerativeModel('gemini-1.5-flash')
-    except Exception as e:
-        return {
-            "full_analysis": f"API 설정이 필요합니다: {e}",
-            "core_traits": "분석 오류"
-        }
+    elements = get_saju_elements(birthdate, birth_hour)
+    return "-".join(elements[key] for key in ("천간", "지지", "월지", "일간", "시지"))
+
+def render_with_name(template: str, name: str) -> str:
+    """
+    템플릿의 이름 자리표시자를 사용자 이름으로 바꿉니다.
     
+    Args:
+        template: 이름 자리표시자가 들어간 템플릿
+        name: 사용자 이름
+        
+    Returns:
+        str: 이름이 채워진 텍스트
+    """
+    return NAME_PLACEHOLDER_PATTERN.sub(lambda _: name, template)
+
+# 템플릿 종류별 작성 지시
+_TEMPLATE_INSTRUCTIONS = {
+    'analysis': """
+    위 사주를 분석해주세요. 다음 구조로 답변해주세요:
+    
+    1. 핵심 특성: (한 문장으로 간결하게)
+    2. 성격과 기질: (200자 내외)
+    3. 적성과 재능: (200자 내외)
+    4. 대인관계와 소통방식: (200자 내외)
+    5. 성장을 위한 제안: (200자 내외)
+    """,
+    'insight': """
+    위 사주를 분석하고 간략한 성장 로드맵을 제안해주세요.
+    사주의 특성을 바탕으로 한 성격, 장단점, 적성, 그리고 3개월/6개월/1년 단위의 간략한 성장 목표를 제안해주세요.
+    전체 400자에서 600자 사이로 작성해주세요.
+    """,
+    'core_traits': """
+    위 사주의 핵심 특성을 30자 이내의 한 문장으로만 답해주세요. 다른 설명은 쓰지 마세요.
+    핵심 특성:
+    """,
+}
+
+def _build_template_prompt(kind: str, birthdate: datetime.date, birth_hour: str) -> str:
+    """사주 요소만으로 이름 없는 템플릿 생성 프롬프트를 만듭니다."""
     saju_elements = get_saju_elements(birthdate, birth_hour)
     
-    prompt = f"""
+    return f"""
+    사주 정보:
+    - 천간: {saju_elements['천간']}
+    - 지지: {saju_elements['지지']}
+    - 월지: {saju_elements['월지']}
+    - 일간: {saju_elements['일간']}
+    - 시지: {saju_elements['시지']}
+    {_TEMPLATE_INSTRUCTIONS[kind]}
+    사용자를 부르거나 가리킬 때는 이름 대신 반드시 {NAME_PLACEHOLDER} 라고 쓰세요. (예: "{NAME_PLACEHOLDER}님은 ...")
+    """
+
+def _stored_template(kind: str, signature: str, record_demand: bool) -> Tuple[Any, Optional[str]]:
+    """콘텐츠 저장소와 저장된 템플릿을 반환합니다. (저장소를 열 수 없거나 템플릿이 없으면 None)"""
+    store = _get_content_store()
+    if store is None:
+        return None, None
+    if record_demand:
+        store.record_request(kind, signature)
+    return store, store.get(kind, signature)
+
+def get_signature_template(kind: str, birthdate: datetime.date, birth_hour: str,
+                           record_demand: bool = True) -> str:
+    """
+    사주 서명별 이름 없는 템플릿을 반환합니다. 콘텐츠 저장소에 없으면 생성하여 저장합니다.
+    
+    Args:
+        kind: 템플릿 종류 ('analysis', 'insight', 'core_traits')
+        birthdate: 생년월일 (datetime.date 객체)
+        birth_hour: 태어난 시간
+        record_demand: 서명별 요청 횟수를 기록할지 여부 (사전 생성 작업에서는 False)
+        
+    Returns:
+        str: 이름 자리표시자가 들어간 템플릿
+    """
+    signature = saju_signature(birthdate, birth_hour)
+    store, template = _stored_template(kind, signature, record_demand)
+    if template is not None:
+        return template
+    
+    template = generate_for_task(kind, _build_template_prompt(kind, birthdate, birth_hour))
+    if store is not None and template.strip():
+        store.put(kind, signature, template)
+    return template
+
+async def get_signature_template_async(kind: str, birthdate: datetime.date, birth_hour: str) -> str:
+    """
+    get_signature_template()의 코루틴 버전입니다. (진행 중 생성에서 사용, 요청 횟수를 기록함)
+    
+    Args:
+        kind: 템플릿 종류 ('analysis', 'insight', 'core_traits')
+        birthdate: 생년월일 (datetime.date 객체)
+        birth_hour: 태어난 시간
+        
+    Returns:
+        str: 이름 자리표시자가 들어간 템플릿
+    """
+    signature = saju_signature(birthdate, birth_hour)
+    # 콘텐츠 저장소(SQLite) 읽기·쓰기는 스레드에서 실행하여 디스패처 루프를 막지 않음
+    store, template = await asyncio.to_thread(_stored_template, kind, signature, True)
+    if template is not None:
+        return template
+    
+    template = await generate_for_task_async(kind, _build_template_prompt(kind, birthdate, birth_hour))
+    if store is not None and template.strip():
+        await asyncio.to_thread(store.put, kind, signature, template)
+    return template
+
+def _get_content_store():
+    """콘텐츠 저장소를 반환합니다. 열 수 없으면 None (저장소 없이 매번 생성)."""
+    try:
+        return get_content_store()
+    except Exception:
+        return None
+
+class _NameStreamRenderer:
+    """스트리밍 조각에 이름을 채웁니다. 조각 경계에 걸친 자리표시자는 다음 조각까지 보류합니다."""
+    
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._pending = ""
+    
+    def feed(self, chunk: str) -> str:
+        self._pending += chunk
+        cut = len(self._pending)
+        start = self._pending.rfind('{{')
+        if start != -1 and '}}' not in self._pending[start:] and cut - start <= 12:
+            cut = start
+        elif self._pending.endswith('{'):
+            cut -= 1
+        ready, self._pending = self._pending[:cut], self._pending[cut:]
+        return render_with_name(ready, self._name)
+    
+    def close(self) -> str:
+        ready, self._pending = self._pending, ""
+        return render_with_name(ready, self._name)
+
+def _build_analysis_prompt(name: str, birthdate: datetime.date, birth_hour: str) -> str:
+    """전체 사주 분석(5개 항목) 프롬프트를 만듭니다."""
+    saju_elements = get_saju_elements(birthdate, birth_hour)
+    
+    return f"""
     사용자 정보:
     - 이름: {name}
     - 생년월일: {birthdate.strftime('%Y년 %m월 %d일')}
@@ -357,24 +889,76 @@ def analyze_saju(name: str, birthdate: datetime.date, birth_hour: str) -> Dict[s
     4. 대인관계와 소통방식: (200자 내외)
     5. 성장을 위한 제안: (200자 내외)
     """
+
+def extract_core_traits(analysis: str) -> Optional[str]:
+    """분석 텍스트에서 '핵심 특성:' 줄의 내용을 꺼냅니다."""
+    for line in analysis.split('\n'):
+        if "핵심 특성:" in line:
+            return line.split("핵심 특성:", 1)[1].strip()
+    return None
+
+@traced('saju.core_traits')
+async def generate_core_traits(name: str, birthdate: datetime.date, birth_hour: str) -> str:
+    """
+    사주의 핵심 특성 한 문장만 짧게 생성합니다. (온보딩 직후 첫 화면용)
     
-    try:
-        response = gemini_model.generate_content(prompt)
-        analysis = response.text
+    Args:
+        name: 사용자 이름
+        birthdate: 생년월일 (datetime.date 객체)
+        birth_hour: 태어난 시간 (예: "23-01시", "07-09시" 등)
         
-        # 핵심 특성 추출 (첫 번째 줄)
-        core_traits = "분석 중..."
-        for line in analysis.split('\n'):
-            if "핵심 특성:" in line:
-                core_traits = line.replace("핵심 특성:", "").strip()
-                break
+    Returns:
+        str: 핵심 특성 한 문장 (생성에 실패하면 DegradedResponse)
+    """
+    try:
+        if NAME_FREE_CONTENT:
+            text = render_with_name(await get_signature_template_async('core_traits', birthdate, birth_hour), name)
+        else:
+            text = await generate_for_task_async('core_traits',
+                                                 _build_template_prompt('core_traits', birthdate, birth_hour),
+                                                 cache_ttl=INSIGHT_CACHE_TTL)
+        traits = extract_core_traits(text) or text.strip().split('\n')[0].strip()
+        return traits or DegradedResponse("분석 중...")
+    except Exception:
+        return DegradedResponse("분석 중...")
+
+@traced('saju.stream_analysis')
+async def stream_saju_analysis(name: str, birthdate: datetime.date, birth_hour: str) -> AsyncIterator[str]:
+    """
+    전체 사주 분석을 스트리밍으로 생성합니다.
+    
+    Args:
+        name: 사용자 이름
+        birthdate: 생년월일 (datetime.date 객체)
+        birth_hour: 태어난 시간 (예: "23-01시", "07-09시" 등)
         
-        return {
-            "full_analysis": analysis,
-            "core_traits": core_traits
-        }
-    except Exception as e:
-        return {
-            "full_analysis": f"분석 중 오류가 발생했습니다: {str(e)}",
-            "core_traits": "분석 오류"
-        }
+    Yields:
+        str: 도착한 분석 텍스트 조각
+    """
+    if not NAME_FREE_CONTENT:
+        async for chunk in stream_for_task_async('analysis', _build_analysis_prompt(name, birthdate, birth_hour),
+                                                 cache_ttl=INSIGHT_CACHE_TTL):
+            yield chunk
+        return
+    
+    signature = saju_signature(birthdate, birth_hour)
+    store, template = await asyncio.to_thread(_stored_template, 'analysis', signature, True)
+    if template is not None:
+        yield render_with_name(template, name)
+        return
+    
+    # 이름 없는 템플릿을 스트리밍으로 받으면서 이름을 채워 내보내고, 끝까지 받으면 저장
+    renderer = _NameStreamRenderer(name)
+    parts = []
+    async for chunk in stream_for_task_async('analysis', _build_template_prompt('analysis', birthdate, birth_hour)):
+        parts.append(chunk)
+        rendered = renderer.feed(chunk)
+        if rendered:
+            yield rendered
+    tail = renderer.close()
+    if tail:
+        yield tail
+    
+    template = "".join(parts)
+    if store is not None and template.strip():
+        await asyncio.to_thread(store.put, 'analysis', signature, template)
@@ -0,0 +1,216 @@
+"""
+지난 대화·고민 검색 색인 모듈
+
+대화 메시지와 이전 고민을 역색인(토큰 → 문서별 출현 횟수)으로 관리합니다.
+한국어는 띄어쓰기와 조사 때문에 단어 단위로 나누면 검색이 잘 맞지 않으므로,
+단어 안의 연속한 두 글자(문자 바이그램)를 토큰으로 사용합니다. (예: '커리어가' → '커리', '리어', '어가')
+
+- 색인은 메시지·고민이 추가될 때마다 그 문서의 토큰만 갱신하므로, 검색 때 전체 이력을 다시 읽지 않습니다.
+- 검색은 질의 토큰의 색인 목록만 모아 BM25 점수로 순위를 매깁니다.
+- 같은 내용이 이미 있는지는 정규화한 본문의 해시 집합으로 O(1)에 확인합니다.
+- 문서 본문은 보관하지 않고 결과 표시용 앞부분(SNIPPET_CHARS)만 보관합니다.
+  (보관소로 옮겨진 오래된 대화도 색인에 남아 검색됩니다)
+
+Export 형태:
+- from utils.search_index import SearchIndex, SearchHit, tokenize, normalize_text
+"""
+import hashlib
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 결과 표시용으로 보관하는 본문 앞부분 길이
+SNIPPET_CHARS = 120
+
+# BM25 매개변수
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r'\w+')
+_SPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    비교용으로 본문을 정규화합니다. (유니코드 NFKC, 소문자, 연속 공백 하나로)
+
+    Args:
+        text: 본문
+
+    Returns:
+        str: 정규화한 본문
+    """
+    return _SPACE_PATTERN.sub(' ', unicodedata.normalize('NFKC', text).lower()).strip()
+
+def tokenize(text: str) -> List[str]:
+    """
+    본문을 문자 바이그램 토큰으로 나눕니다. 한 글자 단어는 그 글자를 토큰으로 사용합니다.
+
+    Args:
+        text: 본문
+
+    Returns:
+        List[str]: 토큰 목록 (중복 포함)
+    """
+    tokens: List[str] = []
+    for word in _WORD_PATTERN.findall(unicodedata.normalize('NFKC', text).lower()):
+        if len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(normalize_text(text).encode(), digest_size=16).digest()
+
+
+@dataclass(slots=True)
+class _Document:
+    seq: int
+    label: str
+    snippet: str
+    length: int
+    digest: bytes
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """검색 결과 하나 (kind: 'message' 또는 'concern', ref: 메시지 위치나 고민 본문)"""
+    kind: str
+    ref: Any
+    label: str
+    snippet: str
+    score: float
+
+
+class SearchIndex:
+    """
+    세션의 대화·고민 역색인
+
+    문서는 (종류, 참조) 쌍으로 구분합니다. 메시지는 대화 전체에서의 위치, 고민은 고민 본문을 참조로 씁니다.
+    """
+
+    def __init__(self) -> None:
+        # 색인 대상 MessageStore ID (세션의 대화 저장소가 바뀌었는지 확인하는 용도)
+        self.store_id: Optional[str] = None
+        self._postings: Dict[str, Dict[Tuple[str, Any], int]] = {}
+        self._docs: Dict[Tuple[str, Any], _Document] = {}
+        self._digests: Dict[str, Counter] = {}
+        self._total_length = 0
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, kind: str, ref: Any, text: str, label: str = '') -> None:
+        """
+        문서를 색인에 추가합니다. 같은 (종류, 참조)가 이미 있으면 새 본문으로 바꿉니다.
+
+        Args:
+            kind: 문서 종류 ('message', 'concern')
+            ref: 문서 참조
+            text: 본문
+            label: 결과에 함께 표시할 정보 (메시지 역할, 고민 기록일 등)
+        """
+        key = (kind, ref)
+        if key in self._docs:
+            self.remove(kind, ref)
+        counts = Counter(tokenize(text))
+        for token, tf in counts.items():
+            self._postings.setdefault(token, {})[key] = tf
+        length = sum(counts.values())
+        digest = _digest(text)
+        self._docs[key] = _Document(self._next_seq, label, text[:SNIPPET_CHARS], length, digest)
+        self._digests.setdefault(kind, Counter())[digest] += 1
+        self._total_length += length
+        self._next_seq += 1
+
+    def add_many(self, kind: str, items: Iterable[Tuple[Any, str, str]]) -> None:
+        """
+        문서 여러 개를 색인에 추가합니다.
+
+        Args:
+            kind: 문서 종류
+            items: (참조, 본문, 표시 정보) 목록
+        """
+        for ref, text, label in items:
+            self.add(kind, ref, text, label)
+
+    def remove(self, kind: str, ref: Any, text: Optional[str] = None) -> None:
+        """
+        문서를 색인에서 뺍니다. (답변이 취소되어 되돌린 질문 등)
+
+        Args:
+            kind: 문서 종류
+            ref: 문서 참조
+            text: 본문 (없으면 색인 전체에서 이 문서의 토큰을 찾음)
+        """
+        key = (kind, ref)
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        tokens = set(tokenize(text)) if text is not None else list(self._postings)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is not None and postings.pop(key, None) is not None and not postings:
+                del self._postings[token]
+        digests = self._digests[kind]
+        digests[doc.digest] -= 1
+        if digests[doc.digest] <= 0:
+            del digests[doc.digest]
+        self._total_length -= doc.length
+
+    def contains(self, kind: str, text: str) -> bool:
+        """
+        정규화한 본문이 같은 문서가 이미 있는지 O(1)에 확인합니다.
+
+        Args:
+            kind: 문서 종류
+            text: 본문
+
+        Returns:
+            bool: 같은 내용의 문서가 있는지 여부
+        """
+        digests = self._digests.get(kind)
+        return digests is not None and _digest(text) in digests
+
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None, limit: int = 10) -> List[SearchHit]:
+        """
+        질의와 관련된 문서를 BM25 점수 순으로 찾습니다. 점수가 같으면 최근 문서가 먼저입니다.
+
+        Args:
+            query: 검색어
+            kinds: 찾을 문서 종류 (없으면 전체)
+            limit: 최대 결과 수
+
+        Returns:
+            List[SearchHit]: 검색 결과
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._docs:
+            return []
+        allowed = set(kinds) if kinds is not None else None
+        doc_count = len(self._docs)
+        average_length = self._total_length / doc_count or 1.0
+
+        scores: Dict[Tuple[str, Any], float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for key, tf in postings.items():
+                if allowed is not None and key[0] not in allowed:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._docs[key].length / average_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], self._docs[item[0]].seq))
+        return [
+            SearchHit(kind, ref, self._docs[(kind, ref)].label, self._docs[(kind, ref)].snippet, score)
+            for (kind, ref), score in best
+        ]
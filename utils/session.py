@@ -4,13 +4,33 @@
 Export 형태:
 - from utils.session import initialize_session_state
 - from utils.session import initialize_gemini_api
+- from utils.session import get_user_key, reset_session
+- from utils.session import start_user_session, resume_user_session, record_session_event
+- from utils.session import new_resume_token, get_journal_key
+- from utils.session import get_search_index
+- from utils.session import MAIN_TABS
 - 또는 import utils.session as session 후 session.initialize_session_state() 형태로 사용
 """
 import datetime
+import hashlib
+import secrets
 import streamlit as st
-import google.generativeai as genai
 from typing import Dict, Any, Optional
 
+from utils.calendar import TaskStore
+from utils.event_log import EVENT_LOG_ENABLED, EventJournal
+from utils.records import MessageStore
+from utils.search_index import SearchIndex
+from utils.streak import StreakTracker
+from utils.llm import set_api_key
+from utils.tracing import traced
+
+# 메인 화면 탭 이름 (session_state['active_tab']에 선택된 탭 이름이 저장됨)
+MAIN_TABS = ["🔮 고민 상담실", "🗺️ 나의 7일 계획"]
+
+# 이어하기 코드의 무작위 바이트 수
+RESUME_TOKEN_BYTES = 16
+
 def initialize_session_state() -> None:
     """
     애플리케이션에 필요한 세션 상태 변수들을 초기화합니다.
@@ -28,16 +48,17 @@ def initialize_session_state() -> None:
             'birth_hour': ''
         }
         
-    # 채팅 관련 상태
-    if 'chat_history' not in st.session_state:
-        st.session_state['chat_history'] = []
-        
+    # 채팅 관련 상태 (대화는 MessageStore 하나에만 보관)
     if 'chat_messages' not in st.session_state:
-        st.session_state['chat_messages'] = []
+        st.session_state['chat_messages'] = MessageStore()
         
     if 'has_initial_greeting' not in st.session_state:
         st.session_state['has_initial_greeting'] = False
     
+    # 메인 화면에서 선택된 탭
+    if 'active_tab' not in st.session_state:
+        st.session_state['active_tab'] = MAIN_TABS[0]
+    
     # 로드맵 관련 상태
     if 'roadmap' not in st.session_state:
         st.session_state['roadmap'] = []
@@ -45,6 +66,10 @@ def initialize_session_state() -> None:
     if 'roadmap_items' not in st.session_state:
         st.session_state['roadmap_items'] = []
     
+    # 현재 7일 계획 (항목 내용은 태스크 저장소에 있으므로 태스크 ID만 보관)
+    if 'plan_task_ids' not in st.session_state:
+        st.session_state['plan_task_ids'] = []
+    
     # 캘린더 관련 상태
     if 'current_date' not in st.session_state:
         st.session_state['current_date'] = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
@@ -54,44 +79,35 @@ def initialize_session_state() -> None:
         today = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         st.session_state['selected_date'] = today.strftime("%Y-%m-%d")
         
-    if 'tasks' not in st.session_state:
+    if 'task_store' not in st.session_state:
         # 샘플 태스크 추가 (테스트용)
         today_str = datetime.datetime.now().strftime("%Y-%m-%d")
-        st.session_state['tasks'] = {
-            today_str: [
-                {
-                    'id': f"{today_str}_0",
-                    'title': "오늘의 성장 목표",
-                    'description': "사주에 맞는 성장 계획 세우기"
-                }
-            ]
-        }
-        
-    if 'task_completion' not in st.session_state:
-        # 태스크 ID를 키로 하는 완료 상태 디셔너리
-        today_str = datetime.datetime.now().strftime("%Y-%m-%d")
-        st.session_state['task_completion'] = {
-            f"{today_str}_0": False
-        }
+        task_store = TaskStore()
+        task_store.add(today_str, {
+            'title': "오늘의 성장 목표",
+            'description': "사주에 맞는 성장 계획 세우기"
+        })
+        st.session_state['task_store'] = task_store
         
-    if 'streak_days' not in st.session_state:
-        st.session_state['streak_days'] = 0
+    if 'streak_tracker' not in st.session_state:
+        st.session_state['streak_tracker'] = StreakTracker()
 
-def initialize_gemini_api() -> Optional[genai.GenerativeModel]:
+def initialize_gemini_api() -> bool:
     """
-    Gemini API를 초기화하고 모델 객체를 반환합니다.
+    Gemini API 키를 등록합니다.
+    SDK 임포트와 모델 생성은 첫 LLM 호출 시점까지 지연됩니다. (utils.llm 참고)
     
     Returns:
-        Optional[genai.GenerativeModel]: 초기화된 Gemini 모델 객체 또는 오류 시 None
+        bool: API 키 등록 성공 여부
     """
     try:
         gemini_api_key = st.secrets["gemini_api_key"]
-        genai.configure(api_key=gemini_api_key)
-        return genai.GenerativeModel('gemini-1.5-flash')
+        set_api_key(gemini_api_key)
+        return True
     except Exception as e:
         st.error(f"API 키 설정 오류: {e}")
         st.info("Google Gemini API 키를 .streamlit/secrets.toml 파일에 'gemini_api_key' 항목으로 설정해주세요.")
-        return None
+        return False
 
 def get_user_info() -> Dict[str, Any]:
     """
@@ -130,3 +146,196 @@ def update_user_info(name: str = None, birthdate: datetime.date = None, birth_ho
         
     if birth_hour is not None:
         st.session_state['user_info']['birth_hour'] = birth_hour
+
+def get_user_key(user_info: Dict[str, Any]) -> str:
+    """
+    사용자 정보(이름, 생년월일, 태어난 시간)로부터 안정적인 사용자 키를 만듭니다.
+    누구나 같은 값을 입력해 만들 수 있으므로 개인 기록(이벤트 로그)을 찾는 데는 쓰지 않습니다.
+    
+    Args:
+        user_info: 사용자 정보 딕셔너리
+        
+    Returns:
+        str: 16자리 16진수 사용자 키
+    """
+    birthdate = user_info.get('birthdate')
+    raw = f"{user_info.get('name', '')}|{birthdate.isoformat() if birthdate else ''}|{user_info.get('birth_hour', '')}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+def new_resume_token() -> str:
+    """
+    새 이어하기 코드를 만듭니다. 기록의 주인만 가지는 무작위 값이며, 다시 들어올 때 이 코드로만 기록을 불러옵니다.
+    
+    Returns:
+        str: URL에 안전한 무작위 문자열
+    """
+    return secrets.token_urlsafe(RESUME_TOKEN_BYTES)
+
+def get_journal_key(resume_token: str) -> str:
+    """
+    이어하기 코드로 이벤트 로그의 사용자 키를 만듭니다.
+    로그 파일에는 코드의 해시만 저장되므로 파일을 읽어도 코드를 알 수 없습니다.
+    
+    Args:
+        resume_token: 이어하기 코드
+        
+    Returns:
+        str: 32자리 16진수 사용자 키
+    """
+    return hashlib.sha256(resume_token.strip().encode()).hexdigest()[:32]
+
+def _attach_journal(journal: EventJournal, resume_token: str) -> None:
+    """이후의 변경은 바뀐 내용만 이벤트로 기록하도록 세션의 저장소에 이벤트 로그를 연결합니다."""
+    st.session_state['chat_messages'].journal = journal
+    st.session_state['task_store'].journal = journal
+    st.session_state['event_journal'] = journal
+    st.session_state['resume_token'] = resume_token
+
+def start_user_session(user_info: Dict[str, Any]) -> Optional[str]:
+    """
+    새 이어하기 코드를 발급하고 그 코드의 이벤트 로그(utils.event_log)를 현재 세션에 연결합니다.
+    온보딩에서 새 사용자 정보를 저장한 직후 호출하며, 이름·생년월일·태어난 시간과
+    세션에 이미 있는 태스크를 첫 이벤트로 기록해 둡니다.
+    
+    Args:
+        user_info: 사용자 정보 딕셔너리 (name, birthdate, birth_hour)
+        
+    Returns:
+        Optional[str]: 발급한 이어하기 코드 (이벤트 로그를 쓰지 않으면 None)
+    """
+    if not EVENT_LOG_ENABLED:
+        return None
+    
+    resume_token = new_resume_token()
+    journal = EventJournal(get_journal_key(resume_token))
+    journal.record('user_info.update', name=user_info['name'], birthdate=user_info['birthdate'].isoformat(),
+                   birth_hour=user_info['birth_hour'])
+    task_store = st.session_state['task_store']
+    journal.record_many('task.add', [
+        {'id': task.id, 'date': task.date, 'title': task.title, 'description': task.description,
+         'completed': task.completed, 'created_at': task.created_at}
+        for task in task_store
+    ])
+    _attach_journal(journal, resume_token)
+    return resume_token
+
+def resume_user_session(resume_token: str) -> bool:
+    """
+    이어하기 코드의 이벤트 로그를 재생해 세션 상태를 복원하고 로그를 현재 세션에 연결합니다.
+    온보딩에서 사용자가 이어하기 코드를 입력했을 때 호출합니다.
+    
+    복원 대상은 사용자 정보, 대화, 태스크(완료 상태와 스트릭 포함), 현재 7일 계획, 핵심 고민, 이전 고민,
+    인사이트, 사주 분석 결과입니다. 코드에 해당하는 기록이 없으면 세션을 바꾸지 않습니다.
+    
+    Args:
+        resume_token: 이어하기 코드
+        
+    Returns:
+        bool: 이전 기록으로 상태를 복원했는지 여부
+    """
+    resume_token = resume_token.strip()
+    if not EVENT_LOG_ENABLED or not resume_token:
+        return False
+    
+    journal = EventJournal(get_journal_key(resume_token))
+    state = journal.replay()
+    user_info = dict(state['user_info'])
+    if not (user_info.get('name') and user_info.get('birthdate')):
+        return False
+    user_info['birthdate'] = datetime.date.fromisoformat(user_info['birthdate'])
+    
+    messages = MessageStore()
+    for role, content in state['messages']:
+        messages.append(role, content)
+    task_store = TaskStore()
+    streak_tracker = StreakTracker()
+    for task_id, task in state['tasks'].items():
+        task_store.add(task['date'], task, task_id=task_id)
+        if task['completed'] and task['completed_on']:
+            streak_tracker.mark(task_id, True, datetime.date.fromisoformat(task['completed_on']))
+    
+    st.session_state['user_info'] = user_info
+    st.session_state['chat_messages'] = messages
+    st.session_state['has_initial_greeting'] = len(messages) > 0
+    st.session_state['task_store'] = task_store
+    st.session_state['streak_tracker'] = streak_tracker
+    st.session_state['plan_task_ids'] = [task_id for task_id in state['plan_task_ids'] if task_id in task_store]
+    if state['current_concern']:
+        st.session_state['current_concern'] = state['current_concern']
+    if state['roadmap']:
+        st.session_state['roadmap'] = state['roadmap']
+    if state.get('previous_concerns'):
+        st.session_state['previous_concerns'] = state['previous_concerns']
+    
+    _attach_journal(journal, resume_token)
+    return True
+
+def record_session_event(kind: str, **data: Any) -> None:
+    """
+    현재 세션에 연결된 이벤트 로그에 이벤트를 기록합니다. 연결되지 않았으면 아무것도 하지 않습니다.
+    
+    Args:
+        kind: 이벤트 종류 (예: 'plan.set', 'roadmap.set', 'user_info.update')
+        **data: 이벤트 내용
+    """
+    journal = st.session_state.get('event_journal')
+    if journal is not None:
+        journal.record(kind, **data)
+
+@traced('state.build_search_index')
+def _build_search_index(messages: MessageStore) -> SearchIndex:
+    """보관된 메시지를 포함한 전체 대화와 이전 고민으로 검색 색인을 새로 만듭니다."""
+    index = SearchIndex()
+    index.store_id = messages.id
+    index.add_many('message', ((position, message.content, message.role)
+                               for position, message in enumerate(messages.all_messages())))
+    index.add_many('concern', ((concern['concern'], concern['concern'], concern.get('created_at', ''))
+                               for concern in st.session_state.get('previous_concerns', [])))
+    return index
+
+def get_search_index() -> SearchIndex:
+    """
+    현재 세션의 지난 대화·고민 검색 색인을 반환합니다.
+    
+    색인은 세션마다 한 번 만들고 이후에는 메시지·고민이 추가될 때마다 갱신됩니다.
+    세션의 대화 저장소가 바뀌었으면(이전 기록 복원 등) 새로 만듭니다.
+    
+    Returns:
+        SearchIndex: 검색 색인
+    """
+    if 'chat_messages' not in st.session_state:
+        st.session_state['chat_messages'] = MessageStore()
+    messages: MessageStore = st.session_state['chat_messages']
+    index = st.session_state.get('search_index')
+    if index is None or index.store_id != messages.id:
+        index = _build_search_index(messages)
+        messages.search_index = index
+        st.session_state['search_index'] = index
+    return index
+
+@traced('state.reset_session')
+def reset_session() -> None:
+    """
+    현재 세션을 종료하고 처음 상태로 되돌립니다.
+    진행 중인 LLM 생성과 사용자별로 잡아둔 외부 자원(컨텍스트 캐시 등)을 먼저 정리한 뒤 세션 상태를 비웁니다.
+    """
+    from utils.inflight import current_session_id, get_inflight_registry
+    
+    summarizer = st.session_state.get('speculative_summarizer')
+    if summarizer is not None:
+        summarizer.invalidate()
+    messages = st.session_state.get('chat_messages')
+    if isinstance(messages, MessageStore):
+        messages.discard()
+    get_inflight_registry().cancel_session(current_session_id(), 'reset')
+    # 처음으로 돌아가면 이 이어하기 코드로 이전 기록을 다시 복원하지 않음
+    record_session_event('reset')
+    
+    user_info = st.session_state.get('user_info', {})
+    if user_info.get('birthdate'):
+        from utils.context_cache import get_context_cache
+        # 같은 사용자 정보로 열린 다른 세션이 캐시를 쓰고 있으면 삭제하지 않음
+        get_context_cache().release(get_user_key(user_info), current_session_id())
+    
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
@@ -0,0 +1,310 @@
+"""
+세션별 메모리 사용량 측정 모듈
+
+워커 프로세스의 메모리는 대부분 세션 상태(st.session_state)에 쌓입니다.
+이 모듈은 낮은 빈도의 백그라운드 타이머로 활성 세션의 상태를 키별로 재귀 측정(deep size)하여
+가장 무거운 세션과 키를 보고하고, 한도를 넘는 세션·키를 경고합니다.
+워커 수·메모리 한도를 정하거나 세션 상태가 계속 커지는 누수를 찾는 데 사용합니다.
+
+- 측정 간격은 SESSION_MEMORY_INTERVAL_SECONDS 환경 변수로 지정합니다. (0 이하이면 측정하지 않음)
+- 세션 전체 한도는 SESSION_MEMORY_ALERT_BYTES, 키 하나의 한도는 SESSION_KEY_ALERT_BYTES로 지정합니다.
+- 측정할 때마다 보고서를 SESSION_MEMORY_REPORT_DIR/<pid>.json에 기록하며,
+  scripts/session_memory_report.py가 모든 워커의 보고서를 모아 보여줍니다.
+- 함수·모듈·클래스·스레드는 크기에 넣지 않습니다. 세션끼리 공유하는 객체는 세션마다 따로 집계됩니다.
+
+기록되는 지표:
+- session_memory.session_bytes: 세션 하나의 상태 크기 (바이트)
+- session_memory.sample_seconds: 측정 한 번에 걸린 시간
+- session_memory.oversized_sessions / session_memory.oversized_keys: 새로 한도를 넘은 세션·키 수
+
+Export 형태:
+- from utils.session_memory import deep_sizeof, measure_state
+- from utils.session_memory import SessionMemorySample, SessionMemoryMonitor, get_session_memory_monitor
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from utils import metrics
+
+# 측정 간격 (초)
+SESSION_MEMORY_INTERVAL_SECONDS = float(os.environ.get('SESSION_MEMORY_INTERVAL_SECONDS', '60'))
+# 세션 하나의 상태 크기 경고 한도 (바이트)
+SESSION_MEMORY_ALERT_BYTES = int(os.environ.get('SESSION_MEMORY_ALERT_BYTES', str(16 * 1024 * 1024)))
+# 세션 상태 키 하나의 크기 경고 한도 (바이트)
+SESSION_KEY_ALERT_BYTES = int(os.environ.get('SESSION_KEY_ALERT_BYTES', str(4 * 1024 * 1024)))
+DEFAULT_REPORT_DIR = os.path.join(".cache", "session_memory")
+
+# 크기에 넣지 않는 타입 (프로세스 전역으로 공유되는 코드·실행 자원)
+_OPAQUE_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, threading.Thread)
+# 객체 하나를 측정할 때 따라가는 최대 객체 수 (측정 비용 상한)
+_MAX_OBJECTS = 500_000
+
+
+def _referents(obj: Any) -> Iterable[Any]:
+    """obj가 직접 참조하는 하위 객체를 반환합니다."""
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, complex)) or obj is None:
+        return ()
+    if isinstance(obj, Mapping):
+        # 다른 스레드가 바꾸는 중일 수 있으므로 먼저 사본을 만듦
+        return [item for pair in list(obj.items()) for item in pair]
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return list(obj)
+    children = []
+    attrs = getattr(obj, '__dict__', None)
+    if isinstance(attrs, dict):
+        children.append(attrs)
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ('__dict__', '__weakref__'):
+                value = getattr(obj, name, None)
+                if value is not None:
+                    children.append(value)
+    return children
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    객체와 그 객체가 참조하는 모든 하위 객체의 크기 합을 반환합니다.
+
+    Args:
+        obj: 측정할 객체
+        seen: 이미 집계한 객체 ID 집합 (여러 객체를 측정할 때 공유하면 같은 객체를 한 번만 집계)
+
+    Returns:
+        int: 크기 (바이트)
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    visited = 0
+    while stack and visited < _MAX_OBJECTS:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _OPAQUE_TYPES):
+            continue
+        seen.add(id(current))
+        visited += 1
+        total += sys.getsizeof(current, 0)
+        stack.extend(_referents(current))
+    if stack:
+        metrics.increment("session_memory.truncated")
+    return total
+
+def measure_state(state: Mapping[str, Any]) -> Dict[str, int]:
+    """
+    세션 상태의 키별 크기를 측정합니다.
+    여러 키가 함께 참조하는 객체는 먼저 측정한 키에 한 번만 집계합니다.
+
+    Args:
+        state: 세션 상태 (키 → 값)
+
+    Returns:
+        Dict[str, int]: 키 → 크기 (바이트)
+    """
+    seen: Set[int] = set()
+    sizes = {}
+    for key, value in list(state.items()):
+        try:
+            sizes[str(key)] = deep_sizeof(value, seen)
+        except RuntimeError:
+            # 측정 중에 스크립트 스레드가 값을 바꾼 경우 (다음 측정에서 다시 시도)
+            metrics.increment("session_memory.sample_errors")
+    return sizes
+
+
+@dataclass(slots=True)
+class SessionMemorySample:
+    """세션 하나의 측정 결과"""
+    session_id: str
+    sampled_at: float
+    total_bytes: int
+    key_bytes: Dict[str, int]
+
+
+def _active_session_states() -> List[Tuple[str, Mapping[str, Any]]]:
+    """Streamlit 런타임의 활성 세션 (세션 ID, 사용자 상태) 목록을 반환합니다."""
+    from streamlit.runtime import Runtime
+    if not Runtime.exists():
+        return []
+    states = []
+    # 세션 목록은 공개 API가 없어 런타임의 세션 관리자를 직접 사용함
+    for info in Runtime.instance()._session_mgr.list_active_sessions():
+        try:
+            states.append((info.session.id, info.session.session_state.filtered_state))
+        except Exception:
+            metrics.increment("session_memory.sample_errors")
+    return states
+
+
+class SessionMemoryMonitor:
+    """
+    활성 세션의 상태 크기를 주기적으로 측정하고 보고서를 만드는 감시기
+
+    sample()은 어느 스레드에서나 호출할 수 있으며, start()하면 interval마다 백그라운드에서 호출됩니다.
+    """
+
+    def __init__(self, interval: float = SESSION_MEMORY_INTERVAL_SECONDS,
+                 session_alert_bytes: int = SESSION_MEMORY_ALERT_BYTES,
+                 key_alert_bytes: int = SESSION_KEY_ALERT_BYTES,
+                 report_dir: Optional[str] = None,
+                 sessions_fn: Callable[[], List[Tuple[str, Mapping[str, Any]]]] = _active_session_states) -> None:
+        self._interval = interval
+        self._session_alert_bytes = session_alert_bytes
+        self._key_alert_bytes = key_alert_bytes
+        self._report_dir = report_dir
+        self._sessions_fn = sessions_fn
+        self._lock = threading.Lock()
+        self._samples: Dict[str, SessionMemorySample] = {}
+        # 이미 경고한 (세션 ID, 키) (키가 None이면 세션 전체) - 한도 아래로 내려가면 다시 경고할 수 있도록 지움
+        self._alerted: Set[Tuple[str, Optional[str]]] = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """백그라운드 측정 스레드를 시작합니다. (이미 시작했거나 간격이 0 이하이면 무시)"""
+        if self._thread is not None or self._interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="session-memory", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(self._interval)
+            try:
+                self.sample()
+                if self._report_dir:
+                    self.write_report(self._report_dir)
+            except Exception:
+                pass
+
+    def sample(self) -> List[SessionMemorySample]:
+        """
+        활성 세션을 모두 측정하고 끝난 세션의 측정 결과는 버립니다.
+
+        Returns:
+            List[SessionMemorySample]: 이번 측정 결과
+        """
+        started = time.monotonic()
+        samples = []
+        for session_id, state in self._sessions_fn():
+            key_bytes = measure_state(state)
+            sample = SessionMemorySample(session_id, time.time(), sum(key_bytes.values()), key_bytes)
+            metrics.observe("session_memory.session_bytes", sample.total_bytes)
+            samples.append(sample)
+        with self._lock:
+            self._samples = {sample.session_id: sample for sample in samples}
+            self._check_alerts(samples)
+        metrics.observe("session_memory.sample_seconds", time.monotonic() - started)
+        return samples
+
+    def _check_alerts(self, samples: List[SessionMemorySample]) -> None:
+        """새로 한도를 넘은 세션·키를 경고합니다. (lock 보유 상태에서 호출)"""
+        over = set()
+        for sample in samples:
+            if sample.total_bytes > self._session_alert_bytes:
+                over.add((sample.session_id, None))
+            over.update((sample.session_id, key) for key, size in sample.key_bytes.items()
+                        if size > self._key_alert_bytes)
+        for session_id, key in over - self._alerted:
+            sample = self._samples[session_id]
+            size = sample.total_bytes if key is None else sample.key_bytes[key]
+            metrics.increment("session_memory.oversized_sessions" if key is None else "session_memory.oversized_keys")
+            from streamlit.logger import get_logger
+            get_logger(__name__).warning(
+                "세션 메모리 한도 초과: session=%s key=%s size=%d bytes", session_id, key or '*', size
+            )
+        self._alerted = over
+
+    def report(self, top_n: int = 5) -> Dict[str, Any]:
+        """
+        마지막 측정 결과로 보고서를 만듭니다.
+
+        Args:
+            top_n: 보고할 상위 세션·키 수
+
+        Returns:
+            Dict[str, Any]: pid, sampled_at, session_count, total_bytes,
+                top_sessions (세션별 크기와 가장 큰 키), top_keys (키별 합계·세션 수·최대값), alerts
+        """
+        with self._lock:
+            samples = list(self._samples.values())
+            alerted = set(self._alerted)
+        keys: Dict[str, Dict[str, int]] = {}
+        for sample in samples:
+            for key, size in sample.key_bytes.items():
+                stats = keys.setdefault(key, {'bytes': 0, 'sessions': 0, 'max': 0})
+                stats['bytes'] += size
+                stats['sessions'] += 1
+                stats['max'] = max(stats['max'], size)
+        by_size = sorted(samples, key=lambda sample: sample.total_bytes, reverse=True)
+        return {
+            'pid': os.getpid(),
+            'sampled_at': max((sample.sampled_at for sample in samples), default=None),
+            'session_count': len(samples),
+            'total_bytes': sum(sample.total_bytes for sample in samples),
+            'top_sessions': [
+                {
+                    'session_id': sample.session_id,
+                    'bytes': sample.total_bytes,
+                    'keys': sorted(sample.key_bytes.items(), key=lambda item: item[1], reverse=True)[:3],
+                }
+                for sample in by_size[:top_n]
+            ],
+            'top_keys': [
+                dict(stats, key=key)
+                for key, stats in sorted(keys.items(), key=lambda item: item[1]['bytes'], reverse=True)[:top_n]
+            ],
+            'alerts': [
+                {'session_id': session_id, 'key': key}
+                for session_id, key in sorted(alerted, key=lambda item: (item[0], item[1] or ''))
+            ],
+        }
+
+    def write_report(self, report_dir: str, top_n: int = 20) -> str:
+        """
+        보고서를 report_dir/<pid>.json에 기록합니다. (여러 워커 보고서는 scripts/session_memory_report.py로 집계)
+
+        Args:
+            report_dir: 보고서 디렉터리
+            top_n: 보고할 상위 세션·키 수
+
+        Returns:
+            str: 기록한 파일 경로
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        path = os.path.join(report_dir, f"{os.getpid()}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(top_n), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+_monitor: Optional[SessionMemoryMonitor] = None
+_monitor_lock = threading.Lock()
+
+def get_session_memory_monitor() -> SessionMemoryMonitor:
+    """
+    프로세스 전역 세션 메모리 감시기를 반환합니다. 처음 호출할 때 백그라운드 측정을 시작합니다.
+    보고서 디렉터리는 SESSION_MEMORY_REPORT_DIR 환경 변수로 지정합니다.
+
+    Returns:
+        SessionMemoryMonitor: 세션 메모리 감시기
+    """
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = SessionMemoryMonitor(
+                    report_dir=os.environ.get("SESSION_MEMORY_REPORT_DIR", DEFAULT_REPORT_DIR)
+                )
+                _monitor.start()
+    return _monitor
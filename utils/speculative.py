@@ -0,0 +1,150 @@
+"""
+대화 요약 선계산(speculative summary) 유틸리티 모듈
+
+AI 답변이 추가될 때마다 백그라운드에서 핵심 고민 요약을 미리 계산해 두어,
+'7일 계획 생성' 버튼을 누른 시점에는 요약 LLM 호출을 기다리지 않도록 합니다.
+요약 시작은 디바운스되며, 새 메시지가 추가되면 이전 요약은 취소/무효화됩니다.
+요약 작업은 세션의 진행 중 생성(utils.inflight)으로 등록되므로 세션 초기화·연결 종료 시 함께 취소됩니다.
+
+Export 형태:
+- from utils.speculative import SpeculativeSummarizer
+- from utils.speculative import get_speculative_summarizer
+"""
+import hashlib
+import threading
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+import streamlit as st
+
+from utils.inflight import Generation, GenerationCancelled, current_session_id, get_inflight_registry
+from utils.records import Message
+
+def conversation_fingerprint(messages: Iterable[Message]) -> str:
+    """
+    대화 내용의 지문을 계산합니다. 메시지가 추가되거나 바뀌면 값이 달라집니다.
+
+    Args:
+        messages: 대화 메시지 목록
+
+    Returns:
+        str: 대화 지문 (sha1 hex)
+    """
+    digest = hashlib.sha1()
+    for msg in messages:
+        digest.update(msg.role.encode())
+        digest.update(b"\x00")
+        digest.update(msg.content.encode())
+        digest.update(b"\x01")
+    return digest.hexdigest()
+
+
+class SpeculativeSummarizer:
+    """
+    디바운스·취소 가능한 백그라운드 대화 요약기
+
+    요약 결과는 요약을 시작한 시점의 대화 지문과 함께 보관되며,
+    조회 시 현재 대화의 지문과 일치할 때만 반환됩니다.
+    """
+
+    def __init__(self, summarize_fn: Callable[[List[Message]], Awaitable[str]],
+                 debounce_seconds: float = 1.5, session_id: str = 'local') -> None:
+        self._summarize_fn = summarize_fn
+        self._debounce_seconds = debounce_seconds
+        self._session_id = session_id
+        self._lock = threading.Lock()
+        self._key: Optional[str] = None
+        self._timer: Optional[threading.Timer] = None
+        self._generation: Optional[Generation] = None
+
+    def _cancel_pending(self) -> None:
+        """대기 중인 타이머와 아직 시작되지 않은 요약 작업을 취소합니다. (lock 보유 상태에서 호출)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._generation is not None:
+            # 이미 실행 중인 작업은 다음 대기 지점에서 중단되고 낭비된 생성으로 집계됩니다.
+            self._generation.cancel('superseded')
+            self._generation = None
+
+    def schedule(self, messages: Iterable[Message]) -> None:
+        """
+        현재 대화에 대한 요약을 디바운스 후 백그라운드에서 시작합니다.
+
+        Args:
+            messages: 대화 메시지 목록 (호출 시점의 목록이 요약에 사용됨, 메시지는 불변이므로 복사하지 않음)
+        """
+        snapshot = list(messages)
+        key = conversation_fingerprint(snapshot)
+
+        with self._lock:
+            if key == self._key and (self._timer is not None or self._generation is not None):
+                return
+            self._cancel_pending()
+            self._key = key
+            self._timer = threading.Timer(self._debounce_seconds, self._start, args=(key, snapshot))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _start(self, key: str, snapshot: List[Message]) -> None:
+        """디바운스가 끝나면 요약 작업을 제출합니다."""
+        with self._lock:
+            if key != self._key:
+                return
+            self._timer = None
+            self._generation = self._submit(key, snapshot)
+
+    def _submit(self, key: str, snapshot: List[Message]) -> Generation:
+        """요약 작업을 세션의 진행 중 생성으로 제출합니다. (lock 보유 상태에서 호출)"""
+        return get_inflight_registry().submit(self._session_id, f"summary:{key}", self._summarize_fn, snapshot)
+
+    def invalidate(self) -> None:
+        """진행 중이거나 완료된 요약을 무효화합니다. (새 사용자 메시지가 추가될 때 호출)"""
+        with self._lock:
+            self._cancel_pending()
+            self._key = None
+
+    def result(self, messages: Iterable[Message], timeout: float = 0.0) -> Optional[str]:
+        """
+        현재 대화에 해당하는 선계산 요약을 반환합니다.
+
+        Args:
+            messages: 현재 대화 메시지 목록
+            timeout: 요약이 실행 중일 때 기다릴 최대 시간 (초)
+
+        Returns:
+            Optional[str]: 요약 결과 (없거나, 대화가 바뀌었거나, 실패한 경우 None)
+        """
+        messages = list(messages)
+        key = conversation_fingerprint(messages)
+        with self._lock:
+            if key != self._key:
+                return None
+            if self._timer is not None and timeout > 0:
+                # 디바운스 대기 중이면 기다리지 않고 바로 시작
+                self._timer.cancel()
+                self._timer = None
+                self._generation = self._submit(key, messages)
+            generation = self._generation
+
+        if generation is None or generation.cancelled:
+            return None
+        try:
+            return generation.result(wait_seconds=timeout)
+        except (TimeoutError, GenerationCancelled):
+            return None
+        except Exception:
+            return None
+
+def get_speculative_summarizer() -> SpeculativeSummarizer:
+    """
+    현재 세션의 선계산 요약기를 반환합니다. 없으면 새로 만듭니다.
+
+    Returns:
+        SpeculativeSummarizer: 세션별 요약기
+    """
+    if 'speculative_summarizer' not in st.session_state:
+        from utils.saju import summarize_conversation_async
+        st.session_state['speculative_summarizer'] = SpeculativeSummarizer(
+            summarize_conversation_async, session_id=current_session_id()
+        )
+    return st.session_state['speculative_summarizer']
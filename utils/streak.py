@@ -0,0 +1,158 @@
+"""
+연속 실천일수(스트릭) 계산 유틸리티 모듈
+
+날짜별 완료 태스크 수를 날짜 서수(date.toordinal()) 기준의 array에 저장하여
+현재/최장 연속 실천일수와 날짜별 실천 기록을 계산합니다.
+
+Export 형태:
+- from utils.streak import StreakTracker
+- 또는 import utils.streak as streak 후 streak.StreakTracker() 형태로 사용
+"""
+import datetime
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class StreakTracker:
+    """
+    날짜별 완료 수를 압축 배열로 관리하는 스트릭 계산기
+
+    - 완료/완료 취소 시 해당 날짜의 카운트만 증감합니다.
+    - 최장 스트릭은 완료 시 해당 날짜가 속한 구간만 확인하여 갱신하고,
+      완료 취소로 구간이 끊어진 경우에만 다음 조회 때 다시 계산합니다.
+    - 현재 스트릭은 (기준일, 변경 버전)별로 캐시하여 매 rerun마다 재계산하지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        self._base: Optional[int] = None  # _counts[0]에 해당하는 날짜 서수
+        self._counts = array('H')
+        self._completed_on: Dict[str, int] = {}  # 태스크 ID → 완료 처리한 날짜 서수
+        self._longest = 0
+        self._longest_stale = False
+        self._version = 0
+        self._current_cache: Tuple[int, int, int] = (-1, -1, 0)  # (기준일, 버전, 값)
+
+    def _active(self, ordinal: int) -> bool:
+        """해당 날짜에 완료한 태스크가 있는지 반환합니다."""
+        if self._base is None:
+            return False
+        index = ordinal - self._base
+        return 0 <= index < len(self._counts) and self._counts[index] > 0
+
+    def _ensure_slot(self, ordinal: int) -> int:
+        """해당 날짜의 배열 인덱스를 반환합니다. 범위를 벗어나면 배열을 확장합니다."""
+        if self._base is None:
+            self._base = ordinal
+            self._counts.append(0)
+            return 0
+
+        if ordinal < self._base:
+            self._counts[0:0] = array('H', bytes(2 * (self._base - ordinal)))
+            self._base = ordinal
+        elif ordinal - self._base >= len(self._counts):
+            self._counts.extend([0] * (ordinal - self._base - len(self._counts) + 1))
+
+        return ordinal - self._base
+
+    def _run_length(self, ordinal: int) -> int:
+        """해당 날짜를 포함하는 연속 실천 구간의 길이를 반환합니다."""
+        if not self._active(ordinal):
+            return 0
+        start = ordinal
+        while self._active(start - 1):
+            start -= 1
+        end = ordinal
+        while self._active(end + 1):
+            end += 1
+        return end - start + 1
+
+    def mark(self, task_id: str, completed: bool, day: datetime.date) -> None:
+        """
+        태스크 완료 상태 변경을 기록합니다.
+
+        Args:
+            task_id: 태스크 ID
+            completed: 변경 후 완료 상태
+            day: 완료 처리한 날짜 (완료 취소 시에는 무시되고 완료했던 날짜가 사용됨)
+        """
+        if completed:
+            if task_id in self._completed_on:
+                return
+            ordinal = day.toordinal()
+            index = self._ensure_slot(ordinal)
+            self._completed_on[task_id] = ordinal
+            self._counts[index] += 1
+            if self._counts[index] == 1 and not self._longest_stale:
+                self._longest = max(self._longest, self._run_length(ordinal))
+        else:
+            ordinal = self._completed_on.pop(task_id, None)
+            if ordinal is None:
+                return
+            index = ordinal - self._base
+            self._counts[index] -= 1
+            if self._counts[index] == 0:
+                self._longest_stale = True
+
+        self._version += 1
+
+    def completed_on(self, task_id: str) -> Optional[datetime.date]:
+        """태스크를 완료 처리한 날짜를 반환합니다. 완료 기록이 없으면 None을 반환합니다."""
+        ordinal = self._completed_on.get(task_id)
+        return datetime.date.fromordinal(ordinal) if ordinal is not None else None
+
+    def current_streak(self, today: datetime.date) -> int:
+        """
+        현재 연속 실천일수를 반환합니다.
+        오늘 아직 완료한 태스크가 없으면 어제까지의 연속 기록을 유지합니다.
+
+        Args:
+            today: 기준 날짜
+
+        Returns:
+            int: 현재 연속 실천일수
+        """
+        ordinal = today.toordinal()
+        cached_day, cached_version, cached_value = self._current_cache
+        if cached_day == ordinal and cached_version == self._version:
+            return cached_value
+
+        day = ordinal if self._active(ordinal) else ordinal - 1
+        streak = 0
+        while self._active(day):
+            streak += 1
+            day -= 1
+
+        self._current_cache = (ordinal, self._version, streak)
+        return streak
+
+    def longest_streak(self) -> int:
+        """최장 연속 실천일수를 반환합니다."""
+        if self._longest_stale:
+            longest = run = 0
+            for count in self._counts:
+                run = run + 1 if count else 0
+                longest = max(longest, run)
+            self._longest = longest
+            self._longest_stale = False
+        return self._longest
+
+    def history(self, start: datetime.date, end: datetime.date) -> List[int]:
+        """
+        [start, end] 구간의 날짜별 완료 태스크 수를 반환합니다. (히트맵용)
+
+        Args:
+            start: 시작 날짜 (포함)
+            end: 종료 날짜 (포함)
+
+        Returns:
+            List[int]: 날짜 순서대로의 완료 태스크 수
+        """
+        first, last = start.toordinal(), end.toordinal()
+        if self._base is None or last < first:
+            return [0] * max(0, last - first + 1)
+
+        result = []
+        for ordinal in range(first, last + 1):
+            index = ordinal - self._base
+            result.append(self._counts[index] if 0 <= index < len(self._counts) else 0)
+        return result
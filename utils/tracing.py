@@ -0,0 +1,464 @@
+"""
+경량 추적(tracing) 유틸리티 모듈
+
+사용자 동작 하나가 여러 모듈(화면 렌더링 → 사주 함수 → LLM 호출 → 상태 변경)로 퍼져 나가므로,
+각 단계를 중첩된 구간(span)으로 기록하여 느린 동작의 시간이 어디에 쓰였는지 볼 수 있게 합니다.
+끝난 구간은 백그라운드 스레드가 모아 OpenTelemetry(OTLP/HTTP JSON) 형식으로 내보냅니다.
+
+- TRACING=1 이면 켜집니다. (TRACE_OTLP_ENDPOINT를 지정해도 켜짐)
+- TRACE_OTLP_ENDPOINT (예: http://localhost:4318/v1/traces)를 지정하면 수집기로 보내고,
+  아니면 TRACE_FILE (기본 .cache/traces.jsonl)에 요청 본문을 한 줄씩 기록합니다.
+- 현재 구간은 contextvars로 전달됩니다. 진행 중 생성(utils.inflight)과 LLM 디스패처는
+  제출 시점의 컨텍스트를 이어받으므로, 백그라운드에서 실행된 구간도 제출한 구간의 하위 구간이 됩니다.
+- 꺼져 있으면 span()과 traced()는 아무것도 기록하지 않습니다.
+
+Export 형태:
+- from utils.tracing import span, traced, start_span, use_span, iterate_in_span, aiterate_in_span
+- from utils.tracing import Span, current_span, set_attributes, add_event, flush
+- from utils.tracing import start_rerun_span, annotate_rerun, finish_rerun_span
+- 또는 import utils.tracing as tracing 후 tracing.span('이름') 형태로 사용
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from utils import metrics
+
+TRACE_OTLP_ENDPOINT = os.environ.get('TRACE_OTLP_ENDPOINT', '')
+TRACING_ENABLED = os.environ.get('TRACING', '').lower() in ('1', 'true', 'yes') or bool(TRACE_OTLP_ENDPOINT)
+TRACE_SERVICE_NAME = os.environ.get('TRACE_SERVICE_NAME', 'saju-mentor')
+DEFAULT_TRACE_FILE = os.path.join(".cache", "traces.jsonl")
+
+# 내보내기 주기 (초)와 한 번에 내보낼 최대 구간 수
+TRACE_FLUSH_SECONDS = 2.0
+TRACE_BATCH_SIZE = 512
+
+# OTLP 구간 종류
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+# 오류가 아니라 Streamlit의 실행 흐름 제어에 쓰이는 예외 (st.rerun(), st.stop())
+_CONTROL_FLOW_EXCEPTIONS = ('RerunException', 'StopException')
+
+T = TypeVar('T')
+
+
+class Span:
+    """추적 구간 하나"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'kind', 'start_ns', 'end_ns',
+                 'attributes', 'events', 'error')
+
+    def __init__(self, name: str, parent: Optional['Span'] = None, kind: int = SPAN_KIND_INTERNAL,
+                 attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[tuple] = []
+        self.error: Optional[str] = None
+
+    def set_attributes(self, **attributes: Any) -> None:
+        """속성을 추가합니다. (값이 None이면 무시)"""
+        self.attributes.update((key, value) for key, value in attributes.items() if value is not None)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """구간 안에서 일어난 일(상태 변경 등)을 시각과 함께 기록합니다."""
+        self.events.append((time.time_ns(), name, attributes))
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """
+        구간을 끝내고 내보내기 대기열에 넣습니다. 두 번째 호출부터는 무시합니다.
+
+        Args:
+            error: 구간을 끝낸 예외 (Streamlit 실행 흐름 제어 예외는 오류로 보지 않음)
+        """
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            if type(error).__name__ in _CONTROL_FLOW_EXCEPTIONS:
+                self.attributes['streamlit.control'] = type(error).__name__
+            else:
+                self.error = f"{type(error).__name__}: {error}"
+        _get_exporter().export(self)
+
+
+class _NoopSpan:
+    """추적이 꺼져 있을 때 쓰는 빈 구간"""
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+# 현재 스크립트 실행의 최상위 구간
+_rerun_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('rerun_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    """현재 컨텍스트의 구간을 반환합니다. (없거나 추적이 꺼져 있으면 None)"""
+    return _current_span.get()
+
+def set_attributes(**attributes: Any) -> None:
+    """현재 구간에 속성을 추가합니다."""
+    span_ = _current_span.get()
+    if span_ is not None:
+        span_.set_attributes(**attributes)
+
+def add_event(name: str, **attributes: Any) -> None:
+    """현재 구간에 이벤트를 기록합니다."""
+    span_ = _current_span.get()
+    if span_ is not None:
+        span_.add_event(name, **attributes)
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Any:
+    """
+    현재 구간의 하위 구간을 시작합니다. 현재 구간으로 설정하지는 않으므로 직접 end()해야 합니다.
+    (생성기처럼 여러 번에 나눠 실행되는 작업에 사용)
+
+    Args:
+        name: 구간 이름
+        kind: 구간 종류 (SPAN_KIND_INTERNAL, SPAN_KIND_CLIENT)
+        **attributes: 구간 속성
+
+    Returns:
+        Span: 시작된 구간 (추적이 꺼져 있으면 빈 구간)
+    """
+    if not TRACING_ENABLED:
+        return _NOOP_SPAN
+    return Span(name, _current_span.get(), kind, attributes)
+
+@contextmanager
+def use_span(span_: Any) -> Iterator[Any]:
+    """
+    블록 안에서 span_을 현재 구간으로 설정합니다. (끝내지는 않음)
+
+    Args:
+        span_: start_span()이 반환한 구간
+    """
+    if not isinstance(span_, Span):
+        yield span_
+        return
+    token = _current_span.set(span_)
+    try:
+        yield span_
+    finally:
+        _current_span.reset(token)
+
+@contextmanager
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Iterator[Any]:
+    """
+    블록을 하나의 구간으로 기록합니다. 블록 안에서 시작한 구간은 이 구간의 하위 구간이 됩니다.
+
+    Args:
+        name: 구간 이름 (예: 'render.chat_tab', 'llm.generate')
+        kind: 구간 종류
+        **attributes: 구간 속성
+
+    Yields:
+        Span: 기록 중인 구간 (추적이 꺼져 있으면 빈 구간)
+    """
+    if not TRACING_ENABLED:
+        yield _NOOP_SPAN
+        return
+    span_ = Span(name, _current_span.get(), kind, attributes)
+    token = _current_span.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.end(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span_.end()
+
+def iterate_in_span(span_: Any, items: Iterator[T]) -> Iterator[T]:
+    """
+    items의 각 항목을 span_을 현재 구간으로 설정한 채 꺼내고, 끝나면 span_을 끝냅니다.
+    생성기가 항목 사이에 호출자에게 제어를 넘겨도 구간 설정이 호출자 쪽으로 새지 않습니다.
+
+    Args:
+        span_: start_span()이 반환한 구간
+        items: 반복할 항목
+
+    Yields:
+        T: items의 각 항목
+    """
+    iterator = iter(items)
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            with use_span(span_):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        # 소비자가 도중에 멈췄으면 원래 생성기도 닫아 정리 코드를 실행
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            with use_span(span_):
+                close()
+        if error is None or isinstance(error, GeneratorExit):
+            span_.end()
+        else:
+            span_.end(error)
+
+async def aiterate_in_span(span_: Any, items: AsyncIterator[T]) -> AsyncIterator[T]:
+    """
+    iterate_in_span()의 비동기 생성기 버전입니다.
+
+    Args:
+        span_: start_span()이 반환한 구간
+        items: 반복할 비동기 항목
+
+    Yields:
+        T: items의 각 항목
+    """
+    iterator = items.__aiter__()
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            with use_span(span_):
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield item
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+        if aclose is not None:
+            with use_span(span_):
+                await aclose()
+        if error is None or isinstance(error, GeneratorExit):
+            span_.end()
+        else:
+            span_.end(error)
+
+def traced(name: str, kind: int = SPAN_KIND_INTERNAL) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    함수 호출을 구간으로 기록하는 데코레이터입니다. 생성기 함수는 반복이 끝날 때까지를 기록합니다.
+    코루틴 함수와 비동기 생성기 함수도 같은 방식으로 기록합니다.
+
+    Args:
+        name: 구간 이름
+        kind: 구간 종류
+
+    Returns:
+        Callable: 데코레이터
+    """
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not TRACING_ENABLED:
+                    return fn(*args, **kwargs)
+                return iterate_in_span(start_span(name, kind), fn(*args, **kwargs))
+            return generator_wrapper
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            def async_generator_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not TRACING_ENABLED:
+                    return fn(*args, **kwargs)
+                return aiterate_in_span(start_span(name, kind), fn(*args, **kwargs))
+            return async_generator_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def coroutine_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not TRACING_ENABLED:
+                    return await fn(*args, **kwargs)
+                with span(name, kind):
+                    return await fn(*args, **kwargs)
+            return coroutine_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not TRACING_ENABLED:
+                return fn(*args, **kwargs)
+            with span(name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_rerun_span() -> Optional[tuple]:
+    """
+    현재 스크립트 실행 전체를 감싸는 최상위 구간을 시작하고 현재 구간으로 설정합니다.
+    스크립트 실행마다 새 추적(trace)이 시작됩니다.
+
+    Returns:
+        Optional[tuple]: finish_rerun_span()에 넘길 값 (추적이 꺼져 있으면 None)
+    """
+    if not TRACING_ENABLED:
+        return None
+    from utils.inflight import current_session_id
+    span_ = Span('streamlit.rerun', attributes={'session.id': current_session_id()})
+    return span_, _current_span.set(span_), _rerun_span.set(span_)
+
+def annotate_rerun(**attributes: Any) -> None:
+    """현재 스크립트 실행의 최상위 구간에 속성을 추가합니다. (예: 실행을 일으킨 사용자 동작)"""
+    span_ = _rerun_span.get()
+    if span_ is not None:
+        span_.set_attributes(**attributes)
+
+def finish_rerun_span(handle: Optional[tuple], screen: str) -> None:
+    """
+    최상위 구간을 끝냅니다.
+
+    Args:
+        handle: start_rerun_span()이 반환한 값
+        screen: 화면 이름 (예: 'onboarding', 'chat', 'roadmap')
+    """
+    if handle is None:
+        return
+    span_, token, rerun_token = handle
+    span_.set_attributes(**{'ui.screen': screen})
+    _current_span.reset(token)
+    _rerun_span.reset(rerun_token)
+    span_.end()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+def _otlp_span(span_: Span) -> Dict[str, Any]:
+    encoded = {
+        'traceId': span_.trace_id,
+        'spanId': span_.span_id,
+        'name': span_.name,
+        'kind': span_.kind,
+        'startTimeUnixNano': str(span_.start_ns),
+        'endTimeUnixNano': str(span_.end_ns),
+        'attributes': _otlp_attributes(span_.attributes),
+        'events': [
+            {'timeUnixNano': str(at), 'name': name, 'attributes': _otlp_attributes(attributes)}
+            for at, name, attributes in span_.events
+        ],
+        'status': {'code': 2, 'message': span_.error} if span_.error else {'code': 0},
+    }
+    if span_.parent_id:
+        encoded['parentSpanId'] = span_.parent_id
+    return encoded
+
+def encode_spans(spans: List[Span]) -> Dict[str, Any]:
+    """
+    구간 목록을 OTLP/HTTP JSON 요청 본문(ExportTraceServiceRequest)으로 변환합니다.
+
+    Args:
+        spans: 끝난 구간 목록
+
+    Returns:
+        Dict[str, Any]: 요청 본문
+    """
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': TRACE_SERVICE_NAME,
+                                                         'process.pid': os.getpid()})},
+            'scopeSpans': [{
+                'scope': {'name': __name__},
+                'spans': [_otlp_span(span_) for span_ in spans],
+            }],
+        }],
+    }
+
+
+class _SpanExporter:
+    """끝난 구간을 모아 백그라운드 스레드에서 주기적으로 내보냅니다."""
+
+    def __init__(self, endpoint: str, path: str) -> None:
+        self._endpoint = endpoint
+        self._path = path
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span_: Span) -> None:
+        self._queue.put(span_)
+
+    def _loop(self) -> None:
+        while True:
+            time.sleep(TRACE_FLUSH_SECONDS)
+            self.flush()
+
+    def flush(self) -> None:
+        """대기 중인 구간을 모두 내보냅니다."""
+        while not self._queue.empty():
+            spans = []
+            while len(spans) < TRACE_BATCH_SIZE:
+                try:
+                    spans.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._send(encode_spans(spans))
+                metrics.increment("tracing.exported_spans", len(spans))
+            except Exception:
+                metrics.increment("tracing.export_errors")
+
+    def _send(self, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body, ensure_ascii=False)
+        if self._endpoint:
+            request = urllib.request.Request(self._endpoint, data=payload.encode(), method="POST",
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write(payload + "\n")
+
+
+_exporter: Optional[_SpanExporter] = None
+_exporter_lock = threading.Lock()
+
+def _get_exporter() -> _SpanExporter:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = _SpanExporter(TRACE_OTLP_ENDPOINT, os.environ.get("TRACE_FILE", DEFAULT_TRACE_FILE))
+    return _exporter
+
+def flush() -> None:
+    """대기 중인 구간을 바로 내보냅니다. (종료 직전·도구에서 사용)"""
+    if _exporter is not None:
+        _exporter.flush()